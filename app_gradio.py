@@ -13,6 +13,8 @@ import joblib
 import requests
 from PIL import Image
 
+from fast_predictor import load_fast_predictor
+
 # =======================
 # (Optional) BLIP captioning
 # =======================
@@ -139,8 +141,11 @@ def fetch_weather(city: str) -> Optional[Dict]:
 if not MODEL_PATH.exists():
     raise FileNotFoundError(f"Model not found: {MODEL_PATH.resolve()}")
 _model = joblib.load(MODEL_PATH.as_posix())
+_fast_model = load_fast_predictor(_model)  # pandas-free path; None → sklearn pipeline
 
 def predict_outfit(features: Dict) -> Tuple[str, str, str]:
+    if _fast_model is not None:
+        return _fast_model.predict_one(features)
     df = pd.DataFrame([features])
     pred_top, pred_bottom, pred_outer = _model.predict(df)[0]
     return str(pred_top), str(pred_bottom), str(pred_outer)
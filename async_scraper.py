@@ -0,0 +1,304 @@
+"""
+🕸️ Async Crawler
+Concurrent fetching for ClothingWebScraper: every collection page of every
+site is requested at once instead of one blocking ``requests.Session`` call
+after another with ``time.sleep(2)`` in between.
+
+- connection pool: one ``requests.Session`` with an HTTPAdapter sized to
+  ``max_connections``; blocking calls run on worker threads through
+  ``asyncio.to_thread`` (no extra HTTP dependency), bounded by a semaphore
+- politeness: a token bucket per host (``rate_per_host`` requests/s, bursts
+  of ``burst``) plus at most ``max_per_host`` requests in flight per host, so
+  different hosts proceed in parallel while each one is rate limited
+- retries: connection errors, timeouts, 429 and 5xx are retried up to
+  ``retries`` times with exponential backoff and full jitter; ``Retry-After``
+  is honoured when the server sends it
+- conditional GET: with an http_cache.HttpCache, requests carry
+  ``If-None-Match`` / ``If-Modified-Since``; on ``304`` (or an identical body)
+  the crawler reuses the products parsed last time, and ``report()`` gives
+  bytes and parse time saved for the run; cache reads / writes run on worker
+  threads like the requests
+- fallbacks: a job may name a second (url, parser), e.g. a collection's HTML
+  page behind its Shopify ``products.json``; it is fetched only when the
+  first URL fails or does not parse
+- large pages (html_extract.LARGE_PAGE_BYTES) are parsed off the event loop,
+  so fetches go on meanwhile (and, when a CLI enables html_extract's process
+  pool, several parse at once)
+
+Offline testing: scraper_fixture_server.py serves saved HTML (with optional
+latency / injected failures) on localhost, and the scraper's base URLs can be
+pointed at it.
+"""
+
+import asyncio
+import functools
+import logging
+import random
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import html_extract
+from http_cache import HttpCache
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
+Parser = Callable[[bytes, str], List[Dict]]  # parse(content, url) -> products
+
+
+class Job(NamedTuple):
+    key: str                                     # result key, e.g. "outfitters_men"
+    url: str
+    parse: Parser
+    fallback: Optional[Tuple[str, Parser]] = None  # (url, parse) used if url fails / does not parse
+
+
+class FetchResult(NamedTuple):
+    body: bytes
+    unchanged: bool  # same body as the cached copy (304 or identical 200)
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``; acquire() waits for one."""
+
+    def __init__(self, rate: float, burst: int = 1, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.clock = clock
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:  # FIFO: waiters are served in arrival order
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class AsyncFetcher:
+    """Pooled, per-host rate-limited fetching with retries (use inside one event loop)."""
+
+    def __init__(self, session: Optional[requests.Session] = None, max_connections: int = 8,
+                 rate_per_host: float = 0.5, burst: int = 2, max_per_host: int = 2,
+                 retries: int = 3, backoff: float = 0.5, max_backoff: float = 10.0,
+                 timeout: float = 15, seed: Optional[int] = None, cache: Optional[HttpCache] = None):
+        self.session = session or requests.Session()
+        self.session.headers.setdefault('User-Agent', DEFAULT_USER_AGENT)
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.max_connections = max_connections
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_per_host = max_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.cache = cache
+        self.stats = Counter()
+        self.last_report: Dict = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._pool: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def _limits(self, url: str):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:  # asyncio primitives belong to one loop; a new crawl gets fresh ones
+            self._loop = loop
+            self._buckets, self._host_slots = {}, {}
+            self._pool = asyncio.Semaphore(self.max_connections)
+        host = urlparse(url).netloc.lower()
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+            self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+        return self._buckets[host], self._host_slots[host]
+
+    def _delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.strip().isdigit():
+            return min(float(retry_after), self.max_backoff)
+        # Full jitter: uniform in [0, backoff * 2**attempt]
+        return self.rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    async def fetch(self, url: str) -> Optional[bytes]:
+        """Body of ``url``, or None once retries are exhausted / on a non-retryable status."""
+        result = await self.fetch_result(url)
+        return result.body if result else None
+
+    async def _received(self, url: str, response: requests.Response) -> Optional[FetchResult]:
+        # HttpCache reads / writes files and hashes bodies: keep that off the event loop
+        cached = None
+        if self.cache and response.status_code == 304:
+            cached = await asyncio.to_thread(self.cache.body, url)
+        if cached is not None:
+            self.stats['not_modified'] += 1
+            self.stats['bytes_saved'] += len(cached)
+            return FetchResult(cached, True)
+        if response.status_code == 304:  # validators sent but the cached body is gone
+            return None
+        body = response.content
+        self.stats['bytes_downloaded'] += len(body)
+        unchanged = await asyncio.to_thread(self.cache.store, url, body, response.headers) if self.cache else False
+        return FetchResult(body, unchanged)
+
+    async def fetch_result(self, url: str) -> Optional[FetchResult]:
+        """Like fetch(), plus whether the body is unchanged since the cached copy."""
+        bucket, host_slot = self._limits(url)
+        headers = await asyncio.to_thread(self.cache.conditional_headers, url) if self.cache else {}
+        for attempt in range(self.retries + 1):
+            response = None
+            async with host_slot:
+                await bucket.acquire()
+                async with self._pool:
+                    self.stats['requests'] += 1
+                    try:
+                        response = await asyncio.to_thread(self.session.get, url, timeout=self.timeout,
+                                                           headers=headers)
+                    except requests.RequestException as e:
+                        logger.warning(f"Fetch failed ({attempt + 1}/{self.retries + 1}) {url}: {e}")
+                    else:
+                        if response.status_code < 400:
+                            result = await self._received(url, response)
+                            if result is not None:
+                                return result
+                            headers = {}  # 304 without a cached body: ask again unconditionally
+                            continue
+                        if response.status_code not in RETRY_STATUSES:
+                            logger.warning(f"HTTP {response.status_code} for {url}")
+                            self.stats['failures'] += 1
+                            return None
+                        logger.warning(f"HTTP {response.status_code} ({attempt + 1}/{self.retries + 1}) {url}")
+            if attempt < self.retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._delay(attempt, response))
+        self.stats['failures'] += 1
+        return None
+
+    async def fetch_all(self, urls: Sequence[str]) -> List[Optional[bytes]]:
+        return list(await asyncio.gather(*(self.fetch(u) for u in urls)))
+
+    def report(self, since: Optional[Counter] = None) -> Dict:
+        """Transfer / parse numbers; ``stats`` accumulates, so pass a snapshot to get one run."""
+        keys = ('requests', 'retries', 'failures', 'not_modified', 'bytes_downloaded', 'bytes_saved',
+                'pages_parsed', 'parses_reused', 'parse_seconds', 'parse_seconds_saved', 'fallbacks')
+        since = since or Counter()
+        out = {}
+        for k in keys:
+            value = self.stats[k] - since[k]
+            out[k] = round(value, 4) if isinstance(value, float) else value
+        return out
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def page_urls(url: str, pages: int) -> List[str]:
+    """Collection page 1..pages (Shopify-style ``?page=N``; page 1 is the bare URL)."""
+    sep = '&' if '?' in url else '?'
+    return [url] + [f"{url}{sep}page={n}" for n in range(2, pages + 1)]
+
+
+async def crawl(jobs: Iterable[Job], fetcher: AsyncFetcher) -> Dict[str, List[Dict]]:
+    """
+    Fetch every job's URL concurrently and parse it; products are merged per
+    key in job order, de-duplicated by product URL (name + image otherwise).
+    """
+    jobs = [Job(*job) for job in jobs]
+    before = Counter(fetcher.stats)
+    fetched = await asyncio.gather(*(_run_job(fetcher, job) for job in jobs))
+    results: Dict[str, List[Dict]] = {job.key: [] for job in jobs}
+    seen: Dict[str, set] = {key: set() for key in results}
+    for job, products in zip(jobs, fetched):
+        key = job.key
+        for product in products or []:
+            ident = product.get('product_url') or (product.get('name', '') + product.get('image_url', ''))
+            if ident not in seen[key]:
+                seen[key].add(ident)
+                results[key].append(product)
+
+    fetcher.last_report = report = fetcher.report(since=before)
+    if fetcher.cache:
+        logger.info(f"HTTP cache: {report['not_modified']}/{report['requests']} not modified, "
+                    f"{report['bytes_saved']} bytes and {report['parse_seconds_saved']:.3f}s parsing saved")
+    return results
+
+
+async def _run_job(fetcher: AsyncFetcher, job: Job) -> Optional[List[Dict]]:
+    """Products of a job's URL, or of its fallback when that fails."""
+    result = await fetcher.fetch_result(job.url)
+    products = await _parse(fetcher, job.url, job.parse, result) if result is not None else None
+    if products is None and job.fallback:
+        url, parse = job.fallback
+        logger.info(f"Falling back to {url}")
+        fetcher.stats['fallbacks'] += 1
+        result = await fetcher.fetch_result(url)
+        products = await _parse(fetcher, url, parse, result) if result is not None else None
+    return products
+
+
+def _parser_name(parse: Callable) -> str:
+    if isinstance(parse, functools.partial):  # stable across runs, unlike repr()
+        args = [repr(a) for a in parse.args] + [f"{k}={v!r}" for k, v in sorted(parse.keywords.items())]
+        return f"{_parser_name(parse.func)}({', '.join(args)})"
+    owner = getattr(getattr(parse, '__self__', None), '__class__', None)
+    return f"{owner.__name__}.{parse.__name__}" if owner else getattr(parse, '__qualname__', repr(parse))
+
+
+async def _parse(fetcher: AsyncFetcher, url: str, parse: Callable, result: FetchResult) -> Optional[List[Dict]]:
+    """Products of one page: reused from the cache when the page is unchanged, else parsed (and cached)."""
+    cache, name = fetcher.cache, _parser_name(parse)
+    if cache and result.unchanged:
+        stored = await asyncio.to_thread(cache.products, url, name)
+        if stored is not None:
+            fetcher.stats['parses_reused'] += 1
+            fetcher.stats['parse_seconds_saved'] += stored['seconds']
+            return stored['products']
+    t0 = time.perf_counter()
+    try:
+        if len(result.body) >= html_extract.LARGE_PAGE_BYTES:
+            products = await asyncio.to_thread(parse, result.body, url)
+        else:
+            products = parse(result.body, url)
+    except Exception as e:
+        logger.error(f"Error parsing {url}: {e}")
+        return None
+    seconds = time.perf_counter() - t0
+    fetcher.stats['pages_parsed'] += 1
+    fetcher.stats['parse_seconds'] += seconds
+    if cache:
+        await asyncio.to_thread(cache.store_products, url, name, products, seconds)
+    return products
+
+
+def run_crawl(jobs: Iterable[Job], fetcher: Optional[AsyncFetcher] = None, **fetcher_kwargs) -> Dict[str, List[Dict]]:
+    """Blocking wrapper: crawl in a fresh event loop (worker thread if one is already running)."""
+    fetcher = fetcher or AsyncFetcher(**fetcher_kwargs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(crawl(jobs, fetcher))
+    # Called from async code (e.g. a FastAPI handler): don't nest event loops
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, crawl(jobs, fetcher)).result()
@@ -0,0 +1,76 @@
+"""
+⏱️ Async Scraper Benchmark
+Serves the saved fixture pages from two local servers (Outfitters, Khaadi)
+with simulated latency and times scrape_all_websites: the original
+sequential scrape (one page at a time, --pause seconds between sites) vs
+the concurrent crawler (per-host token bucket at --rate requests/s), then
+a second crawl through the conditional-GET cache (unchanged pages answer 304).
+
+Run: python bench_async_scraper.py [--latency 0.3] [--pages 3] [--rate 2] [--pause 2]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+from async_scraper import AsyncFetcher
+from clothing_web_scraper import ClothingWebScraper
+from scraper_fixture_server import FixtureServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs concurrent scraping")
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per response")
+    parser.add_argument("--pages", type=int, default=3, help="pages per Outfitters collection")
+    parser.add_argument("--rate", type=float, default=2.0, help="requests/s per host (concurrent)")
+    parser.add_argument("--pause", type=float, default=2.0, help="sleep between sites (sequential)")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with FixtureServer(latency=args.latency) as outfitters, FixtureServer(latency=args.latency) as khaadi:
+        scraper = ClothingWebScraper(outfitters_base=outfitters.url, khaadi_base=khaadi.url,
+                                     outfitters_source="html")
+        jobs = scraper.crawl_jobs(args.pages)
+
+        # Sequential: every page fetched + parsed one after another, pausing between sites
+        t0 = time.perf_counter()
+        sequential = {}
+        for i, (key, url, parse, _) in enumerate(jobs):
+            if i and jobs[i - 1][0] != key:
+                time.sleep(args.pause)
+            try:
+                response = scraper.session.get(url, timeout=15)
+                response.raise_for_status()
+                sequential.setdefault(key, []).extend(parse(response.content, url))
+            except Exception:
+                continue
+        sequential_s = time.perf_counter() - t0
+
+        fetcher = AsyncFetcher(rate_per_host=args.rate, burst=2, max_per_host=4)
+        t0 = time.perf_counter()
+        concurrent = scraper.scrape_all_websites(pages=args.pages, fetcher=fetcher)
+        concurrent_s = time.perf_counter() - t0
+
+        # Conditional GET: warm a throwaway cache, then re-crawl unchanged pages
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cached_scraper = ClothingWebScraper(outfitters_base=outfitters.url, khaadi_base=khaadi.url,
+                                                http_cache_dir=cache_dir, outfitters_source="html")
+            options = dict(rate_per_host=args.rate, burst=2, max_per_host=4, cache=cached_scraper.http_cache)
+            cached_scraper.scrape_all_websites(pages=args.pages, fetcher=AsyncFetcher(**options))
+            t0 = time.perf_counter()
+            cached_scraper.scrape_all_websites(pages=args.pages, fetcher=AsyncFetcher(**options))
+            cached_s = time.perf_counter() - t0
+            cache_report = cached_scraper.last_crawl_report
+
+    print(f"📊 {len(jobs)} pages on 2 hosts, {args.latency * 1000:.0f} ms latency")
+    print(f"  sequential (+{args.pause:g} s between sites)  {sequential_s:7.2f} s")
+    print(f"  concurrent ({args.rate:g} req/s per host)       {concurrent_s:7.2f} s   x{sequential_s / concurrent_s:5.1f}")
+    print(f"  re-crawl via HTTP cache             {cached_s:7.2f} s   "
+          f"{cache_report['not_modified']}/{cache_report['requests']} not modified, "
+          f"{cache_report['bytes_saved']} bytes + {cache_report['parse_seconds_saved'] * 1000:.1f} ms parsing saved")
+    print(f"  products: {sum(len(v) for v in concurrent.values())} (deduplicated), requests: {dict(fetcher.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+⏱️ Caption Index Benchmark
+Builds an N-caption cache and compares the legacy normalized dict (every key
+Path.resolve()d and stored twice: absolute + "clothing_images…/" tail) and
+its lookup (resolve + anchor slicing per image, as scan_wardrobe did) with
+CaptionIndex (one interned canonical id per image, string-split lookups).
+
+Memory is the tracemalloc peak while building each structure.
+
+Run: python bench_caption_index.py [--captions 50000] [--lookups 50000]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from caption_index import CaptionIndex
+
+ROOTS = ["clothing_images_men", "clothing_images"]
+LABELS = ["shirt", "t-shirt", "kurta", "sweater", "jeans", "pants", "shorts", "jacket", "coat", "tops"]
+COLORS = ["black", "white", "navy", "red", "olive", "beige", "maroon", "sky blue"]
+
+
+def synthetic_cache(n: int, seed: int = 7) -> Dict[str, str]:
+    rng = random.Random(seed)
+    cache = {}
+    for i in range(n):
+        root, label = rng.choice(ROOTS), rng.choice(LABELS)
+        caption = f"a studio product photo of a {rng.choice(COLORS)} {label} for {'men' if root.endswith('men') else 'women'},"
+        cache[f"{root}/{label}/{label}_{i:06d}.jpg"] = caption
+    return cache
+
+
+# --- legacy (pre-CaptionIndex) key handling, kept here for comparison ---
+def legacy_normalize(cache: Dict[str, str]) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for k, v in cache.items():
+        norm_key = Path(k).resolve().as_posix().lower()
+        val = (v or "").strip()
+        out[norm_key] = val
+        for anchor in ("/clothing_images_men/", "/clothing_images/"):
+            idx = norm_key.find(anchor)
+            if idx != -1:
+                out[norm_key[idx + 1:]] = val
+    return out
+
+
+def legacy_lookup(cache: Dict[str, str], raw_path: str):
+    img_key = Path(raw_path).resolve().as_posix().lower()
+    if img_key in cache:
+        return cache[img_key]
+    rel_posix = raw_path.replace("\\", "/").lower()
+    for anchor in ("clothing_images_men/", "clothing_images/"):
+        if anchor in rel_posix:
+            tail = rel_posix[rel_posix.index(anchor):]
+            if tail in cache:
+                return cache[tail]
+    return None
+
+
+def build_measured(fn, cache):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    built = fn(cache)
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, seconds, peak / 1e6
+
+
+def time_lookups(fn, paths: List[str]) -> float:
+    t0 = time.perf_counter()
+    hits = sum(fn(p) is not None for p in paths)
+    assert hits == len(paths), hits
+    return (time.perf_counter() - t0) * 1e6 / len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark caption key lookup structures")
+    parser.add_argument("--captions", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=50_000)
+    args = parser.parse_args()
+
+    cache = synthetic_cache(args.captions)
+    keys = list(cache)
+    rng = random.Random(1)
+    paths = [rng.choice(keys) for _ in range(args.lookups)]
+    paths = [p if i % 2 else str(Path(p).resolve()) for i, p in enumerate(paths)]  # half absolute
+
+    legacy, legacy_s, legacy_mb = build_measured(legacy_normalize, cache)
+    index, index_s, index_mb = build_measured(CaptionIndex, cache)
+    legacy_us = time_lookups(lambda p: legacy_lookup(legacy, p), paths)
+    index_us = time_lookups(index.get, paths)
+
+    print(f"📊 {len(cache)} captions, {len(paths)} lookups (half absolute paths)")
+    print(f"  build   legacy {legacy_s * 1000:8.1f} ms {legacy_mb:7.1f} MB ({len(legacy)} keys)   "
+          f"index {index_s * 1000:7.1f} ms {index_mb:6.1f} MB ({len(index)} keys)")
+    print(f"  lookup  legacy {legacy_us:8.2f} µs/path   index {index_us:6.2f} µs/path   x{legacy_us / index_us:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
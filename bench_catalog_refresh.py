@@ -0,0 +1,68 @@
+"""
+⏱️ Catalog Refresh Benchmark
+Time a recommendation request when its catalog slices are stale, against
+fixture sites with --latency seconds per response: the old constructor
+scraped the slices inside the request; with CatalogRefresher the request
+reads the snapshot and the scrape runs on the background worker.
+
+Run: python bench_catalog_refresh.py [--latency 1.0]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+from catalog_refresher import CatalogRefresher, scrape_slice
+from clothing_web_scraper import ClothingWebScraper
+from dynamic_shopping_recommender import DynamicShoppingRecommender
+from product_catalog import ProductCatalog
+from scraper_fixture_server import FixtureServer
+
+SLICES = ["outfitters_women", "outfitters_women_shirts"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-request scraping vs stale-while-revalidate")
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per response")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with FixtureServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        def scraper():
+            return ClothingWebScraper(outfitters_base=server.url, khaadi_base=server.url, http_cache_dir=None)
+
+        catalog = ProductCatalog(Path(tmp) / "catalog.db")
+        stale_at = time.time() - 7 * 24 * 3600
+        for source in SLICES:
+            catalog.upsert_products(source, scrape_slice(scraper(), source), replace=True, refreshed_at=stale_at)
+
+        # Old request path: scrape the stale slices before answering
+        t0 = time.perf_counter()
+        for source in SLICES:
+            catalog.upsert_products(source, scrape_slice(scraper(), source), replace=True)
+        blocking_s = time.perf_counter() - t0
+        for source in SLICES:
+            catalog.upsert_products(source, [], refreshed_at=stale_at)
+
+        refresher = CatalogRefresher(catalog, scraper_factory=scraper)
+        t0 = time.perf_counter()
+        recommender = DynamicShoppingRecommender(tmp, gender="women", preferred_category="shirts",
+                                                 catalog=catalog, refresher=refresher)
+        products = recommender._get_available_products()
+        request_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        refresher.drain()
+        background_s = time.perf_counter() - t0
+        catalog.close()
+
+    print(f"📊 stale slices {SLICES}, {args.latency * 1000:.0f} ms per response")
+    print(f"  scrape inside the request        {blocking_s * 1000:9.1f} ms")
+    print(f"  serve snapshot + queue refresh   {request_s * 1000:9.1f} ms   "
+          f"({sum(len(v) for v in products.values())} products served)")
+    print(f"  background refresh finished      {background_s * 1000:9.1f} ms later, stats {dict(refresher.stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+⏱️ Color Extraction Benchmark
+Compares the legacy per-term regex loop with color_extraction.ColorExtractor
+on a synthetic corpus built from the stored BLIP captions.
+
+Run: python bench_color_extraction.py [--captions 20000]
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from color_extraction import COLOR_ALIASES, COLOR_NAMES, ColorExtractor
+
+
+def legacy_extract_color_from_caption(caption: str) -> Optional[str]:
+    """Verbatim copy of the pre-refactor helper (one regex search per term)."""
+    if not caption:
+        return None
+    text = caption.lower()
+    for c in COLOR_NAMES:
+        if re.search(rf"\b{re.escape(c)}\b", text):
+            return c
+    for alias, canonical in COLOR_ALIASES.items():
+        if re.search(rf"\b{re.escape(alias)}\b", text):
+            return canonical
+    return None
+
+
+def build_corpus(n: int, seed: int = 7) -> List[str]:
+    """Stored captions plus synthetic variants that exercise aliases and misses."""
+    base: List[str] = []
+    for p in ("blip_captions_male.json", "blip_captions_female.json"):
+        if Path(p).exists():
+            with open(p, "r", encoding="utf-8") as f:
+                base.extend(json.load(f).values())
+    if not base:
+        base = ["a studio product photo of a shirt"]
+    rng = random.Random(seed)
+    vocab = list(COLOR_NAMES) + list(COLOR_ALIASES.keys())
+    fillers = ["cotton", "slim fit", "with buttons", "for men", "for women", "striped", "plain"]
+    corpus: List[str] = []
+    for i in range(n):
+        cap = rng.choice(base)
+        r = rng.random()
+        if r < 0.4:
+            cap = f"{cap} {rng.choice(fillers)} {rng.choice(vocab)} {i}"
+        elif r < 0.6:
+            cap = f"a {rng.choice(fillers)} garment number {i}"
+        corpus.append(cap)
+    return corpus
+
+
+def _time(fn, *args) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark caption color extraction")
+    parser.add_argument("--captions", type=int, default=20000)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.captions)
+    extractor = ColorExtractor()
+
+    legacy = [legacy_extract_color_from_caption(c) for c in corpus]
+    fast = [extractor.extract(c) for c in corpus]
+    bulk = extractor.extract_many(corpus)
+    mismatches = sum(1 for a, b in zip(legacy, fast) if a != b)
+    assert fast == bulk
+
+    results: Dict[str, float] = {
+        "legacy loop": _time(lambda: [legacy_extract_color_from_caption(c) for c in corpus]),
+        "ColorExtractor.extract": _time(lambda: [extractor.extract(c) for c in corpus]),
+        "ColorExtractor.extract_many": _time(extractor.extract_many, corpus),
+    }
+
+    print(f"📊 {len(corpus)} captions, {len(set(corpus))} unique, mismatches vs legacy: {mismatches}")
+    base = results["legacy loop"]
+    for name, secs in results.items():
+        per = secs / len(corpus) * 1e6
+        print(f"  {name:<30} {secs*1000:9.1f} ms  {per:7.2f} µs/caption  x{base/secs:6.1f}")
+
+
+if __name__ == "__main__":
+    main()
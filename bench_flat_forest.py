@@ -0,0 +1,148 @@
+"""
+⏱️ Flat Forest Benchmark
+Compares the sklearn outfit pipeline (joblib.load + predict on a DataFrame)
+with the compiled flat model (load_flat_model, memory-mapped + predict_many)
+at batch sizes 1 / 100 / 10k. Each variant runs in a fresh subprocess so the
+reported peak RSS covers imports, model load and prediction only.
+
+Without --model a pipeline identical to dataset.ipynb / DATA.ipynb is trained
+from --csv (the checked-in .pkl files may be LFS pointers).
+
+Run: python bench_flat_forest.py [--model weather_clothing_recommender.pkl]
+                                 [--csv enhanced_weather_clothing_dataset_no_accessories.csv]
+"""
+
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from train_outfit_models import TARGETS
+
+DEFAULT_CSV = "enhanced_weather_clothing_dataset_no_accessories.csv"
+
+
+def notebook_pipeline(csv_path: str, n_estimators: int = 100):
+    """Same preprocessing, forest and split as dataset.ipynb / DATA.ipynb."""
+    from train_outfit_models import fit, load_dataset
+
+    X, y = load_dataset(csv_path)
+    pipeline, _ = fit(X, y, n_estimators, max_depth=None, n_jobs=None)
+    return pipeline, X
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process (VmHWM resets on exec, unlike ru_maxrss)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def batch_rows(rows: List[Dict], n: int) -> List[Dict]:
+    return [rows[i % len(rows)] for i in range(n)]
+
+
+# ==========================
+# Child process (one variant, one batch size)
+# ==========================
+def run_child(mode: str, artifact: str, rows_path: str, batch: int, repeat: int) -> Dict:
+    t0 = time.perf_counter()
+    if mode == "joblib":
+        import joblib
+        import pandas as pd
+
+        model = joblib.load(artifact)
+        predict = lambda rows: model.predict(pd.DataFrame(rows))
+    else:
+        from fast_predictor import load_flat_model
+
+        model = load_flat_model(artifact, mmap=True)
+        predict = model.predict_many
+    load_ms = (time.perf_counter() - t0) * 1000
+
+    rows = batch_rows(json.loads(Path(rows_path).read_text()), batch)
+    predict(rows)  # warm-up
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        predict(rows)
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return {"load_ms": load_ms, "predict_ms": times[len(times) // 2],
+            "rss_mb": peak_rss_mb()}
+
+
+def spawn(mode: str, artifact: Path, rows_path: Path, batch: int, repeat: int) -> Dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--artifact", str(artifact),
+         "--rows", str(rows_path), "--batch", str(batch), "--repeat", str(repeat)],
+        check=True, capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the flat forest evaluator against joblib + sklearn")
+    parser.add_argument("--model", help="pipeline .pkl (default: train one from --csv)")
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--batches", default="1,100,10000")
+    parser.add_argument("--repeat", type=int, default=0, help="timed calls per batch (default: auto)")
+    parser.add_argument("--child", choices=["joblib", "flat"], help=argparse.SUPPRESS)
+    parser.add_argument("--artifact", help=argparse.SUPPRESS)
+    parser.add_argument("--rows", help=argparse.SUPPRESS)
+    parser.add_argument("--batch", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.artifact, args.rows, args.batch, args.repeat)))
+        return
+
+    import joblib
+    from fast_predictor import FastOutfitPredictor, load_flat_model
+
+    if args.model:
+        pipeline = joblib.load(args.model)
+        with open(args.csv, newline="", encoding="utf-8") as f:
+            names = next(csv.reader(f))
+        import pandas as pd
+        X = pd.read_csv(args.csv).dropna()[[c for c in names if c not in TARGETS]]
+    else:
+        pipeline, X = notebook_pipeline(args.csv)
+    rows = X.to_dict(orient="records")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pkl = Path(tmp) / "model.pkl"
+        joblib.dump(pipeline, pkl)
+        flat = FastOutfitPredictor.from_pipeline(pipeline).save(Path(tmp) / "model.flat")
+        rows_path = Path(tmp) / "rows.json"
+        rows_path.write_text(json.dumps(rows))
+
+        expected = [tuple(str(v) for v in r) for r in pipeline.predict(X)]
+        mismatches = sum(a != b for a, b in zip(expected, load_flat_model(flat).predict_many(rows)))
+        flat_mb = sum(p.stat().st_size for p in flat.iterdir()) / 1e6
+        print(f"📊 {len(rows)} rows, mismatches vs pipeline.predict: {mismatches}")
+        print(f"  on disk: joblib {pkl.stat().st_size / 1e6:.1f} MB, flat {flat_mb:.1f} MB")
+
+        for batch in (int(b) for b in args.batches.split(",")):
+            repeat = args.repeat or max(3, min(200, 20000 // batch))
+            old = spawn("joblib", pkl, rows_path, batch, repeat)
+            new = spawn("flat", flat, rows_path, batch, repeat)
+            print(f"  batch {batch:>6}: predict joblib {old['predict_ms']:9.2f} ms   flat {new['predict_ms']:9.2f} ms"
+                  f"   x{old['predict_ms'] / new['predict_ms']:5.1f}   |  load {old['load_ms']:6.0f} / {new['load_ms']:4.0f} ms"
+                  f"   peak RSS {old['rss_mb']:5.0f} / {new['rss_mb']:4.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
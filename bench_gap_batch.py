@@ -0,0 +1,69 @@
+"""
+⏱️ Batch Gap Analysis Benchmark
+Random count matrices for N wardrobes; compares one GapAnalyzer per user
+(wardrobe dict built from the counts, Python loops) with BatchGapAnalyzer
+(array operations over all users), with and without compact records.
+
+Run: python bench_gap_batch.py [--users 100000] [--season winter]
+"""
+
+import argparse
+import time
+from collections import Counter
+
+import numpy as np
+
+from gap_batch import BatchGapAnalyzer
+from shopping_recommender_backend import GapAnalyzer, categorize_label
+
+LABELS = ["shirt", "t-shirt", "tops", "kurta", "sweater", "jeans", "pants", "shorts", "trousers",
+          "capris", "leggings", "coat", "jacket", "hoodie", "puffer_jacket", "dupatta"]
+COLORS = ["black", "white", "blue", "red", "green", "yellow", "orange", "pink", "purple",
+          "brown", "gray", "beige", "navy", "maroon", "olive", "mustard"]
+
+
+def per_user(label_counts, color_counts, season):
+    categories = [categorize_label(l) for l in LABELS]
+    out = []
+    for labels_row, colors_row in zip(label_counts.tolist(), color_counts.tolist()):
+        wardrobe = {"tops": {}, "bottoms": {}, "outerwear": {}, "total_items": sum(labels_row),
+                    "color_distribution": Counter({c: n for c, n in zip(COLORS, colors_row) if n})}
+        for label, cat, n in zip(LABELS, categories, labels_row):
+            if n:
+                wardrobe[cat][label] = {"count": n, "colors": [], "unique_colors": []}
+        out.append(GapAnalyzer(wardrobe, season).analyze_gaps())
+    return out
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch gap analysis")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--season", default="winter")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    label_counts = rng.choice([0, 0, 0, 1, 2, 3], size=(args.users, len(LABELS)))
+    color_counts = rng.choice([0, 0, 1, 2, 4], size=(args.users, len(COLORS)))
+    analyzer = BatchGapAnalyzer(LABELS)
+
+    loop, loop_s = timed(lambda: per_user(label_counts, color_counts, args.season))
+    batch, batch_s = timed(lambda: analyzer.analyze(label_counts, color_counts, COLORS, args.season))
+    records, records_s = timed(batch.records)
+    for i in range(0, args.users, max(1, args.users // 100)):
+        assert batch.gaps(i) == loop[i], i
+
+    print(f"📊 {args.users} wardrobes, {len(LABELS)} labels × {len(COLORS)} colors, season={args.season}")
+    print(f"  GapAnalyzer per user      {loop_s * 1000:9.1f} ms")
+    print(f"  batch arrays (all gaps)   {batch_s * 1000:9.1f} ms   x{loop_s / batch_s:7.1f}")
+    print(f"  batch + compact records   {(batch_s + records_s) * 1000:9.1f} ms   x{loop_s / (batch_s + records_s):7.1f}"
+          f"   ({len(records)} records)")
+
+
+if __name__ == "__main__":
+    main()
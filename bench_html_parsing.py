@@ -0,0 +1,95 @@
+"""
+⏱️ HTML Parsing Benchmark
+Times ClothingWebScraper's HTML parsers on the stored fixture pages with the
+original BeautifulSoup backend vs html_extract (lxml, precompiled selectors,
+one walk per container), then on a large page made of --cards repeated
+product cards, and finally --pages large pages parsed one after another
+in-process vs concurrently through html_extract's process pool.
+
+Run: python bench_html_parsing.py [--repeat 20] [--cards 3000] [--pages 8]
+"""
+
+import argparse
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import html_extract
+from clothing_web_scraper import ClothingWebScraper
+from scraper_fixture_server import DEFAULT_DIR
+
+BASE = "https://outfitters.com.pk"
+PAGES = [
+    ("outfitters_men_shirts.html", "parse_outfitters_men_shirts"),
+    ("outfitters_men_shirts_page2.html", "parse_outfitters_men_shirts"),
+    ("outfitters_women_shirts.html", "parse_outfitters_women_shirts"),
+    ("khaadi_men.html", "parse_khaadi_men"),
+]
+
+
+def best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def large_page(cards: int) -> bytes:
+    """Khaadi fixture with its product tiles repeated ``cards`` times (distinct links)."""
+    page = (DEFAULT_DIR / "khaadi_men.html").read_text(encoding="utf-8")
+    tiles = re.findall(r'  <div class="product-tile">.*?\n  </div>\n', page, flags=re.S)
+    body = "".join(tiles[i % len(tiles)].replace('.html"', f'-{i}.html"') for i in range(cards))
+    start, end = page.index(tiles[0]), page.index(tiles[-1]) + len(tiles[-1])
+    return (page[:start] + body + page[end:]).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BeautifulSoup vs lxml HTML extraction")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cards", type=int, default=3000, help="product cards on the large page")
+    parser.add_argument("--pages", type=int, default=8, help="large pages for the process-pool run")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    bs4 = ClothingWebScraper(outfitters_base=BASE, http_cache_dir=None, parser_backend="bs4")
+    lxml = ClothingWebScraper(outfitters_base=BASE, http_cache_dir=None, parser_backend="lxml")
+
+    print(f"📊 Fixture pages (best of {args.repeat})")
+    for name, method in PAGES:
+        content = (DEFAULT_DIR / name).read_bytes()
+        url = f"{BASE}/collections/x"
+        slow = best(lambda: getattr(bs4, method)(content, url), args.repeat)
+        fast = best(lambda: getattr(lxml, method)(content, url), args.repeat)
+        print(f"  {name:34s} bs4 {slow * 1000:7.3f} ms   lxml {fast * 1000:7.3f} ms   x{slow / fast:5.1f}")
+
+    page = large_page(args.cards)
+    url = "https://khaadi.com/men"
+    slow = best(lambda: bs4.parse_khaadi_men(page, url), 3)
+    fast = best(lambda: html_extract.extract_products(page, url, "khaadi_men", url), 3)
+    print(f"\n📊 Large page: {args.cards} cards, {len(page) / 1024:.0f} KiB (best of 3)")
+    print(f"  bs4 {slow * 1000:8.1f} ms   lxml {fast * 1000:8.1f} ms   x{slow / fast:5.1f}")
+
+    print(f"\n📊 {args.pages} large pages, {html_extract.POOL_WORKERS} pool workers")
+    if html_extract.POOL_WORKERS < 2:
+        print("  single CPU: parse_products() parses in-process, nothing to compare")
+        return
+    t0 = time.perf_counter()
+    for _ in range(args.pages):
+        html_extract.extract_products(page, url, "khaadi_men", url)
+    in_process = time.perf_counter() - t0
+    html_extract.use_process_pool()
+    html_extract.parse_products(page, url, "khaadi_men", url)  # start the workers
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.pages) as threads:  # like the crawler's to_thread offload
+        list(threads.map(lambda _: html_extract.parse_products(page, url, "khaadi_men", url), range(args.pages)))
+    pooled = time.perf_counter() - t0
+    html_extract.use_process_pool(False)
+    print(f"  in-process, one by one  {in_process * 1000:8.1f} ms")
+    print(f"  process pool            {pooled * 1000:8.1f} ms   x{in_process / pooled:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
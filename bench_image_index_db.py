@@ -0,0 +1,136 @@
+"""
+⏱️ Image Index DB Benchmark
+Indexes N synthetic rows with the old pattern (new sqlite3.connect + commit
+per upsert, as upsert_image_record used to do) and with ImageIndexDB
+(per-thread WAL connection, executemany batches), then times caption lookups.
+Finally compares color queries / random samples at --query-rows rows: the old
+LIKE + ORDER BY RANDOM() SQL against image_colors + FTS5 + id sampling.
+
+Run: python bench_image_index_db.py [--rows 10000] [--batch 256] [--query-rows 100000]
+"""
+
+import argparse
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from image_index_db import SCHEMA, UPSERT_SQL, ImageIndexDB
+
+LABELS = ["shirt", "tshirt", "jeans", "trousers", "jacket", "coat", "hoodie", "shorts"]
+COLORS = ["black", "white", "gray", "red", "blue", "green", "beige", "brown", "pink", "navy"]
+# canonical color -> alias terms, as color_terms_for_query returns them
+QUERY_TERMS = {
+    "blue": ["aqua", "azure", "babyblue", "blue", "cobalt", "denim", "indigo", "midnight", "navy", "royalblue",
+             "sapphire", "sky", "teal", "turquoise"],
+    "gray": ["ash", "charcoal", "graphite", "gray", "grey", "gunmetal", "pewter", "slate", "smoke"],
+    "pink": ["baby pink", "blush", "bubblegum", "coralpink", "dustyrose", "fuchsia", "hotpink", "peony", "pink",
+             "rose", "salmonpink"],
+}
+
+
+def synthetic_rows(n: int, seed: int = 7) -> List[Tuple[str, str, str, List[str]]]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        label = rng.choice(LABELS)
+        colors = rng.sample(COLORS, rng.randint(0, 2))
+        caption = f"a {' and '.join(colors) or 'plain'} {label} on a white background"
+        rows.append((f"/data/clothing_images/{label}/img_{i:06d}.jpg", label, caption, colors))
+    return rows
+
+
+def legacy_index(db_path: Path, rows) -> None:
+    with sqlite3.connect(db_path.as_posix()) as con:
+        for stmt in SCHEMA:
+            con.execute(stmt)
+    for path, label, caption, colors in rows:
+        with sqlite3.connect(db_path.as_posix()) as con:
+            con.execute(UPSERT_SQL, (path, label, caption, ",".join(colors), None, None))
+
+
+def legacy_lookup(db_path: Path, paths) -> None:
+    for p in paths:
+        with sqlite3.connect(db_path.as_posix()) as con:
+            con.execute("SELECT caption FROM images WHERE path = ?", (p,)).fetchone()
+
+
+def legacy_query(con: sqlite3.Connection, color: str, terms: List[str], limit: int):
+    params = [f"%{color}%"] + [f"%{t.lower()}%" for t in terms]
+    where = ["colors LIKE ?"] + ["LOWER(caption) LIKE ?"] * len(terms)
+    sql = f"""
+        SELECT path,label,caption,colors
+        FROM images
+        WHERE {" OR ".join(where)}
+        ORDER BY RANDOM() LIMIT ?
+    """
+    return con.execute(sql, params + [limit]).fetchall()
+
+
+def _per_call_ms(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def bench_queries(n: int, limit: int = 24, repeat: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ImageIndexDB(Path(tmp) / "query.db")
+        db.upsert_many(synthetic_rows(n))
+        con = db.connection()
+        print(f"📊 {n} rows, limit={limit}, mean of {repeat} calls")
+        for color, terms in QUERY_TERMS.items():
+            old = _per_call_ms(lambda: legacy_query(con, color, terms, limit), repeat)
+            new = _per_call_ms(lambda: db.query_by_color(color, terms, limit), repeat)
+            print(f"  color {color:<6} LIKE+RANDOM() {old:8.2f} ms   image_colors+FTS5 {new:7.2f} ms   x{old/new:6.1f}")
+        old = _per_call_ms(lambda: con.execute(
+            "SELECT path,label,caption,colors FROM images ORDER BY RANDOM() LIMIT ?", (limit,)).fetchall(), repeat)
+        new = _per_call_ms(lambda: db.sample(limit), repeat)
+        print(f"  sample       ORDER BY RANDOM() {old:8.2f} ms   id sampling      {new:7.2f} ms   x{old/new:6.1f}")
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image index data layer")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--query-rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.rows)
+    lookups = [r[0] for r in random.Random(3).sample(rows, min(args.lookups, len(rows)))]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old_db = Path(tmp) / "legacy.db"
+        t0 = time.perf_counter()
+        legacy_index(old_db, rows)
+        old_write = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        legacy_lookup(old_db, lookups)
+        old_read = time.perf_counter() - t0
+
+        db = ImageIndexDB(Path(tmp) / "batched.db", batch_size=args.batch)
+        t0 = time.perf_counter()
+        db.upsert_many(rows)
+        new_write = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for p in lookups:
+            db.get_caption(p)
+        new_read = time.perf_counter() - t0
+        assert db.count() == len(rows)
+        db.close()
+
+    print(f"📊 {len(rows)} rows, batch={args.batch}, {len(lookups)} caption lookups")
+    print(f"  index  legacy {old_write*1000:9.1f} ms   batched {new_write*1000:8.1f} ms   x{old_write/new_write:6.1f}")
+    print(f"  lookup legacy {old_read*1000:9.1f} ms   pooled  {new_read*1000:8.1f} ms   x{old_read/new_read:6.1f}")
+
+    if args.query_rows:
+        bench_queries(args.query_rows)
+
+
+if __name__ == "__main__":
+    main()
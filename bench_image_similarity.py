@@ -0,0 +1,78 @@
+"""
+⏱️ Image Similarity Benchmark
+Embedding throughput on synthetic images, plus nearest-neighbour latency and
+recall of the per-label index (brute force vs. inverted-file ANN).
+
+Run: python bench_image_similarity.py [--images 200] [--vectors 20000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from image_similarity import EMBED_DIM, LabelSimilarityIndex, embed_rgb
+
+
+def synthetic_images(n: int, seed: int = 7):
+    """Flat-colored 'garments' with random stripes, at a typical product-photo size."""
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        img = np.full((64, 48, 3), rng.integers(0, 256, 3), dtype=np.uint8)
+        step = int(rng.integers(3, 12))
+        img[::step] = rng.integers(0, 256, 3)
+        yield img
+
+
+def synthetic_vectors(n: int, seed: int = 11) -> np.ndarray:
+    """Clustered unit vectors with the embedding's dimensionality."""
+    rng = np.random.default_rng(seed)
+    centers = rng.random((max(n // 50, 1), EMBED_DIM)).astype(np.float32)
+    x = centers[rng.integers(0, len(centers), n)] + 0.05 * rng.random((n, EMBED_DIM)).astype(np.float32)
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x.astype(np.float16)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image similarity search")
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    imgs = list(synthetic_images(args.images))
+    t0 = time.perf_counter()
+    for img in imgs:
+        embed_rgb(img)
+    secs = time.perf_counter() - t0
+    print(f"🖼️ embedding: {args.images} images in {secs*1000:.1f} ms ({secs/args.images*1000:.2f} ms/image)")
+    print(f"   vector: {EMBED_DIM} x float16 = {EMBED_DIM * 2} bytes/image")
+
+    vecs = synthetic_vectors(args.vectors)
+    ids = [f"img_{i}.jpg" for i in range(len(vecs))]
+    queries = np.random.default_rng(3).choice(len(ids), args.queries, replace=False)
+
+    t0 = time.perf_counter()
+    brute = LabelSimilarityIndex(ids, vecs, ann_threshold=len(ids) + 1)
+    build_brute = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ann = LabelSimilarityIndex(ids, vecs, ann_threshold=1)
+    build_ann = time.perf_counter() - t0
+
+    results = {}
+    for name, index in (("brute force", brute), ("ANN (IVF)", ann)):
+        t0 = time.perf_counter()
+        hits = [index.neighbours(ids[q], k=10) for q in queries]
+        results[name] = ((time.perf_counter() - t0) / len(queries), hits)
+
+    exact, approx = results["brute force"][1], results["ANN (IVF)"][1]
+    recall = np.mean([len({h for h, _ in a} & {h for h, _ in b}) / 10.0 for a, b in zip(exact, approx)])
+    print(f"📊 {len(ids)} vectors, {len(queries)} queries, k=10")
+    print(f"  build: brute {build_brute*1000:.1f} ms, ANN {build_ann*1000:.1f} ms")
+    for name, (per, _) in results.items():
+        print(f"  {name:<12} {per*1000:8.3f} ms/query")
+    print(f"  ANN recall@10 vs brute force: {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+⏱️ Product Catalog Benchmark
+Builds N synthetic scraped products, then compares the JSON path
+(json.load of scraped_clothing_data.json + ClothingWebScraper's linear
+get_products_by_color / get_products_by_category scans) with ProductCatalog
+(upsert ingestion, then indexed by_color / by_category / price-bounded search).
+Unbounded catalog queries cost about as much as building their result dicts;
+bounded ones (what a recommendation shows) stay in the low milliseconds.
+Budget queries ("tops under PKR 3,000 in missing colors") compare reparsing
+every price string against PriceIndex's bisect over sorted price arrays.
+
+Run: python bench_product_catalog.py [--products 100000] [--queries 50]
+"""
+
+import argparse
+import json
+import logging
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from clothing_web_scraper import ClothingWebScraper
+from color_extraction import extract_color_from_caption
+from product_catalog import ProductCatalog, category_family, price_minor, to_minor
+
+CATEGORIES = ["shirts", "t-shirt", "kurta", "jeans", "trousers", "shorts", "jacket", "hoodie", "coat"]
+COLORS = ["Black", "White", "Navy", "Light Blue", "Red", "Olive Green", "Beige", "Charcoal", "Pink", "Brown"]
+QUERY_COLORS = ["black", "blue", "green", "red"]
+
+
+def synthetic_scrape(n: int, seed: int = 7) -> Dict[str, List[Dict]]:
+    rng = random.Random(seed)
+    scraped: Dict[str, List[Dict]] = {}
+    for i in range(n):
+        gender = rng.choice(["men", "women"])
+        category = rng.choice(CATEGORIES)
+        colors = rng.sample(COLORS, rng.randint(0, 3))
+        scraped.setdefault(f"outfitters_{gender}", []).append({
+            "name": f"{category.title()} {i:06d}",
+            "price": f"PKR {rng.randrange(999, 9999):,}",
+            "colors": colors,
+            "image_url": f"https://cdn.example/{i}.jpg",
+            "product_url": f"https://example.com/products/{category}-{i}",
+            "website": "Outfitters",
+            "category": category,
+            "gender": gender,
+        })
+    return scraped
+
+
+def per_query(fn, args_list) -> Tuple[float, int]:
+    """(ms per query, mean result size)"""
+    rows = 0
+    t0 = time.perf_counter()
+    for args in args_list:
+        rows += len(fn(*args))
+    return (time.perf_counter() - t0) * 1000 / len(args_list), rows // len(args_list)
+
+
+def scan_under_budget(scraped: Dict[str, List[Dict]], gender: str, family: str, budget_minor: int,
+                      colors: List[str]) -> List[Dict]:
+    """Budget query without a price index: parse every price string, filter, sort."""
+    wanted = {extract_color_from_caption(c) for c in colors}
+    hits = []
+    for product in scraped.get(f"outfitters_{gender}", []):
+        price = price_minor(product["price"])
+        if price is None or price > budget_minor or category_family(product["category"]) != family:
+            continue
+        if any(extract_color_from_caption(c) in wanted for c in product["colors"]):
+            hits.append((price, product))
+    hits.sort(key=lambda hit: hit[0])
+    return [product for _, product in hits]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON scans vs the SQLite product catalog")
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    scraped = synthetic_scrape(args.products)
+    rng = random.Random(11)
+    color_queries = [(rng.choice(QUERY_COLORS), rng.choice(["men", "women"])) for _ in range(args.queries)]
+    category_queries = [(rng.choice(["shirt", "jeans", "jacket"]), rng.choice(["men", "women"]))
+                        for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "scraped_clothing_data.json"
+        json_path.write_text(json.dumps(scraped), encoding="utf-8")
+
+        legacy = ClothingWebScraper(http_cache_dir=None)
+        t0 = time.perf_counter()
+        legacy.load_from_json(json_path.as_posix())
+        load_ms = (time.perf_counter() - t0) * 1000
+        legacy_color = per_query(legacy.get_products_by_color, color_queries)
+        legacy_category = per_query(legacy.get_products_by_category, category_queries)
+
+        catalog = ProductCatalog(Path(tmp) / "catalog.db")
+        t0 = time.perf_counter()
+        catalog.ingest(scraped)
+        ingest_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        catalog.ingest(scraped)
+        reingest_s = time.perf_counter() - t0
+
+        catalog_color = per_query(catalog.by_color, color_queries)
+        catalog_category = per_query(catalog.by_category, category_queries)
+        catalog_color_50 = per_query(lambda c, g: catalog.by_color(c, g, limit=50), color_queries)
+        budget = per_query(
+            lambda c, g: catalog.search(gender=g, category="tops", color=c, max_price_minor=300000,
+                                        order_by_price=True, limit=20),
+            color_queries)
+        t0 = time.perf_counter()
+        indexes = {g: catalog.price_index(g) for g in ("men", "women")}
+        index_build_ms = (time.perf_counter() - t0) * 1000
+        budget_queries = [(g, to_minor(3000), [c.title()]) for c, g in color_queries]
+        scan_budget = per_query(lambda g, b, colors: scan_under_budget(scraped, g, "tops", b, colors),
+                                budget_queries[:5])
+        index_budget = per_query(lambda g, b, colors: indexes[g].under(g, "tops", b, colors=colors),
+                                 budget_queries)
+        index_range = per_query(lambda g, b, colors: indexes[g].range(g, "tops", b - 50000, b), budget_queries)
+        catalog.close()
+
+    print(f"📊 {args.products:,} products, {args.queries} queries each (ms per query)")
+    print(f"  JSON load                                {load_ms:9.1f} ms (once per process)")
+    print(f"  catalog ingest / re-ingest (upsert)      {ingest_s:9.2f} s / {reingest_s:.2f} s")
+    rows = [("by color (all matches)", legacy_color, catalog_color),
+            ("by category (all matches)", legacy_category, catalog_category),
+            ("by color, limit 50", None, catalog_color_50),
+            ("tops in color under PKR 3,000, top 20", None, budget)]
+    print(f"  price index build (both genders)         {index_build_ms:9.1f} ms (once per ingest)")
+    rows += [("tops under PKR 3,000 in a color", scan_budget, index_budget),
+             ("tops PKR 2,500-3,000 (bisect range)", None, index_range)]
+    for label, legacy_result, (ms, n) in rows:
+        scan = f"JSON scan {legacy_result[0]:8.2f}" if legacy_result else " " * 18
+        speedup = f"x{legacy_result[0] / ms:6.1f}" if legacy_result else " " * 7
+        print(f"  {label:<38} {scan}   catalog {ms:8.2f}   {speedup}  ({n:,} results)")
+
+
+if __name__ == "__main__":
+    main()
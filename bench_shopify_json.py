@@ -0,0 +1,75 @@
+"""
+⏱️ Shopify JSON vs HTML Benchmark
+Parsing cost of one Outfitters collection page read two ways: the HTML page
+(parse_outfitters_collection, BeautifulSoup + selector probing) vs the
+products.json feed (parse_outfitters_products_json). Pages are built from the
+saved fixtures, repeated to --products products with distinct handles.
+
+Run: python bench_shopify_json.py [--products 48] [--repeat 50]
+"""
+
+import argparse
+import copy
+import json
+import logging
+import re
+import time
+
+from clothing_web_scraper import ClothingWebScraper
+from scraper_fixture_server import DEFAULT_DIR
+
+BASE = "https://outfitters.com.pk"
+COLLECTION_URL = f"{BASE}/collections/men-shirts"
+
+
+def fixture_pages(n: int):
+    """(html, json) bytes for a men's shirts collection with n products."""
+    html = (DEFAULT_DIR / "outfitters_men_shirts.html").read_text(encoding="utf-8")
+    cards = re.findall(r'  <div class="product-card">.*?</div>\n', html, flags=re.S)
+    feed = json.loads((DEFAULT_DIR / "outfitters_men_shirts_products.json").read_text(encoding="utf-8"))
+    html_cards, items = [], []
+    for i in range(n):
+        html_cards.append(cards[i % len(cards)].replace('/products/', f'/products/{i}-'))
+        item = copy.deepcopy(feed["products"][i % len(feed["products"])])
+        item["id"], item["handle"] = i, f"{i}-{item['handle']}"
+        items.append(item)
+    start, end = html.index(cards[0]), html.index(cards[-1]) + len(cards[-1])
+    page = html[:start] + "".join(html_cards) + html[end:]
+    return page.encode("utf-8"), json.dumps({"products": items}).encode("utf-8")
+
+
+def timed(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark products.json vs HTML collection parsing")
+    parser.add_argument("--products", type=int, default=48, help="products per page (HTML path caps at 60)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    scraper = ClothingWebScraper(outfitters_base=BASE, http_cache_dir=None)
+    html, feed = fixture_pages(args.products)
+    json_url = scraper.outfitters_json_url(COLLECTION_URL)
+
+    html_s, from_html = timed(lambda: scraper.parse_outfitters_collection(html, COLLECTION_URL, "shirts", "men"),
+                              args.repeat)
+    json_s, from_json = timed(lambda: scraper.parse_outfitters_products_json(feed, json_url, "shirts", "men"),
+                              args.repeat)
+
+    with_colors = lambda products: sum(1 for p in products if p["colors"])
+    print(f"📊 Outfitters collection page, {args.products} products (best of {args.repeat})")
+    print(f"  HTML page        {len(html) / 1024:7.1f} KiB  {html_s * 1000:8.2f} ms  "
+          f"{len(from_html)} products, {with_colors(from_html)} with colors")
+    print(f"  products.json    {len(feed) / 1024:7.1f} KiB  {json_s * 1000:8.2f} ms  "
+          f"{len(from_json)} products, {with_colors(from_json)} with colors   x{html_s / json_s:5.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+⏱️ Wardrobe Snapshot Benchmark
+Builds a synthetic wardrobe (empty image files + a caption cache) and times
+generate_shopping_recommendations with the full scan (caption lookup +
+color regex per image, every call) against the persisted snapshot: cold
+(first build), warm (nothing changed) and after one folder changed.
+
+Run: python bench_wardrobe_snapshot.py [--folders 12] [--images 400] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from shopping_recommender_backend import generate_shopping_recommendations
+from wardrobe_snapshot import get_wardrobe_snapshot
+
+LABELS = ["shirt", "t-shirt", "kurta", "sweater", "jeans", "pants", "shorts", "trousers",
+          "jacket", "coat", "hoodie", "capris", "leggings", "tops", "dupatta", "puffer_jacket"]
+COLORS = ["black", "white", "navy", "charcoal", "red", "olive", "beige", "maroon", "sky blue", "mustard"]
+
+
+def build_wardrobe(root: Path, folders: int, images: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    captions = {}
+    for label in LABELS[:folders]:
+        (root / label).mkdir(parents=True)
+        for i in range(images):
+            path = root / label / f"{label}_{i:05d}.jpg"
+            path.write_bytes(b"")
+            captions[path.resolve().as_posix().lower()] = (
+                f"a studio product photo of a {rng.choice(COLORS)} {label} with {rng.choice(COLORS)} buttons"
+            )
+    return captions
+
+
+def timed(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the persisted wardrobe snapshot")
+    parser.add_argument("--folders", type=int, default=12)
+    parser.add_argument("--images", type=int, default=400, help="images per folder")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            root = Path("clothing_images_men")
+            captions = build_wardrobe(root, min(args.folders, len(LABELS)), args.images)
+            run = lambda snap: generate_shopping_recommendations(root.as_posix(), "winter", captions,
+                                                                 use_snapshot=snap)
+
+            full = timed(lambda: run(False), args.repeat)
+            cold = timed(lambda: run(True), 1)
+            warm = timed(lambda: run(True), args.repeat)
+            snapshot = get_wardrobe_snapshot(root.as_posix())
+
+            def touch_one():
+                (root / LABELS[0] / f"new_{time.perf_counter_ns()}.jpg").write_bytes(b"")
+                run(True)
+
+            changed = timed(touch_one, args.repeat)
+            rescanned = list(snapshot.rescanned)
+            assert run(False)[1:] == run(True)[1:]
+        finally:
+            os.chdir(cwd)
+
+    n = len(captions)
+    print(f"📊 {n} images in {len(captions) // args.images} folders, mean of {args.repeat} calls")
+    print(f"  full scan every call     {full:8.2f} ms")
+    print(f"  snapshot cold (build)    {cold:8.2f} ms")
+    print(f"  snapshot warm            {warm:8.2f} ms   x{full / warm:6.1f}")
+    print(f"  snapshot, 1 folder new   {changed:8.2f} ms   x{full / changed:6.1f}   (rescanned {rescanned})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+🎨 Caption Colors
+The BLIP caption cleanup and caption → color tags shared by the image
+indexer and the Streamlit mood modules (weather_mood_module_MALE / _FEMALE).
+
+Tags come from color_extraction's tables (the default one, or the men's via
+``extractor=get_men_extractor()``), so the Streamlit image index, the Gradio
+mood modules and the API's color index file a caption under the same
+canonical colors ("navy blue" → blue, "charcoal" → gray).
+"""
+
+import re
+from typing import List
+
+from color_extraction import ColorExtractor, get_default_extractor
+
+PROMPT = "Describe this clothing item and include its main color in one word."
+PROMPT_ECHO_RE = re.compile(
+    r"^\s*(top|bottom|outerwear)\s*:\s*|^\s*describe.*?one word\.?\s*",
+    re.IGNORECASE,
+)
+
+
+def normalize_color(word: str, extractor: ColorExtractor = None) -> str:
+    return (extractor or get_default_extractor()).normalize(word)
+
+
+def extract_colors(text: str, extractor: ColorExtractor = None) -> List[str]:
+    """Canonical colors named in ``text``, in order of appearance, de-duplicated."""
+    return (extractor or get_default_extractor()).extract_all(text)
+
+
+def clean_caption(text: str) -> str:
+    """Strip the echoed prompt and surrounding punctuation."""
+    return PROMPT_ECHO_RE.sub("", text or "").strip().strip(" ,.-") or "clothing item"
+
+
+def color_terms_for_query(color: str, extractor: ColorExtractor = None) -> List[str]:
+    """Canonical color plus every term that maps to it (for caption fallback search)."""
+    return (extractor or get_default_extractor()).terms_for(color)
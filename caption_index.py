@@ -0,0 +1,77 @@
+"""
+🔑 Caption Index
+BLIP caption lookup keyed by one canonical image id instead of every key
+variant of the caption cache.
+
+The canonical id is the last three path components, lower-case posix:
+``<images root>/<label>/<filename>`` (``clothing_images_men/shirt/s1.jpg``).
+Absolute paths, relative paths and the Windows-style keys of the caption
+JSON files (``clothing_images_men\\shirt\\s1.jpg``) all map to it with string
+splitting only — no ``Path.resolve()`` per lookup — so the index holds one
+entry per image (ids and caption texts interned) and answers in O(1).
+
+``version`` is a content hash of the (id, caption) pairs, so consumers that
+derive data from captions (wardrobe_snapshot) notice edited or re-generated
+captions even when the number of captions stays the same.
+"""
+
+import hashlib
+import os
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, Optional
+
+
+def canonical_image_id(path) -> str:
+    """Last three path components, lower-case posix ('.' / '..' segments resolved first)."""
+    p = str(path).replace("\\", "/")
+    if p.startswith(".") or "/." in p:
+        p = os.path.abspath(p).replace("\\", "/")
+    return "/".join(p.rsplit("/", 3)[-3:]).lower()
+
+
+class CaptionIndex(Mapping):
+    """Read-only caption mapping; ``index[path]`` / ``path in index`` accept any path form."""
+
+    def __init__(self, captions: Optional[Dict[str, str]] = None):
+        self._captions: Dict[str, str] = {}
+        self._version: Optional[str] = None
+        for key, caption in (captions or {}).items():
+            self._captions[sys.intern(canonical_image_id(key))] = sys.intern((caption or "").strip())
+
+    @classmethod
+    def from_json(cls, path: str) -> "CaptionIndex":
+        import json
+
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __getitem__(self, path) -> str:
+        return self._captions[canonical_image_id(path)]
+
+    def __contains__(self, path) -> bool:
+        return canonical_image_id(path) in self._captions
+
+    def get(self, path, default=None):
+        return self._captions.get(canonical_image_id(path), default)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._captions)
+
+    def __len__(self) -> int:
+        return len(self._captions)
+
+    @property
+    def version(self) -> str:
+        """Hash of every (id, caption) pair; computed once, the index is read-only."""
+        if self._version is None:
+            digest = hashlib.sha1()
+            for key in sorted(self._captions):
+                digest.update(f"{key}\0{self._captions[key]}\n".encode("utf-8"))
+            self._version = digest.hexdigest()[:16]
+        return self._version
+
+
+def as_caption_index(captions) -> CaptionIndex:
+    """Wrap a plain {path: caption} dict (any key form); indexes pass through."""
+    return captions if isinstance(captions, CaptionIndex) else CaptionIndex(captions)
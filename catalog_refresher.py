@@ -0,0 +1,229 @@
+"""
+🔄 Catalog Refresher
+Stale-while-revalidate for the product catalog: requests always read the
+last good snapshot in ProductCatalog and never scrape. A background worker
+re-scrapes catalog slices (``outfitters_men``, ``khaadi_men``,
+``outfitters_women_jeans`` ...) whose ``refreshed_at`` is older than the TTL.
+
+- ``ensure_fresh(sources)`` is the request-path hook: it only queues the
+  stale / missing slices (non-blocking, one queued refresh per slice).
+- A scheduler thread does the same for every known slice every
+  ``interval`` seconds, so popular slices are usually refreshed before a
+  request notices.
+- A failed or empty scrape keeps the previous snapshot; the slice is
+  retried after ``retry_after`` seconds instead of on every request.
+
+Scrapes run one at a time on a single daemon worker. When several base
+slices are due together they are fetched in one concurrent crawl
+(ClothingWebScraper.scrape_all_websites).
+
+    refresher = shared_refresher(catalog)      # one per catalog db, scheduler started
+    refresher.ensure_fresh(["outfitters_men"])  # returns immediately
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional
+
+from clothing_web_scraper import ClothingWebScraper
+from product_catalog import ProductCatalog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = float(os.getenv("WEARSMART_CATALOG_TTL", 6 * 3600))
+DEFAULT_INTERVAL = float(os.getenv("WEARSMART_CATALOG_REFRESH_INTERVAL", 300))
+DEFAULT_RETRY_AFTER = 300.0
+
+# Slices scrape_all_websites produces; anything else is outfitters_{gender}_{category}
+BASE_SLICES = ("outfitters_men", "outfitters_women", "khaadi_men")
+
+
+def slice_name(gender: str, category: Optional[str] = None) -> str:
+    """Catalog source of an Outfitters collection: ("men",) → outfitters_men, ("women", "jeans") → outfitters_women_jeans."""
+    name = f"outfitters_{(gender or 'men').lower()}"
+    category = (category or "").strip().lower()
+    return f"{name}_{category}" if category else name
+
+
+def scrape_slice(scraper: ClothingWebScraper, source: str) -> List[Dict]:
+    """Products of one catalog slice, scraped now."""
+    if source == "outfitters_men":
+        return scraper.scrape_outfitters_men_shirts()
+    if source == "outfitters_women":
+        return scraper.scrape_outfitters_women_shirts()
+    if source == "khaadi_men":
+        return scraper.scrape_khaadi_men()
+    _, gender, category = source.split("_", 2)
+    return scraper.ensure_outfitters_category(gender, category)
+
+
+class CatalogRefresher:
+    """TTL-driven background refresh of ProductCatalog slices."""
+
+    def __init__(self, catalog: ProductCatalog, scraper_factory: Optional[Callable[[], ClothingWebScraper]] = None,
+                 ttl: float = DEFAULT_TTL, interval: float = DEFAULT_INTERVAL,
+                 retry_after: float = DEFAULT_RETRY_AFTER):
+        self.catalog = catalog
+        self.scraper_factory = scraper_factory or (lambda: ClothingWebScraper(catalog=catalog))
+        self.ttl = ttl
+        self.interval = interval
+        self.retry_after = retry_after
+        self.stats = Counter()  # queued, refreshed, failed
+        self.errors: Dict[str, str] = {}
+        self._failed_at: Dict[str, float] = {}
+        self._pending: set = set()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._scheduler: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ---------- request path ----------
+    def stale(self, sources: Iterable[str], now: Optional[float] = None) -> List[str]:
+        """The given slices that are missing or older than the TTL (and not in a retry back-off)."""
+        now = time.time() if now is None else now
+        slices = self.catalog.slices()
+        out = []
+        for source in dict.fromkeys(sources):
+            refreshed_at = slices.get(source, {}).get("refreshed_at")
+            if refreshed_at is not None and now - refreshed_at < self.ttl:
+                continue
+            if now - self._failed_at.get(source, float("-inf")) < self.retry_after:
+                continue
+            out.append(source)
+        return out
+
+    def ensure_fresh(self, sources: Iterable[str]) -> List[str]:
+        """Queue a refresh of the stale slices among ``sources``; never blocks. Returns what was queued."""
+        queued = []
+        stale = self.stale(sources)
+        with self._lock:
+            for source in stale:
+                if source not in self._pending:
+                    self._pending.add(source)
+                    queued.append(source)
+        if queued:
+            self._ensure_worker()
+            self.stats["queued"] += len(queued)
+            self._queue.put(queued)
+        return queued
+
+    def drain(self) -> None:
+        """Block until every queued refresh has finished (tests / shutdown)."""
+        self._queue.join()
+
+    def status(self) -> Dict[str, Dict]:
+        """{source: {"refreshed_at", "age_s", "products", "stale", "refreshing", "error"}}"""
+        now = time.time()
+        stale = set(self.stale(self.known_slices(), now))
+        return {
+            source: {**info, "age_s": round(now - info["refreshed_at"], 1), "stale": source in stale,
+                     "refreshing": source in self._pending, "error": self.errors.get(source)}
+            for source, info in self.catalog.slices().items()
+        }
+
+    def known_slices(self) -> List[str]:
+        return list(dict.fromkeys(list(BASE_SLICES) + list(self.catalog.slices())))
+
+    # ---------- scheduler ----------
+    def start(self) -> "CatalogRefresher":
+        """Start the scheduler thread (idempotent)."""
+        with self._lock:
+            if self._scheduler is None:
+                self._stop.clear()
+                self._scheduler = threading.Thread(target=self._schedule, name="catalog-scheduler", daemon=True)
+                self._scheduler.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the scheduler; a refresh already running finishes in the background."""
+        self._stop.set()
+        with self._lock:
+            scheduler, self._scheduler = self._scheduler, None
+        if scheduler is not None:
+            scheduler.join()
+
+    def _schedule(self) -> None:
+        while True:
+            try:
+                self.ensure_fresh(self.known_slices())
+            except Exception as e:  # a bad tick must not end the scheduler
+                logger.warning(f"Catalog refresh check failed: {e}")
+            if self._stop.wait(self.interval):
+                return
+
+    # ---------- worker ----------
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="catalog-refresh", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            sources = self._queue.get()
+            try:
+                self.refresh(sources)
+            except Exception as e:  # the worker must outlive any scrape
+                logger.warning(f"Catalog refresh of {sources} failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.difference_update(sources)
+                self._queue.task_done()
+
+    def refresh(self, sources: List[str]) -> Dict[str, int]:
+        """Scrape ``sources`` now and upsert every non-empty result. Returns {source: products written}."""
+        scraper = self.scraper_factory()
+        base = [s for s in sources if s in BASE_SLICES]
+        if len(base) > 1:
+            crawled = scraper.scrape_all_websites()
+            results = {s: (lambda s=s: crawled.get(s, [])) for s in base}
+        else:
+            results = {s: (lambda s=s: scrape_slice(scraper, s)) for s in base}
+        results.update({s: (lambda s=s: scrape_slice(scraper, s)) for s in sources if s not in BASE_SLICES})
+
+        written = {}
+        for source, scrape in results.items():
+            try:
+                products = scrape()
+                if not products:
+                    raise ValueError("scrape returned no products")
+                written[source] = self.catalog.upsert_products(source, products, replace=True)
+            except Exception as e:
+                # keep serving the last good snapshot; retry after the back-off
+                self._failed_at[source] = time.time()
+                self.errors[source] = str(e)
+                self.stats["failed"] += 1
+                logger.warning(f"Keeping previous {source} products: {e}")
+                continue
+            self._failed_at.pop(source, None)
+            self.errors.pop(source, None)
+            self.stats["refreshed"] += 1
+            logger.info(f"Refreshed {source}: {written[source]} products")
+        if written:
+            # rebuild budget indexes here rather than in the next budgeted request
+            self.catalog.warm_price_indexes()
+        return written
+
+
+# ==========================
+# Shared refreshers
+# ==========================
+_refreshers: Dict[str, CatalogRefresher] = {}
+_refreshers_lock = threading.Lock()
+
+
+def shared_refresher(catalog: ProductCatalog) -> CatalogRefresher:
+    """The process-wide refresher for ``catalog``'s database, with its scheduler running."""
+    key = catalog.db_path.resolve().as_posix()
+    with _refreshers_lock:
+        refresher = _refreshers.get(key)
+        if refresher is None:
+            refresher = _refreshers[key] = CatalogRefresher(catalog).start()
+    return refresher
@@ -1,6 +1,15 @@
 """
 Dynamic Clothing Web Scraper for Pakistani Fashion Websites
 Fetches real product data from multiple clothing websites
+
+Outfitters is a Shopify store: collections are read from their structured
+``/collections/<slug>/products.json`` feed (titles, variant prices, Color
+options, images) and the HTML collection page is only scraped when the feed
+is unavailable (``outfitters_source="html"`` skips the feed).
+
+HTML pages are parsed by html_extract (lxml, precompiled selectors, process
+pool for large pages) unless ``parser_backend="bs4"`` selects the original
+BeautifulSoup parsers below.
 """
 
 import requests
@@ -9,9 +18,17 @@ import json
 import time
 import re
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 from urllib.parse import urljoin, urlparse
 import logging
+from decimal import Decimal, InvalidOperation
+from functools import partial
+
+from async_scraper import AsyncFetcher, Job, page_urls, run_crawl
+from html_extract import BACKENDS as PARSER_BACKENDS, DEFAULT_BACKEND as DEFAULT_PARSER_BACKEND, parse_products, \
+    use_process_pool
+from http_cache import DEFAULT_DIR as HTTP_CACHE_DIR, HttpCache
+from product_catalog import ProductCatalog, shared_catalog
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -20,7 +37,28 @@ logger = logging.getLogger(__name__)
 class ClothingWebScraper:
     """Scrapes clothing data from Pakistani fashion websites"""
     
-    def __init__(self):
+    OUTFITTERS_BASE = "https://outfitters.com.pk"
+    KHAADI_BASE = "https://khaadi.com"
+    SHOPIFY_PAGE_LIMIT = 250  # max products per products.json page
+    COLOR_OPTION_NAMES = {'color', 'colour'}
+    
+    def __init__(self, outfitters_base: Optional[str] = None, khaadi_base: Optional[str] = None,
+                 http_cache_dir: Optional[str] = HTTP_CACHE_DIR, outfitters_source: str = "json",
+                 parser_backend: str = DEFAULT_PARSER_BACKEND, catalog: Optional[ProductCatalog] = None):
+        # Base URLs are overridable so the scraper can run against a local fixture server
+        self.outfitters_base = (outfitters_base or self.OUTFITTERS_BASE).rstrip('/')
+        self.khaadi_base = (khaadi_base or self.KHAADI_BASE).rstrip('/')
+        if outfitters_source not in ("json", "html"):
+            raise ValueError(f"outfitters_source must be 'json' or 'html', not {outfitters_source!r}")
+        self.outfitters_source = outfitters_source
+        if parser_backend not in PARSER_BACKENDS:
+            raise ValueError(f"parser_backend must be one of {PARSER_BACKENDS}, not {parser_backend!r}")
+        self.parser_backend = parser_backend
+        # Indexed product store; when set, the get_products_by_* lookups query it
+        self.catalog = catalog
+        # Conditional-GET cache for concurrent crawls (None disables it)
+        self.http_cache = HttpCache(http_cache_dir) if http_cache_dir else None
+        self.last_crawl_report: Dict = {}
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -29,275 +67,367 @@ class ClothingWebScraper:
         
     def scrape_outfitters_men_shirts(self) -> List[Dict]:
         """Scrape men's shirts from Outfitters"""
+        url = f"{self.outfitters_base}/collections/men-shirts"
+        products = self._scrape_outfitters_json(url, category='shirts', gender='men')
+        if products is not None:
+            return products
         try:
-            url = "https://outfitters.com.pk/collections/men-shirts"
             response = self.session.get(url, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            products = []
-            
-            # Debug: Print page structure
-            logger.info(f"Page title: {soup.title.string if soup.title else 'No title'}")
-            
-            # Try multiple selectors for product containers
-            selectors = [
-                'div[class*="product"]',
-                'div[class*="item"]', 
-                'div[class*="card"]',
-                'article',
-                '.product-item',
-                '.product-card',
-                '.grid-item'
-            ]
-            
-            product_containers = []
-            for selector in selectors:
-                containers = soup.select(selector)
-                if containers:
-                    logger.info(f"Found {len(containers)} containers with selector: {selector}")
-                    product_containers.extend(containers)
-                    break
-            
-            if not product_containers:
-                # Fallback: look for any div with product-related classes
-                product_containers = soup.find_all('div', class_=lambda x: x and any(word in x.lower() for word in ['product', 'item', 'card', 'grid']))
-                logger.info(f"Fallback found {len(product_containers)} containers")
-            
-            # If still no containers, try to find any links that might be products
-            if not product_containers:
-                product_links = soup.find_all('a', href=re.compile(r'/products/'))
-                logger.info(f"Found {len(product_links)} product links")
-                for link in product_links[:10]:  # Limit to first 10
-                    parent = link.parent
-                    if parent:
-                        product_containers.append(parent)
-            
-            logger.info(f"Processing {len(product_containers)} product containers")
-            
-            for i, container in enumerate(product_containers[:20]):  # Limit to first 20
-                try:
-                    # Extract product name - try multiple approaches
-                    name = ""
-                    name_selectors = ['h3', 'h4', 'h5', 'h2', '.title', '.name', '.product-title', 'a[href*="/products/"]']
-                    
-                    for selector in name_selectors:
-                        name_elem = container.select_one(selector)
-                        if name_elem:
-                            name = name_elem.get_text(strip=True)
-                            if name and len(name) > 3:  # Valid name
-                                break
-                    
-                    if not name:
-                        # Try getting text from any link
-                        link = container.find('a', href=re.compile(r'/products/'))
-                        if link:
-                            name = link.get_text(strip=True)
-                    
-                    if not name or len(name) < 3:
-                        continue
-                    
-                    # Extract price
-                    price = "Price not available"
-                    price_selectors = ['.price', '.cost', '[class*="price"]', 'span:contains("PKR")', 'div:contains("PKR")']
-                    
-                    for selector in price_selectors:
-                        price_elem = container.select_one(selector)
-                        if price_elem:
-                            price_text = price_elem.get_text(strip=True)
-                            price_match = re.search(r'PKR\s*([\d,]+)', price_text)
-                            if price_match:
-                                price = f"PKR {price_match.group(1)}"
-                                break
-                    
-                    # Extract colors - look for color swatches or color names
-                    colors = []
-                    color_selectors = ['.color', '.swatch', '[class*="color"]', '[class*="swatch"]']
-                    
-                    for selector in color_selectors:
-                        color_elements = container.select(selector)
-                        for color_elem in color_elements:
-                            color_text = color_elem.get_text(strip=True)
-                            if color_text and len(color_text) < 30 and color_text not in colors:
-                                colors.append(color_text)
-                    
-                    # If no colors found, try to extract from product name
-                    if not colors:
-                        color_keywords = ['black', 'white', 'blue', 'red', 'green', 'brown', 'grey', 'gray', 'navy', 'beige', 'ivory', 'off-white']
-                        for keyword in color_keywords:
-                            if keyword in name.lower():
-                                colors.append(keyword.title())
-                    
-                    # Extract image URL
-                    image_url = ""
-                    img_elem = container.find('img')
-                    if img_elem:
-                        img_src = img_elem.get('src') or img_elem.get('data-src') or img_elem.get('data-lazy')
-                        if img_src:
-                            if img_src.startswith('//'):
-                                image_url = 'https:' + img_src
-                            elif img_src.startswith('/'):
-                                image_url = 'https://outfitters.com.pk' + img_src
-                            else:
-                                image_url = urljoin(url, img_src)
-                    
-                    # Extract product URL
-                    product_url = ""
-                    link_elem = container.find('a', href=True)
-                    if link_elem:
-                        href = link_elem['href']
-                        if href.startswith('/'):
-                            product_url = 'https://outfitters.com.pk' + href
-                        elif href.startswith('http'):
-                            product_url = href
-                        else:
-                            product_url = urljoin(url, href)
-                    
-                    # Only add if we have a valid name
-                    if name and len(name) > 3:
-                        product = {
-                            'name': name,
-                            'price': price,
-                            'colors': colors[:5],  # Limit to 5 colors
-                            'image_url': image_url,
-                            'product_url': product_url,
-                            'website': 'Outfitters',
-                            'category': 'shirts',
-                            'gender': 'men'
-                        }
-                        products.append(product)
-                        logger.info(f"Added product {i+1}: {name}")
-                        
-                except Exception as e:
-                    logger.warning(f"Error parsing product container {i+1}: {e}")
-                    continue
-            
-            logger.info(f"Scraped {len(products)} men's shirts from Outfitters")
-            return products
-            
+            return self.parse_outfitters_men_shirts(response.content, url)
         except Exception as e:
             logger.error(f"Error scraping Outfitters men's shirts: {e}")
             return []
-    
-    def _scrape_outfitters_collection(self, url: str, category: str, gender: str) -> List[Dict]:
-        """Generic scraper for an Outfitters collection URL."""
-        try:
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            products: List[Dict] = []
-            selectors = [
-                'div[class*="product"]','div[class*="item"]','div[class*="card"]','article',
-                '.product-item','.product-card','.grid-item'
-            ]
-            containers: List = []
-            for sel in selectors:
-                tmp = soup.select(sel)
-                if tmp:
-                    containers.extend(tmp)
-                    break
-            if not containers:
-                containers = soup.find_all('div', class_=lambda x: x and any(w in x.lower() for w in ['product','item','card','grid']))
-            if not containers:
-                links = soup.find_all('a', href=re.compile(r'/products/'))
-                for lk in links[:20]:
-                    if lk.parent:
-                        containers.append(lk.parent)
-            seen = set()
-            for container in containers[:60]:
-                try:
-                    # name
-                    name = ""
-                    for sel in ['h3','h4','h5','h2','.title','.name','.product-title','a[href*="/products/"]']:
-                        el = container.select_one(sel)
-                        if el:
-                            t = el.get_text(strip=True)
-                            if t and len(t) > 3:
-                                name = t
-                                break
-                    if not name:
-                        lk = container.find('a', href=re.compile(r'/products/'))
-                        if lk:
-                            name = lk.get_text(strip=True)
-                    if not name or len(name) < 3:
-                        continue
-                    # price
-                    price = "Price not available"
-                    for sel in ['.price','.cost','[class*="price"]']:
-                        el = container.select_one(sel)
-                        if el:
-                            txt = el.get_text(strip=True)
-                            m = re.search(r'PKR\s*([\d,]+)', txt)
-                            if m:
-                                price = f"PKR {m.group(1)}"
-                                break
-                    # colors
-                    colors: List[str] = []
-                    for sel in ['.color','.swatch','[class*="color"]','[class*="swatch"]']:
-                        for ce in container.select(sel):
-                            ct = (ce.get_text(strip=True) or '').strip()
-                            if not ct:
-                                continue
-                            tl = ct.lower()
-                            if tl in {"xs","s","m","l","xl","xxl","xxxl","one size"}:
-                                continue
-                            if "fit" in tl or "women" in tl or "men" in tl or re.search(r"\b\d+\s*colors?\b", tl):
-                                continue
-                            if len(ct) < 50 and ct not in colors:
-                                colors.append(ct)
-                    # image
-                    image_url = ""
-                    img = container.find('img')
-                    if img:
-                        src = img.get('src') or img.get('data-src') or img.get('data-lazy')
-                        if src:
-                            if src.startswith('//'):
-                                image_url = 'https:' + src
-                            elif src.startswith('/'):
-                                image_url = 'https://outfitters.com.pk' + src
-                            else:
-                                image_url = urljoin(url, src)
-                    # product link
-                    prod_url = ""
-                    pl = container.find('a', href=re.compile(r'/products/'))
-                    if pl and pl.get('href'):
-                        href = pl['href']
-                    else:
-                        anyl = container.find('a', href=True)
-                        href = anyl['href'] if anyl else ''
-                    if href:
-                        if href.startswith('/'):
-                            prod_url = 'https://outfitters.com.pk' + href
-                        elif href.startswith('http'):
-                            prod_url = href
+
+    def parse_outfitters_men_shirts(self, content, url: str) -> List[Dict]:
+        """Products from an Outfitters men's shirts page (HTML)."""
+        if self.parser_backend == "lxml":
+            return parse_products(content, url, 'outfitters_men', self.outfitters_base)
+        soup = BeautifulSoup(content, 'html.parser')
+        products = []
+        
+        # Debug: Print page structure
+        logger.info(f"Page title: {soup.title.string if soup.title else 'No title'}")
+        
+        # Try multiple selectors for product containers
+        selectors = [
+            'div[class*="product"]',
+            'div[class*="item"]', 
+            'div[class*="card"]',
+            'article',
+            '.product-item',
+            '.product-card',
+            '.grid-item'
+        ]
+        
+        product_containers = []
+        for selector in selectors:
+            containers = soup.select(selector)
+            if containers:
+                logger.info(f"Found {len(containers)} containers with selector: {selector}")
+                product_containers.extend(containers)
+                break
+        
+        if not product_containers:
+            # Fallback: look for any div with product-related classes
+            product_containers = soup.find_all('div', class_=lambda x: x and any(word in x.lower() for word in ['product', 'item', 'card', 'grid']))
+            logger.info(f"Fallback found {len(product_containers)} containers")
+        
+        # If still no containers, try to find any links that might be products
+        if not product_containers:
+            product_links = soup.find_all('a', href=re.compile(r'/products/'))
+            logger.info(f"Found {len(product_links)} product links")
+            for link in product_links[:10]:  # Limit to first 10
+                parent = link.parent
+                if parent:
+                    product_containers.append(parent)
+        
+        logger.info(f"Processing {len(product_containers)} product containers")
+        
+        for i, container in enumerate(product_containers[:20]):  # Limit to first 20
+            try:
+                # Extract product name - try multiple approaches
+                name = ""
+                name_selectors = ['h3', 'h4', 'h5', 'h2', '.title', '.name', '.product-title', 'a[href*="/products/"]']
+                
+                for selector in name_selectors:
+                    name_elem = container.select_one(selector)
+                    if name_elem:
+                        name = name_elem.get_text(strip=True)
+                        if name and len(name) > 3:  # Valid name
+                            break
+                
+                if not name:
+                    # Try getting text from any link
+                    link = container.find('a', href=re.compile(r'/products/'))
+                    if link:
+                        name = link.get_text(strip=True)
+                
+                if not name or len(name) < 3:
+                    continue
+                
+                # Extract price
+                price = "Price not available"
+                price_selectors = ['.price', '.cost', '[class*="price"]', 'span:contains("PKR")', 'div:contains("PKR")']
+                
+                for selector in price_selectors:
+                    price_elem = container.select_one(selector)
+                    if price_elem:
+                        price_text = price_elem.get_text(strip=True)
+                        price_match = re.search(r'PKR\s*([\d,]+)', price_text)
+                        if price_match:
+                            price = f"PKR {price_match.group(1)}"
+                            break
+                
+                # Extract colors - look for color swatches or color names
+                colors = []
+                color_selectors = ['.color', '.swatch', '[class*="color"]', '[class*="swatch"]']
+                
+                for selector in color_selectors:
+                    color_elements = container.select(selector)
+                    for color_elem in color_elements:
+                        color_text = color_elem.get_text(strip=True)
+                        if color_text and len(color_text) < 30 and color_text not in colors:
+                            colors.append(color_text)
+                
+                # If no colors found, try to extract from product name
+                if not colors:
+                    color_keywords = ['black', 'white', 'blue', 'red', 'green', 'brown', 'grey', 'gray', 'navy', 'beige', 'ivory', 'off-white']
+                    for keyword in color_keywords:
+                        if keyword in name.lower():
+                            colors.append(keyword.title())
+                
+                # Extract image URL
+                image_url = ""
+                img_elem = container.find('img')
+                if img_elem:
+                    img_src = img_elem.get('src') or img_elem.get('data-src') or img_elem.get('data-lazy')
+                    if img_src:
+                        if img_src.startswith('//'):
+                            image_url = 'https:' + img_src
+                        elif img_src.startswith('/'):
+                            image_url = self.outfitters_base + img_src
                         else:
-                            prod_url = urljoin(url, href)
-                    key = prod_url or (name + image_url)
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    products.append({
+                            image_url = urljoin(url, img_src)
+                
+                # Extract product URL
+                product_url = ""
+                link_elem = container.find('a', href=True)
+                if link_elem:
+                    href = link_elem['href']
+                    if href.startswith('/'):
+                        product_url = self.outfitters_base + href
+                    elif href.startswith('http'):
+                        product_url = href
+                    else:
+                        product_url = urljoin(url, href)
+                
+                # Only add if we have a valid name
+                if name and len(name) > 3:
+                    product = {
                         'name': name,
                         'price': price,
-                        'colors': colors[:5],
+                        'colors': colors[:5],  # Limit to 5 colors
                         'image_url': image_url,
-                        'product_url': prod_url,
+                        'product_url': product_url,
                         'website': 'Outfitters',
-                        'category': category.lower(),
-                        'gender': gender.lower()
-                    })
-                except Exception:
-                    continue
+                        'category': 'shirts',
+                        'gender': 'men'
+                    }
+                    products.append(product)
+                    logger.info(f"Added product {i+1}: {name}")
+                    
+            except Exception as e:
+                logger.warning(f"Error parsing product container {i+1}: {e}")
+                continue
+        
+        logger.info(f"Scraped {len(products)} men's shirts from Outfitters")
+        return products
+    
+    def _scrape_outfitters_collection(self, url: str, category: str, gender: str) -> List[Dict]:
+        """Generic scraper for an Outfitters collection URL."""
+        products = self._scrape_outfitters_json(url, category, gender)
+        if products is not None:
             return products
+        try:
+            response = self.session.get(url, timeout=15)
+            response.raise_for_status()
+            return self.parse_outfitters_collection(response.content, url, category, gender)
         except Exception as e:
             logger.error(f"Error scraping Outfitters collection {url}: {e}")
             return []
 
+    def parse_outfitters_collection(self, content, url: str, category: str, gender: str) -> List[Dict]:
+        """Products from an Outfitters collection page (HTML)."""
+        if self.parser_backend == "lxml":
+            return parse_products(content, url, 'outfitters_collection', self.outfitters_base, category, gender)
+        soup = BeautifulSoup(content, 'html.parser')
+        products: List[Dict] = []
+        selectors = [
+            'div[class*="product"]','div[class*="item"]','div[class*="card"]','article',
+            '.product-item','.product-card','.grid-item'
+        ]
+        containers: List = []
+        for sel in selectors:
+            tmp = soup.select(sel)
+            if tmp:
+                containers.extend(tmp)
+                break
+        if not containers:
+            containers = soup.find_all('div', class_=lambda x: x and any(w in x.lower() for w in ['product','item','card','grid']))
+        if not containers:
+            links = soup.find_all('a', href=re.compile(r'/products/'))
+            for lk in links[:20]:
+                if lk.parent:
+                    containers.append(lk.parent)
+        seen = set()
+        for container in containers[:60]:
+            try:
+                # name
+                name = ""
+                for sel in ['h3','h4','h5','h2','.title','.name','.product-title','a[href*="/products/"]']:
+                    el = container.select_one(sel)
+                    if el:
+                        t = el.get_text(strip=True)
+                        if t and len(t) > 3:
+                            name = t
+                            break
+                if not name:
+                    lk = container.find('a', href=re.compile(r'/products/'))
+                    if lk:
+                        name = lk.get_text(strip=True)
+                if not name or len(name) < 3:
+                    continue
+                # price
+                price = "Price not available"
+                for sel in ['.price','.cost','[class*="price"]']:
+                    el = container.select_one(sel)
+                    if el:
+                        txt = el.get_text(strip=True)
+                        m = re.search(r'PKR\s*([\d,]+)', txt)
+                        if m:
+                            price = f"PKR {m.group(1)}"
+                            break
+                # colors
+                colors: List[str] = []
+                for sel in ['.color','.swatch','[class*="color"]','[class*="swatch"]']:
+                    for ce in container.select(sel):
+                        ct = (ce.get_text(strip=True) or '').strip()
+                        if not ct:
+                            continue
+                        tl = ct.lower()
+                        if tl in {"xs","s","m","l","xl","xxl","xxxl","one size"}:
+                            continue
+                        if "fit" in tl or "women" in tl or "men" in tl or re.search(r"\b\d+\s*colors?\b", tl):
+                            continue
+                        if len(ct) < 50 and ct not in colors:
+                            colors.append(ct)
+                # image
+                image_url = ""
+                img = container.find('img')
+                if img:
+                    src = img.get('src') or img.get('data-src') or img.get('data-lazy')
+                    if src:
+                        if src.startswith('//'):
+                            image_url = 'https:' + src
+                        elif src.startswith('/'):
+                            image_url = self.outfitters_base + src
+                        else:
+                            image_url = urljoin(url, src)
+                # product link
+                prod_url = ""
+                pl = container.find('a', href=re.compile(r'/products/'))
+                if pl and pl.get('href'):
+                    href = pl['href']
+                else:
+                    anyl = container.find('a', href=True)
+                    href = anyl['href'] if anyl else ''
+                if href:
+                    if href.startswith('/'):
+                        prod_url = self.outfitters_base + href
+                    elif href.startswith('http'):
+                        prod_url = href
+                    else:
+                        prod_url = urljoin(url, href)
+                key = prod_url or (name + image_url)
+                if key in seen:
+                    continue
+                seen.add(key)
+                products.append({
+                    'name': name,
+                    'price': price,
+                    'colors': colors[:5],
+                    'image_url': image_url,
+                    'product_url': prod_url,
+                    'website': 'Outfitters',
+                    'category': category.lower(),
+                    'gender': gender.lower()
+                })
+            except Exception:
+                continue
+        return products
+    
+    # ---------- Shopify products.json ----------
+    def outfitters_json_url(self, collection_url: str) -> str:
+        """products.json feed of an Outfitters collection page URL."""
+        return f"{collection_url.rstrip('/')}/products.json?limit={self.SHOPIFY_PAGE_LIMIT}"
+
+    def _scrape_outfitters_json(self, collection_url: str, category: str, gender: str) -> Optional[List[Dict]]:
+        """Products from the collection's products.json, or None to fall back to the HTML page."""
+        if self.outfitters_source != "json":
+            return None
+        url = self.outfitters_json_url(collection_url)
+        try:
+            response = self.session.get(url, timeout=15)
+            response.raise_for_status()
+            return self.parse_outfitters_products_json(response.content, url, category, gender)
+        except Exception as e:
+            logger.warning(f"Outfitters products.json unavailable ({e}), falling back to HTML: {collection_url}")
+            return None
+
+    @staticmethod
+    def _format_price(amount: str) -> str:
+        """Shopify "3990.00" -> "PKR 3,990" (same format the HTML path scrapes)."""
+        value = Decimal(amount)
+        return f"PKR {value:,.0f}" if value == value.to_integral_value() else f"PKR {value:,.2f}"
+
+    def parse_outfitters_products_json(self, content, url: str, category: str, gender: str) -> List[Dict]:
+        """
+        Products from a Shopify products.json page.
+        
+        Raises ValueError if the body is not a products feed (the caller then
+        falls back to the HTML page).
+        """
+        try:
+            feed = json.loads(content)
+            items = feed['products']
+        except (ValueError, TypeError, KeyError) as e:
+            raise ValueError(f"not a Shopify products feed: {e}") from None
+        products: List[Dict] = []
+        for item in items:
+            name = (item.get('title') or '').strip()
+            if not name:
+                continue
+            price = "Price not available"
+            amounts = []
+            for variant in item.get('variants') or []:
+                try:
+                    amount = Decimal(str(variant.get('price')))
+                except InvalidOperation:
+                    continue
+                if amount.is_finite():
+                    amounts.append(amount)
+            if amounts:
+                price = self._format_price(str(min(amounts)))
+            colors: List[str] = []
+            for option in item.get('options') or []:
+                if str(option.get('name', '')).lower() in self.COLOR_OPTION_NAMES:
+                    colors = [str(v) for v in option.get('values') or []]
+                    break
+            image_url = ""
+            images = item.get('images') or []
+            if images and images[0].get('src'):
+                src = images[0]['src']
+                image_url = 'https:' + src if src.startswith('//') else urljoin(url, src)
+            handle = item.get('handle')
+            products.append({
+                'name': name,
+                'price': price,
+                'colors': colors[:5],
+                'image_url': image_url,
+                'product_url': f"{self.outfitters_base}/products/{handle}" if handle else "",
+                'website': 'Outfitters',
+                'category': category.lower(),
+                'gender': gender.lower()
+            })
+        return products
+
     def ensure_outfitters_category(self, gender: str, category: str) -> List[Dict]:
         """Ensure we have products for a specific Outfitters collection by gender/category."""
         gender_l = (gender or 'men').lower()
         cat_l = (category or '').strip().lower()
-        base = 'https://outfitters.com.pk/collections/'
+        base = f'{self.outfitters_base}/collections/'
         # Map common categories to Outfitters slugs
         men_map = {
             'shirt': 'men-shirts', 'shirts': 'men-shirts', 't-shirt': 'men-t-shirts', 'tshirts': 'men-t-shirts',
@@ -324,207 +454,259 @@ class ClothingWebScraper:
         return products
     def scrape_outfitters_women_shirts(self) -> List[Dict]:
         """Scrape women's shirts from Outfitters (robust selectors)"""
+        url = f"{self.outfitters_base}/collections/women-shirts"
+        products = self._scrape_outfitters_json(url, category='shirts', gender='women')
+        if products is not None:
+            return products
         try:
-            url = "https://outfitters.com.pk/collections/women-shirts"
             response = self.session.get(url, timeout=15)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            products: List[Dict] = []
-            
-            logger.info(f"[Women] Page title: {soup.title.string if soup.title else 'No title'}")
-            selectors = [
-                'div[class*="product"]',
-                'div[class*="item"]',
-                'div[class*="card"]',
-                'article',
-                '.product-item',
-                '.product-card',
-                '.grid-item'
-            ]
-            product_containers: List = []
-            for sel in selectors:
-                found = soup.select(sel)
-                if found:
-                    logger.info(f"[Women] Found {len(found)} containers with selector: {sel}")
-                    product_containers.extend(found)
-                    break
-            if not product_containers:
-                product_containers = soup.find_all('div', class_=lambda x: x and any(w in x.lower() for w in ['product','item','card','grid']))
-                logger.info(f"[Women] Fallback found {len(product_containers)} containers")
-            if not product_containers:
-                product_links = soup.find_all('a', href=re.compile(r'/products/'))
-                logger.info(f"[Women] Found {len(product_links)} product links")
-                for link in product_links[:10]:
-                    if link.parent:
-                        product_containers.append(link.parent)
-            
-            logger.info(f"[Women] Processing {len(product_containers)} product containers")
-            for i, container in enumerate(product_containers[:20]):
-                try:
-                    # Name
-                    name = ""
-                    for sel in ['h3','h4','h5','h2','.title','.name','.product-title','a[href*="/products/"]']:
-                        el = container.select_one(sel)
-                        if el:
-                            t = el.get_text(strip=True)
-                            if t and len(t) > 3:
-                                name = t
-                                break
-                    if not name:
-                        link = container.find('a', href=re.compile(r'/products/'))
-                        if link:
-                            name = link.get_text(strip=True)
-                    if not name or len(name) < 3:
-                        continue
-                    
-                    # Price
-                    price = "Price not available"
-                    for sel in ['.price','.cost','[class*="price"]']:
-                        el = container.select_one(sel)
-                        if el:
-                            txt = el.get_text(strip=True)
-                            m = re.search(r'PKR\s*([\d,]+)', txt)
-                            if m:
-                                price = f"PKR {m.group(1)}"
-                                break
-                    
-                    # Colors
-                    colors: List[str] = []
-                    for sel in ['.color','.swatch','[class*="color"]','[class*="swatch"]']:
-                        for ce in container.select(sel):
-                            ct = ce.get_text(strip=True)
-                            if ct and len(ct) < 50 and ct not in colors:
-                                colors.append(ct)
-                    if not colors:
-                        for kw in ['black','white','blue','red','green','brown','grey','gray','navy','beige','ivory','off-white']:
-                            if kw in name.lower():
-                                colors.append(kw.title())
-                    
-                    # Image URL
-                    image_url = ""
-                    img = container.find('img')
-                    if img:
-                        src = img.get('src') or img.get('data-src') or img.get('data-lazy')
-                        if src:
-                            if src.startswith('//'):
-                                image_url = 'https:' + src
-                            elif src.startswith('/'):
-                                image_url = 'https://outfitters.com.pk' + src
-                            else:
-                                image_url = urljoin(url, src)
-                    
-                    # Product URL (prefer /products/)
-                    product_url = ""
-                    prod_link = container.find('a', href=re.compile(r'/products/'))
-                    if prod_link and prod_link.get('href'):
-                        href = prod_link['href']
-                    else:
-                        any_link = container.find('a', href=True)
-                        href = any_link['href'] if any_link else ''
-                    if href:
-                        if href.startswith('/'):
-                            product_url = 'https://outfitters.com.pk' + href
-                        elif href.startswith('http'):
-                            product_url = href
-                        else:
-                            product_url = urljoin(url, href)
-                    
-                    prod = {
-                        'name': name,
-                        'price': price,
-                        'colors': colors[:5],
-                        'image_url': image_url,
-                        'product_url': product_url,
-                        'website': 'Outfitters',
-                        'category': 'shirts',
-                        'gender': 'women'
-                    }
-                    products.append(prod)
-                except Exception as e:
-                    logger.warning(f"[Women] Error parsing container {i+1}: {e}")
-                    continue
-            
-            logger.info(f"Scraped {len(products)} women's shirts from Outfitters")
-            return products
-        
+            return self.parse_outfitters_women_shirts(response.content, url)
         except Exception as e:
             logger.error(f"Error scraping Outfitters women's shirts: {e}")
             return []
+
+    def parse_outfitters_women_shirts(self, content, url: str) -> List[Dict]:
+        """Products from an Outfitters women's shirts page (HTML)."""
+        if self.parser_backend == "lxml":
+            return parse_products(content, url, 'outfitters_women', self.outfitters_base)
+        soup = BeautifulSoup(content, 'html.parser')
+        products: List[Dict] = []
+        
+        logger.info(f"[Women] Page title: {soup.title.string if soup.title else 'No title'}")
+        selectors = [
+            'div[class*="product"]',
+            'div[class*="item"]',
+            'div[class*="card"]',
+            'article',
+            '.product-item',
+            '.product-card',
+            '.grid-item'
+        ]
+        product_containers: List = []
+        for sel in selectors:
+            found = soup.select(sel)
+            if found:
+                logger.info(f"[Women] Found {len(found)} containers with selector: {sel}")
+                product_containers.extend(found)
+                break
+        if not product_containers:
+            product_containers = soup.find_all('div', class_=lambda x: x and any(w in x.lower() for w in ['product','item','card','grid']))
+            logger.info(f"[Women] Fallback found {len(product_containers)} containers")
+        if not product_containers:
+            product_links = soup.find_all('a', href=re.compile(r'/products/'))
+            logger.info(f"[Women] Found {len(product_links)} product links")
+            for link in product_links[:10]:
+                if link.parent:
+                    product_containers.append(link.parent)
+        
+        logger.info(f"[Women] Processing {len(product_containers)} product containers")
+        for i, container in enumerate(product_containers[:20]):
+            try:
+                # Name
+                name = ""
+                for sel in ['h3','h4','h5','h2','.title','.name','.product-title','a[href*="/products/"]']:
+                    el = container.select_one(sel)
+                    if el:
+                        t = el.get_text(strip=True)
+                        if t and len(t) > 3:
+                            name = t
+                            break
+                if not name:
+                    link = container.find('a', href=re.compile(r'/products/'))
+                    if link:
+                        name = link.get_text(strip=True)
+                if not name or len(name) < 3:
+                    continue
+                
+                # Price
+                price = "Price not available"
+                for sel in ['.price','.cost','[class*="price"]']:
+                    el = container.select_one(sel)
+                    if el:
+                        txt = el.get_text(strip=True)
+                        m = re.search(r'PKR\s*([\d,]+)', txt)
+                        if m:
+                            price = f"PKR {m.group(1)}"
+                            break
+                
+                # Colors
+                colors: List[str] = []
+                for sel in ['.color','.swatch','[class*="color"]','[class*="swatch"]']:
+                    for ce in container.select(sel):
+                        ct = ce.get_text(strip=True)
+                        if ct and len(ct) < 50 and ct not in colors:
+                            colors.append(ct)
+                if not colors:
+                    for kw in ['black','white','blue','red','green','brown','grey','gray','navy','beige','ivory','off-white']:
+                        if kw in name.lower():
+                            colors.append(kw.title())
+                
+                # Image URL
+                image_url = ""
+                img = container.find('img')
+                if img:
+                    src = img.get('src') or img.get('data-src') or img.get('data-lazy')
+                    if src:
+                        if src.startswith('//'):
+                            image_url = 'https:' + src
+                        elif src.startswith('/'):
+                            image_url = self.outfitters_base + src
+                        else:
+                            image_url = urljoin(url, src)
+                
+                # Product URL (prefer /products/)
+                product_url = ""
+                prod_link = container.find('a', href=re.compile(r'/products/'))
+                if prod_link and prod_link.get('href'):
+                    href = prod_link['href']
+                else:
+                    any_link = container.find('a', href=True)
+                    href = any_link['href'] if any_link else ''
+                if href:
+                    if href.startswith('/'):
+                        product_url = self.outfitters_base + href
+                    elif href.startswith('http'):
+                        product_url = href
+                    else:
+                        product_url = urljoin(url, href)
+                
+                prod = {
+                    'name': name,
+                    'price': price,
+                    'colors': colors[:5],
+                    'image_url': image_url,
+                    'product_url': product_url,
+                    'website': 'Outfitters',
+                    'category': 'shirts',
+                    'gender': 'women'
+                }
+                products.append(prod)
+            except Exception as e:
+                logger.warning(f"[Women] Error parsing container {i+1}: {e}")
+                continue
+        
+        logger.info(f"Scraped {len(products)} women's shirts from Outfitters")
+        return products
     
     def scrape_khaadi_men(self) -> List[Dict]:
         """Scrape men's clothing from Khaadi"""
         try:
             # Khaadi men's clothing URL (adjust as needed)
-            url = "https://khaadi.com/men"
+            url = f"{self.khaadi_base}/men"
             response = self.session.get(url, timeout=10)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            products = []
-            
-            # Similar scraping logic for Khaadi
-            product_containers = soup.find_all('div', class_=re.compile(r'product|item|card'))
-            
-            for container in product_containers:
-                try:
-                    name_elem = container.find(['h3', 'h4', 'h5'], class_=re.compile(r'title|name|product'))
-                    if not name_elem:
-                        continue
-                    name = name_elem.get_text(strip=True)
-                    
-                    price_elem = container.find(['span', 'div'], class_=re.compile(r'price|cost'))
-                    price = "Price not available"
-                    if price_elem:
-                        price_text = price_elem.get_text(strip=True)
-                        price_match = re.search(r'PKR\s*([\d,]+)', price_text)
-                        if price_match:
-                            price = f"PKR {price_match.group(1)}"
-                    
-                    colors = []
-                    color_elements = container.find_all(['span', 'div'], class_=re.compile(r'color|swatch'))
-                    for color_elem in color_elements:
-                        color_text = color_elem.get_text(strip=True)
-                        if color_text and len(color_text) < 20:
-                            colors.append(color_text)
-                    
-                    img_elem = container.find('img')
-                    image_url = ""
-                    if img_elem:
-                        img_src = img_elem.get('src') or img_elem.get('data-src')
-                        if img_src:
-                            image_url = urljoin(url, img_src)
-                    
-                    link_elem = container.find('a', href=True)
-                    product_url = ""
-                    if link_elem:
-                        product_url = urljoin(url, link_elem['href'])
-                    
-                    if name and name != "":
-                        products.append({
-                            'name': name,
-                            'price': price,
-                            'colors': colors,
-                            'image_url': image_url,
-                            'product_url': product_url,
-                            'website': 'Khaadi',
-                            'category': 'general',
-                            'gender': 'men'
-                        })
-                        
-                except Exception as e:
-                    logger.warning(f"Error parsing Khaadi product container: {e}")
-                    continue
-            
-            logger.info(f"Scraped {len(products)} men's items from Khaadi")
-            return products
-            
+            return self.parse_khaadi_men(response.content, url)
         except Exception as e:
             logger.error(f"Error scraping Khaadi men's clothing: {e}")
             return []
+
+    def parse_khaadi_men(self, content, url: str) -> List[Dict]:
+        """Products from a Khaadi men's page (HTML)."""
+        if self.parser_backend == "lxml":
+            return parse_products(content, url, 'khaadi_men', self.khaadi_base)
+        soup = BeautifulSoup(content, 'html.parser')
+        products = []
+        
+        # Similar scraping logic for Khaadi
+        product_containers = soup.find_all('div', class_=re.compile(r'product|item|card'))
+        
+        for container in product_containers:
+            try:
+                name_elem = container.find(['h3', 'h4', 'h5'], class_=re.compile(r'title|name|product'))
+                if not name_elem:
+                    continue
+                name = name_elem.get_text(strip=True)
+                
+                price_elem = container.find(['span', 'div'], class_=re.compile(r'price|cost'))
+                price = "Price not available"
+                if price_elem:
+                    price_text = price_elem.get_text(strip=True)
+                    price_match = re.search(r'PKR\s*([\d,]+)', price_text)
+                    if price_match:
+                        price = f"PKR {price_match.group(1)}"
+                
+                colors = []
+                color_elements = container.find_all(['span', 'div'], class_=re.compile(r'color|swatch'))
+                for color_elem in color_elements:
+                    color_text = color_elem.get_text(strip=True)
+                    if color_text and len(color_text) < 20:
+                        colors.append(color_text)
+                
+                img_elem = container.find('img')
+                image_url = ""
+                if img_elem:
+                    img_src = img_elem.get('src') or img_elem.get('data-src')
+                    if img_src:
+                        image_url = urljoin(url, img_src)
+                
+                link_elem = container.find('a', href=True)
+                product_url = ""
+                if link_elem:
+                    product_url = urljoin(url, link_elem['href'])
+                
+                if name and name != "":
+                    products.append({
+                        'name': name,
+                        'price': price,
+                        'colors': colors,
+                        'image_url': image_url,
+                        'product_url': product_url,
+                        'website': 'Khaadi',
+                        'category': 'general',
+                        'gender': 'men'
+                    })
+                    
+            except Exception as e:
+                logger.warning(f"Error parsing Khaadi product container: {e}")
+                continue
+        
+        logger.info(f"Scraped {len(products)} men's items from Khaadi")
+        return products
     
-    def scrape_all_websites(self) -> Dict[str, List[Dict]]:
-        """Scrape all configured websites"""
+    def crawl_jobs(self, pages: int = 1) -> List[Job]:
+        """Every page scraped by scrape_all_websites (products.json first, HTML as fallback)."""
+        jobs = []
+        for key, slug, gender, parse in (('outfitters_men', 'men-shirts', 'men', self.parse_outfitters_men_shirts),
+                                         ('outfitters_women', 'women-shirts', 'women', self.parse_outfitters_women_shirts)):
+            collection_url = f"{self.outfitters_base}/collections/{slug}"
+            html_urls = page_urls(collection_url, pages)
+            if self.outfitters_source != "json":
+                jobs.extend(Job(key, url, parse) for url in html_urls)
+                continue
+            parse_json = partial(self.parse_outfitters_products_json, category='shirts', gender=gender)
+            for json_url, html_url in zip(page_urls(self.outfitters_json_url(collection_url), pages), html_urls):
+                jobs.append(Job(key, json_url, parse_json, fallback=(html_url, parse)))
+        jobs.append(Job('khaadi_men', f"{self.khaadi_base}/men", self.parse_khaadi_men))
+        return jobs
+    
+    def scrape_all_websites(self, concurrent: bool = True, pages: int = 1,
+                            fetcher: Optional[AsyncFetcher] = None) -> Dict[str, List[Dict]]:
+        """
+        Scrape all configured websites.
+        
+        Args:
+            concurrent: Fetch all sites / collection pages at once through the
+                async crawler (per-host rate limits, retries); False = the
+                original one-by-one scrape with a 2 s pause between sites
+            pages: Collection pages per Outfitters collection (concurrent only)
+            fetcher: Optional configured AsyncFetcher (default: one using
+                this scraper's HTTP cache)
+        
+        After a concurrent crawl, ``last_crawl_report`` holds the run's
+        requests, bytes downloaded / saved by 304s and parse time saved.
+        """
+        if concurrent:
+            logger.info("Crawling Pakistani clothing websites concurrently...")
+            fetcher = fetcher or AsyncFetcher(cache=self.http_cache)
+            self.scraped_data = run_crawl(self.crawl_jobs(pages), fetcher)
+            self.last_crawl_report = fetcher.last_report
+            for key, products in self.scraped_data.items():
+                logger.info(f"Scraped {len(products)} products for {key}")
+            return self.scraped_data
+        
         all_products = {
             'outfitters_men': [],
             'outfitters_women': [],
@@ -559,6 +741,13 @@ class ClothingWebScraper:
         except Exception as e:
             logger.error(f"Error saving data to JSON: {e}")
     
+    def save_to_catalog(self, catalog: Optional[ProductCatalog] = None) -> Dict[str, int]:
+        """Upsert scraped data into the product catalog (each key replaces its slice)"""
+        catalog = catalog or self.catalog or shared_catalog()
+        written = catalog.ingest(self.scraped_data)
+        logger.info(f"Upserted {sum(written.values())} products into {catalog.db_path}")
+        return written
+    
     def load_from_json(self, filename: str = "scraped_clothing_data.json") -> Dict:
         """Load previously scraped data from JSON file"""
         try:
@@ -576,6 +765,8 @@ class ClothingWebScraper:
     
     def get_products_by_color(self, color: str, gender: str = "men") -> List[Dict]:
         """Get products filtered by color and gender"""
+        if self.catalog is not None:
+            return self.catalog.by_color(color, gender)
         if not self.scraped_data:
             self.load_from_json()
         
@@ -599,6 +790,8 @@ class ClothingWebScraper:
     
     def get_products_by_category(self, category: str, gender: str = "men") -> List[Dict]:
         """Get products filtered by category and gender"""
+        if self.catalog is not None:
+            return self.catalog.by_category(category, gender)
         if not self.scraped_data:
             self.load_from_json()
         
@@ -617,6 +810,7 @@ class ClothingWebScraper:
 
 def main():
     """Test the scraper"""
+    use_process_pool()  # standalone crawl: parse big pages on other cores
     scraper = ClothingWebScraper()
     
     # Scrape all websites
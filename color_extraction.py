@@ -0,0 +1,196 @@
+"""
+🎨 Color Extraction
+Shared caption → color lookup used by the shopping backend and the mood modules.
+
+The original helpers ran one ``re.search(rf"\\b{color}\\b")`` per color name and
+then one per alias for every caption. ``ColorExtractor`` tokenizes the caption
+once and resolves every single-word term through a hash lookup; only the few
+multi-word / hyphenated aliases ("baby pink", "off-white") keep a precompiled
+regex. Precedence is unchanged: every COLOR_NAMES entry beats every alias, and
+within each group the first entry in table order wins.
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# ==========================
+# Default vocabulary
+# ==========================
+COLOR_NAMES = [
+    "red", "green", "blue", "yellow", "orange", "purple", "pink",
+    "brown", "black", "white", "gray", "beige", "maroon", "navy",
+    "teal", "cyan", "gold", "silver", "cream"
+]
+
+COLOR_ALIASES = {
+    "grey": "gray", "charcoal": "gray", "slate": "gray", "ash": "gray",
+    "smoke": "gray", "graphite": "gray", "gunmetal": "gray", "pewter": "gray",
+    "sky": "blue", "navy": "blue", "teal": "blue", "turquoise": "blue",
+    "aqua": "blue", "azure": "blue", "babyblue": "blue", "cobalt": "blue",
+    "indigo": "blue", "royalblue": "blue", "denim": "blue", "sapphire": "blue",
+    "midnight": "blue", "crimson": "red", "scarlet": "red", "ruby": "red",
+    "cherry": "red", "garnet": "red", "blood": "red", "rosewood": "red",
+    "rust": "red", "wine": "red", "brick": "red", "mahogany": "red",
+    "burgundy": "maroon", "oxblood": "maroon", "berry": "maroon",
+    "plum": "maroon", "raisin": "maroon", "lime": "green", "olive": "green",
+    "forest": "green", "emerald": "green", "mint": "green", "sage": "green",
+    "moss": "green", "seafoam": "green", "jade": "green", "chartreuse": "green",
+    "avocado": "green", "basil": "green", "golden": "gold", "mustard": "yellow",
+    "lemon": "yellow", "amber": "yellow", "honey": "yellow", "canary": "yellow",
+    "sunflower": "yellow", "beige": "yellow", "sand": "yellow", "camel": "yellow",
+    "khaki": "yellow", "tan": "yellow", "apricot": "orange", "peach": "orange",
+    "tangerine": "orange", "coral": "orange", "salmon": "orange",
+    "terracotta": "orange", "rusty": "orange", "pumpkin": "orange",
+    "violet": "purple", "lavender": "purple", "lilac": "purple", "mauve": "purple",
+    "orchid": "purple", "amethyst": "purple", "magenta": "purple",
+    "eggplant": "purple", "rose": "pink", "blush": "pink", "fuchsia": "pink",
+    "hotpink": "pink", "salmonpink": "pink", "baby pink": "pink",
+    "bubblegum": "pink", "coralpink": "pink", "peony": "pink", "dustyrose": "pink",
+    "chocolate": "brown", "coffee": "brown", "mocha": "brown", "walnut": "brown",
+    "caramel": "brown", "bronze": "brown", "copper": "brown", "espresso": "brown",
+    "rustbrown": "brown", "hazel": "brown", "offwhite": "white", "off-white": "white",
+    "ivory": "white", "cream": "white", "eggshell": "white", "snow": "white",
+    "pearl": "white", "linen": "white", "porcelain": "white", "jet": "black",
+    "onyx": "black", "ebony": "black", "coal": "black", "ink": "black",
+    "char": "black", "graphiteblack": "black", "platinum": "silver",
+    "chrome": "silver", "metallic": "silver", "steel": "silver",
+}
+
+# Men's mood module: the shared table with silver folded into gray, plus a few
+# compound shades its captions use
+MEN_COLOR_ALIASES = {
+    **COLOR_ALIASES,
+    "silver": "gray", "mintgreen": "green", "dustyblue": "blue", "pastelpink": "pink",
+    "pastelyellow": "yellow", "creamwhite": "white", "sandstone": "beige",
+    "camelbrown": "brown", "copperred": "red", "taupe": "beige", "beigebrown": "brown",
+    "offgray": "gray",
+}
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+# ==========================
+# Extractor
+# ==========================
+class ColorExtractor:
+    """Resolve the first matching color term of a caption in a single pass."""
+
+    def __init__(self, color_names: Sequence[str] = None, aliases: Dict[str, str] = None):
+        self.color_names = list(COLOR_NAMES if color_names is None else color_names)
+        self.aliases = dict(COLOR_ALIASES if aliases is None else aliases)
+
+        # Rank every term by the order the legacy loops would have tried it.
+        ordered: List[Tuple[str, str]] = [(c, c) for c in self.color_names]
+        ordered += list(self.aliases.items())
+
+        self._token_rank: Dict[str, int] = {}
+        self._phrase_rules: List[Tuple[int, "re.Pattern", str]] = []
+        self._results: List[str] = []
+        seen = set()
+        for term, canonical in ordered:
+            term = term.lower()
+            if term in seen:
+                continue
+            seen.add(term)
+            rank = len(self._results)
+            self._results.append(canonical)
+            if _TOKEN_RE.fullmatch(term):
+                self._token_rank[term] = rank
+            else:
+                self._phrase_rules.append((rank, re.compile(rf"\b{re.escape(term)}\b"), canonical))
+
+    def normalize(self, word: str) -> str:
+        """Normalize color name to canonical form."""
+        w = (word or "").strip().lower()
+        return self.aliases.get(w, w)
+
+    def extract(self, caption: Optional[str]) -> Optional[str]:
+        """Return the first matched color (canonicalized) or None."""
+        if not caption:
+            return None
+        text = caption.lower()
+        best = len(self._results)
+        token_rank = self._token_rank
+        for tok in _TOKEN_RE.findall(text):
+            rank = token_rank.get(tok)
+            if rank is not None and rank < best:
+                best = rank
+        for rank, pattern, _canonical in self._phrase_rules:
+            if rank >= best:
+                break
+            if pattern.search(text):
+                best = rank
+                break
+        return self._results[best] if best < len(self._results) else None
+
+    def extract_all(self, caption: Optional[str]) -> List[str]:
+        """Every color term of a caption, normalized, in order of appearance (de-duplicated)."""
+        if not caption:
+            return []
+        text = caption.lower()
+        hits = [(m.start(), m.group()) for m in _TOKEN_RE.finditer(text) if m.group() in self._token_rank]
+        for _rank, pattern, _canonical in self._phrase_rules:
+            hits += [(m.start(), m.group()) for m in pattern.finditer(text)]
+        out: List[str] = []
+        for _start, term in sorted(hits):
+            color = self.normalize(term)
+            if color not in out:
+                out.append(color)
+        return out
+
+    def terms_for(self, color: str) -> List[str]:
+        """Canonical color plus every term that normalizes to it (for caption text search)."""
+        canonical = self.normalize(color)
+        terms = {canonical}
+        terms.update(t for t in list(self.color_names) + list(self.aliases) if self.normalize(t) == canonical)
+        return sorted(terms)
+
+    def extract_many(self, captions: Iterable[Optional[str]]) -> List[Optional[str]]:
+        """Bulk mode: extract colors for a whole corpus, memoizing repeated captions."""
+        memo: Dict[Optional[str], Optional[str]] = {}
+        out: List[Optional[str]] = []
+        for cap in captions:
+            if cap in memo:
+                out.append(memo[cap])
+                continue
+            color = self.extract(cap)
+            memo[cap] = color
+            out.append(color)
+        return out
+
+    def extract_mapping(self, captions_by_key: Dict[str, str]) -> Dict[str, Optional[str]]:
+        """Bulk mode for caption caches: ``{image_path: caption}`` → ``{image_path: color}``."""
+        keys = list(captions_by_key.keys())
+        return dict(zip(keys, self.extract_many(captions_by_key[k] for k in keys)))
+
+
+# ==========================
+# Module-level helpers (default vocabulary)
+# ==========================
+_default_extractor = ColorExtractor()
+_men_extractor = ColorExtractor(COLOR_NAMES, MEN_COLOR_ALIASES)
+
+
+def get_default_extractor() -> ColorExtractor:
+    """Return the shared extractor built from COLOR_NAMES / COLOR_ALIASES."""
+    return _default_extractor
+
+
+def get_men_extractor() -> ColorExtractor:
+    """Return the shared extractor built from COLOR_NAMES / MEN_COLOR_ALIASES."""
+    return _men_extractor
+
+
+def normalize_color_word(word: str) -> str:
+    """Normalize color name to canonical form."""
+    return _default_extractor.normalize(word)
+
+
+def extract_color_from_caption(caption: str) -> Optional[str]:
+    """Extract color from BLIP caption."""
+    return _default_extractor.extract(caption)
+
+
+def extract_colors_bulk(captions: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """Extract colors for many captions at once (same order as input)."""
+    return _default_extractor.extract_many(captions)
@@ -0,0 +1,266 @@
+"""
+🗂️ Color → Image Inverted Index
+Maps (gender, label, canonical color) → image ids so the Mood Module can answer
+a color query with a set lookup instead of re-scanning a label folder and
+re-matching every caption.
+
+Image ids are posix paths relative to the working directory
+(e.g. ``clothing_images_men/shirt/s1.jpg``), the same strings the Gradio
+galleries and ``/static`` URLs are built from.
+
+The index is persisted as JSON next to the BLIP caption cache
+(``blip_captions_male.json`` → ``blip_captions_male_color_index.json``) and is
+updated incrementally whenever a caption is generated.
+"""
+
+import json
+import os
+import sqlite3
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from color_extraction import ColorExtractor, get_default_extractor
+
+INDEX_VERSION = 1
+VALID_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+Key = Tuple[str, str, str]
+
+
+def image_id_for(path: str) -> str:
+    """Canonical image id: posix path with Windows separators normalized."""
+    return str(path).replace("\\", "/")
+
+
+def label_for(image_id: str) -> str:
+    """Label is the parent folder name of the image."""
+    parts = image_id_for(image_id).rsplit("/", 2)
+    return parts[-2].lower() if len(parts) >= 2 else ""
+
+
+def index_path_for_cache(caption_cache_path: str) -> Path:
+    """Sidecar path of the color index for a caption cache JSON file."""
+    p = Path(caption_cache_path)
+    return p.with_name(f"{p.stem}_color_index.json")
+
+
+class ColorImageIndex:
+    """Inverted index of caption/dominant colors per (gender, label)."""
+
+    def __init__(self, extractor: ColorExtractor = None, index_path: Optional[str] = None):
+        self.extractor = extractor or get_default_extractor()
+        self.index_path = Path(index_path) if index_path else None
+        # Every color a query can normalize to; substring hits on these keep
+        # parity with the legacy "requested in caption" fallback.
+        self.query_colors: Set[str] = {
+            self.extractor.normalize(t)
+            for t in list(self.extractor.color_names) + list(self.extractor.aliases.keys())
+        }
+        self._postings: Dict[Key, Set[str]] = defaultdict(set)
+        self._images: Dict[str, Tuple[str, str, List[str]]] = {}  # id -> (gender, label, colors)
+        self._folder_state: Dict[str, int] = {}  # "gender/label" -> folder mtime_ns
+        self._uncaptioned: Dict[str, Set[str]] = {}  # "gender/label" -> image ids with no caption yet
+        self._dirty = False
+
+    # ---------- building ----------
+    def colors_for_caption(self, caption: str, extra_colors: Iterable[str] = ()) -> List[str]:
+        """All colors a legacy caption filter would have matched for this caption."""
+        cap = (caption or "").lower()
+        found: Set[str] = set()
+        if cap:
+            for c in self.query_colors:
+                if c and c in cap:
+                    found.add(c)
+            det = self.extractor.extract(cap)
+            if det:
+                found.add(self.extractor.normalize(det))
+        for c in extra_colors or ():
+            if c:
+                found.add(self.extractor.normalize(c))
+        return sorted(found)
+
+    def add_image(self, gender: str, label: str, image_path: str, caption: str,
+                  extra_colors: Iterable[str] = ()) -> List[str]:
+        """Index (or re-index) one image; returns the colors it was filed under."""
+        image_id = image_id_for(image_path)
+        self.remove_image(image_id)
+        gender, label = gender.lower(), (label or label_for(image_id)).lower()
+        colors = self.colors_for_caption(caption, extra_colors)
+        self._images[image_id] = (gender, label, colors)
+        for c in colors:
+            self._postings[(gender, label, c)].add(image_id)
+        self._dirty = True
+        return colors
+
+    def remove_image(self, image_path: str) -> bool:
+        image_id = image_id_for(image_path)
+        entry = self._images.pop(image_id, None)
+        if entry is None:
+            return False
+        gender, label, colors = entry
+        for c in colors:
+            ids = self._postings.get((gender, label, c))
+            if ids is not None:
+                ids.discard(image_id)
+                if not ids:
+                    del self._postings[(gender, label, c)]
+        self._dirty = True
+        return True
+
+    def add_caption_cache(self, gender: str, captions: Dict[str, str]) -> int:
+        """Bulk-index a ``{image_path: caption}`` cache (label from parent folder)."""
+        ids = [image_id_for(k) for k in captions.keys()]
+        for image_id, cap in zip(ids, captions.values()):
+            self.add_image(gender, label_for(image_id), image_id, cap)
+        return len(ids)
+
+    def add_sqlite_index(self, gender: str, db_path: str) -> int:
+        """Bulk-index rows from the Streamlit image DB, using its dominant-color column."""
+        if not Path(db_path).exists():
+            return 0
+        con = sqlite3.connect(Path(db_path).as_posix())
+        try:
+            rows = con.execute("SELECT path, label, caption, colors FROM images").fetchall()
+        finally:
+            con.close()
+        for path, label, caption, colors in rows:
+            extra = [c for c in (colors or "").split(",") if c]
+            self.add_image(gender, label or "", path, caption or "", extra)
+        return len(rows)
+
+    # ---------- freshness ----------
+    def sync_folder(self, gender: str, folder: Path, caption_for) -> bool:
+        """
+        Bring one label folder up to date if its mtime changed since last sync.
+
+        ``caption_for(path_str)`` is called for images not in the index yet (it
+        should generate/cached-lookup the caption); deleted files are pruned.
+        Images that get no caption are remembered and only they are retried
+        on later syncs of an unchanged folder. Returns True if the folder was
+        rescanned or an uncaptioned image was retried.
+        """
+        folder = Path(folder)
+        key = f"{gender.lower()}/{folder.name.lower()}"
+        label = folder.name.lower()
+        try:
+            mtime = folder.stat().st_mtime_ns
+        except OSError:
+            return False
+        if self._folder_state.get(key) == mtime:
+            pending = self._uncaptioned.get(key)
+            if not pending:
+                return False
+            self._uncaptioned[key] = {i for i in pending if not self._add_captioned(gender, label, i, caption_for)}
+            self._dirty = True
+            return True
+        present = set()
+        uncaptioned = set()
+        with os.scandir(folder) as it:
+            for entry in it:
+                if not entry.is_file() or os.path.splitext(entry.name)[1].lower() not in VALID_EXTS:
+                    continue
+                image_id = image_id_for((folder / entry.name).as_posix())
+                present.add(image_id)
+                if image_id not in self._images and not self._add_captioned(gender, label, image_id, caption_for):
+                    uncaptioned.add(image_id)  # captioning unavailable; retry on next query
+        for image_id, (g, l, _colors) in list(self._images.items()):
+            if g == gender.lower() and l == label and image_id not in present:
+                self.remove_image(image_id)
+        self._folder_state[key] = mtime
+        self._uncaptioned[key] = uncaptioned
+        self._dirty = True
+        return True
+
+    def _add_captioned(self, gender: str, label: str, image_id: str, caption_for) -> bool:
+        caption = caption_for(str(Path(image_id))) or ""
+        if caption:
+            self.add_image(gender, label, image_id, caption)
+        return bool(caption)
+
+    # ---------- queries ----------
+    def covers(self, color: str) -> bool:
+        """True if queries for this color can be answered from the index alone."""
+        return self.extractor.normalize(color) in self.query_colors
+
+    def lookup(self, gender: str, label: str, color: str) -> List[str]:
+        """Sorted image ids for (gender, label, color)."""
+        key = (gender.lower(), (label or "").lower(), self.extractor.normalize(color))
+        return sorted(self._postings.get(key, ()))
+
+    def page(self, gender: str, label: str, color: str, page: int = 1,
+             page_size: int = 24) -> Tuple[List[str], int]:
+        """One gallery page (1-based) plus the total number of matches."""
+        ids = self.lookup(gender, label, color)
+        start = max(page - 1, 0) * page_size
+        return ids[start:start + page_size], len(ids)
+
+    def colors_for_label(self, gender: str, label: str) -> Dict[str, int]:
+        """Color → image count for one label (handy for UI hints)."""
+        g, l = gender.lower(), (label or "").lower()
+        return {c: len(ids) for (gg, ll, c), ids in self._postings.items() if gg == g and ll == l}
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+    # ---------- persistence ----------
+    def save(self, path: Optional[str] = None) -> None:
+        target = Path(path) if path else self.index_path
+        if target is None:
+            return
+        payload = {
+            "version": INDEX_VERSION,
+            "images": {k: [g, l, c] for k, (g, l, c) in self._images.items()},
+            "folders": self._folder_state,
+            "uncaptioned": {k: sorted(ids) for k, ids in self._uncaptioned.items() if ids},
+        }
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, target)
+        self._dirty = False
+
+    def flush(self) -> None:
+        """Persist only if something changed since the last save."""
+        if self._dirty:
+            self.save()
+
+    def load(self, path: Optional[str] = None) -> bool:
+        source = Path(path) if path else self.index_path
+        if source is None or not source.exists():
+            return False
+        try:
+            with open(source, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read color index {source}: {e}")
+            return False
+        if payload.get("version") != INDEX_VERSION:
+            return False
+        self._postings.clear()
+        self._images.clear()
+        for image_id, (g, l, colors) in payload.get("images", {}).items():
+            self._images[image_id] = (g, l, list(colors))
+            for c in colors:
+                self._postings[(g, l, c)].add(image_id)
+        self._folder_state = dict(payload.get("folders", {}))
+        self._uncaptioned = {k: set(ids) for k, ids in payload.get("uncaptioned", {}).items()}
+        self._dirty = False
+        return True
+
+
+def load_or_build_color_index(gender: str, caption_cache_path: str,
+                              extractor: ColorExtractor = None) -> ColorImageIndex:
+    """Load the sidecar index for a caption cache, or build it from the cache once."""
+    index = ColorImageIndex(extractor, index_path_for_cache(caption_cache_path).as_posix())
+    if index.load():
+        return index
+    if Path(caption_cache_path).exists():
+        try:
+            with open(caption_cache_path, "r", encoding="utf-8") as f:
+                captions = json.load(f)
+            index.add_caption_cache(gender, captions)
+            index.save()
+        except Exception as e:
+            print(f"⚠️ Could not build color index from {caption_cache_path}: {e}")
+    return index
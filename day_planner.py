@@ -0,0 +1,158 @@
+"""
+🗓️ Day Planner
+"What to wear today" across morning, afternoon, evening and night from a
+single weather forecast call.
+
+The OpenWeather 5-day / 3-hour forecast is fetched once; the entries of the
+next 24 hours are grouped into the four time-of-day slots (numeric fields
+averaged, the most common condition kept). All slot feature rows are then
+predicted in ONE batch — ``FastOutfitPredictor.predict_many`` /
+``pipeline.predict`` on a 4-row frame, or the rule engine row by row — and
+images are picked for every slot from a shared "used" set so the same item
+is not shown twice in a day (unless a folder runs out of images).
+
+Used by the Gradio apps (Day plan section) and ``POST /plan/{gender}``.
+"""
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import requests
+
+FORECAST_URL = "http://api.openweathermap.org/data/2.5/forecast"
+TIME_SLOTS = ("morning", "afternoon", "evening", "night")
+WEATHER_FIELDS = ("temperature", "feels_like", "humidity", "wind_speed")
+PLAN_HOURS = 24
+
+
+def slot_for_hour(hour: int) -> str:
+    """Local hour → time_of_day, matching the values the models were trained on."""
+    if 5 <= hour < 12:
+        return "morning"
+    if 12 <= hour < 17:
+        return "afternoon"
+    if 17 <= hour < 21:
+        return "evening"
+    return "night"
+
+
+# ==========================
+# Forecast
+# ==========================
+def fetch_forecast(city: str, api_key: str, timeout: int = 10) -> Optional[Dict]:
+    """Raw 5-day / 3-hour forecast JSON for a city, or None."""
+    if not city:
+        return None
+    try:
+        r = requests.get(FORECAST_URL, params={"q": city, "appid": api_key, "units": "metric"}, timeout=timeout)
+        if r.status_code != 200:
+            return None
+        return r.json()
+    except Exception:
+        return None
+
+
+def forecast_slots(payload: Dict, hours: int = PLAN_HOURS) -> List[Dict]:
+    """
+    Group the forecast entries of the next ``hours`` hours into time slots
+    (each slot once: tomorrow's stretch of the first slot is not merged in).
+
+    Returns one weather dict per slot (same keys as ``fetch_weather``) plus
+    ``time_of_day``, ``start`` and ``end`` (local "HH:MM"), in chronological
+    order starting from the slot of the first entry.
+    """
+    entries = payload.get("list") or []
+    if not entries:
+        return []
+    tz = timezone(timedelta(seconds=(payload.get("city") or {}).get("timezone", 0)))
+    first = entries[0]["dt"]
+    groups: Dict[str, List[Tuple[datetime, Dict]]] = {}
+    last = None
+    for e in entries:
+        if e["dt"] - first >= hours * 3600:
+            break
+        local = datetime.fromtimestamp(e["dt"], tz)
+        slot = slot_for_hour(local.hour)
+        if slot in groups and slot != last:
+            break  # slot comes round again (tomorrow) — each slot covers one contiguous stretch
+        groups.setdefault(slot, []).append((local, e))
+        last = slot
+
+    slots = []
+    for slot, items in sorted(groups.items(), key=lambda kv: kv[1][0][0]):
+        values = {
+            "temperature": [e["main"]["temp"] for _, e in items],
+            "feels_like": [e["main"]["feels_like"] for _, e in items],
+            "humidity": [e["main"]["humidity"] for _, e in items],
+            "wind_speed": [e["wind"]["speed"] for _, e in items],
+        }
+        conditions = Counter(e["weather"][0]["main"].lower() for _, e in items)
+        slots.append({
+            "time_of_day": slot,
+            **{k: round(sum(v) / len(v), 1) for k, v in values.items()},
+            "weather_condition": conditions.most_common(1)[0][0],
+            "start": items[0][0].strftime("%H:%M"),
+            "end": (items[-1][0] + timedelta(hours=3)).strftime("%H:%M"),
+        })
+    return slots
+
+
+def slot_features(slots: Sequence[Dict], season: str, occasion: str, mood: Optional[str] = None) -> List[Dict]:
+    """One model / rule-engine feature row per slot."""
+    rows = []
+    for s in slots:
+        row = {k: s[k] for k in WEATHER_FIELDS}
+        row.update(weather_condition=s["weather_condition"], time_of_day=s["time_of_day"],
+                   season=season, occasion=occasion)
+        if mood is not None:
+            row["mood"] = mood
+        rows.append(row)
+    return rows
+
+
+# ==========================
+# Batch prediction
+# ==========================
+def predict_batch(model, rows: List[Dict], fast_model=None) -> List[Tuple[str, str, str]]:
+    """All rows through the outfit model at once (flat predictor if available)."""
+    if fast_model is not None:
+        return fast_model.predict_many(rows)
+    import pandas as pd
+
+    return [tuple(p) for p in model.predict(pd.DataFrame(rows))]
+
+
+# ==========================
+# Image picking
+# ==========================
+def pick_unused(candidates: Sequence[str], used: Set[str], rng: random.Random) -> Optional[str]:
+    """Random candidate not shown yet today; falls back to any candidate when all are used."""
+    if not candidates:
+        return None
+    fresh = [c for c in candidates if c not in used]
+    choice = rng.choice(fresh or list(candidates))
+    used.add(choice)
+    return choice
+
+
+def plan_day(slots: Sequence[Dict], outfits: Sequence[Tuple[str, str, str]],
+             images_for: Callable[[str], Sequence[str]], rng: Optional[random.Random] = None) -> List[Dict]:
+    """
+    Attach one image per item to every slot without repeating an image.
+
+    ``images_for(label)`` lists the candidate images for a label ([] for
+    "none" / missing folders).
+    """
+    rng = rng or random.Random()
+    used: Set[str] = set()
+    plan = []
+    for s, (top, bottom, outer) in zip(slots, outfits):
+        labels = {"top": top, "bottom": bottom, "outer": outer}
+        images = {}
+        for item, label in labels.items():
+            candidates = [] if str(label).lower() == "none" else sorted(images_for(label))
+            images[item] = pick_unused(candidates, used, rng)
+        plan.append({"weather": dict(s), "outfit": labels, "images": images})
+    return plan
@@ -8,53 +8,51 @@ import re
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from clothing_web_scraper import ClothingWebScraper
+from catalog_refresher import CatalogRefresher, shared_refresher, slice_name
+from product_catalog import FAMILIES, ProductCatalog, price_minor, shared_catalog, to_minor
 import logging
 
 logger = logging.getLogger(__name__)
 
+SCRAPED_JSON = "scraped_clothing_data.json"
+
+# preferred_category -> product family
+PREFERRED_FAMILY = {
+    'shirt':'tops','shirts':'tops','t-shirt':'tops','tshirts':'tops','tee':'tops','tees':'tops',
+    'kurta':'tops','kurtas':'tops','top':'tops','tops':'tops','blouse':'tops','blouses':'tops',
+    'sweater':'tops','sweaters':'tops',
+    'jeans':'bottoms','trousers':'bottoms','pants':'bottoms','shorts':'bottoms','leggings':'bottoms','skirt':'bottoms','skirts':'bottoms','capris':'bottoms',
+    'jacket':'outerwear','jackets':'outerwear','coat':'outerwear','coats':'outerwear','hoodie':'outerwear','hoodies':'outerwear','blazer':'outerwear','blazers':'outerwear','dupatta':'outerwear','dupattas':'outerwear'
+}
+
 class DynamicShoppingRecommender:
     """Generates shopping recommendations using real web data"""
     
-    def __init__(self, images_root: str, caption_cache: Dict = None, gender: str = "men", preferred_category: Optional[str] = None):
+    def __init__(self, images_root: str, caption_cache: Dict = None, gender: str = "men", preferred_category: Optional[str] = None,
+                 catalog: Optional[ProductCatalog] = None, refresher: Optional[CatalogRefresher] = None):
         self.images_root = Path(images_root)
         self.caption_cache = caption_cache or {}
-        self.web_scraper = ClothingWebScraper()
+        self.catalog = catalog or shared_catalog()
+        self.web_scraper = ClothingWebScraper(catalog=self.catalog)
         self.gender = (gender or "men").lower()
         self.preferred_category = (preferred_category or "").strip().lower()
         
-        # Load or scrape web data
-        self.web_data = self.web_scraper.load_from_json()
-        if not self.web_data or all(len(products) == 0 for products in self.web_data.values()):
-            logger.info("No cached web data found or empty cache, scraping fresh data...")
-            self.web_data = self.web_scraper.scrape_all_websites()
-            self.web_scraper.save_to_json()
-        else:
-            # Ensure gender-specific data exists; if missing for requested gender, scrape that slice now
-            try:
-                if self.gender == "women":
-                    has_women = any(k.startswith("outfitters_women") and len(v) > 0 for k, v in self.web_data.items())
-                    if not has_women:
-                        logger.info("No women's products in cache; scraping Outfitters women now...")
-                        women_products = self.web_scraper.scrape_outfitters_women_shirts()
-                        self.web_data["outfitters_women"] = women_products
-                        self.web_scraper.scraped_data = self.web_data
-                        self.web_scraper.save_to_json()
-                elif self.gender == "men":
-                    has_men = any(k.startswith("outfitters_men") and len(v) > 0 for k, v in self.web_data.items())
-                    if not has_men:
-                        logger.info("No men's products in cache; scraping Outfitters men now...")
-                        men_products = self.web_scraper.scrape_outfitters_men_shirts()
-                        self.web_data["outfitters_men"] = men_products
-                        self.web_scraper.scraped_data = self.web_data
-                        self.web_scraper.save_to_json()
-                # If preferred_category requested, ensure that collection exists
-                if self.preferred_category:
-                    ensured = self.web_scraper.ensure_outfitters_category(self.gender, self.preferred_category)
-                    if ensured:
-                        # Reload from scraper's latest cache
-                        self.web_data = self.web_scraper.scraped_data
-            except Exception:
-                pass
+        # Web products live in the product catalog; scraped_clothing_data.json is only imported once
+        if self.catalog.count() == 0 and Path(SCRAPED_JSON).exists():
+            logger.info(f"Importing {SCRAPED_JSON} into the product catalog...")
+            self.catalog.import_json(SCRAPED_JSON)
+        # Serve the current snapshot; missing or stale slices are re-scraped in the background
+        self.refresher = refresher or shared_refresher(self.catalog)
+        self.refresher.ensure_fresh(self._catalog_slices())
+    
+    def _catalog_slices(self) -> List[str]:
+        """Catalog slices this recommendation reads"""
+        slices = [slice_name(self.gender)]
+        if self.gender == "men":
+            slices.append("khaadi_men")
+        if self.preferred_category:
+            slices.append(slice_name(self.gender, self.preferred_category))
+        return slices
     
     def analyze_wardrobe_gaps(self, season: str) -> Dict:
         """Analyze wardrobe gaps using both local images and web data"""
@@ -113,62 +111,15 @@ class DynamicShoppingRecommender:
         return None
     
     def _get_available_products(self) -> Dict[str, List[Dict]]:
-        """Get available products from web scraping"""
-        all_products = []
-        
-        for website, products in self.web_data.items():
-            all_products.extend(products)
-        
-        # Group by category and gender
-        categorized = {
-            'men_tops': [],
-            'men_bottoms': [],
-            'men_outerwear': [],
-            'women_tops': [],
-            'women_bottoms': [],
-            'women_outerwear': []
-        }
-        
-        for product in all_products:
-            gender = product.get('gender', 'men')
-            category = product.get('category', 'general')
-            
-            # Map categories to our system
-            if category in ['shirts', 't-shirt', 'kurta', 'sweater', 'top', 'blouse']:
-                category = 'tops'
-            elif category in ['pants', 'jeans', 'trousers', 'shorts', 'leggings', 'skirt']:
-                category = 'bottoms'
-            elif category in ['jacket', 'coat', 'blazer', 'hoodie', 'cardigan', 'dupatta']:
-                category = 'outerwear'
-            else:
-                category = 'tops'  # Default to tops for unknown categories
-            
-            # If preferred_category is set, skip mismatches
-            if self.preferred_category:
-                if category != 'tops' and self.preferred_category in {'shirt','shirts','t-shirt','tshirts','tee','tees','kurta','kurtas','top','tops','blouse','blouses','sweater','sweaters'}:
-                    pass  # only tops match will be included below
-                # Map preferred to bucket
-                pref_map = {
-                    'shirt':'tops','shirts':'tops','t-shirt':'tops','tshirts':'tops','tee':'tops','tees':'tops',
-                    'kurta':'tops','kurtas':'tops','top':'tops','tops':'tops','blouse':'tops','blouses':'tops',
-                    'sweater':'tops','sweaters':'tops',
-                    'jeans':'bottoms','trousers':'bottoms','pants':'bottoms','shorts':'bottoms','leggings':'bottoms','skirt':'bottoms','skirts':'bottoms','capris':'bottoms',
-                    'jacket':'outerwear','jackets':'outerwear','coat':'outerwear','coats':'outerwear','hoodie':'outerwear','hoodies':'outerwear','blazer':'outerwear','blazers':'outerwear','dupatta':'outerwear','dupattas':'outerwear'
-                }
-                desired_bucket = pref_map.get(self.preferred_category)
-                if desired_bucket and category != desired_bucket:
-                    continue
-
-            key = f"{gender}_{category}"
-            if key in categorized:
-                categorized[key].append(product)
-        
-        # Filter by gender for the caller
-        filtered: Dict[str, List[Dict]] = {}
-        for key, items in categorized.items():
-            if key.startswith(f"{self.gender}_"):
-                filtered[key] = items
-        return filtered
+        """Products for this gender from the catalog, grouped as ``{gender}_{tops|bottoms|outerwear}``"""
+        if self.preferred_category:
+            # Only the preferred category's family is filled; the other buckets stay empty
+            desired_bucket = PREFERRED_FAMILY.get(self.preferred_category)
+            if desired_bucket:
+                products = {f"{self.gender}_{family}": [] for family in FAMILIES}
+                products.update(self.catalog.buckets(self.gender, desired_bucket))
+                return products
+        return self.catalog.buckets(self.gender)
     
     def _identify_gaps(self, local_wardrobe: Dict, web_products: Dict, season: str) -> Dict:
         """Identify gaps between local wardrobe and available products"""
@@ -242,8 +193,8 @@ class DynamicShoppingRecommender:
         
         return recommendations[:10]  # Limit to top 10
     
-    def generate_shopping_recommendations(self, season: str) -> Tuple[str, str, str, List[str], List[str]]:
-        """Generate comprehensive shopping recommendations with images and links"""
+    def generate_shopping_recommendations(self, season: str, budget: Optional[float] = None) -> Tuple[str, str, str, List[str], List[str]]:
+        """Generate comprehensive shopping recommendations with images and links (budget: max price in PKR)"""
         try:
             # Analyze wardrobe gaps
             analysis = self.analyze_wardrobe_gaps(season)
@@ -251,7 +202,7 @@ class DynamicShoppingRecommender:
             # Generate formatted outputs
             wardrobe_summary = self._format_wardrobe_summary(analysis['local_wardrobe'])
             gap_analysis = self._format_gap_analysis(analysis['gaps'])
-            shopping_list, product_images, product_links = self._format_shopping_list(analysis['gaps'], analysis['available_products'])
+            shopping_list, product_images, product_links = self._format_shopping_list(analysis['gaps'], analysis['available_products'], budget)
             
             return wardrobe_summary, gap_analysis, shopping_list, product_images, product_links
             
@@ -290,9 +241,34 @@ class DynamicShoppingRecommender:
         
         return analysis
     
-    def _format_shopping_list(self, gaps: Dict, web_products: Dict) -> Tuple[str, List[str], List[str]]:
-        """Format shopping recommendations with real products and return images/links"""
+    def _within_budget(self, gaps: Dict, web_products: Dict, budget: float) -> Dict[str, List[Dict]]:
+        """Per bucket, products at or under budget from the price index: missing colors first, then cheapest"""
+        index = self.catalog.price_index(self.gender)
+        max_minor = to_minor(budget)
+        missing = gaps.get('missing_colors', [])
+        within: Dict[str, List[Dict]] = {}
+        for bucket, products in web_products.items():
+            if not products:
+                continue
+            family = bucket.rsplit('_', 1)[-1]
+            # the shopping list dedupes by product URL, so overlap between the two lists is fine
+            preferred = index.under(self.gender, family, max_minor, colors=missing, limit=10) if missing else []
+            within[bucket] = preferred + index.under(self.gender, family, max_minor, limit=10)
+        return within
+    
+    def _format_shopping_list(self, gaps: Dict, web_products: Dict,
+                              budget: Optional[float] = None) -> Tuple[str, List[str], List[str]]:
+        """
+        Format shopping recommendations with real products and return images/links.
+        
+        With ``budget`` (max price in PKR) only products at or under it are
+        listed, cheapest first and those in missing colors before the rest.
+        """
         shopping_list = "🛍️ **Shopping Recommendations**\n\n"
+        if budget is not None:
+            amount = f"{budget:,.0f}" if float(budget).is_integer() else f"{budget:,.2f}"
+            shopping_list += f"💰 Budget: up to PKR {amount}\n\n"
+            web_products = self._within_budget(gaps, web_products, budget)
         product_images: List[str] = []
         product_links: List[str] = []
         seen_products: set = set()      # dedupe by product_url
@@ -343,6 +319,10 @@ class DynamicShoppingRecommender:
             shopping_list += "🟡 **SEASONAL RECOMMENDATIONS**\n"
             added_seasonal = 0
             for product in gaps['seasonal_needs']:
+                if budget is not None:
+                    price = price_minor(product.get('price'))
+                    if price is None or price > to_minor(budget):
+                        continue
                 shopping_list += f"**{product.get('name', 'Product')}**\n"
                 shopping_list += f"💰 {product.get('price', 'Price not available')}\n"
                 
@@ -372,22 +352,12 @@ class DynamicShoppingRecommender:
         
         return shopping_list, product_images, product_links
 
-def generate_dynamic_shopping_recommendations(images_root: str, season: str, caption_cache: Dict = None, gender: str = "men", preferred_category: Optional[str] = None) -> Tuple[str, str, str, List[str], List[str]]:
+def generate_dynamic_shopping_recommendations(images_root: str, season: str, caption_cache: Dict = None, gender: str = "men", preferred_category: Optional[str] = None,
+                                              budget: Optional[float] = None) -> Tuple[str, str, str, List[str], List[str]]:
     """Main function to generate dynamic shopping recommendations"""
     try:
         recommender = DynamicShoppingRecommender(images_root, caption_cache, gender=gender)
-        # If a preferred category is provided, reduce web_data to that category family
-        if preferred_category:
-            cat = preferred_category.strip().lower()
-            # Map input to our canonical buckets
-            tops_aliases = {"shirt","shirts","t-shirt","tshirts","tee","tees","kurta","kurtas","top","tops","blouse","blouses","sweater","sweaters"}
-            bottoms_aliases = {"pants","trousers","jeans","shorts","leggings","skirt","skirts","capris"}
-            outer_aliases = {"jacket","jackets","coat","coats","blazer","blazers","hoodie","hoodies","cardigan","cardigans","dupatta","dupattas","puffer_jacket","puffer"}
-            if cat in tops_aliases:
-                # keep only *_tops
-                recommender.web_data = {k:v for k,v in recommender.web_data.items() if k.endswith("_men") or k.endswith("_women") or True}
-            # We will filter later in _get_available_products by key prefix; here we pass through
-        return recommender.generate_shopping_recommendations(season)
+        return recommender.generate_shopping_recommendations(season, budget)
     except Exception as e:
         logger.error(f"Error in dynamic shopping recommendations: {e}")
         error_msg = f"❌ Error generating recommendations: {str(e)}"
@@ -0,0 +1,339 @@
+"""
+⚡ Fast Outfit Predictor
+Pandas-free inference for the weather → outfit models
+(weather_clothing_recommender*.pkl).
+
+The saved models are sklearn Pipelines:
+    ColumnTransformer(OneHotEncoder(handle_unknown="ignore") on categoricals,
+                      passthrough on numericals)
+    → MultiOutputClassifier(RandomForestClassifier)
+
+For a single request, building a one-row DataFrame and running it through the
+ColumnTransformer costs far more than the trees. FastOutfitPredictor copies the
+fitted encoder vocabularies and every tree into plain NumPy arrays once, then
+encodes dicts directly and walks all trees of a forest level by level with a
+handful of vectorized gathers per level. Outputs match ``pipeline.predict``:
+features are compared as float32 against float64 thresholds (as sklearn's tree
+code does) and per-tree probabilities are accumulated in estimator order.
+
+Compiled model layout (``save`` / ``load_flat_model``): every tree of every
+output lives in five contiguous node arrays plus one array of tree roots,
+
+    feature.npy   int32    split feature (0 on leaves)
+    threshold.npy float64  split threshold (+inf on leaves)
+    left.npy      int32    global index of the left child (self on leaves)
+    right.npy     int32    global index of the right child (self on leaves)
+    value.npy     float64  (n_nodes, max_classes) leaf class fractions
+    roots.npy     int32    global root node of every tree, output by output
+
+and schema.json holds the encoder vocabularies and per-output classes. The
+arrays are plain .npy files, so they can be memory-mapped and shared between
+processes; sklearn is not needed to load or run them.
+
+Verify against a model + dataset:
+    python fast_predictor.py --model weather_clothing_recommender.pkl \\
+        --csv enhanced_weather_clothing_dataset_no_accessories.csv
+Compile for serving:
+    python fast_predictor.py --model weather_clothing_recommender.pkl \\
+        --csv enhanced_weather_clothing_dataset_no_accessories.csv --export models/men.flat
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+ARRAYS = ("feature", "threshold", "left", "right", "value", "roots")
+
+
+# ==========================
+# Encoder
+# ==========================
+class FeatureEncoder:
+    """Fitted ColumnTransformer (one-hot + passthrough) as dict lookups."""
+
+    def __init__(self, onehot: List[Tuple[str, Dict]], numeric: List[Tuple[str, int]],
+                 n_features_out: int, features: List[str]):
+        self.onehot = onehot        # (column, {category: output index})
+        self.numeric = numeric      # (column, output index)
+        self.n_features_out = n_features_out
+        self.features = features
+
+    @classmethod
+    def from_column_transformer(cls, column_transformer) -> "FeatureEncoder":
+        from sklearn.preprocessing import FunctionTransformer, OneHotEncoder
+
+        names = list(getattr(column_transformer, "feature_names_in_", []))
+        onehot: List[Tuple[str, Dict]] = []
+        numeric: List[Tuple[str, int]] = []
+        width = 0
+        for _name, trans, cols in column_transformer.transformers_:
+            if isinstance(trans, str) and trans == "drop":
+                continue
+            cols = [names[c] if isinstance(c, (int, np.integer)) else c for c in np.atleast_1d(cols)]
+            # fitted ColumnTransformers store "passthrough" as an identity FunctionTransformer
+            if (isinstance(trans, str) and trans == "passthrough") or \
+                    (isinstance(trans, FunctionTransformer) and trans.func is None):
+                for col in cols:
+                    numeric.append((col, width))
+                    width += 1
+            elif isinstance(trans, OneHotEncoder):
+                if getattr(trans, "drop_idx_", None) is not None or \
+                        getattr(trans, "_infrequent_enabled", False):
+                    raise ValueError("OneHotEncoder with drop/infrequent categories is not supported")
+                for col, cats in zip(cols, trans.categories_):
+                    onehot.append((col, {c: width + i for i, c in enumerate(cats.tolist())}))
+                    width += len(cats)
+            else:
+                raise ValueError(f"Unsupported transformer: {type(trans).__name__}")
+        features = names or [c for c, _ in onehot] + [c for c, _ in numeric]
+        return cls(onehot, numeric, width, features)
+
+    def to_schema(self) -> Dict:
+        return {
+            "features": self.features,
+            "n_features_out": self.n_features_out,
+            "onehot": [[col, sorted(index, key=index.get), min(index.values())]
+                       for col, index in self.onehot if index],
+            "numeric": [[col, j] for col, j in self.numeric],
+        }
+
+    @classmethod
+    def from_schema(cls, schema: Dict) -> "FeatureEncoder":
+        onehot = [(col, {c: start + i for i, c in enumerate(cats)}) for col, cats, start in schema["onehot"]]
+        numeric = [(col, int(j)) for col, j in schema["numeric"]]
+        return cls(onehot, numeric, int(schema["n_features_out"]), list(schema["features"]))
+
+    def encode(self, rows: Sequence[Dict]) -> np.ndarray:
+        """Encode feature dicts to the float32 matrix the trees see."""
+        X = np.zeros((len(rows), self.n_features_out), dtype=np.float32)
+        for i, row in enumerate(rows):
+            for col, index in self.onehot:
+                j = index.get(row[col])
+                if j is not None:  # unknown category → all zeros (handle_unknown="ignore")
+                    X[i, j] = 1.0
+            for col, j in self.numeric:
+                X[i, j] = float(row[col])
+        return X
+
+
+# ==========================
+# Forest
+# ==========================
+def compile_forests(forests) -> Tuple[Dict[str, np.ndarray], List[Dict]]:
+    """
+    Flatten fitted RandomForestClassifiers into one set of node arrays.
+
+    Returns (arrays, outputs) where outputs[k] holds the tree range, depth and
+    classes of forest k inside the shared arrays.
+    """
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    outputs: List[Dict] = []
+    offset = 0
+    n_classes = max(len(f.classes_) for f in forests)
+    for forest in forests:
+        first_tree, depth = len(roots), 0
+        for est in forest.estimators_:
+            t = est.tree_
+            idx = np.arange(t.node_count)
+            leaf = t.children_left == -1
+            # Leaves point to themselves with threshold +inf: stepping from a
+            # leaf is a no-op, which is how the evaluator detects finished paths.
+            left.append(np.where(leaf, idx, t.children_left) + offset)
+            right.append(np.where(leaf, idx, t.children_right) + offset)
+            feature.append(np.where(leaf, 0, t.feature))
+            threshold.append(np.where(leaf, np.inf, t.threshold))
+            v = t.value[:, 0, :].astype(np.float64)
+            sums = v.sum(axis=1, keepdims=True)
+            if not np.allclose(sums, 1.0):  # older sklearn stores counts, not fractions
+                sums[sums == 0.0] = 1.0
+                v = v / sums
+            value.append(np.pad(v, ((0, 0), (0, n_classes - v.shape[1]))))
+            roots.append(offset)
+            offset += t.node_count
+            depth = max(depth, t.max_depth)
+        outputs.append({"trees": [first_tree, len(roots)], "max_depth": int(depth),
+                        "classes": np.asarray(forest.classes_).tolist()})
+    if offset >= np.iinfo(np.int32).max:
+        raise ValueError("Model too large for int32 node indices")
+    arrays = {
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "value": np.concatenate(value),
+        "roots": np.asarray(roots, dtype=np.int32),
+    }
+    return arrays, outputs
+
+
+class FlatForest:
+    """One output's trees, viewed inside the shared node arrays."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], trees: Sequence[int], max_depth: int, classes):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.classes = np.asarray(classes)
+        self.value = arrays["value"][:, :len(self.classes)]
+        self.roots = arrays["roots"][trees[0]:trees[1]]
+        self.max_depth = max_depth
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node of every (tree, sample): shape (n_trees, n_samples)."""
+        n, width = X.shape
+        flat_X = X.astype(np.float64).ravel()  # exact; saves a float32 → float64 cast per step
+        n_trees = len(self.roots)
+        nodes = np.repeat(self.roots.astype(np.intp), n)  # tree-major (tree, sample) pairs
+        row_base = np.tile(np.arange(n, dtype=np.intp) * width, n_trees)
+        active = np.arange(nodes.size)
+        while active.size:  # one level per pass; pairs drop out once they sit on a leaf
+            cur = nodes.take(active)
+            # indices are valid by construction: mode="clip" skips the bounds-check path
+            split = self.feature.take(cur, mode="clip") + row_base.take(active)
+            go_left = flat_X.take(split, mode="clip") <= self.threshold.take(cur, mode="clip")
+            nxt = np.where(go_left, self.left.take(cur, mode="clip"), self.right.take(cur, mode="clip"))
+            nodes[active] = nxt
+            active = active[nxt != cur]
+        return nodes.reshape(n_trees, n)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        proba = np.zeros((X.shape[0], len(self.classes)), dtype=np.float64)
+        for tree_leaves in self.leaves(X):  # same accumulation order as sklearn
+            proba += self.value[tree_leaves]
+        return proba / len(self.roots)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+# ==========================
+# Predictor
+# ==========================
+class FastOutfitPredictor:
+    """Drop-in for ``pipeline.predict`` on the outfit models, without pandas."""
+
+    def __init__(self, encoder: FeatureEncoder, arrays: Dict[str, np.ndarray], outputs: List[Dict]):
+        self.encoder = encoder
+        self.arrays = arrays
+        self.outputs = outputs
+        self.forests = [FlatForest(arrays, o["trees"], o["max_depth"], o["classes"]) for o in outputs]
+
+    @classmethod
+    def from_pipeline(cls, pipeline) -> "FastOutfitPredictor":
+        from sklearn.compose import ColumnTransformer
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.multioutput import MultiOutputClassifier
+
+        steps = [step for _, step in getattr(pipeline, "steps", [])]
+        if len(steps) != 2 or not isinstance(steps[0], ColumnTransformer) \
+                or not isinstance(steps[1], MultiOutputClassifier):
+            raise ValueError("Expected Pipeline(ColumnTransformer, MultiOutputClassifier)")
+        if not all(isinstance(e, RandomForestClassifier) for e in steps[1].estimators_):
+            raise ValueError("Expected RandomForestClassifier estimators")
+        encoder = FeatureEncoder.from_column_transformer(steps[0])
+        arrays, outputs = compile_forests(steps[1].estimators_)
+        return cls(encoder, arrays, outputs)
+
+    @property
+    def features(self) -> List[str]:
+        return self.encoder.features
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in self.arrays.values())
+
+    def predict_array(self, X: np.ndarray) -> np.ndarray:
+        """Predict from an already-encoded (n_samples, n_features_out) matrix."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return np.stack([f.predict(X) for f in self.forests], axis=1)
+
+    def predict_many(self, rows: Sequence[Dict]) -> List[Tuple[str, ...]]:
+        out = self.predict_array(self.encoder.encode(rows))
+        return [tuple(str(v) for v in r) for r in out]
+
+    def predict_one(self, features: Dict) -> Tuple[str, ...]:
+        return self.predict_many([features])[0]
+
+    def save(self, path) -> Path:
+        """Write the compiled model as a directory of .npy arrays + schema.json."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(self.arrays[name]))
+        schema = {"format": FORMAT_VERSION, "encoder": self.encoder.to_schema(), "outputs": self.outputs}
+        (path / "schema.json").write_text(json.dumps(schema, indent=1), encoding="utf-8")
+        return path
+
+
+def load_flat_model(path, mmap: bool = True) -> FastOutfitPredictor:
+    """Load a model written by ``FastOutfitPredictor.save`` (memory-mapped by default)."""
+    path = Path(path)
+    schema = json.loads((path / "schema.json").read_text(encoding="utf-8"))
+    if schema.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported flat model format: {schema.get('format')}")
+    # np.asarray drops the np.memmap subclass (and its per-op overhead) but keeps the mapping
+    arrays = {name: np.asarray(np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None))
+              for name in ARRAYS}
+    return FastOutfitPredictor(FeatureEncoder.from_schema(schema["encoder"]), arrays, schema["outputs"])
+
+
+def load_fast_predictor(pipeline) -> Optional[FastOutfitPredictor]:
+    """Fast predictor for a loaded pipeline, or None if its layout is unsupported."""
+    try:
+        return FastOutfitPredictor.from_pipeline(pipeline)
+    except Exception as e:
+        print(f"⚠️ Fast predictor unavailable, using sklearn pipeline: {e}")
+        return None
+
+
+# ==========================
+# Verification CLI
+# ==========================
+def main():
+    import joblib
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Check FastOutfitPredictor against pipeline.predict")
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--csv", required=True)
+    parser.add_argument("--singles", type=int, default=200, help="rows to time one by one")
+    parser.add_argument("--export", help="also write the compiled model to this directory")
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.model)
+    fast = FastOutfitPredictor.from_pipeline(pipeline)
+    df = pd.read_csv(args.csv).dropna()
+    X = df[fast.features]
+    rows = X.to_dict(orient="records")
+
+    expected = [tuple(str(v) for v in r) for r in pipeline.predict(X)]
+    got = fast.predict_many(rows)
+    mismatches = sum(1 for a, b in zip(expected, got) if a != b)
+    print(f"📊 {len(rows)} rows, mismatches vs pipeline.predict: {mismatches}")
+
+    sample = rows[:args.singles]
+    t0 = time.perf_counter()
+    for r in sample:
+        pipeline.predict(pd.DataFrame([r]))
+    slow = (time.perf_counter() - t0) / len(sample)
+    t0 = time.perf_counter()
+    for r in sample:
+        fast.predict_one(r)
+    quick = (time.perf_counter() - t0) / len(sample)
+    print(f"  single row: pipeline {slow*1000:.2f} ms, fast {quick*1000:.3f} ms  (x{slow/quick:.1f})")
+
+    if args.export:
+        out = fast.save(args.export)
+        reloaded = load_flat_model(out)
+        assert reloaded.predict_many(rows) == got
+        print(f"💾 Compiled model written to {out} ({fast.nbytes / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+📦 Batch Gap Analyzer
+GapAnalyzer for many wardrobes at once, e.g. nightly "what to buy" pushes.
+
+Input is two count matrices:
+
+    label_counts  (users × labels)  items per clothing label
+    color_counts  (users × colors)  items per color
+
+Every gap type becomes an array operation over all users:
+
+- category totals      label_counts @ one-hot(label → tops/bottoms/outerwear)
+- missing colors       color_counts[:, COMMON_COLORS] <= 2 (absent or 1–2 items)
+- underrepresented /   totals < MIN_CATEGORY_COUNTS
+  quantity gaps
+- seasonal gaps        label_counts @ warm / summer label masks, per season
+
+``GapBatch.records()`` emits one compact record per user (gap lists plus
+``[priority, category, code]`` recommendations); ``GapBatch.gaps(i)`` expands
+a user to the exact dict ``GapAnalyzer.analyze_gaps`` returns.
+
+Benchmark: python bench_gap_batch.py
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from shopping_recommender_backend import (
+    CATEGORY_FAMILIES,
+    COMMON_COLORS,
+    MIN_CATEGORY_COUNTS,
+    SUMMER_TOP_KEYWORDS,
+    WARM_OUTERWEAR_LABELS,
+    GapAnalyzer,
+    categorize_label,
+)
+
+SORTED_COMMON_COLORS = sorted(COMMON_COLORS)  # GapAnalyzer returns missing colors sorted
+MIN_COUNTS = np.array([MIN_CATEGORY_COUNTS[c] for c in CATEGORY_FAMILIES])
+NEEDED_BITS = int(MIN_COUNTS.max()).bit_length()
+SEASONAL_GAPS = ("warm_outerwear", "warm_clothing", "summer_clothing")
+WARM_SEASONS = ("winter", "autumn")
+SUMMER_SEASONS = ("summer", "spring")
+
+
+class GapBatch:
+    """Gap arrays for a batch of users (row i = user i)."""
+
+    def __init__(self, season: str, totals: np.ndarray, missing_colors: np.ndarray,
+                 warm_outerwear: np.ndarray, warm_clothing: np.ndarray, summer_clothing: np.ndarray):
+        self.season = season
+        self.totals = totals                  # (users, 3) items per category
+        self.missing_colors = missing_colors  # (users, len(SORTED_COMMON_COLORS)) bool
+        self.needed = np.maximum(MIN_COUNTS - totals, 0)  # underrepresented == needed > 0 (same thresholds)
+        self.seasonal = np.stack([warm_outerwear, warm_clothing, summer_clothing], axis=1)
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+    # ---------- per user ----------
+    @staticmethod
+    def _lists(missing_row, seasonal_row, needed_row):
+        missing = [c for c, m in zip(SORTED_COMMON_COLORS, missing_row) if m]
+        under = [c for c, n in zip(CATEGORY_FAMILIES, needed_row) if n]
+        seasonal = [g for g, s in zip(SEASONAL_GAPS, seasonal_row) if s]
+        return missing, under, seasonal
+
+    @classmethod
+    def _record(cls, missing_row, seasonal_row, needed_row) -> Dict:
+        missing, under, seasonal = cls._lists(missing_row, seasonal_row, needed_row)
+        recs = [["HIGH", "outerwear", gap] for gap in seasonal if gap != "summer_clothing"]
+        recs += [["HIGH", c, "quantity"] for c, n in zip(CATEGORY_FAMILIES, needed_row) if n >= 2]
+        if missing:
+            recs.append(["MEDIUM", "tops", "colors"])
+        recs += [["MEDIUM", c, "category"] for c in under]
+        recs.append(["LOW", "tops", "statement"])
+        return {
+            "missing_colors": missing,
+            "underrepresented_categories": under,
+            "seasonal_gaps": seasonal,
+            "needed": {c: n for c, n in zip(CATEGORY_FAMILIES, needed_row) if n},
+            "recommendations": recs,
+        }
+
+    def records(self) -> List[Dict]:
+        """
+        Compact record per user: gap lists + [priority, category, code] recommendations.
+
+        Records depend only on the gap pattern, so one record is built per
+        distinct pattern and users with the same gaps share that (read-only) dict.
+        """
+        if not len(self):
+            return []
+        # One int64 key per user: a bit per missing color / seasonal gap, then
+        # the per-category needed counts (each < 2**NEEDED_BITS)
+        flags = np.concatenate([self.missing_colors, self.seasonal], axis=1).astype(np.int64)
+        keys = flags @ (1 << np.arange(flags.shape[1], dtype=np.int64))
+        for k in range(len(CATEGORY_FAMILIES)):
+            keys |= self.needed[:, k].astype(np.int64) << (flags.shape[1] + k * NEEDED_BITS)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        rows = zip(self.missing_colors[first].tolist(), self.seasonal[first].tolist(), self.needed[first].tolist())
+        built = [self._record(*row) for row in rows]
+        return [built[j] for j in inverse.tolist()]
+
+    def gaps(self, i: int) -> Dict:
+        """User i as the full ``GapAnalyzer.analyze_gaps`` dict."""
+        missing, under, seasonal = self._lists(self.missing_colors[i].tolist(), self.seasonal[i].tolist(),
+                                                self.needed[i].tolist())
+        gaps = {
+            "missing_colors": missing,
+            "underrepresented_categories": under,
+            "seasonal_gaps": seasonal,
+            "quantity_gaps": [
+                {"category": c, "current": int(t), "recommended": MIN_CATEGORY_COUNTS[c], "needed": int(n)}
+                for c, t, n in zip(CATEGORY_FAMILIES, self.totals[i], self.needed[i]) if n
+            ],
+        }
+        gaps["recommendations"] = GapAnalyzer({}, self.season)._generate_recommendations(gaps)
+        return gaps
+
+
+class BatchGapAnalyzer:
+    """Label-level masks built once per label vocabulary; analyze() is pure array math."""
+
+    def __init__(self, labels: Sequence[str], categories: Optional[Sequence[str]] = None):
+        self.labels = list(labels)
+        categories = list(categories) if categories is not None else [categorize_label(l) for l in self.labels]
+        if len(categories) != len(self.labels):
+            raise ValueError("labels and categories must have the same length")
+        self.category_matrix = np.zeros((len(self.labels), len(CATEGORY_FAMILIES)), dtype=np.int64)
+        for j, cat in enumerate(categories):
+            self.category_matrix[j, CATEGORY_FAMILIES.index(cat)] = 1
+        self.warm_mask = np.array([cat == "outerwear" and label in WARM_OUTERWEAR_LABELS
+                                   for label, cat in zip(self.labels, categories)], dtype=bool)
+        self.summer_mask = np.array([cat == "tops" and any(k in label for k in SUMMER_TOP_KEYWORDS)
+                                     for label, cat in zip(self.labels, categories)], dtype=bool)
+
+    def analyze(self, label_counts, color_counts, colors: Sequence[str], season: str = "summer") -> GapBatch:
+        """
+        Args:
+            label_counts: (users, len(labels)) item counts
+            color_counts: (users, len(colors)) item counts per color
+            colors: Column names of color_counts
+            season: summer/winter/spring/autumn
+        """
+        season = season.lower()
+        label_counts = np.asarray(label_counts)
+        color_counts = np.asarray(color_counts)
+        users = len(label_counts)
+        if label_counts.shape != (users, len(self.labels)) or color_counts.shape != (users, len(colors)):
+            raise ValueError("count matrices do not match labels / colors")
+
+        totals = label_counts @ self.category_matrix
+
+        common = np.zeros((users, len(SORTED_COMMON_COLORS)), dtype=color_counts.dtype if users else np.int64)
+        column = {c: j for j, c in enumerate(colors)}
+        for k, color in enumerate(SORTED_COMMON_COLORS):
+            if color in column:
+                common[:, k] = color_counts[:, column[color]]
+        missing_colors = common <= 2
+
+        no = np.zeros(users, dtype=bool)
+        present = label_counts > 0
+        if season in WARM_SEASONS:
+            warm_outerwear = totals[:, CATEGORY_FAMILIES.index("outerwear")] < 2
+            warm_clothing = ~present[:, self.warm_mask].any(axis=1)
+            summer_clothing = no
+        elif season in SUMMER_SEASONS:
+            warm_outerwear = warm_clothing = no
+            summer_clothing = ~present[:, self.summer_mask].any(axis=1)
+        else:
+            warm_outerwear = warm_clothing = summer_clothing = no
+        return GapBatch(season, totals, missing_colors, warm_outerwear, warm_clothing, summer_clothing)
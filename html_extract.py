@@ -0,0 +1,488 @@
+"""
+⚡ HTML Extraction
+Fast product-card extraction for scraped HTML pages (the fallback path when a
+site has no structured feed).
+
+ClothingWebScraper's BeautifulSoup parsers build a full ``html.parser`` tree
+and then, per container, run a dozen ``select`` / ``find_all`` calls (and a
+lambda class filter over the whole tree). This module produces the same
+products with lxml:
+
+- selectors are written in the same CSS subset the BeautifulSoup code uses
+  and compiled once per site, to lxml XPath for locating containers and to
+  element predicates (grouped by tag) for the fields
+- each container is walked once; every descendant is checked only against the
+  selectors that can match its tag, and the name / price / color / image /
+  link rules then read from what that walk collected
+- opt-in (``use_process_pool()``, or WEARSMART_PARSE_POOL=1): pages of
+  LARGE_PAGE_BYTES or more are parsed in a process pool, so big collection
+  pages use other cores instead of holding the GIL. Only command-line runs
+  turn it on; inside the apps (e.g. CatalogRefresher) pages are parsed
+  in-thread, because spawned workers re-import the host's ``__main__``.
+
+Backends: "lxml" (default when installed) and "bs4" (the original parsers);
+set WEARSMART_HTML_BACKEND to override.
+
+Benchmark: python bench_html_parsing.py
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("lxml", "bs4")
+DEFAULT_BACKEND = os.getenv("WEARSMART_HTML_BACKEND", "lxml" if LXML_AVAILABLE else "bs4")
+LARGE_PAGE_BYTES = int(os.getenv("WEARSMART_PARSE_POOL_BYTES", 512 * 1024))
+POOL_WORKERS = min(4, os.cpu_count() or 1)
+POOL_ENABLED = os.getenv("WEARSMART_PARSE_POOL", "0") == "1"
+
+PRICE_RE = re.compile(r'PKR\s*([\d,]+)')
+COLOR_KEYWORDS = ['black', 'white', 'blue', 'red', 'green', 'brown', 'grey', 'gray', 'navy', 'beige', 'ivory', 'off-white']
+SIZE_LABELS = {"xs", "s", "m", "l", "xl", "xxl", "xxxl", "one size"}
+COLOR_COUNT_RE = re.compile(r"\b\d+\s*colors?\b")
+NON_TEXT_TAGS = {'script', 'style', 'template'}  # BeautifulSoup's get_text() skips these
+
+
+# ============================================================================
+# Selectors
+# ============================================================================
+
+_SELECTOR_PART = re.compile(r'\.([\w-]+)|\[(\w+)(?:\*="([^"]*)")?\]|:contains\("([^"]*)"\)')
+
+
+class Selector:
+    """One compound CSS selector: ``tag``, ``.class``, ``[attr]``, ``[attr*="v"]``, ``:contains("t")``."""
+
+    __slots__ = ("css", "tag", "classes", "attrs", "contains")
+
+    def __init__(self, css: str):
+        self.css = css
+        m = re.match(r'[a-z][a-z0-9]*', css)
+        self.tag = m.group(0) if m else None
+        rest = css[m.end():] if m else css
+        self.classes: Tuple[str, ...] = ()
+        self.attrs: Tuple[Tuple[str, Optional[str]], ...] = ()  # (attr, substring or None = present)
+        self.contains: Optional[str] = None
+        pos = 0
+        for part in _SELECTOR_PART.finditer(rest):
+            if part.start() != pos:
+                raise ValueError(f"unsupported selector: {css!r}")
+            pos = part.end()
+            cls, attr, sub, text = part.groups()
+            if cls:
+                self.classes += (cls,)
+            elif attr:
+                self.attrs += ((attr, sub),)
+            else:
+                self.contains = text
+        if pos != len(rest) or not (self.tag or self.classes or self.attrs):
+            raise ValueError(f"unsupported selector: {css!r}")
+
+    def matches(self, el, cls: Optional[str]) -> bool:
+        """Structural match (tag already checked by the caller); ``:contains`` is checked later."""
+        if self.classes:
+            if not cls:
+                return False
+            tokens = cls.split()
+            if any(c not in tokens for c in self.classes):
+                return False
+        for attr, sub in self.attrs:
+            value = cls if attr == 'class' else el.get(attr)
+            if value is None or (sub is not None and sub not in value):
+                return False
+        return True
+
+    def xpath(self) -> str:
+        conds = [f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in self.classes]
+        conds += [f"contains(@{a}, '{s}')" if s is not None else f"@{a}" for a, s in self.attrs]
+        if self.contains is not None:
+            conds.append(f"contains(string(.), '{self.contains}')")
+        return f"//{self.tag or '*'}" + "".join(f"[{c}]" for c in conds)
+
+
+class Scanner:
+    """Collects, in one walk over a container, every descendant matching each selector."""
+
+    def __init__(self, selectors: Sequence[str]):
+        self.selectors = [Selector(css) for css in selectors]
+        self.index = {css: i for i, css in enumerate(selectors)}
+        self.by_tag: Dict[str, List[Tuple[int, Selector]]] = {}
+        self.any_tag: List[Tuple[int, Selector]] = []
+        for i, sel in enumerate(self.selectors):
+            if sel.tag:
+                self.by_tag.setdefault(sel.tag, []).append((i, sel))
+            else:
+                if not sel.classes and all(a != 'class' for a, _ in sel.attrs):
+                    raise ValueError(f"tagless selector must test the class: {sel.css!r}")
+                self.any_tag.append((i, sel))
+
+    def scan(self, container) -> "Matches":
+        found: List[List] = [[] for _ in self.selectors]
+        by_tag, any_tag = self.by_tag, self.any_tag
+        for pos, el in enumerate(container.iterdescendants()):
+            tag = el.tag
+            if not isinstance(tag, str):  # comments, processing instructions
+                continue
+            cls = el.get('class')
+            for i, sel in by_tag.get(tag, ()):
+                if sel.matches(el, cls):
+                    found[i].append((pos, el))
+            if cls:
+                for i, sel in any_tag:
+                    if sel.matches(el, cls):
+                        found[i].append((pos, el))
+        return Matches(self, found)
+
+
+class Matches:
+    """Result of Scanner.scan: matching elements per selector, in document order."""
+
+    def __init__(self, scanner: Scanner, found: List[List]):
+        self.scanner = scanner
+        self.found = found
+
+    def all(self, css: str) -> List:
+        i = self.scanner.index[css]
+        sel = self.scanner.selectors[i]
+        els = [el for _, el in self.found[i]]
+        if sel.contains is not None:
+            els = [el for el in els if sel.contains in text(el)]
+        return els
+
+    def first(self, css: str):
+        """Like BeautifulSoup's ``select_one``."""
+        els = self.all(css)
+        return els[0] if els else None
+
+    def first_of(self, selectors: Sequence[str]):
+        """First element (document order) matching any selector, like ``find([...], class_=re)``."""
+        hits = [self.found[self.scanner.index[css]][:1] for css in selectors]
+        hits = [h[0] for h in hits if h]
+        return min(hits, key=lambda hit: hit[0])[1] if hits else None
+
+    def all_of(self, selectors: Sequence[str]) -> List:
+        """Every element matching any selector, in document order, like ``find_all([...], class_=re)``."""
+        hits = {pos: el for css in selectors for pos, el in self.found[self.scanner.index[css]]}
+        return [hits[pos] for pos in sorted(hits)]
+
+
+def text(el) -> str:
+    """``get_text(strip=True)``: stripped strings joined, without script/style/comment text."""
+    parts: List[str] = []
+    _collect_text(el, parts)
+    return ''.join(parts)
+
+
+def _collect_text(el, parts: List[str]) -> None:
+    if el.text:
+        s = el.text.strip()
+        if s:
+            parts.append(s)
+    for child in el:
+        if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS:
+            _collect_text(child, parts)
+        if child.tail:
+            s = child.tail.strip()
+            if s:
+                parts.append(s)
+
+
+def _xpath(expr: str):
+    return etree.XPath(expr) if LXML_AVAILABLE else None
+
+
+# ============================================================================
+# Site rules (mirroring ClothingWebScraper's BeautifulSoup parsers)
+# ============================================================================
+
+OUTFITTERS_CONTAINERS = ['div[class*="product"]', 'div[class*="item"]', 'div[class*="card"]', 'article',
+                         '.product-item', '.product-card', '.grid-item']
+OUTFITTERS_NAMES = ['h3', 'h4', 'h5', 'h2', '.title', '.name', '.product-title', 'a[href*="/products/"]']
+OUTFITTERS_PRICES = ['.price', '.cost', '[class*="price"]']
+OUTFITTERS_TEXT_PRICES = ['span:contains("PKR")', 'div:contains("PKR")']
+OUTFITTERS_COLORS = ['.color', '.swatch', '[class*="color"]', '[class*="swatch"]']
+KHAADI_NAMES = [f'{tag}[class*="{word}"]' for tag in ('h3', 'h4', 'h5') for word in ('title', 'name', 'product')]
+KHAADI_PRICES = [f'{tag}[class*="{word}"]' for tag in ('span', 'div') for word in ('price', 'cost')]
+KHAADI_COLORS = [f'{tag}[class*="{word}"]' for tag in ('span', 'div') for word in ('color', 'swatch')]
+
+_CONTAINER_XPATHS = [_xpath(Selector(css).xpath()) for css in OUTFITTERS_CONTAINERS] if LXML_AVAILABLE else []
+_LOWER_CLASS = "translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+_FALLBACK_CONTAINERS = _xpath("//div[" + " or ".join(f"contains({_LOWER_CLASS}, '{w}')"
+                                                     for w in ('product', 'item', 'card', 'grid')) + "]")
+_PRODUCT_LINKS = _xpath("//a[contains(@href, '/products/')]")
+_KHAADI_CONTAINERS = _xpath("//div[contains(@class, 'product') or contains(@class, 'item') or contains(@class, 'card')]")
+
+_OUTFITTERS_SCANNER = Scanner(OUTFITTERS_NAMES + OUTFITTERS_PRICES + OUTFITTERS_TEXT_PRICES + OUTFITTERS_COLORS
+                              + ['img', 'a[href]'])
+_KHAADI_SCANNER = Scanner(KHAADI_NAMES + KHAADI_PRICES + KHAADI_COLORS + ['img', 'a[href]'])
+
+# Per-page options of the three Outfitters parsers
+OUTFITTERS_SITES = {
+    'outfitters_men': dict(limit=20, link_limit=10, text_prices=True, strict_name=False, color_max=30,
+                           keyword_colors=True, filter_colors=False, product_link=False, dedupe=False,
+                           category='shirts', gender='men'),
+    'outfitters_women': dict(limit=20, link_limit=10, text_prices=False, strict_name=True, color_max=50,
+                             keyword_colors=True, filter_colors=False, product_link=True, dedupe=False,
+                             category='shirts', gender='women'),
+    'outfitters_collection': dict(limit=60, link_limit=20, text_prices=False, strict_name=True, color_max=50,
+                                  keyword_colors=False, filter_colors=True, product_link=True, dedupe=True),
+}
+SITES = tuple(OUTFITTERS_SITES) + ('khaadi_men',)
+
+
+def _outfitters_containers(root, link_limit: int) -> List:
+    for xp in _CONTAINER_XPATHS:
+        found = xp(root)
+        if found:
+            return found
+    found = _FALLBACK_CONTAINERS(root)
+    if found:
+        return found
+    return [a.getparent() for a in _PRODUCT_LINKS(root)[:link_limit] if a.getparent() is not None]
+
+
+def _absolute(src: str, url: str, base: str) -> str:
+    if src.startswith('//'):
+        return 'https:' + src
+    if src.startswith('/'):
+        return base + src
+    return urljoin(url, src)
+
+
+def _product_link(m: Matches):
+    """First ``<a>`` whose href contains /products/."""
+    for a in m.all('a[href]'):
+        if '/products/' in a.get('href'):
+            return a
+    return None
+
+
+def _outfitters_card(m: Matches, url: str, base: str, opts: Dict) -> Optional[Dict]:
+    # name
+    name = ""
+    for sel in OUTFITTERS_NAMES:
+        el = m.first(sel)
+        if el is not None:
+            t = text(el)
+            if opts['strict_name']:
+                if t and len(t) > 3:
+                    name = t
+                    break
+            else:
+                name = t
+                if name and len(name) > 3:
+                    break
+    product_link = _product_link(m)
+    if not name and product_link is not None:
+        name = text(product_link)
+    if not name or len(name) < 3 or (not opts['strict_name'] and len(name) <= 3):
+        return None
+    # price
+    price = "Price not available"
+    for sel in OUTFITTERS_PRICES + (OUTFITTERS_TEXT_PRICES if opts['text_prices'] else []):
+        el = m.first(sel)
+        if el is not None:
+            match = PRICE_RE.search(text(el))
+            if match:
+                price = f"PKR {match.group(1)}"
+                break
+    # colors
+    colors: List[str] = []
+    for sel in OUTFITTERS_COLORS:
+        for el in m.all(sel):
+            ct = text(el)
+            if not ct:
+                continue
+            if opts['filter_colors']:
+                tl = ct.lower()
+                if tl in SIZE_LABELS:
+                    continue
+                if "fit" in tl or "women" in tl or "men" in tl or COLOR_COUNT_RE.search(tl):
+                    continue
+            if len(ct) < opts['color_max'] and ct not in colors:
+                colors.append(ct)
+    if not colors and opts['keyword_colors']:
+        colors = [kw.title() for kw in COLOR_KEYWORDS if kw in name.lower()]
+    # image
+    image_url = ""
+    img = m.first('img')
+    if img is not None:
+        src = img.get('src') or img.get('data-src') or img.get('data-lazy')
+        if src:
+            image_url = _absolute(src, url, base)
+    # product link
+    link = m.first('a[href]')
+    if opts['product_link']:
+        link = product_link if product_link is not None else link
+        href = link.get('href') if link is not None else ''
+        product_url = _absolute_link(href, url, base) if href else ""
+    else:
+        product_url = _absolute_link(link.get('href'), url, base) if link is not None else ""
+    return {
+        'name': name,
+        'price': price,
+        'colors': colors[:5],
+        'image_url': image_url,
+        'product_url': product_url,
+        'website': 'Outfitters',
+        'category': opts['category'],
+        'gender': opts['gender'],
+    }
+
+
+def _absolute_link(href: str, url: str, base: str) -> str:
+    if href.startswith('/'):
+        return base + href
+    if href.startswith('http'):
+        return href
+    return urljoin(url, href)
+
+
+def _outfitters_products(root, url: str, base: str, opts: Dict) -> List[Dict]:
+    products: List[Dict] = []
+    seen = set()
+    for container in _outfitters_containers(root, opts['link_limit'])[:opts['limit']]:
+        try:
+            product = _outfitters_card(_OUTFITTERS_SCANNER.scan(container), url, base, opts)
+        except Exception as e:
+            logger.warning(f"Error parsing Outfitters product container: {e}")
+            continue
+        if product is None:
+            continue
+        if opts['dedupe']:
+            key = product['product_url'] or (product['name'] + product['image_url'])
+            if key in seen:
+                continue
+            seen.add(key)
+        products.append(product)
+    return products
+
+
+def _khaadi_products(root, url: str) -> List[Dict]:
+    products: List[Dict] = []
+    for container in _KHAADI_CONTAINERS(root):
+        try:
+            m = _KHAADI_SCANNER.scan(container)
+            name_el = m.first_of(KHAADI_NAMES)
+            if name_el is None:
+                continue
+            name = text(name_el)
+            price = "Price not available"
+            price_el = m.first_of(KHAADI_PRICES)
+            if price_el is not None:
+                match = PRICE_RE.search(text(price_el))
+                if match:
+                    price = f"PKR {match.group(1)}"
+            colors = [t for t in (text(el) for el in m.all_of(KHAADI_COLORS)) if t and len(t) < 20]
+            image_url = ""
+            img = m.first('img')
+            if img is not None:
+                src = img.get('src') or img.get('data-src')
+                if src:
+                    image_url = urljoin(url, src)
+            link = m.first('a[href]')
+            product_url = urljoin(url, link.get('href')) if link is not None else ""
+            if name:
+                products.append({
+                    'name': name,
+                    'price': price,
+                    'colors': colors,
+                    'image_url': image_url,
+                    'product_url': product_url,
+                    'website': 'Khaadi',
+                    'category': 'general',
+                    'gender': 'men',
+                })
+        except Exception as e:
+            logger.warning(f"Error parsing Khaadi product container: {e}")
+            continue
+    return products
+
+
+# ============================================================================
+# Entry points
+# ============================================================================
+
+_UTF8_PARSER = lxml_html.HTMLParser(encoding='utf-8') if LXML_AVAILABLE else None
+
+
+def _document(content):
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    try:
+        content.decode('utf-8')
+        parser = _UTF8_PARSER
+    except UnicodeDecodeError:
+        parser = None  # let libxml2 use the page's declared charset
+    return lxml_html.document_fromstring(content, parser=parser)
+
+
+def extract_products(content, url: str, site: str, base: str, category: Optional[str] = None,
+                     gender: Optional[str] = None) -> List[Dict]:
+    """Products of one HTML page for ``site`` (see SITES), parsed with lxml in this process."""
+    if not LXML_AVAILABLE:
+        raise RuntimeError("lxml is not installed; use the bs4 parser backend")
+    try:
+        root = _document(content)
+    except etree.ParserError:  # empty document
+        return []
+    if site == 'khaadi_men':
+        return _khaadi_products(root, url)
+    opts = dict(OUTFITTERS_SITES[site])
+    if site == 'outfitters_collection':
+        opts.update(category=(category or '').lower(), gender=(gender or '').lower())
+    return _outfitters_products(root, url, base, opts)
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _process_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the crawler calls this from worker threads, where forking is unsafe
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def use_process_pool(enabled: bool = True) -> None:
+    """Turn the large-page process pool on (CLI / benchmarks) or off; off shuts it down."""
+    global POOL_ENABLED
+    POOL_ENABLED = enabled
+    if not enabled:
+        shutdown_pool()
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def parse_products(content, url: str, site: str, base: str, category: Optional[str] = None,
+                   gender: Optional[str] = None) -> List[Dict]:
+    """extract_products(), in the process pool (when enabled) for pages of LARGE_PAGE_BYTES or more."""
+    if POOL_ENABLED and len(content) >= LARGE_PAGE_BYTES and POOL_WORKERS > 1:
+        try:
+            return _process_pool().submit(extract_products, content, url, site, base, category, gender).result()
+        except Exception as e:
+            logger.warning(f"Parse pool unavailable, parsing in-process: {e}")
+    return extract_products(content, url, site, base, category, gender)
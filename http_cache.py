@@ -0,0 +1,119 @@
+"""
+💾 HTTP Cache
+On-disk conditional-GET cache for the scraper (data/http_cache).
+
+Per URL it keeps the last body with its ``ETag`` / ``Last-Modified`` and the
+product lists parsed from that body (per parser, with the time parsing took):
+
+    <sha1(url)>.body   raw response body
+    <sha1(url)>.json   {"url", "etag", "last_modified", "sha1", "size", "parsed": {parser: {"products", "seconds"}}}
+
+The next request sends ``If-None-Match`` / ``If-Modified-Since``. A ``304``
+(or a 200 whose body hashes the same) means the page is unchanged, so the
+crawler reuses the stored products instead of parsing again; a changed body
+drops every stored parse.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+DEFAULT_DIR = os.getenv("WEARSMART_HTTP_CACHE", "data/http_cache")
+
+logger = logging.getLogger(__name__)
+
+
+def _sha1(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+class HttpCache:
+    """Validators, bodies and parsed products per URL; metadata is memoized in memory."""
+
+    def __init__(self, directory=DEFAULT_DIR):
+        self.directory = Path(directory)
+        self._meta: Dict[str, Optional[Dict]] = {}
+
+    def _paths(self, url: str):
+        key = _sha1(url.encode("utf-8"))
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def entry(self, url: str) -> Optional[Dict]:
+        if url not in self._meta:
+            meta_path, body_path = self._paths(url)
+            meta = None
+            if meta_path.exists() and body_path.exists():
+                try:
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        meta = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable HTTP cache entry for {url}: {e}")
+            self._meta[url] = meta
+        return self._meta[url]
+
+    def _save(self, url: str, meta: Dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path, _ = self._paths(url)
+        tmp = meta_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, meta_path)
+        self._meta[url] = meta
+
+    # ---------- HTTP ----------
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        meta = self.entry(url)
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def body(self, url: str) -> Optional[bytes]:
+        if self.entry(url) is None:
+            return None
+        try:
+            return self._paths(url)[1].read_bytes()
+        except OSError:
+            self._meta[url] = None
+            return None
+
+    def store(self, url: str, body: bytes, headers) -> bool:
+        """Record a 200 response; True if the body is identical to the cached one."""
+        meta = self.entry(url)
+        digest = _sha1(body)
+        unchanged = bool(meta) and meta.get("sha1") == digest
+        new_meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "sha1": digest,
+            "size": len(body),
+            "parsed": meta.get("parsed", {}) if unchanged else {},
+        }
+        if not unchanged:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            body_path = self._paths(url)[1]
+            tmp = body_path.with_suffix(".body.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, body_path)
+        if new_meta != meta:
+            self._save(url, new_meta)
+        return unchanged
+
+    # ---------- parsed products ----------
+    def products(self, url: str, parser: str) -> Optional[Dict]:
+        """{"products", "seconds"} stored for this body + parser, or None."""
+        meta = self.entry(url)
+        return (meta or {}).get("parsed", {}).get(parser)
+
+    def store_products(self, url: str, parser: str, products: List[Dict], seconds: float) -> None:
+        meta = self.entry(url)
+        if meta is None:
+            return
+        meta = dict(meta, parsed=dict(meta.get("parsed", {}), **{parser: {"products": products, "seconds": seconds}}))
+        self._save(url, meta)
@@ -0,0 +1,307 @@
+"""
+🗄️ Image Index DB
+SQLite data layer behind the Streamlit mood modules' image index
+(data/image_index_men.db, data/image_index.db).
+
+- one long-lived connection per thread (Streamlit reruns the script on worker
+  threads), opened in WAL mode so readers never block the indexer
+- fixed SQL strings, so sqlite3's statement cache reuses the prepared
+  statements instead of re-parsing them per call
+- writes go through ``executemany`` in one transaction per ``batch_size`` rows
+  instead of one connect + commit per image
+- color queries hit a normalized ``image_colors(color, image_id)`` table and an
+  FTS5 index over captions instead of leading-wildcard LIKEs, and random
+  samples are drawn from matching ids rather than ``ORDER BY RANDOM()`` over
+  the whole table
+"""
+
+import random
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+DEFAULT_BATCH_SIZE = 256
+STATEMENT_CACHE_SIZE = 256
+
+Row = Tuple[str, str, str, str]  # (path, label, caption, colors_csv)
+FileStat = Tuple[Optional[int], Optional[int]]  # (size, mtime_ns) as last indexed
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS images (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT UNIQUE,
+        label TEXT,
+        caption TEXT,
+        colors TEXT,
+        size INTEGER,
+        mtime_ns INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_label ON images(label)",
+    # B-tree indexes on colors/caption could never serve '%x%' LIKEs; color
+    # queries now use image_colors + images_fts, so stop paying for them.
+    "DROP INDEX IF EXISTS idx_colors",
+    "DROP INDEX IF EXISTS idx_caption",
+]
+
+COLOR_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS image_colors (
+        color TEXT NOT NULL,
+        image_id INTEGER NOT NULL,
+        PRIMARY KEY (color, image_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_image_colors_image ON image_colors(image_id)",
+    """
+    CREATE TRIGGER IF NOT EXISTS images_colors_ad AFTER DELETE ON images BEGIN
+        DELETE FROM image_colors WHERE image_id = old.id;
+    END
+    """,
+]
+
+# External-content FTS5 table kept in sync with images.caption by triggers.
+FTS_SCHEMA = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS images_fts USING fts5(caption, content='images', content_rowid='id')",
+    """
+    CREATE TRIGGER IF NOT EXISTS images_fts_ai AFTER INSERT ON images BEGIN
+        INSERT INTO images_fts(rowid, caption) VALUES (new.id, new.caption);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_fts_ad AFTER DELETE ON images BEGIN
+        INSERT INTO images_fts(images_fts, rowid, caption) VALUES ('delete', old.id, old.caption);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS images_fts_au AFTER UPDATE OF caption ON images BEGIN
+        INSERT INTO images_fts(images_fts, rowid, caption) VALUES ('delete', old.id, old.caption);
+        INSERT INTO images_fts(rowid, caption) VALUES (new.id, new.caption);
+    END
+    """,
+]
+
+UPSERT_SQL = """
+    INSERT INTO images (path, label, caption, colors, size, mtime_ns)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(path) DO UPDATE SET
+      label=excluded.label,
+      caption=excluded.caption,
+      colors=excluded.colors,
+      size=excluded.size,
+      mtime_ns=excluded.mtime_ns
+"""
+STATS_SQL = "SELECT path, size, mtime_ns FROM images"
+RESTAMP_SQL = "UPDATE images SET size = ?, mtime_ns = ? WHERE path = ?"
+DELETE_SQL = "DELETE FROM images WHERE path = ?"
+CLEAR_COLORS_SQL = "DELETE FROM image_colors WHERE image_id = (SELECT id FROM images WHERE path = ?)"
+INSERT_COLOR_SQL = "INSERT OR IGNORE INTO image_colors (color, image_id) SELECT ?, id FROM images WHERE path = ?"
+COLOR_IDS_SQL = "SELECT image_id FROM image_colors WHERE color = ?"
+FTS_IDS_SQL = "SELECT rowid FROM images_fts WHERE images_fts MATCH ?"
+CAPTION_SQL = "SELECT caption FROM images WHERE path = ?"
+COUNT_SQL = "SELECT COUNT(*) FROM images"
+PATHS_SQL = "SELECT path FROM images"
+# Two single-aggregate subqueries: each is a rowid seek (MIN and MAX together scan).
+ID_RANGE_SQL = "SELECT (SELECT MIN(id) FROM images), (SELECT MAX(id) FROM images)"
+ALL_IDS_SQL = "SELECT id FROM images"
+
+
+class BatchWriter:
+    """Collects upserts and writes them ``batch_size`` rows per transaction."""
+
+    def __init__(self, db: "ImageIndexDB", batch_size: int):
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self._pending: List[Tuple] = []  # (path, label, caption, colors_csv, size, mtime_ns)
+        self.written = 0
+
+    def add(self, path: str, label: str, caption: str, colors: Sequence[str],
+            size: Optional[int] = None, mtime_ns: Optional[int] = None) -> None:
+        self._pending.append((path, label, caption, ",".join(colors), size, mtime_ns))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        with self.db.connection() as con:
+            self.db._write_rows(con, self._pending)
+        self.written += len(self._pending)
+        self._pending = []
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+
+class ImageIndexDB:
+    """Per-thread SQLite connections + batched writes for the image index."""
+
+    def __init__(self, db_path, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self.has_fts = False
+
+    # ---------- connections ----------
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (opened, tuned and schema-checked once)."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.db_path.as_posix(), cached_statements=STATEMENT_CACHE_SIZE)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA busy_timeout=5000")
+            self._local.con = con
+            self._ensure_schema(con)
+        return con
+
+    def _ensure_schema(self, con: sqlite3.Connection) -> None:
+        with self._schema_lock:
+            if self._schema_ready:
+                return
+            existing = {row[0] for row in con.execute("SELECT name FROM sqlite_master")}
+            with con:
+                for stmt in SCHEMA + COLOR_SCHEMA:
+                    con.execute(stmt)
+                # Databases created before change tracking: add the stat columns.
+                columns = {row[1] for row in con.execute("PRAGMA table_info(images)")}
+                for column in ("size", "mtime_ns"):
+                    if column not in columns:
+                        con.execute(f"ALTER TABLE images ADD COLUMN {column} INTEGER")
+                if "image_colors" not in existing:
+                    # Databases created before the normalized table: backfill from the CSV column.
+                    rows = con.execute("SELECT id, colors FROM images WHERE colors != ''").fetchall()
+                    con.executemany(
+                        "INSERT OR IGNORE INTO image_colors (color, image_id) VALUES (?, ?)",
+                        ((c, image_id) for image_id, csv in rows for c in csv.split(",") if c),
+                    )
+            try:
+                with con:
+                    for stmt in FTS_SCHEMA:
+                        con.execute(stmt)
+                    if "images_fts" not in existing:
+                        con.execute("INSERT INTO images_fts(images_fts) VALUES ('rebuild')")
+                self.has_fts = True
+            except sqlite3.OperationalError as e:  # SQLite built without FTS5
+                print(f"⚠️ FTS5 unavailable, caption search falls back to LIKE: {e}")
+            self._schema_ready = True
+
+    def close(self) -> None:
+        """Close the calling thread's connection (others stay open)."""
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    # ---------- writes ----------
+    def writer(self, batch_size: Optional[int] = None) -> BatchWriter:
+        return BatchWriter(self, batch_size or self.batch_size)
+
+    @staticmethod
+    def _write_rows(con: sqlite3.Connection, rows: List[Tuple]) -> None:
+        con.executemany(UPSERT_SQL, rows)
+        con.executemany(CLEAR_COLORS_SQL, [(r[0],) for r in rows])
+        con.executemany(INSERT_COLOR_SQL, [(c, r[0]) for r in rows for c in r[3].split(",") if c])
+
+    def upsert(self, path: str, label: str, caption: str, colors: Sequence[str],
+               size: Optional[int] = None, mtime_ns: Optional[int] = None) -> None:
+        with self.connection() as con:
+            self._write_rows(con, [(path, label, caption, ",".join(colors), size, mtime_ns)])
+
+    def upsert_many(self, rows: Iterable[Tuple]) -> int:
+        """Rows are (path, label, caption, colors[, size, mtime_ns])."""
+        with self.writer() as w:
+            for row in rows:
+                w.add(*row)
+        return w.written
+
+    def restamp(self, stats: Iterable[Tuple[str, int, int]]) -> None:
+        """Record (path, size, mtime_ns) for rows indexed before change tracking."""
+        with self.connection() as con:
+            con.executemany(RESTAMP_SQL, [(size, mtime, path) for path, size, mtime in stats])
+
+    def delete_paths(self, paths: Iterable[str]) -> int:
+        paths = [(p,) for p in paths]
+        with self.connection() as con:
+            con.executemany(DELETE_SQL, paths)
+        return len(paths)
+
+    # ---------- reads ----------
+    def get_caption(self, path: str) -> Optional[str]:
+        row = self.connection().execute(CAPTION_SQL, (path,)).fetchone()
+        return row[0] if row else None
+
+    def existing_paths(self) -> Set[str]:
+        return {row[0] for row in self.connection().execute(PATHS_SQL)}
+
+    def file_stats(self) -> Dict[str, FileStat]:
+        """path -> (size, mtime_ns) recorded when the image was last indexed."""
+        return {path: (size, mtime) for path, size, mtime in self.connection().execute(STATS_SQL)}
+
+    def count(self) -> int:
+        row = self.connection().execute(COUNT_SQL).fetchone()
+        return int(row[0]) if row else 0
+
+    def caption_ids(self, terms: Iterable[str]) -> Set[int]:
+        """Ids of images whose caption contains any of the terms (as words/phrases)."""
+        terms = [t.lower() for t in terms if t]
+        if not terms:
+            return set()
+        con = self.connection()
+        if self.has_fts:
+            match = " OR ".join('"%s"' % t.replace('"', '""') for t in terms)
+            return {row[0] for row in con.execute(FTS_IDS_SQL, (match,))}
+        where = " OR ".join(["LOWER(caption) LIKE ?"] * len(terms))
+        return {row[0] for row in con.execute(f"SELECT id FROM images WHERE {where}", [f"%{t}%" for t in terms])}
+
+    def query_by_color(self, color: str, terms: Iterable[str] = (), limit: int = 24) -> List[Row]:
+        """
+        Random sample of rows tagged with canonical ``color`` or whose caption
+        mentions any of ``terms`` (aliases).
+        """
+        ids = {row[0] for row in self.connection().execute(COLOR_IDS_SQL, (color,))}
+        ids |= self.caption_ids(terms)
+        return self.fetch_sample(ids, limit)
+
+    def fetch_sample(self, ids: Iterable[int], limit: int) -> List[Row]:
+        """Rows for up to ``limit`` ids drawn uniformly at random (random order)."""
+        ids = list(ids)
+        picked = random.sample(ids, min(limit, len(ids)))
+        if not picked:
+            return []
+        rows = self.connection().execute(
+            f"SELECT id,path,label,caption,colors FROM images WHERE id IN ({','.join('?' * len(picked))})",
+            picked,
+        ).fetchall()
+        by_id = {row[0]: row[1:] for row in rows}
+        return [by_id[i] for i in picked if i in by_id]
+
+    def sample(self, limit: int = 24) -> List[Row]:
+        """Uniform random rows via id-range rejection sampling (no full-table sort)."""
+        con = self.connection()
+        lo, hi = con.execute(ID_RANGE_SQL).fetchone()  # rowid bounds, no COUNT(*) scan
+        if lo is None:
+            return []
+        if hi - lo + 1 <= limit * 4:
+            return self.fetch_sample((row[0] for row in con.execute(ALL_IDS_SQL)), limit)
+        picked: Set[int] = set()
+        for _ in range(8):
+            need = limit - len(picked)
+            if need <= 0:
+                break
+            draw = {random.randint(lo, hi) for _ in range(need * 2)} - picked
+            hits = con.execute(
+                f"SELECT id FROM images WHERE id IN ({','.join('?' * len(draw))})", list(draw)
+            ).fetchall()
+            picked.update(row[0] for row in hits[:need])
+        if len(picked) < limit:  # very sparse id range: fall back to all ids
+            return self.fetch_sample((row[0] for row in con.execute(ALL_IDS_SQL)), limit)
+        return self.fetch_sample(picked, limit)
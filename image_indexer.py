@@ -0,0 +1,226 @@
+"""
+🗂️ Image Indexer
+Change-aware, parallel (re)indexing of a clothing image tree into the SQLite
+image index used by the Streamlit mood modules.
+
+- every row stores the (size, mtime_ns) the image had when it was captioned, so
+  an unchanged tree is skipped after a single os.scandir pass
+- new / modified images are captioned one at a time by default: the caption
+  function is usually one shared BLIP model, and threads calling its
+  ``generate`` at once only compete for the same torch thread pool (CPU) or
+  memory (GPU). ``workers`` > 1 is for captioners that parallelize (e.g. a
+  GPU with headroom). Rows are committed in small batches, so an
+  interrupted run resumes where it stopped
+- rows for files that no longer exist under the root are pruned
+
+CLI (no Streamlit needed):
+    python image_indexer.py --root clothing_images_men --db data/image_index_men.db --gender men
+    python image_indexer.py --root clothing_images --db data/image_index.db --workers 2
+"""
+
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+from caption_colors import PROMPT, clean_caption, extract_colors
+from color_extraction import get_men_extractor
+from image_index_db import ImageIndexDB
+
+VALID_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+DEFAULT_WORKERS = 1  # one shared captioning model; see the module docstring
+COMMIT_EVERY = 16  # captions are expensive: keep the loss on interruption small
+
+ImageFile = Tuple[str, str, int, int]  # (label, absolute path, size, mtime_ns)
+
+
+# =========================
+# Scan + plan
+# =========================
+def scan_images(root: Path) -> List[ImageFile]:
+    """One os.scandir pass over root/<label>/<image> collecting size + mtime."""
+    root = Path(root).resolve()
+    if not root.is_dir():
+        return []
+    items: List[ImageFile] = []
+    with os.scandir(root) as labels:
+        label_dirs = sorted((e for e in labels if e.is_dir()), key=lambda e: e.name)
+    for label_dir in label_dirs:
+        with os.scandir(label_dir.path) as files:
+            for entry in files:
+                if os.path.splitext(entry.name)[1].lower() not in VALID_EXTS or not entry.is_file():
+                    continue
+                st = entry.stat()
+                items.append((label_dir.name, os.path.join(root, label_dir.name, entry.name),
+                              st.st_size, st.st_mtime_ns))
+    return items
+
+
+def plan_refresh(items: List[ImageFile], stats: Dict[str, Tuple], root: Path,
+                 recaption: bool = False):
+    """
+    Split scanned files into (to_caption, to_restamp, unchanged_count, to_prune).
+
+    Rows indexed before change tracking have no stored stat; they are restamped
+    instead of re-captioned.
+    """
+    prefix = os.path.join(str(Path(root).resolve()), "")
+    todo: List[ImageFile] = []
+    restamp: List[Tuple[str, int, int]] = []
+    unchanged = 0
+    present = set()
+    for label, path, size, mtime in items:
+        present.add(path)
+        stored = stats.get(path)
+        if recaption or stored is None:
+            todo.append((label, path, size, mtime))
+        elif stored == (None, None):
+            restamp.append((path, size, mtime))
+        elif stored != (size, mtime):
+            todo.append((label, path, size, mtime))
+        else:
+            unchanged += 1
+    prune = [p for p in stats if p.startswith(prefix) and p not in present]
+    return todo, restamp, unchanged, prune
+
+
+# =========================
+# Refresh
+# =========================
+def refresh_index(db: ImageIndexDB, root: Path,
+                  caption_fn: Callable[[str], str],
+                  colors_fn: Callable[[str], List[str]],
+                  recaption: bool = False,
+                  workers: int = DEFAULT_WORKERS,
+                  prune: bool = True,
+                  progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, int]:
+    """
+    Bring the index for ``root`` up to date.
+
+    ``caption_fn`` runs on ``workers`` threads; ``progress(done, total)`` and all DB
+    writes run on the calling thread. Returns counts for indexed / skipped /
+    restamped / pruned / failed images.
+    """
+    items = scan_images(root)
+    todo, restamp, unchanged, stale = plan_refresh(items, db.file_stats(), root, recaption)
+    report = {"indexed": 0, "skipped": unchanged + len(restamp), "restamped": len(restamp),
+              "pruned": 0, "failed": 0}
+    if restamp:
+        db.restamp(restamp)
+    if prune and stale:
+        report["pruned"] = db.delete_paths(stale)
+    if not todo:
+        return report
+
+    def work(item: ImageFile):
+        label, path, size, mtime = item
+        caption = caption_fn(path)
+        return label, path, size, mtime, caption, colors_fn(caption)
+
+    total = len(todo)
+    with db.writer(COMMIT_EVERY) as writer, ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(work, item) for item in todo]
+        for done, fut in enumerate(as_completed(futures), start=1):
+            try:
+                label, path, size, mtime, caption, colors = fut.result()
+            except Exception as e:  # left unindexed, retried on the next run
+                print(f"⚠️ Captioning failed: {e}")
+                report["failed"] += 1
+            else:
+                writer.add(path, label, caption, colors, size, mtime)
+                report["indexed"] += 1
+            if progress:
+                progress(done, total)
+    return report
+
+
+# =========================
+# Captioning for the CLI (same vocabulary as the Streamlit mood modules)
+# =========================
+class BlipCaptioner:
+    """
+    Unprompted BLIP caption, falling back to the color prompt (same as the apps).
+    The model is loaded on first use, so a run with nothing to caption never
+    imports torch.
+    """
+
+    def __init__(self, model_dir: str = "blip_finetunedggdata"):
+        self.model_dir = model_dir
+        self.processor = None
+        self.model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self.model is not None:
+                return
+            import torch
+            from transformers import BlipForConditionalGeneration, BlipProcessor
+
+            source = self.model_dir if Path(self.model_dir).exists() else "Salesforce/blip-image-captioning-base"
+            self.torch = torch
+            self.processor = BlipProcessor.from_pretrained(source)
+            model = BlipForConditionalGeneration.from_pretrained(source)
+            model.to("cuda" if torch.cuda.is_available() else "cpu")
+            model.eval()
+            self.model = model
+
+    def _caption(self, image, prompt: Optional[str] = None) -> str:
+        if prompt is None:
+            inputs = self.processor(image, return_tensors="pt")
+        else:
+            inputs = self.processor(images=image, text=prompt, return_tensors="pt")
+        with self.torch.no_grad():
+            out = self.model.generate(**inputs.to(self.model.device), max_new_tokens=32)
+        return self.processor.decode(out[0], skip_special_tokens=True).strip()
+
+    def __call__(self, image_path: str) -> str:
+        from PIL import Image
+
+        if self.model is None:
+            self._load()
+        try:
+            image = Image.open(image_path).convert("RGB")
+        except Exception:
+            return "clothing item"
+        cap = clean_caption(self._caption(image))
+        if extract_colors(cap):
+            return cap
+        return clean_caption(self._caption(image, PROMPT))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or refresh the clothing image index")
+    parser.add_argument("--root", required=True, help="images root (one folder per label)")
+    parser.add_argument("--db", required=True, help="SQLite index, e.g. data/image_index_men.db")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="concurrent captions on the one model (only helps on a GPU with headroom)")
+    parser.add_argument("--recaption", action="store_true", help="re-caption every image")
+    parser.add_argument("--no-prune", action="store_true", help="keep rows for deleted files")
+    parser.add_argument("--model-dir", default="blip_finetunedggdata")
+    parser.add_argument("--gender", choices=["men", "women"], default="women",
+                        help="color table for the tags (men: the men's extended aliases)")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if not root.is_dir():
+        parser.error(f"Folder not found: {root}")
+
+    db = ImageIndexDB(args.db)
+    print(f"🔄 Refreshing index {args.db} from {root}")
+
+    def show(done: int, total: int):
+        if done == total or done % 25 == 0:
+            print(f"  {done}/{total}")
+
+    colors = partial(extract_colors, extractor=get_men_extractor()) if args.gender == "men" else extract_colors
+    report = refresh_index(db, root, BlipCaptioner(args.model_dir), colors, recaption=args.recaption,
+                           workers=args.workers, prune=not args.no_prune, progress=show)
+    print("✅ " + ", ".join(f"{k}: {v}" for k, v in report.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+🔍 Visual Similarity ("more like this")
+Compact per-image embeddings and per-label nearest-neighbour search, so a
+reroll can return items that look like the one the user liked instead of a
+random pick from the same folder.
+
+Embedding (74 dims, stored as float16):
+    - 64-bin joint Lab color histogram (4 x 4 x 4), square-rooted so a dot
+      product approximates the Hellinger / Bhattacharyya similarity
+    - 8-bin gradient-orientation histogram + mean/std gradient magnitude as a
+      small texture descriptor
+The vector is L2-normalized, so cosine similarity is a plain dot product.
+
+Search is brute force (one matrix-vector product) for normal label folders and
+switches to a small inverted-file index (spherical k-means + exact re-rank)
+once a label holds ANN_THRESHOLD images or more. Everything runs offline on CPU
+with NumPy + Pillow; embeddings are cached per gender in an .npz file keyed by
+image path and mtime, so only new or modified images are re-embedded.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+VALID_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+
+THUMB_SIZE = 64
+L_EDGES = np.array([25.0, 50.0, 75.0], dtype=np.float32)
+AB_EDGES = np.array([-16.0, 0.0, 16.0], dtype=np.float32)
+ORIENT_BINS = 8
+TEXTURE_WEIGHT = 0.5
+EMBED_DIM = 4 * 4 * 4 + ORIENT_BINS + 2
+
+ANN_THRESHOLD = 2000
+KMEANS_ITERS = 8
+
+
+# ==========================
+# Embedding
+# ==========================
+def _srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """(N, 3) uint8 sRGB → (N, 3) float32 CIE Lab (D65)."""
+    c = rgb.astype(np.float32) / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    m = np.array([[0.4124564, 0.3575761, 0.1804375],
+                  [0.2126729, 0.7151522, 0.0721750],
+                  [0.0193339, 0.1191920, 0.9503041]], dtype=np.float32)
+    xyz = c @ m.T / np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16.0 / 116.0)
+    L = 116.0 * f[:, 1] - 16.0
+    a = 500.0 * (f[:, 0] - f[:, 1])
+    b = 200.0 * (f[:, 1] - f[:, 2])
+    return np.stack([L, a, b], axis=1)
+
+
+def embed_rgb(rgb: np.ndarray) -> np.ndarray:
+    """Embedding for an (H, W, 3) uint8 RGB array."""
+    h, w, _ = rgb.shape
+    lab = _srgb_to_lab(rgb.reshape(-1, 3))
+
+    li = np.searchsorted(L_EDGES, lab[:, 0])
+    ai = np.searchsorted(AB_EDGES, lab[:, 1])
+    bi = np.searchsorted(AB_EDGES, lab[:, 2])
+    hist = np.bincount(li * 16 + ai * 4 + bi, minlength=64).astype(np.float32)
+    hist = np.sqrt(hist / max(hist.sum(), 1.0))
+
+    L = lab[:, 0].reshape(h, w)
+    gx = np.zeros_like(L)
+    gy = np.zeros_like(L)
+    gx[:, 1:-1] = L[:, 2:] - L[:, :-2]
+    gy[1:-1, :] = L[2:, :] - L[:-2, :]
+    mag = np.hypot(gx, gy).ravel()
+    angle = np.mod(np.arctan2(gy, gx).ravel(), np.pi)
+    oi = np.minimum((angle / np.pi * ORIENT_BINS).astype(np.int64), ORIENT_BINS - 1)
+    orient = np.bincount(oi, weights=mag, minlength=ORIENT_BINS).astype(np.float32)
+    orient = np.sqrt(orient / max(orient.sum(), 1e-6))
+    stats = np.array([mag.mean() / 100.0, mag.std() / 100.0], dtype=np.float32)
+
+    vec = np.concatenate([hist, TEXTURE_WEIGHT * np.concatenate([orient, stats])])
+    norm = np.linalg.norm(vec)
+    return (vec / norm if norm > 0 else vec).astype(np.float16)
+
+
+def compute_embedding(image_path: str) -> Optional[np.ndarray]:
+    """Embedding for an image file, or None if it cannot be read."""
+    try:
+        with Image.open(image_path) as img:
+            img = img.convert("RGB")
+            img.thumbnail((THUMB_SIZE, THUMB_SIZE))
+            rgb = np.asarray(img, dtype=np.uint8)
+    except Exception as e:
+        print(f"⚠️ Could not embed {image_path}: {e}")
+        return None
+    return embed_rgb(rgb)
+
+
+# ==========================
+# Per-label index
+# ==========================
+def _spherical_kmeans(x: np.ndarray, k: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Tiny k-means on unit vectors (cosine). Returns (centroids, assignment)."""
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), size=k, replace=False)].copy()
+    assign = np.zeros(len(x), dtype=np.int64)
+    for _ in range(KMEANS_ITERS):
+        assign = np.argmax(x @ centroids.T, axis=1)
+        for j in range(k):
+            members = x[assign == j]
+            if len(members):
+                c = members.sum(axis=0)
+                centroids[j] = c / max(np.linalg.norm(c), 1e-6)
+    return centroids, assign
+
+
+class LabelSimilarityIndex:
+    """Nearest-neighbour search over the embeddings of one label folder."""
+
+    def __init__(self, ids: Sequence[str], vectors: np.ndarray, ann_threshold: int = ANN_THRESHOLD):
+        self.ids = list(ids)
+        self._pos = {image_id: i for i, image_id in enumerate(self.ids)}
+        self.vectors = np.asarray(vectors, dtype=np.float16).reshape(len(self.ids), -1)
+        self._dense = self.vectors.astype(np.float32)
+        self._centroids = None
+        self._lists: List[np.ndarray] = []
+        if len(self.ids) >= ann_threshold:
+            nlist = max(2, int(np.sqrt(len(self.ids))))
+            self._centroids, assign = _spherical_kmeans(self._dense, nlist)
+            self._lists = [np.flatnonzero(assign == j) for j in range(nlist)]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def uses_ann(self) -> bool:
+        return self._centroids is not None
+
+    def search(self, query: np.ndarray, k: int = 5, exclude: Iterable[str] = (),
+               nprobe: int = 4) -> List[Tuple[str, float]]:
+        """Top-k (image_id, cosine similarity) for a query embedding."""
+        if not self.ids or k <= 0:
+            return []
+        q = np.asarray(query, dtype=np.float32).ravel()
+        skip = {self._pos[i] for i in exclude if i in self._pos}
+        want = k + len(skip)
+
+        cand = None
+        if self.uses_ann:
+            order = np.argsort(-(self._centroids @ q))
+            probed = []
+            total = 0
+            for j in order:
+                probed.append(self._lists[j])
+                total += len(self._lists[j])
+                if len(probed) >= nprobe and total >= want:
+                    break
+            cand = np.concatenate(probed)
+
+        rows = self._dense if cand is None else self._dense[cand]
+        scores = rows @ q
+        if want < len(scores):
+            top = np.argpartition(-scores, want)[:want]
+            top = top[np.argsort(-scores[top])]
+        else:
+            top = np.argsort(-scores)
+        out: List[Tuple[str, float]] = []
+        for t in top:
+            pos = int(t if cand is None else cand[t])
+            if pos in skip:
+                continue
+            out.append((self.ids[pos], float(scores[t])))
+            if len(out) >= k:
+                break
+        return out
+
+    def neighbours(self, image_id: str, k: int = 5, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """Top-k images most similar to an indexed image (never returns itself)."""
+        pos = self._pos.get(image_id)
+        if pos is None:
+            return []
+        return self.search(self._dense[pos], k, set(exclude) | {image_id})
+
+
+# ==========================
+# Per-gender store (embedding cache)
+# ==========================
+class SimilarityStore:
+    """Embeddings for every image under a gender root, cached on disk by path + mtime."""
+
+    def __init__(self, images_root, cache_path: Optional[str] = None):
+        self.images_root = Path(images_root)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._vectors: Dict[str, Tuple[int, np.ndarray]] = {}  # id -> (mtime_ns, vec)
+        self._labels: Dict[str, Tuple[int, LabelSimilarityIndex]] = {}  # label -> (folder mtime, index)
+        self._load()
+
+    def _load(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            with np.load(self.cache_path, allow_pickle=False) as data:
+                ids, mtimes, vecs = data["ids"], data["mtimes"], data["vectors"]
+        except Exception as e:
+            print(f"⚠️ Could not read embedding cache {self.cache_path}: {e}")
+            return
+        if vecs.ndim != 2 or vecs.shape[1] != EMBED_DIM:
+            return
+        for image_id, mtime, vec in zip(ids.tolist(), mtimes.tolist(), vecs):
+            self._vectors[image_id] = (int(mtime), vec)
+
+    def save(self) -> None:
+        if self.cache_path is None:
+            return
+        ids = list(self._vectors.keys())
+        mtimes = np.array([self._vectors[i][0] for i in ids], dtype=np.int64)
+        vecs = (np.stack([self._vectors[i][1] for i in ids]) if ids
+                else np.zeros((0, EMBED_DIM), dtype=np.float16))
+        tmp = self.cache_path.with_name(self.cache_path.name + ".tmp.npz")
+        np.savez(tmp, ids=np.array(ids, dtype=str), mtimes=mtimes, vectors=vecs.astype(np.float16))
+        os.replace(tmp, self.cache_path)
+
+    def for_label(self, label: str) -> LabelSimilarityIndex:
+        """Index for one label folder, re-embedding only new or changed images."""
+        label = (label or "").lower()
+        folder = self.images_root / label
+        try:
+            folder_mtime = folder.stat().st_mtime_ns
+        except OSError:
+            return LabelSimilarityIndex([], np.zeros((0, EMBED_DIM), dtype=np.float16))
+        cached = self._labels.get(label)
+        if cached and cached[0] == folder_mtime:
+            return cached[1]
+
+        ids: List[str] = []
+        vecs: List[np.ndarray] = []
+        changed = False
+        present = set()
+        with os.scandir(folder) as it:
+            entries = sorted((e for e in it if e.is_file()), key=lambda e: e.name)
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() not in VALID_EXTS:
+                continue
+            image_id = (folder / entry.name).as_posix()
+            present.add(image_id)
+            mtime = entry.stat().st_mtime_ns
+            hit = self._vectors.get(image_id)
+            if hit is None or hit[0] != mtime:
+                vec = compute_embedding(image_id)
+                if vec is None:
+                    continue
+                self._vectors[image_id] = (mtime, vec)
+                changed = True
+            ids.append(image_id)
+            vecs.append(self._vectors[image_id][1])
+
+        prefix = folder.as_posix() + "/"
+        for image_id in [i for i in self._vectors if i.startswith(prefix) and i not in present]:
+            del self._vectors[image_id]
+            changed = True
+        if changed:
+            self.save()
+
+        matrix = np.stack(vecs) if vecs else np.zeros((0, EMBED_DIM), dtype=np.float16)
+        index = LabelSimilarityIndex(ids, matrix)
+        self._labels[label] = (folder_mtime, index)
+        return index
+
+    def next_similar(self, label: str, current_path: Optional[str], history: Dict) -> Optional[str]:
+        """
+        "More like this" step for one slot: the nearest image to the anchor
+        (the image the user liked) that has not been shown yet.
+
+        ``history`` is a mutable per-slot dict kept in the UI state; it is reset
+        whenever the label changes or the slot was changed by other means.
+        """
+        if not current_path:
+            return None
+        current = Path(current_path).as_posix()
+        shown = history.get("shown") or []
+        if history.get("label") != label or not shown or shown[-1] != current:
+            history.clear()
+            history.update({"label": label, "anchor": current, "shown": [current]})
+        index = self.for_label(label)
+        hits = index.neighbours(history["anchor"], k=1, exclude=history["shown"])
+        if not hits:  # every image shown once: cycle from the closest again
+            history["shown"] = [history["anchor"]]
+            hits = index.neighbours(history["anchor"], k=1, exclude=history["shown"])
+        if not hits:
+            return None
+        history["shown"].append(hits[0][0])
+        return hits[0][0]
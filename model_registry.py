@@ -0,0 +1,402 @@
+"""
+📦 Model Registry
+Versioned storage for the weather → outfit models: metadata, checksums, lazy
+memory-mapped loading and atomic activation / hot swap.
+
+Layout (root: models/registry, or $WEARSMART_MODEL_REGISTRY):
+
+    <root>/<name>/ACTIVE              id of the active version (replaced atomically)
+    <root>/<name>/v3/meta.json        versions, feature schema, classes, checksums
+    <root>/<name>/v3/model.joblib     uncompressed joblib dump (mmap_mode friendly)
+    <root>/<name>/v3/flat/*.npy       compiled node arrays (fast_predictor), if supported
+
+Serving prefers the flat arrays: they are memory-mapped, so every uvicorn worker
+shares the same page-cache pages, and they do not depend on the sklearn version
+that trained the model (the KeyError problem behind load_and_resave_simple.py /
+fix_models_alternative.py). model.joblib is the fallback and the source for
+re-compiling.
+
+Checksums are hashed at register time and remembered per (path, size,
+mtime_ns); activate() / load() re-verify with a stat per file and only re-read
+files that changed, so loading stays lazy.
+
+CLI:
+    python model_registry.py register outfit_men weather_clothing_recommender.pkl --activate
+    python model_registry.py list outfit_men
+    python model_registry.py activate outfit_men v2
+    python model_registry.py verify outfit_men v2
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_ROOT = os.getenv("WEARSMART_MODEL_REGISTRY", "models/registry")
+MODEL_FILE = "model.joblib"
+FLAT_DIR = "flat"
+META_FILE = "meta.json"
+ACTIVE_FILE = "ACTIVE"
+VERSION_RE = re.compile(r"^v(\d+)$")
+
+
+class RegistryError(Exception):
+    """Unknown model/version or an artifact that fails verification."""
+
+
+# (path, size, mtime_ns) -> sha256: a file is read in full once per process
+# (at register / activate / first load), later verifications only stat it
+_hashes: Dict[Tuple[str, int, int], str] = {}
+_hashes_lock = threading.Lock()
+
+
+def _stat_key(path: Path) -> Tuple[str, int, int]:
+    st = path.stat()
+    return path.resolve().as_posix(), st.st_size, st.st_mtime_ns
+
+
+def _sha256(path: Path) -> str:
+    key = _stat_key(path)
+    with _hashes_lock:
+        cached = _hashes.get(key)
+    if cached is not None:
+        return cached
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    with _hashes_lock:
+        _hashes[key] = h.hexdigest()
+    return h.hexdigest()
+
+
+def _remember_checksums(version_dir: Path, checksums: Dict[str, str]) -> None:
+    """Seed the hash cache for files just hashed under another path (rename keeps size / mtime)."""
+    with _hashes_lock:
+        for rel, digest in checksums.items():
+            _hashes[_stat_key(version_dir / rel)] = digest
+
+
+def _checksums(version_dir: Path) -> Dict[str, str]:
+    return {
+        p.relative_to(version_dir).as_posix(): _sha256(p)
+        for p in sorted(version_dir.rglob("*"))
+        if p.is_file() and p.name != META_FILE
+    }
+
+
+# ==========================
+# Loaded model
+# ==========================
+class LoadedModel:
+    """One loaded version; predicts from a feature dict with either backend."""
+
+    def __init__(self, name: str, version: str, meta: Dict, predictor, backend: str):
+        self.name = name
+        self.version = version
+        self.meta = meta
+        self.predictor = predictor
+        self.backend = backend  # "flat" or "joblib"
+        self.loaded_at = time.time()
+
+    def predict_one(self, features: Dict) -> Tuple[str, ...]:
+        if self.backend == "flat":
+            return self.predictor.predict_one(features)
+        import pandas as pd
+
+        return tuple(str(v) for v in self.predictor.predict(pd.DataFrame([features]))[0])
+
+    def info(self) -> Dict:
+        return {"name": self.name, "version": self.version, "backend": self.backend,
+                "sklearn_version": self.meta.get("sklearn_version"),
+                "created_at": self.meta.get("created_at")}
+
+
+# ==========================
+# Registry
+# ==========================
+class ModelRegistry:
+    """Versioned model artifacts on disk."""
+
+    def __init__(self, root: str = DEFAULT_ROOT):
+        self.root = Path(root)
+
+    # ---------- queries ----------
+    def names(self) -> List[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def versions(self, name: str) -> List[str]:
+        model_dir = self.root / name
+        if not model_dir.is_dir():
+            return []
+        found = [p.name for p in model_dir.iterdir() if p.is_dir() and VERSION_RE.match(p.name)]
+        return sorted(found, key=lambda v: int(VERSION_RE.match(v).group(1)))
+
+    def meta(self, name: str, version: str) -> Dict:
+        path = self.root / name / version / META_FILE
+        if not path.exists():
+            raise RegistryError(f"Unknown model version: {name}/{version}")
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def active_version(self, name: str) -> Optional[str]:
+        try:
+            version = (self.root / name / ACTIVE_FILE).read_text(encoding="utf-8").strip()
+        except OSError:
+            return None
+        return version or None
+
+    def describe(self, name: str) -> Dict:
+        active = self.active_version(name)
+        versions = []
+        for v in self.versions(name):
+            m = self.meta(name, v)
+            versions.append({"version": v, "active": v == active, "created_at": m.get("created_at"),
+                             "sklearn_version": m.get("sklearn_version"), "flat": m.get("flat", False),
+                             "source": m.get("source")})
+        return {"name": name, "active": active, "versions": versions}
+
+    # ---------- writes ----------
+    def register(self, name: str, model, source: Optional[str] = None,
+                 extra: Optional[Dict] = None, activate: bool = False) -> str:
+        """Store a fitted pipeline as the next version of ``name``; returns the version id."""
+        import joblib
+        import sklearn
+
+        from fast_predictor import FastOutfitPredictor
+
+        model_dir = self.root / name
+        model_dir.mkdir(parents=True, exist_ok=True)
+        staging = model_dir / f".staging-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir()
+        try:
+            joblib.dump(model, staging / MODEL_FILE)  # uncompressed: arrays stay mmap-able
+            meta = {
+                "name": name,
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "source": source,
+                "sklearn_version": sklearn.__version__,
+                "joblib_version": joblib.__version__,
+                "numpy_version": np.__version__,
+                "python_version": platform.python_version(),
+                "features": [str(f) for f in getattr(model, "feature_names_in_", [])],
+                "flat": False,
+            }
+            try:
+                fast = FastOutfitPredictor.from_pipeline(model)
+            except ValueError as e:
+                print(f"⚠️ {name}: no flat artifact ({e}); serving will use joblib")
+            else:
+                fast.save(staging / FLAT_DIR)
+                meta["flat"] = True
+                meta["features"] = fast.features
+                meta["outputs"] = [o["classes"] for o in fast.outputs]
+            meta.update(extra or {})
+            meta["checksums"] = _checksums(staging)
+
+            # the rename publishes the version; retry if another writer took the id
+            while True:
+                existing = self.versions(name)
+                number = int(VERSION_RE.match(existing[-1]).group(1)) + 1 if existing else 1
+                version = f"v{number}"
+                meta["version"] = version
+                (staging / META_FILE).write_text(json.dumps(meta, indent=1), encoding="utf-8")
+                try:
+                    os.rename(staging, model_dir / version)
+                    _remember_checksums(model_dir / version, meta["checksums"])
+                    break
+                except OSError:
+                    if not (model_dir / version).exists():
+                        raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        print(f"✅ Registered {name}/{version}")
+        if activate:
+            self.activate(name, version)
+        return version
+
+    def register_file(self, name: str, path: str, activate: bool = False) -> str:
+        """Register an existing .pkl (must load with the installed sklearn)."""
+        import joblib
+
+        return self.register(name, joblib.load(path), source=os.path.basename(path), activate=activate)
+
+    def verify(self, name: str, version: str) -> bool:
+        """Compare artifact checksums with meta.json (files unchanged since last hashed: stat only)."""
+        meta = self.meta(name, version)
+        expected = meta.get("checksums", {})
+        actual = _checksums(self.root / name / version)
+        if expected != actual:
+            bad = sorted(k for k in set(expected) | set(actual) if expected.get(k) != actual.get(k))
+            print(f"❌ {name}/{version} checksum mismatch: {', '.join(bad)}")
+            return False
+        return True
+
+    def activate(self, name: str, version: str) -> None:
+        """Point ACTIVE at ``version`` (verified first); readers see old or new, never a partial file."""
+        if not self.verify(name, version):
+            raise RegistryError(f"{name}/{version} failed checksum verification")
+        pointer = self.root / name / ACTIVE_FILE
+        tmp = pointer.with_name(f"{ACTIVE_FILE}.{os.getpid()}.tmp")
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, pointer)
+        print(f"🔁 {name}: active version is now {version}")
+
+    # ---------- loading ----------
+    def load(self, name: str, version: Optional[str] = None, mmap: bool = True,
+             verify: bool = True) -> LoadedModel:
+        version = version or self.active_version(name)
+        if version is None:
+            raise RegistryError(f"No active version for {name}")
+        meta = self.meta(name, version)
+        if verify and not self.verify(name, version):
+            raise RegistryError(f"{name}/{version} failed checksum verification")
+        version_dir = self.root / name / version
+        if meta.get("flat"):
+            from fast_predictor import load_flat_model
+
+            return LoadedModel(name, version, meta, load_flat_model(version_dir / FLAT_DIR, mmap=mmap), "flat")
+
+        import joblib
+        import sklearn
+
+        if meta.get("sklearn_version") != sklearn.__version__:
+            print(f"⚠️ {name}/{version} was saved with sklearn {meta.get('sklearn_version')}, "
+                  f"running {sklearn.__version__}")
+        model = joblib.load(version_dir / MODEL_FILE, mmap_mode="r" if mmap else None)
+        return LoadedModel(name, version, meta, model, "joblib")
+
+
+# ==========================
+# Serving slot
+# ==========================
+class ActiveModel:
+    """
+    The active version of one registered model, for request handlers.
+
+    Loaded on first use. ``swap`` loads the new version *before* replacing the
+    reference, so requests keep being served by the old model until the new one
+    is ready; in-flight requests hold their own reference. Other processes
+    (uvicorn workers) notice a changed ACTIVE pointer within ``check_interval``
+    seconds and reload it on a background thread.
+    """
+
+    def __init__(self, registry: ModelRegistry, name: str, check_interval: float = 5.0):
+        self.registry = registry
+        self.name = name
+        self.check_interval = check_interval
+        self.error: Optional[str] = None
+        self._current: Optional[LoadedModel] = None
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        self._reloading = False
+
+    @property
+    def current(self) -> Optional[LoadedModel]:
+        """The loaded model, without triggering a load."""
+        return self._current
+
+    def get(self) -> Optional[LoadedModel]:
+        current = self._current
+        if current is None:
+            return self._load_initial()
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self._last_check = time.monotonic()
+            version = self.registry.active_version(self.name)
+            if version and version != current.version and not self._reloading:
+                self._reloading = True
+                threading.Thread(target=self._reload, args=(version,), daemon=True).start()
+        return current
+
+    def swap(self, version: str) -> LoadedModel:
+        """Load ``version``, make it active on disk and serve it from now on."""
+        with self._lock:
+            loaded = self.registry.load(self.name, version)
+            self.registry.activate(self.name, version)
+            self._current = loaded
+            self._last_check = time.monotonic()
+            self.error = None
+        return loaded
+
+    def _load_initial(self) -> Optional[LoadedModel]:
+        with self._lock:
+            if self._current is None:
+                self._last_check = time.monotonic()
+                if self.registry.active_version(self.name) is None:
+                    self.error = f"No active version for {self.name}"
+                    return None
+                try:
+                    self._current = self.registry.load(self.name)
+                    self.error = None
+                except Exception as e:
+                    self.error = f"Failed to load {self.name}: {e}"
+                    print(f"❌ {self.error}")
+            return self._current
+
+    def _reload(self, version: str) -> None:
+        try:
+            loaded = self.registry.load(self.name, version)
+            with self._lock:
+                self._current = loaded
+            print(f"🔁 {self.name}: now serving {version}")
+        except Exception as e:
+            self.error = f"Failed to load {self.name}/{version}: {e}"
+            print(f"❌ {self.error}")
+        finally:
+            self._reloading = False
+
+
+# ==========================
+# CLI
+# ==========================
+def main():
+    parser = argparse.ArgumentParser(description="Manage versioned outfit models")
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("register", help="register a .pkl pipeline as a new version")
+    p.add_argument("name")
+    p.add_argument("path")
+    p.add_argument("--activate", action="store_true")
+    p = sub.add_parser("list", help="list versions")
+    p.add_argument("name", nargs="?")
+    p = sub.add_parser("activate", help="make a version active")
+    p.add_argument("name")
+    p.add_argument("version")
+    p = sub.add_parser("verify", help="check artifact checksums")
+    p.add_argument("name")
+    p.add_argument("version")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == "register":
+        registry.register_file(args.name, args.path, activate=args.activate)
+    elif args.command == "list":
+        for name in [args.name] if args.name else registry.names():
+            info = registry.describe(name)
+            print(f"📦 {name} (active: {info['active']})")
+            for v in info["versions"]:
+                mark = "*" if v["active"] else " "
+                print(f"  {mark} {v['version']:<5} {v['created_at']}  sklearn {v['sklearn_version']}"
+                      f"  flat={v['flat']}  {v['source'] or ''}")
+    elif args.command == "activate":
+        registry.activate(args.name, args.version)
+    elif args.command == "verify":
+        ok = registry.verify(args.name, args.version)
+        print("✅ checksums OK" if ok else "❌ verification failed")
+        raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
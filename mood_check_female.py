@@ -899,6 +899,16 @@ from PIL import Image
 import re
 
 from dynamic_shopping_recommender import generate_dynamic_shopping_recommendations
+from color_extraction import (
+    COLOR_ALIASES,
+    COLOR_NAMES,
+    extract_color_from_caption,
+    normalize_color_word,
+)
+from color_index import ColorImageIndex, load_or_build_color_index
+from image_similarity import SimilarityStore
+from fast_predictor import load_fast_predictor
+from day_planner import fetch_forecast, forecast_slots, plan_day, predict_batch, slot_features
 import csv
 from datetime import datetime
 
@@ -956,66 +966,6 @@ def generate_caption(image_path: Optional[str]) -> str:
         print(f"[BLIP caption error] {e}")
         return ""
 
-# ==========================
-# Color extraction + aliases
-# ==========================
-COLOR_NAMES = [
-    "red", "green", "blue", "yellow", "orange", "purple", "pink",
-    "brown", "black", "white", "gray", "beige", "maroon", "navy",
-    "teal", "cyan", "gold", "silver", "cream"
-]
-
-COLOR_ALIASES = {
-    "grey": "gray", "charcoal": "gray", "slate": "gray", "ash": "gray",
-    "smoke": "gray", "graphite": "gray", "gunmetal": "gray", "pewter": "gray",
-    "sky": "blue", "navy": "blue", "teal": "blue", "turquoise": "blue",
-    "aqua": "blue", "azure": "blue", "babyblue": "blue", "cobalt": "blue",
-    "indigo": "blue", "royalblue": "blue", "denim": "blue", "sapphire": "blue",
-    "midnight": "blue", "crimson": "red", "scarlet": "red", "ruby": "red",
-    "cherry": "red", "garnet": "red", "blood": "red", "rosewood": "red",
-    "rust": "red", "wine": "red", "brick": "red", "mahogany": "red",
-    "burgundy": "maroon", "oxblood": "maroon", "berry": "maroon",
-    "plum": "maroon", "raisin": "maroon", "lime": "green", "olive": "green",
-    "forest": "green", "emerald": "green", "mint": "green", "sage": "green",
-    "moss": "green", "seafoam": "green", "jade": "green", "chartreuse": "green",
-    "avocado": "green", "basil": "green", "golden": "gold", "mustard": "yellow",
-    "lemon": "yellow", "amber": "yellow", "honey": "yellow", "canary": "yellow",
-    "sunflower": "yellow", "beige": "yellow", "sand": "yellow", "camel": "yellow",
-    "khaki": "yellow", "tan": "yellow", "apricot": "orange", "peach": "orange",
-    "tangerine": "orange", "coral": "orange", "salmon": "orange",
-    "terracotta": "orange", "rusty": "orange", "pumpkin": "orange",
-    "violet": "purple", "lavender": "purple", "lilac": "purple", "mauve": "purple",
-    "orchid": "purple", "amethyst": "purple", "magenta": "purple",
-    "eggplant": "purple", "rose": "pink", "blush": "pink", "fuchsia": "pink",
-    "hotpink": "pink", "salmonpink": "pink", "baby pink": "pink",
-    "bubblegum": "pink", "coralpink": "pink", "peony": "pink", "dustyrose": "pink",
-    "chocolate": "brown", "coffee": "brown", "mocha": "brown", "walnut": "brown",
-    "caramel": "brown", "bronze": "brown", "copper": "brown", "espresso": "brown",
-    "rustbrown": "brown", "hazel": "brown", "offwhite": "white", "off-white": "white",
-    "ivory": "white", "cream": "white", "eggshell": "white", "snow": "white",
-    "pearl": "white", "linen": "white", "porcelain": "white", "jet": "black",
-    "onyx": "black", "ebony": "black", "coal": "black", "ink": "black",
-    "char": "black", "graphiteblack": "black", "platinum": "silver",
-    "chrome": "silver", "metallic": "silver", "steel": "silver",
-}
-
-def normalize_color_word(word: str) -> str:
-    w = (word or "").strip().lower()
-    return COLOR_ALIASES.get(w, w)
-
-def extract_color_from_caption(caption: str) -> Optional[str]:
-    """Return first matched color name (canonicalized) or None."""
-    if not caption:
-        return None
-    text = caption.lower()
-    for c in COLOR_NAMES:
-        if re.search(rf"\b{re.escape(c)}\b", text):
-            return c
-    for alias, canonical in COLOR_ALIASES.items():
-        if re.search(rf"\b{re.escape(alias)}\b", text):
-            return canonical
-    return None
-
 # ==========================
 # Config
 # ==========================
@@ -1074,11 +1024,18 @@ def fetch_weather(city: str) -> Optional[Dict]:
 if not MODEL_PATH.exists():
     raise FileNotFoundError(f"Model not found: {MODEL_PATH.resolve()}")
 _model = joblib.load(MODEL_PATH.as_posix())
+_fast_model = load_fast_predictor(_model)  # pandas-free path; None → sklearn pipeline
 
 def predict_outfit(features: Dict) -> Tuple[str, str, str]:
+    if _fast_model is not None:
+        return _fast_model.predict_one(features)
     df = pd.DataFrame([features])
     return _model.predict(df)[0]
 
+def predict_outfits(rows: List[Dict]) -> List[Tuple[str, str, str]]:
+    """Batch version of predict_outfit (one model call for all rows)."""
+    return predict_batch(_model, rows, _fast_model)
+
 # ==========================
 # Image utils
 # ==========================
@@ -1113,6 +1070,16 @@ def pick_new_image_same_label(label: str, current_path: Optional[str], rng: rand
     options = [f for f in files if f != (current_path or "")]
     return rng.choice(options) if options else current_path
 
+_similarity = SimilarityStore(IMAGES_ROOT, "image_embeddings_women.npz")
+
+def pick_similar_image_same_label(label: str, slot: str, state: Dict) -> Optional[str]:
+    """Keep label fixed; return the next-closest looking image to the one the user liked."""
+    images = state.get("images") or {}
+    if not label or label.lower() == "none":
+        return None
+    history = state.setdefault("similar", {}).setdefault(slot, {})
+    return _similarity.next_similar(label.lower(), images.get(slot), history) or images.get(slot)
+
 def sanitize_prediction(label: str, slot: str, rng: random.Random) -> str:
     allowed = allowed_labels_for(slot)
     lbl = (label or "").lower()
@@ -1125,6 +1092,15 @@ def sanitize_prediction(label: str, slot: str, rng: random.Random) -> str:
 # Caption cache (in-memory)
 # ==========================
 _caption_cache: Dict[str, str] = {}
+# (gender, label, color) -> image ids; persisted next to the BLIP caption cache
+_color_index: Optional[ColorImageIndex] = None  # loaded on the first color query
+
+def get_color_index() -> ColorImageIndex:
+    """Color → image index, loaded (or built from the caption cache) on first use."""
+    global _color_index
+    if _color_index is None:
+        _color_index = load_or_build_color_index("women", "blip_captions_female.json")
+    return _color_index
 
 def get_blip_caption_cached(image_path: str) -> str:
     """Return a lowercased caption for image_path, caching results."""
@@ -1135,6 +1111,8 @@ def get_blip_caption_cached(image_path: str) -> str:
     caption = generate_caption(image_path) or ""
     caption_l = caption.lower().strip()
     _caption_cache[image_path] = caption_l
+    if caption_l and _color_index is not None:  # not loaded yet: its first sync_folder picks this up
+        _color_index.add_image("women", Path(image_path).parent.name, image_path, caption_l)
     return caption_l
 
 def precompute_captions_for_label(label: str, progress_callback: Optional[callable] = None):
@@ -1150,6 +1128,8 @@ def precompute_captions_for_label(label: str, progress_callback: Optional[callab
         get_blip_caption_cached(str(p))
         if progress_callback:
             progress_callback(i, total)
+    if _color_index is not None:
+        _color_index.flush()
 
 # ==========================
 # Weather-based recommendation
@@ -1227,6 +1207,41 @@ def do_recommend(city: str, time_of_day: str, season: str, occasion: str, state:
         state
     )
 
+# ==========================
+# Day plan (one forecast call, one batch prediction)
+# ==========================
+def list_images_for_label(label: str) -> List[str]:
+    folder = IMAGES_ROOT / (label or "").lower()
+    if not folder.is_dir():
+        return []
+    return [p.as_posix() for p in folder.iterdir() if p.suffix.lower() in VALID_EXTS]
+
+def do_day_plan(city: str, season: str, occasion: str):
+    forecast = fetch_forecast(city, OPENWEATHER_API_KEY, REQUEST_TIMEOUT)
+    slots = forecast_slots(forecast) if forecast else []
+    if not slots:
+        return "❌ Failed to fetch the forecast. Check the city name and API key.", []
+
+    rng = random.Random(random.randint(0, 10_000_000))
+    preds = predict_outfits(slot_features(slots, season, occasion))
+    outfits = [
+        (sanitize_prediction(pt, "top", rng), sanitize_prediction(pb, "bottom", rng),
+         sanitize_prediction(po, "outer", rng))
+        for pt, pb, po in preds
+    ]
+    plan = plan_day(slots, outfits, list_images_for_label, rng)
+
+    lines, gallery = [], []
+    for slot in plan:
+        w, o = slot["weather"], slot["outfit"]
+        lines.append(
+            f"**{w['time_of_day'].capitalize()}** ({w['start']}–{w['end']}) — "
+            f"🌤️ {w['weather_condition'].capitalize()} 🌡️ {w['temperature']}°C (feels {w['feels_like']}°C) → "
+            f"👚 {o['top']} · 👖 {o['bottom']} · 🧥 {o['outer'] if o['outer'] != 'none' else 'None needed'}"
+        )
+        gallery += [(path, f"{w['time_of_day']}: {o[item]}") for item, path in slot["images"].items() if path]
+    return "\n\n".join(lines), gallery
+
 # ==========================
 # Manual item change (dropdown)
 # ==========================
@@ -1271,8 +1286,10 @@ def change_item(selected_item: str, slot: str, state: Dict):
 # ==========================
 # Reroll (keeps label fixed, shuffle images)
 # ==========================
-def do_reroll(slot: str, state: Dict):
-    """Shuffle a new image within the SAME label for the chosen slot."""
+REROLL_MODES = {"Random": "random", "More like this": "similar"}
+
+def do_reroll(slot: str, state: Dict, mode: str = "random"):
+    """Shuffle a new image within the SAME label for the chosen slot (mode="similar": more like this)."""
     state = state or {}
     preds = state.get("preds") or {}
     images = state.get("images") or {}
@@ -1291,7 +1308,10 @@ def do_reroll(slot: str, state: Dict):
     state["seed"] = seed + 1
 
     label = preds[slot]  # KEEP label fixed
-    new_img = pick_new_image_same_label(label, images.get(slot), rng)
+    if mode == "similar":
+        new_img = pick_similar_image_same_label(label, slot, state)
+    else:
+        new_img = pick_new_image_same_label(label, images.get(slot), rng)
     images[slot] = new_img
     state["images"] = images
 
@@ -1350,6 +1370,15 @@ def filter_images_by_color_using_captions(color: str, label: str) -> List[str]:
         return []
 
     requested = normalize_color_word(color.lower())
+
+    # Vocabulary colors are answered from the inverted index; the folder is
+    # only rescanned (and new images captioned) when its mtime changes.
+    index = get_color_index()
+    if index.covers(requested):
+        index.sync_folder("women", folder, get_blip_caption_cached)
+        index.flush()
+        return index.lookup("women", label, requested)
+
     matches: List[str] = []
 
     precompute_captions_for_label(label)
@@ -1516,6 +1545,8 @@ with gr.Blocks(title="AI Outfit Recommender (Weather + BLIP + Mood Module)") as
             outer_dropdown = gr.Dropdown(label="Change Category", choices=[])
             reroll_outer = gr.Button("🔁 Reroll Outerwear Image", size="sm")
 
+    reroll_mode = gr.Radio(["Random", "More like this"], value="Random", label="Reroll mode")
+
     recommend_btn.click(
         fn=do_recommend,
         inputs=[city, time_of_day, season, occasion, state],
@@ -1550,24 +1581,33 @@ with gr.Blocks(title="AI Outfit Recommender (Weather + BLIP + Mood Module)") as
 
     # Reroll button handlers
     reroll_top.click(
-        lambda s: do_reroll("top", s),
-        inputs=[state],
+        lambda m, s: do_reroll("top", s, REROLL_MODES.get(m, "random")),
+        inputs=[reroll_mode, state],
         outputs=[weather_box, top_img, top_cap, bottom_img, bottom_cap, outer_img, outer_cap, state]
     )
 
     reroll_bottom.click(
-        lambda s: do_reroll("bottom", s),
-        inputs=[state],
+        lambda m, s: do_reroll("bottom", s, REROLL_MODES.get(m, "random")),
+        inputs=[reroll_mode, state],
         outputs=[weather_box, top_img, top_cap, bottom_img, bottom_cap, outer_img, outer_cap, state]
     )
 
     reroll_outer.click(
-        lambda s: do_reroll("outer", s),
-        inputs=[state],
+        lambda m, s: do_reroll("outer", s, REROLL_MODES.get(m, "random")),
+        inputs=[reroll_mode, state],
         outputs=[weather_box, top_img, top_cap, bottom_img, bottom_cap, outer_img, outer_cap, state]
     )
 
     # Mood Module
+    gr.Markdown("---")
+    gr.Markdown("## 🗓️ Day Plan — Morning to Night from One Forecast")
+
+    plan_btn = gr.Button("🗓️ Plan My Day", variant="secondary")
+    plan_info = gr.Markdown()
+    plan_gallery = gr.Gallery(label="Today's Outfits", columns=3, height="auto")
+
+    plan_btn.click(fn=do_day_plan, inputs=[city, season, occasion], outputs=[plan_info, plan_gallery])
+
     gr.Markdown("---")
     gr.Markdown("## 🎨 Mood Module — Filter by Your Favorite Colors")
 
@@ -9,6 +9,11 @@ from pathlib import Path
 from typing import Dict, Tuple, Optional, List
 # Add this import at the top
 from dynamic_shopping_recommender import generate_dynamic_shopping_recommendations
+from color_extraction import get_men_extractor
+from color_index import ColorImageIndex, load_or_build_color_index
+from image_similarity import SimilarityStore
+from fast_predictor import load_fast_predictor
+from day_planner import fetch_forecast, forecast_slots, plan_day, predict_batch, slot_features
 
 import gradio as gr
 import pandas as pd
@@ -196,14 +201,21 @@ def fetch_weather(city: str) -> Optional[Dict]:
 if not MODEL_PATH.exists():
     raise FileNotFoundError(f"Model not found: {MODEL_PATH.resolve()}")
 _model = joblib.load(MODEL_PATH.as_posix())
+_fast_model = load_fast_predictor(_model)  # pandas-free path; None → sklearn pipeline
 
 def predict_outfit(features: Dict):
-    df = pd.DataFrame([features])
-    if 'mood' not in df.columns:
-        df['mood'] = 'Neutral'  # default placeholder for models expecting mood
-    pred_top, pred_bottom, pred_outer = _model.predict(df)[0]
+    if 'mood' not in features:
+        features = {**features, 'mood': 'Neutral'}  # default placeholder for models expecting mood
+    if _fast_model is not None:
+        return _fast_model.predict_one(features)
+    pred_top, pred_bottom, pred_outer = _model.predict(pd.DataFrame([features]))[0]
     return pred_top, pred_bottom, pred_outer
 
+def predict_outfits(rows: List[Dict]) -> List[Tuple[str, str, str]]:
+    """Batch version of predict_outfit (one model call for all rows)."""
+    rows = [r if 'mood' in r else {**r, 'mood': 'Neutral'} for r in rows]
+    return predict_batch(_model, rows, _fast_model)
+
 # -----------------------------
 # Image "DB" helpers
 # -----------------------------
@@ -237,6 +249,16 @@ def pick_new_image_same_label(label: str, current_path: Optional[str], rng: rand
     options = [f for f in files if f != (current_path or "")]
     return rng.choice(options) if options else current_path
 
+_similarity = SimilarityStore(IMAGES_ROOT, "image_embeddings_men.npz")
+
+def pick_similar_image_same_label(label: str, slot: str, state: Dict) -> Optional[str]:
+    """Keep label fixed; return the next-closest looking image to the one the user liked."""
+    images = state.get("images") or {}
+    if not label or label.lower() == "none":
+        return None
+    history = state.setdefault("similar", {}).setdefault(slot, {})
+    return _similarity.next_similar(label.lower(), images.get(slot), history) or images.get(slot)
+
 def sanitize_prediction(label: str, slot: str, rng: random.Random) -> str:
     allowed = allowed_labels_for(slot)
     lbl = (label or "").lower()
@@ -248,196 +270,30 @@ def sanitize_prediction(label: str, slot: str, rng: random.Random) -> str:
     return rng.choice(candidates)
 
 # -----------------------------
-# Color extraction + aliases (copied from female module)
+# Color extraction (men's extended alias table, see color_extraction.MEN_COLOR_ALIASES)
 # -----------------------------
-COLOR_NAMES = [
-    "red", "green", "blue", "yellow", "orange", "purple", "pink",
-    "brown", "black", "white", "gray", "beige", "maroon", "navy",
-    "teal", "cyan", "gold", "silver", "cream"
-]
-
-COLOR_ALIASES = {
-    # --- Gray / Grey ---
-    "grey": "gray",
-    "charcoal": "gray",
-    "slate": "gray",
-    "ash": "gray",
-    "smoke": "gray",
-    "graphite": "gray",
-    "silver": "gray",
-    "gunmetal": "gray",
-    "pewter": "gray",
-
-    # --- Blue ---
-    "sky": "blue",
-    "navy": "blue",
-    "teal": "blue",
-    "turquoise": "blue",
-    "aqua": "blue",
-    "azure": "blue",
-    "babyblue": "blue",
-    "cobalt": "blue",
-    "indigo": "blue",
-    "royalblue": "blue",
-    "denim": "blue",
-    "sapphire": "blue",
-    "midnight": "blue",
-
-    # --- Red ---
-    "crimson": "red",
-    "scarlet": "red",
-    "ruby": "red",
-    "cherry": "red",
-    "garnet": "red",
-    "blood": "red",
-    "rosewood": "red",
-    "rust": "red",
-    "wine": "red",
-    "brick": "red",
-    "mahogany": "red",
-
-    # --- Maroon / Burgundy ---
-    "burgundy": "maroon",
-    "oxblood": "maroon",
-    "berry": "maroon",
-    "plum": "maroon",
-    "raisin": "maroon",
-
-    # --- Green ---
-    "lime": "green",
-    "olive": "green",
-    "forest": "green",
-    "emerald": "green",
-    "mint": "green",
-    "sage": "green",
-    "moss": "green",
-    "seafoam": "green",
-    "jade": "green",
-    "chartreuse": "green",
-    "avocado": "green",
-    "basil": "green",
-
-    # --- Yellow / Gold ---
-    "golden": "gold",
-    "mustard": "yellow",
-    "lemon": "yellow",
-    "amber": "yellow",
-    "honey": "yellow",
-    "canary": "yellow",
-    "sunflower": "yellow",
-    "beige": "yellow",
-    "sand": "yellow",
-    "camel": "yellow",
-    "khaki": "yellow",
-    "tan": "yellow",
-
-    # --- Orange ---
-    "apricot": "orange",
-    "peach": "orange",
-    "tangerine": "orange",
-    "coral": "orange",
-    "salmon": "orange",
-    "terracotta": "orange",
-    "rusty": "orange",
-    "pumpkin": "orange",
-
-    # --- Purple / Violet ---
-    "violet": "purple",
-    "lavender": "purple",
-    "lilac": "purple",
-    "mauve": "purple",
-    "orchid": "purple",
-    "amethyst": "purple",
-    "magenta": "purple",
-    "eggplant": "purple",
-
-    # --- Pink ---
-    "rose": "pink",
-    "blush": "pink",
-    "fuchsia": "pink",
-    "hotpink": "pink",
-    "salmonpink": "pink",
-    "baby pink": "pink",
-    "bubblegum": "pink",
-    "coralpink": "pink",
-    "peony": "pink",
-    "dustyrose": "pink",
-
-    # --- Brown ---
-    "chocolate": "brown",
-    "coffee": "brown",
-    "mocha": "brown",
-    "walnut": "brown",
-    "caramel": "brown",
-    "bronze": "brown",
-    "copper": "brown",
-    "espresso": "brown",
-    "rustbrown": "brown",
-    "hazel": "brown",
-
-    # --- White / Cream ---
-    "offwhite": "white",
-    "off-white": "white",
-    "ivory": "white",
-    "cream": "white",
-    "eggshell": "white",
-    "snow": "white",
-    "pearl": "white",
-    "linen": "white",
-    "porcelain": "white",
-
-    # --- Black ---
-    "jet": "black",
-    "onyx": "black",
-    "ebony": "black",
-    "coal": "black",
-    "ink": "black",
-    "char": "black",
-    "graphiteblack": "black",
-
-    # --- Metallics ---
-    "platinum": "silver",
-    "chrome": "silver",
-    "metallic": "silver",
-    "steel": "silver",
-
-    # --- Others / Misc Fashion Shades ---
-    "mintgreen": "green",
-    "dustyblue": "blue",
-    "pastelpink": "pink",
-    "pastelyellow": "yellow",
-    "creamwhite": "white",
-    "sandstone": "beige",
-    "camelbrown": "brown",
-    "copperred": "red",
-    "taupe": "beige",
-    "beigebrown": "brown",
-    "offgray": "gray"
-}
+_color_extractor = get_men_extractor()
 
 def normalize_color_word(word: str) -> str:
-    w = (word or "").strip().lower()
-    return COLOR_ALIASES.get(w, w)
+    return _color_extractor.normalize(word)
 
 def extract_color_from_caption(caption: str) -> Optional[str]:
     """Return first matched color name (canonicalized) or None."""
-    if not caption:
-        return None
-    text = caption.lower()
-    # Try exact known color words first (word boundaries)
-    for c in COLOR_NAMES:
-        if re.search(rf"\b{re.escape(c)}\b", text):
-            return c
-    # Try aliases
-    for alias, canonical in COLOR_ALIASES.items():
-        if re.search(rf"\b{re.escape(alias)}\b", text):
-            return canonical
-    return None
+    return _color_extractor.extract(caption)
 
 # -----------------------------
 # Caption cache (global, in-memory)
 # -----------------------------
 _caption_cache: Dict[str, str] = {}  # image_path -> caption_lower
+# (gender, label, color) -> image ids; persisted next to the BLIP caption cache
+_color_index: Optional[ColorImageIndex] = None  # loaded on the first color query
+
+def get_color_index() -> ColorImageIndex:
+    """Color → image index, loaded (or built from the caption cache) on first use."""
+    global _color_index
+    if _color_index is None:
+        _color_index = load_or_build_color_index("men", "blip_captions_male.json", _color_extractor)
+    return _color_index
 
 def get_blip_caption_cached(image_path: Optional[str]) -> str:
     """Return a lowercased caption for image_path, caching results."""
@@ -448,6 +304,8 @@ def get_blip_caption_cached(image_path: Optional[str]) -> str:
     caption = generate_caption(image_path) or ""
     caption_l = caption.lower().strip()
     _caption_cache[image_path] = caption_l
+    if caption_l and _color_index is not None:  # not loaded yet: its first sync_folder picks this up
+        _color_index.add_image("men", Path(image_path).parent.name, image_path, caption_l)
     return caption_l
 
 def precompute_captions_for_label(label: str, progress_callback: Optional[callable] = None):
@@ -463,6 +321,8 @@ def precompute_captions_for_label(label: str, progress_callback: Optional[callab
         get_blip_caption_cached(str(p))
         if progress_callback:
             progress_callback(i, total)
+    if _color_index is not None:
+        _color_index.flush()
 
 # -----------------------------
 # Weather-based recommendation + BLIP caption & color display
@@ -571,6 +431,44 @@ def do_recommend(city: str, time_of_day: str, season: str, occasion: str, state:
         state
     )
 # -----------------------------
+# Day plan (one forecast call, one batch prediction)
+# -----------------------------
+def list_images_for_label(label: str) -> List[str]:
+    folder = IMAGES_ROOT / (label or "").lower()
+    if not folder.is_dir():
+        return []
+    return [p.as_posix() for p in folder.iterdir() if p.suffix.lower() in VALID_EXTS]
+
+def do_day_plan(city: str, season: str, occasion: str):
+    forecast = fetch_forecast(city, OPENWEATHER_API_KEY, REQUEST_TIMEOUT)
+    slots = forecast_slots(forecast) if forecast else []
+    if not slots:
+        return "❌ Failed to fetch the forecast.", []
+
+    rng = random.Random(random.randint(0, 10_000_000))
+    if occasion.lower() == "formal":
+        outfits = [("formal_shirts", "formal_pants", "coat")] * len(slots)
+    else:
+        preds = predict_outfits(slot_features(slots, season, occasion))
+        outfits = [
+            (sanitize_prediction(pt, "top", rng), sanitize_prediction(pb, "bottom", rng),
+             sanitize_prediction(po, "outer", rng))
+            for pt, pb, po in preds
+        ]
+    plan = plan_day(slots, outfits, list_images_for_label, rng)
+
+    lines, gallery = [], []
+    for slot in plan:
+        w, o = slot["weather"], slot["outfit"]
+        lines.append(
+            f"**{w['time_of_day'].capitalize()}** ({w['start']}–{w['end']}) — "
+            f"🌤️ {w['weather_condition'].capitalize()} 🌡️ {w['temperature']}°C (feels {w['feels_like']}°C) → "
+            f"👕 {o['top']} · 👖 {o['bottom']} · 🧥 {o['outer'] if o['outer'] != 'none' else 'None'}"
+        )
+        gallery += [(path, f"{w['time_of_day']}: {o[item]}") for item, path in slot["images"].items() if path]
+    return "\n\n".join(lines), gallery
+
+# -----------------------------
 # Mood Module (caption-based color filtering)
 # -----------------------------
 def filter_images_by_color_using_captions(color: str, label: str) -> List[str]:
@@ -582,6 +480,15 @@ def filter_images_by_color_using_captions(color: str, label: str) -> List[str]:
         return []
 
     requested = normalize_and_canonicalize_color_input(color)
+
+    # Vocabulary colors are answered from the inverted index; the folder is
+    # only rescanned (and new images captioned) when its mtime changes.
+    index = get_color_index()
+    if index.covers(requested):
+        index.sync_folder("men", folder, get_blip_caption_cached)
+        index.flush()
+        return index.lookup("men", label, requested)
+
     matches: List[str] = []
 
     # Precompute captions for all images in label
@@ -701,8 +608,10 @@ def get_caption_for_image(image_path: Optional[str], captions_cache: Dict[str, s
 # -----------------------------
 # Reroll (keeps label fixed, shuffle images)
 # -----------------------------
-def do_reroll(slot: str, state: Dict):
-    """Shuffle a new image within the SAME label for the chosen slot."""
+REROLL_MODES = {"Random": "random", "More like this": "similar"}
+
+def do_reroll(slot: str, state: Dict, mode: str = "random"):
+    """Shuffle a new image within the SAME label for the chosen slot (mode="similar": more like this)."""
     state = state or {}
     preds = state.get("preds") or {}
     images = state.get("images") or {}
@@ -721,7 +630,10 @@ def do_reroll(slot: str, state: Dict):
     rng = random.Random(seed)
 
     label = preds[slot]  # KEEP label fixed
-    new_img = pick_new_image_same_label(label, images.get(slot), rng)
+    if mode == "similar":
+        new_img = pick_similar_image_same_label(label, slot, state)
+    else:
+        new_img = pick_new_image_same_label(label, images.get(slot), rng)
     images[slot] = new_img
     state["images"] = images
 
@@ -968,21 +880,31 @@ with gr.Blocks(title="WearSmart Men — Weather + BLIP + Mood Module") as demo:
         outputs=[weather_box, top_img, top_cap, bottom_img, bottom_cap, outer_img, outer_cap, state],
     )
 
+    reroll_mode = gr.Radio(["Random", "More like this"], value="Random", label="Reroll mode")
     with gr.Row():
         reroll_top = gr.Button("🔁 Reroll Top")
         reroll_bottom = gr.Button("🔁 Reroll Bottom")
         reroll_outer = gr.Button("🔁 Reroll Outerwear")
 
-    reroll_top.click(lambda s: do_reroll("top", s),
-        inputs=[state],
+    reroll_top.click(lambda m, s: do_reroll("top", s, REROLL_MODES.get(m, "random")),
+        inputs=[reroll_mode, state],
         outputs=[weather_box, top_img, top_cap, bottom_img, bottom_cap, outer_img, outer_cap, state])
-    reroll_bottom.click(lambda s: do_reroll("bottom", s),
-        inputs=[state],
+    reroll_bottom.click(lambda m, s: do_reroll("bottom", s, REROLL_MODES.get(m, "random")),
+        inputs=[reroll_mode, state],
         outputs=[weather_box, top_img, top_cap, bottom_img, bottom_cap, outer_img, outer_cap, state])
-    reroll_outer.click(lambda s: do_reroll("outer", s),
-        inputs=[state],
+    reroll_outer.click(lambda m, s: do_reroll("outer", s, REROLL_MODES.get(m, "random")),
+        inputs=[reroll_mode, state],
         outputs=[weather_box, top_img, top_cap, bottom_img, bottom_cap, outer_img, outer_cap, state])
 
+    gr.Markdown("---")
+    gr.Markdown("## 🗓️ Day Plan — Morning to Night from One Forecast")
+
+    plan_btn = gr.Button("🗓️ Plan My Day", variant="secondary")
+    plan_info = gr.Markdown()
+    plan_gallery = gr.Gallery(label="Today's Outfits", columns=3, height="auto")
+
+    plan_btn.click(fn=do_day_plan, inputs=[city, season, occasion], outputs=[plan_info, plan_gallery])
+
     gr.Markdown("---")
     gr.Markdown("## 🎨 Mood Module — Filter by Your Favorite Colors (caption-based)")
 
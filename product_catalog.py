@@ -0,0 +1,487 @@
+"""
+🗂️ Product Catalog
+Scraped web products in SQLite (data/catalog.db), replacing the
+scraped_clothing_data.json blob for lookups.
+
+Normalized tables:
+
+- ``categories(id, name, family)``  scraped category ("shirts") and its
+  tops / bottoms / outerwear family
+- ``products``  one row per product, keyed by product URL, with gender,
+  category, numeric price (``price_minor``: paisa, NULL if not listed) and the
+  scrape slice it came from (``source``, e.g. ``outfitters_men``)
+- ``product_colors(canonical, gender, product_id)``  canonical colors
+  (color_extraction vocabulary: "Dark Blue" → blue) of each product's color labels
+  and name
+- ``catalog_slices(source)``  when each slice was last ingested
+
+Indexes cover gender + category / family + price and canonical color +
+gender, so ``by_color`` / ``by_category`` / ``search`` are index lookups
+instead of scans over every product. ``ingest(scraped_data)`` upserts a
+scrape (ClothingWebScraper.save_to_catalog) and drops products a slice no
+longer lists.
+
+``price_index(gender)`` builds sorted price arrays per (gender, category)
+from ``price_minor`` for budget queries (PriceIndex.range / under, bisect);
+it is cached until the next ingest.
+
+Connections follow wardrobe_store.py: one per thread, WAL mode, fixed SQL
+strings for the statement cache.
+
+Benchmark: python bench_product_catalog.py
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from color_extraction import extract_color_from_caption
+
+DEFAULT_DB = os.getenv("WEARSMART_CATALOG_DB", "data/catalog.db")
+STATEMENT_CACHE_SIZE = 128
+FAMILIES = ("tops", "bottoms", "outerwear")
+GENDERS = ("men", "women")
+
+# Scraped category -> family (same buckets DynamicShoppingRecommender used; unknown -> tops)
+CATEGORY_FAMILY = {
+    **dict.fromkeys(['shirts', 't-shirt', 'kurta', 'sweater', 'top', 'blouse'], 'tops'),
+    **dict.fromkeys(['pants', 'jeans', 'trousers', 'shorts', 'leggings', 'skirt'], 'bottoms'),
+    **dict.fromkeys(['jacket', 'coat', 'blazer', 'hoodie', 'cardigan', 'dupatta'], 'outerwear'),
+}
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS categories (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        family TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY,
+        product_key TEXT NOT NULL UNIQUE,
+        source TEXT NOT NULL,
+        batch INTEGER NOT NULL,
+        website TEXT NOT NULL,
+        gender TEXT NOT NULL,
+        category_id INTEGER NOT NULL REFERENCES categories(id),
+        family TEXT NOT NULL,
+        name TEXT NOT NULL,
+        price TEXT NOT NULL,
+        price_minor INTEGER,
+        image_url TEXT NOT NULL,
+        product_url TEXT NOT NULL,
+        colors TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_products_gender_category ON products(gender, category_id, price_minor)",
+    "CREATE INDEX IF NOT EXISTS idx_products_gender_family ON products(gender, family, price_minor)",
+    "CREATE INDEX IF NOT EXISTS idx_products_source ON products(source, batch)",
+    """
+    CREATE TABLE IF NOT EXISTS product_colors (
+        canonical TEXT NOT NULL,
+        gender TEXT NOT NULL,
+        product_id INTEGER NOT NULL,
+        PRIMARY KEY (canonical, gender, product_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_product_colors_product ON product_colors(product_id)",
+    """
+    CREATE TABLE IF NOT EXISTS catalog_slices (
+        source TEXT PRIMARY KEY,
+        batch INTEGER NOT NULL,
+        refreshed_at REAL NOT NULL,
+        products INTEGER NOT NULL
+    )
+    """,
+]
+
+INSERT_CATEGORY_SQL = "INSERT OR IGNORE INTO categories (name, family) VALUES (?, ?)"
+CATEGORY_ID_SQL = "SELECT id FROM categories WHERE name = ?"
+CATEGORY_LIKE_SQL = "SELECT id FROM categories WHERE name LIKE ?"
+NEXT_BATCH_SQL = "SELECT COALESCE(MAX(batch), 0) + 1 FROM catalog_slices"
+UPSERT_PRODUCT_SQL = """
+    INSERT INTO products (product_key, source, batch, website, gender, category_id, family, name, price,
+                          price_minor, image_url, product_url, colors)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(product_key) DO UPDATE SET
+        source = excluded.source, batch = excluded.batch, website = excluded.website,
+        gender = excluded.gender, category_id = excluded.category_id, family = excluded.family,
+        name = excluded.name, price = excluded.price, price_minor = excluded.price_minor,
+        image_url = excluded.image_url, product_url = excluded.product_url, colors = excluded.colors
+"""
+PRODUCT_ID_SQL = "SELECT id FROM products WHERE product_key = ?"
+DELETE_COLORS_SQL = "DELETE FROM product_colors WHERE product_id = ?"
+INSERT_COLOR_SQL = "INSERT OR IGNORE INTO product_colors (canonical, gender, product_id) VALUES (?, ?, ?)"
+DELETE_STALE_COLORS_SQL = """
+    DELETE FROM product_colors WHERE product_id IN (SELECT id FROM products WHERE source = ? AND batch < ?)
+"""
+DELETE_STALE_SQL = "DELETE FROM products WHERE source = ? AND batch < ?"
+UPSERT_SLICE_SQL = """
+    INSERT INTO catalog_slices (source, batch, refreshed_at, products) VALUES (?, ?, ?, ?)
+    ON CONFLICT(source) DO UPDATE SET batch = excluded.batch, refreshed_at = excluded.refreshed_at,
+                                      products = excluded.products
+"""
+SLICES_SQL = "SELECT source, refreshed_at, products FROM catalog_slices ORDER BY source"
+COUNT_SQL = "SELECT COUNT(*) FROM products"
+
+PRODUCT_COLUMNS = """
+    p.name, p.price, p.colors, p.image_url, p.product_url, p.website, c.name, p.gender
+"""
+SELECT_PRODUCTS = f"SELECT {PRODUCT_COLUMNS} FROM products p JOIN categories c ON c.id = p.category_id"
+BY_COLOR_SQL = f"""
+    SELECT {PRODUCT_COLUMNS} FROM product_colors pc
+    JOIN products p ON p.id = pc.product_id JOIN categories c ON c.id = p.category_id
+    WHERE pc.canonical = ? AND pc.gender = ? ORDER BY pc.product_id LIMIT ?
+"""
+BY_COLOR_ANY_GENDER_SQL = f"""
+    SELECT {PRODUCT_COLUMNS} FROM product_colors pc
+    JOIN products p ON p.id = pc.product_id JOIN categories c ON c.id = p.category_id
+    WHERE pc.canonical = ? ORDER BY pc.product_id LIMIT ?
+"""
+
+CATALOG_VERSION_SQL = "SELECT COALESCE(MAX(batch), 0) FROM catalog_slices"
+PRICED_SQL = f"""
+    SELECT p.price_minor, p.family, {PRODUCT_COLUMNS},
+           (SELECT group_concat(canonical) FROM product_colors WHERE product_id = p.id)
+    FROM products p JOIN categories c ON c.id = p.category_id
+    WHERE p.price_minor IS NOT NULL AND (?1 IS NULL OR p.gender = ?1)
+    ORDER BY p.price_minor, p.id
+"""
+
+PRICE_RE = re.compile(r'(\d[\d,]*(?:\.\d+)?)')
+
+
+def price_minor(price: Optional[str]) -> Optional[int]:
+    """"PKR 2,490" -> 249000 (paisa); None when no amount is listed."""
+    match = PRICE_RE.search(price or "")
+    if not match:
+        return None
+    try:
+        return int((Decimal(match.group(1).replace(",", "")) * 100).to_integral_value())
+    except InvalidOperation:
+        return None
+
+
+def to_minor(amount: Optional[float]) -> Optional[int]:
+    """Rupees (3000, 2499.5) -> paisa; None stays None."""
+    if amount is None:
+        return None
+    return int((Decimal(str(amount)) * 100).to_integral_value())
+
+
+def category_family(category: str) -> str:
+    return CATEGORY_FAMILY.get((category or "").strip().lower(), "tops")
+
+
+def canonical_colors(product: Dict) -> List[str]:
+    """Canonical colors of a product's color labels, plus a color named in its title."""
+    colors = []
+    for text in list(product.get("colors") or []) + [product.get("name", "")]:
+        color = extract_color_from_caption(text)
+        if color and color not in colors:
+            colors.append(color)
+    return colors
+
+
+def product_key(product: Dict) -> str:
+    url = (product.get("product_url") or "").strip()
+    if url:
+        return url
+    return "|".join((product.get("website") or "", product.get("name") or "", product.get("image_url") or ""))
+
+
+class PriceIndex:
+    """
+    Sorted price arrays per (gender, category) for budget queries.
+
+    Each priced product is listed under its family ("tops") and its scraped
+    category ("shirts"); ``range`` / ``under`` bisect the array instead of
+    scanning products and reparsing their price strings.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[int, str, Dict, Sequence[str]]] = ()):
+        """``rows``: (price_minor, family, product, canonical colors), any order."""
+        self._prices: Dict[Tuple[str, str], List[int]] = {}
+        self._entries: Dict[Tuple[str, str], List[Tuple[Dict, frozenset]]] = {}
+        for minor, family, product, colors in sorted(rows, key=lambda row: row[0]):
+            entry = (product, frozenset(colors))
+            keys = [(product["gender"], family)]
+            if product["category"] != family:
+                keys.append((product["gender"], product["category"]))
+            for key in keys:
+                self._prices.setdefault(key, []).append(minor)
+                self._entries.setdefault(key, []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(v) for k, v in self._prices.items() if k[1] in FAMILIES)
+
+    def range(self, gender: str, category: str, min_price_minor: Optional[int] = None,
+              max_price_minor: Optional[int] = None) -> List[Dict]:
+        """Products of ``category`` (family or scraped category) priced within the bounds (paisa), cheapest first."""
+        key = (gender.lower(), category.strip().lower())
+        prices = self._prices.get(key, [])
+        lo = 0 if min_price_minor is None else bisect_left(prices, min_price_minor)
+        hi = len(prices) if max_price_minor is None else bisect_right(prices, max_price_minor)
+        return [product for product, _ in self._entries.get(key, [])[lo:hi]]
+
+    def under(self, gender: str, category: str, max_price_minor: int, colors: Iterable[str] = (),
+              limit: Optional[int] = None) -> List[Dict]:
+        """
+        Products at or under ``max_price_minor``, cheapest first; with
+        ``colors`` only products in one of those colors (any color word).
+        """
+        key = (gender.lower(), category.strip().lower())
+        hi = bisect_right(self._prices.get(key, []), max_price_minor)
+        entries = self._entries.get(key, [])[:hi]
+        wanted = {extract_color_from_caption(c) or c.strip().lower() for c in colors if c}
+        out = [product for product, product_colors in entries if not wanted or product_colors & wanted]
+        return out[:limit] if limit is not None else out
+
+
+class ProductCatalog:
+    """Indexed store of scraped products, filled from scrapes with upserts."""
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._category_ids: Dict[str, int] = {}
+        self._price_indexes: Dict[Optional[str], Tuple[int, PriceIndex]] = {}
+        self._price_lock = threading.Lock()
+
+    # ---------- connections ----------
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (opened, tuned and schema-checked once)."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.db_path.as_posix(), cached_statements=STATEMENT_CACHE_SIZE)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA busy_timeout=5000")
+            self._local.con = con
+            with self._schema_lock:
+                if not self._schema_ready:
+                    with con:
+                        for stmt in SCHEMA:
+                            con.execute(stmt)
+                    self._schema_ready = True
+        return con
+
+    def close(self) -> None:
+        """Close the calling thread's connection (others stay open)."""
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    # ---------- ingestion ----------
+    def _category_id(self, con: sqlite3.Connection, category: str, created: Dict[str, int]) -> int:
+        """Id of ``category``; ids first seen in this transaction go to ``created`` until it commits."""
+        cat_id = self._category_ids.get(category) or created.get(category)
+        if cat_id is None:
+            con.execute(INSERT_CATEGORY_SQL, (category, category_family(category)))
+            cat_id = created[category] = con.execute(CATEGORY_ID_SQL, (category,)).fetchone()[0]
+        return cat_id
+
+    def upsert_products(self, source: str, products: Iterable[Dict], replace: bool = False,
+                        refreshed_at: Optional[float] = None) -> int:
+        """
+        Insert or update one scrape slice's products in one transaction.
+
+        With ``replace`` the slice's products that are not in ``products``
+        are deleted (a full re-scrape of that slice). ``refreshed_at`` is
+        when the data was scraped (default now). Returns the number of
+        products written.
+        """
+        written = 0
+        created: Dict[str, int] = {}  # cached only after commit; a rollback discards these rows
+        with self.connection() as con:
+            batch = con.execute(NEXT_BATCH_SQL).fetchone()[0]
+            for product in products:
+                name = (product.get("name") or "").strip()
+                if not name:
+                    continue
+                key = product_key(product)
+                gender = (product.get("gender") or "men").strip().lower()
+                category = (product.get("category") or "general").strip().lower()
+                price = product.get("price") or "Price not available"
+                con.execute(UPSERT_PRODUCT_SQL, (
+                    key, source, batch, product.get("website") or "", gender,
+                    self._category_id(con, category, created), category_family(category), name, price,
+                    price_minor(price), product.get("image_url") or "", product.get("product_url") or "",
+                    json.dumps(list(product.get("colors") or []), ensure_ascii=False),
+                ))
+                product_id = con.execute(PRODUCT_ID_SQL, (key,)).fetchone()[0]
+                con.execute(DELETE_COLORS_SQL, (product_id,))
+                con.executemany(INSERT_COLOR_SQL, [(c, gender, product_id) for c in canonical_colors(product)])
+                written += 1
+            if replace:
+                con.execute(DELETE_STALE_COLORS_SQL, (source, batch))
+                con.execute(DELETE_STALE_SQL, (source, batch))
+            con.execute(UPSERT_SLICE_SQL, (source, batch, refreshed_at or time.time(), written))
+        self._category_ids.update(created)
+        return written
+
+    def ingest(self, scraped: Dict[str, List[Dict]], replace: bool = True,
+               refreshed_at: Optional[float] = None) -> Dict[str, int]:
+        """Upsert a whole scrape (``{source: products}``, e.g. ClothingWebScraper.scraped_data)."""
+        return {source: self.upsert_products(source, products, replace, refreshed_at)
+                for source, products in scraped.items()}
+
+    def import_json(self, filename: str = "scraped_clothing_data.json") -> Dict[str, int]:
+        """
+        One-off migration of a scraped_clothing_data.json file; {} if it is
+        missing or unreadable. Slices are dated by the file's mtime, so an
+        old file counts as stale.
+        """
+        try:
+            with open(filename, "r", encoding="utf-8") as f:
+                scraped = json.load(f)
+            scraped_at = os.path.getmtime(filename)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not import {filename}: {e}")
+            return {}
+        return self.ingest(scraped, refreshed_at=scraped_at)
+
+    # ---------- queries ----------
+    @staticmethod
+    def _products(rows) -> List[Dict]:
+        return [
+            {"name": name, "price": price, "colors": json.loads(colors), "image_url": image_url,
+             "product_url": product_url, "website": website, "category": category, "gender": gender}
+            for name, price, colors, image_url, product_url, website, category, gender in rows
+        ]
+
+    def count(self) -> int:
+        return self.connection().execute(COUNT_SQL).fetchone()[0]
+
+    def slices(self) -> Dict[str, Dict]:
+        """{source: {"refreshed_at", "products"}} for every ingested slice."""
+        return {source: {"refreshed_at": refreshed_at, "products": n}
+                for source, refreshed_at, n in self.connection().execute(SLICES_SQL)}
+
+    def by_color(self, color: str, gender: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Products in a color ("Light Blue", "dark blue", "blue" all resolve to blue)."""
+        canonical = extract_color_from_caption(color) or (color or "").strip().lower()
+        limit = -1 if limit is None else limit
+        con = self.connection()
+        if gender:
+            rows = con.execute(BY_COLOR_SQL, (canonical, gender.lower(), limit))
+        else:
+            rows = con.execute(BY_COLOR_ANY_GENDER_SQL, (canonical, limit))
+        return self._products(rows)
+
+    def by_category(self, category: str, gender: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Products of a family ("tops") or of scraped categories containing ``category`` ("shirt")."""
+        return self.search(gender=gender, category=category, limit=limit)
+
+    def search(self, gender: Optional[str] = None, category: Optional[str] = None, color: Optional[str] = None,
+               min_price_minor: Optional[int] = None, max_price_minor: Optional[int] = None,
+               order_by_price: bool = False, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Products matching every given filter (all indexed).
+
+        Args:
+            gender: men / women
+            category: Family (tops / bottoms / outerwear) or part of a scraped category name
+            color: Any color word (canonicalized like by_color)
+            min_price_minor / max_price_minor: Price bounds in paisa (unpriced products excluded)
+            order_by_price: Cheapest first instead of catalog order
+            limit: Max products
+        """
+        con = self.connection()
+        where, params = [], []
+        if gender:
+            where.append("p.gender = ?")
+            params.append(gender.lower())
+        if category:
+            category = category.strip().lower()
+            if category in FAMILIES:
+                where.append("p.family = ?")
+                params.append(category)
+            else:
+                ids = [row[0] for row in con.execute(CATEGORY_LIKE_SQL, (f"%{category}%",))]
+                if not ids:
+                    return []
+                where.append(f"p.category_id IN ({','.join('?' * len(ids))})")
+                params.extend(ids)
+        if color:
+            canonical = extract_color_from_caption(color) or color.strip().lower()
+            where.append("p.id IN (SELECT product_id FROM product_colors WHERE canonical = ?"
+                         + (" AND gender = ?)" if gender else ")"))
+            params.extend([canonical, gender.lower()] if gender else [canonical])
+        if min_price_minor is not None:
+            where.append("p.price_minor >= ?")
+            params.append(min_price_minor)
+        if max_price_minor is not None:
+            where.append("p.price_minor <= ?")
+            params.append(max_price_minor)
+        sql = SELECT_PRODUCTS
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY p.price_minor, p.id" if order_by_price else " ORDER BY p.id"
+        sql += " LIMIT ?"
+        params.append(-1 if limit is None else limit)
+        return self._products(con.execute(sql, params))
+
+    def price_index(self, gender: Optional[str] = None) -> PriceIndex:
+        """
+        PriceIndex of priced products (one gender or all), rebuilt only after
+        an ingest. CatalogRefresher rebuilds it right after each refresh
+        (warm_price_indexes), so requests normally get the cached one.
+        """
+        con = self.connection()
+        version = con.execute(CATALOG_VERSION_SQL).fetchone()[0]
+        cached = self._price_indexes.get(gender)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with self._price_lock:  # one build per version, concurrent callers wait for it
+            cached = self._price_indexes.get(gender)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            rows = con.execute(PRICED_SQL, (gender.lower() if gender else None,)).fetchall()
+            products = self._products(row[2:-1] for row in rows)
+            index = PriceIndex(
+                (row[0], row[1], product, row[-1].split(",") if row[-1] else ())
+                for row, product in zip(rows, products)
+            )
+            self._price_indexes[gender] = (version, index)
+        return index
+
+    def warm_price_indexes(self, genders: Iterable[Optional[str]] = GENDERS) -> None:
+        """Build the price indexes of ``genders`` now (after an ingest, off the request path)."""
+        for gender in genders:
+            self.price_index(gender)
+
+    def buckets(self, gender: str, family: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """``{f"{gender}_{family}": products}`` for one gender (DynamicShoppingRecommender's grouping)."""
+        families = [family] if family else list(FAMILIES)
+        return {f"{gender}_{f}": self.search(gender=gender, category=f) for f in families}
+
+
+# ==========================
+# Shared catalogs
+# ==========================
+_catalogs: Dict[str, ProductCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def shared_catalog(db_path=DEFAULT_DB) -> ProductCatalog:
+    """The process-wide ProductCatalog for ``db_path``, so its cached price indexes are reused across requests."""
+    key = Path(db_path).resolve().as_posix()
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = ProductCatalog(db_path)
+    return catalog
@@ -0,0 +1,146 @@
+"""
+🧪 Scraper Fixture Server
+Local HTTP server that serves saved HTML so ClothingWebScraper / the async
+crawler can be tested and benchmarked offline.
+
+Routes come from ``<fixtures>/routes.json`` (request path incl. query →
+HTML file); unknown paths get 404. Per-request ``latency`` simulates a remote
+site, ``fail(path, [503, 429, ...])`` makes the next requests for a path
+return those statuses, and ``hits`` records (path, monotonic time) of every
+request. Pages carry ``ETag`` / ``Last-Modified`` and conditional requests
+get ``304`` (``validators=False`` turns that off); ``set_page`` changes a page.
+
+    with FixtureServer("scraper_fixtures", latency=0.05) as server:
+        scraper = ClothingWebScraper(outfitters_base=server.url, khaadi_base=server.url)
+
+Run: python scraper_fixture_server.py [--dir scraper_fixtures] [--port 8765]
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_DIR = Path(__file__).resolve().parent / "scraper_fixtures"
+
+
+class FixtureServer:
+    """Threaded localhost server for saved pages; start()/stop() or use as a context manager."""
+
+    def __init__(self, directory=DEFAULT_DIR, port: int = 0, latency: float = 0.0,
+                 routes: Optional[Dict[str, str]] = None, validators: bool = True):
+        self.directory = Path(directory)
+        if routes is None:
+            with open(self.directory / "routes.json", "r", encoding="utf-8") as f:
+                routes = json.load(f)
+        self.pages: Dict[str, bytes] = {path: (self.directory / name).read_bytes() for path, name in routes.items()}
+        self.modified: Dict[str, str] = dict.fromkeys(self.pages, formatdate(usegmt=True))
+        self.latency = latency
+        self.validators = validators
+        self.hits: List[Tuple[str, float]] = []
+        self._failures: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail(self, path: str, statuses: Sequence[int]) -> None:
+        """Answer the next len(statuses) requests for ``path`` with these status codes."""
+        with self._lock:
+            self._failures.setdefault(path, []).extend(statuses)
+
+    def set_page(self, path: str, body: bytes) -> None:
+        """Replace (or add) a page; its ETag and Last-Modified change with it."""
+        with self._lock:
+            self.pages[path] = body
+            self.modified[path] = formatdate(time.time() + 1, usegmt=True)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.hits.append((self.path, time.monotonic()))
+                    queued = server._failures.get(self.path)
+                    status = queued.pop(0) if queued else None
+                if server.latency:
+                    time.sleep(server.latency)
+                body = server.pages.get(self.path)
+                if status is None and body is None:
+                    status = 404
+                etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"' if body is not None else None
+                if status is None and server.validators:
+                    if_none_match = self.headers.get("If-None-Match")
+                    if_modified = self.headers.get("If-Modified-Since")
+                    if (if_none_match == etag if if_none_match else if_modified == server.modified[self.path]):
+                        status = 304
+                if status is not None:
+                    self.send_response(status)
+                    if status == 429:
+                        self.send_header("Retry-After", "0")
+                    if status == 304:
+                        self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if server.validators:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", server.modified[self.path])
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # keep test output quiet
+                pass
+
+        return Handler
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve saved scraper fixtures on localhost")
+    parser.add_argument("--dir", default=str(DEFAULT_DIR))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FixtureServer(args.dir, args.port, args.latency)
+    print(f"🧪 Serving {len(server.pages)} fixture pages on {server.url} (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import argparse
+
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
@@ -8,47 +10,66 @@ from sklearn.preprocessing import MultiLabelBinarizer
 from sklearn.metrics import classification_report, hamming_loss, jaccard_score
 import joblib
 
+DATASET_CSV = "Cleaned_Final_csv.csv"
+MODEL_FILE = "season_multilabel_model_CLEANNNNNNN_2.joblib"
+MLB_FILE = "season_mlb_2.joblib"
+
+
 # === Load and preprocess dataset ===
-df = pd.read_csv(r"C:\Users\hP\Desktop\FYP\FYP_DATASET_Final\Cleaned_Final_csv.csv")
-df["gender"] = df["gender"].str.lower()
-df["season"] = df["season"].str.lower()
-df["articleType"] = df["articleType"].str.lower()
+def load_grouped(csv_path: str = DATASET_CSV) -> pd.DataFrame:
+    """One row per articleType with the list of seasons it was seen in."""
+    df = pd.read_csv(csv_path)
+    df["gender"] = df["gender"].str.lower()
+    df["season"] = df["season"].str.lower()
+    df["articleType"] = df["articleType"].str.lower()
+
+    # === Group by articleType and aggregate seasons ===
+    return df.groupby("articleType")["season"].apply(list).reset_index()
+
+
+def train(csv_path: str = DATASET_CSV):
+    """Fit the TF-IDF + multi-output forest. Returns (pipeline, mlb, X_test, Y_test)."""
+    df_grouped = load_grouped(csv_path)
 
-# === Group by articleType and aggregate seasons ===
-df_grouped = df.groupby("articleType")["season"].apply(list).reset_index()
+    # === Features and labels ===
+    X = df_grouped["articleType"]
+    y = df_grouped["season"]
 
-# === Features and labels ===
-X = df_grouped["articleType"]
-y = df_grouped["season"]
+    # === Binarize the labels ===
+    mlb = MultiLabelBinarizer()
+    Y = mlb.fit_transform(y)
 
-# === Binarize the labels ===
-mlb = MultiLabelBinarizer()
-Y = mlb.fit_transform(y)
+    # === Train/test split ===
+    X_train, X_test, Y_train, Y_test = train_test_split(
+        X, Y, test_size=0.2, random_state=42
+    )
 
-# === Train/test split ===
-X_train, X_test, Y_train, Y_test = train_test_split(
-    X, Y, test_size=0.2, random_state=42
-)
+    # === Build pipeline ===
+    pipeline = Pipeline([
+        ('tfidf', TfidfVectorizer(ngram_range=(1, 2))),
+        ('clf', MultiOutputClassifier(RandomForestClassifier(n_estimators=200, random_state=42)))
+    ])
 
-# === Build pipeline ===
-pipeline = Pipeline([
-    ('tfidf', TfidfVectorizer(ngram_range=(1, 2))),
-    ('clf', MultiOutputClassifier(RandomForestClassifier(n_estimators=200, random_state=42)))
-])
+    # === Train model ===
+    pipeline.fit(X_train, Y_train)
+    return pipeline, mlb, X_test, Y_test
 
-# === Train model ===
-pipeline.fit(X_train, Y_train)
 
-# === Evaluate model ===
-Y_pred = pipeline.predict(X_test)
-print(f"\n✅ Hamming Loss: {hamming_loss(Y_test, Y_pred):.2f}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the articleType → season multi-label model")
+    parser.add_argument("--csv", default=DATASET_CSV)
+    args = parser.parse_args()
 
-print("📊 Classification Report:\n")
-print(classification_report(Y_test, Y_pred, target_names=mlb.classes_))
+    pipeline, mlb, X_test, Y_test = train(args.csv)
 
-# === Save the model and binarizer ===
-joblib.dump(pipeline, "season_multilabel_model_CLEANNNNNNN_2.joblib")
-joblib.dump(mlb, "season_mlb_2.joblib")
-print("\n✅ Model and label binarizer saved.")
+    # === Evaluate model ===
+    Y_pred = pipeline.predict(X_test)
+    print(f"\n✅ Hamming Loss: {hamming_loss(Y_test, Y_pred):.2f}")
 
+    print("📊 Classification Report:\n")
+    print(classification_report(Y_test, Y_pred, target_names=mlb.classes_))
 
+    # === Save the model and binarizer ===
+    joblib.dump(pipeline, MODEL_FILE)
+    joblib.dump(mlb, MLB_FILE)
+    print("\n✅ Model and label binarizer saved.")
@@ -0,0 +1,140 @@
+"""
+🍂 Season Classifier Serving
+Answers "which seasons is this articleType worn in?" from the model trained
+by season_classifier.py.
+
+The input vocabulary is tiny (one row per articleType), so every known
+articleType is run through the model ONCE at start-up and the results are
+kept in a lookup table. Unknown strings (user folder names, scraped product
+types) go through an LRU cache; all misses of a call are predicted in one
+batched ``pipeline.predict``.
+
+Model source, in order: the saved joblib files → training in-process from
+the CSV (~1 s) → lookup-only from the CSV labels.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+SEASON_ORDER = ("spring", "summer", "fall", "winter")
+DEFAULT_CACHE_SIZE = 1024
+
+
+def normalize_article_type(value) -> str:
+    """'Puffer_Jacket ' → 'puffer jacket' (the training strings are lower-case words)."""
+    return " ".join(str(value or "").lower().replace("_", " ").split())
+
+
+def _ordered(seasons: Iterable[str]) -> List[str]:
+    seasons = set(seasons)
+    return [s for s in SEASON_ORDER if s in seasons] + sorted(seasons - set(SEASON_ORDER))
+
+
+class SeasonClassifierService:
+    """Lookup table for known articleTypes + LRU-cached batched model for the rest."""
+
+    def __init__(self, pipeline=None, mlb=None, known: Optional[Iterable[str]] = None,
+                 labels: Optional[Dict[str, List[str]]] = None, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.pipeline = pipeline
+        self.mlb = mlb
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.model_calls = 0
+        self._cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Precompute: every known articleType through the model in one batch
+        self.lookup: Dict[str, List[str]] = {}
+        known = sorted({normalize_article_type(k) for k in (known or [])} - {""})
+        if known and self.ready:
+            self.lookup = dict(zip(known, self._predict(known)))
+        elif labels:
+            self.lookup = {normalize_article_type(k): _ordered(v) for k, v in labels.items()}
+
+    @property
+    def ready(self) -> bool:
+        return self.pipeline is not None and self.mlb is not None
+
+    # ---------- construction ----------
+    @classmethod
+    def load(cls, model_path: Optional[str] = None, mlb_path: Optional[str] = None,
+             csv_path: Optional[str] = None, cache_size: int = DEFAULT_CACHE_SIZE) -> "SeasonClassifierService":
+        import season_classifier  # sklearn import deferred to first use
+
+        model_path = model_path or season_classifier.MODEL_FILE
+        mlb_path = mlb_path or season_classifier.MLB_FILE
+        csv_path = csv_path or season_classifier.DATASET_CSV
+        grouped = season_classifier.load_grouped(csv_path) if os.path.exists(csv_path) else None
+        known = grouped["articleType"].tolist() if grouped is not None else []
+        labels = dict(zip(grouped["articleType"], grouped["season"])) if grouped is not None else {}
+
+        pipeline = mlb = None
+        if os.path.exists(model_path) and os.path.exists(mlb_path):
+            try:
+                import joblib
+
+                pipeline, mlb = joblib.load(model_path), joblib.load(mlb_path)
+            except Exception as e:
+                print(f"⚠️ Could not load season model ({e}); retraining from {csv_path}")
+        if pipeline is None and grouped is not None:
+            pipeline, mlb, _, _ = season_classifier.train(csv_path)
+        if pipeline is None:
+            print("⚠️ Season model and dataset not found; season lookups will be empty")
+        return cls(pipeline, mlb, known=known, labels=labels, cache_size=cache_size)
+
+    # ---------- serving ----------
+    def classify(self, article_types: Iterable[str]) -> Dict[str, Dict]:
+        """
+        {input: {"seasons": [...], "source": "lookup" | "cache" | "model" | "none"}}.
+
+        Known types are answered from the lookup table, repeats of unknown
+        types from the LRU; the remaining misses share one model call.
+        """
+        article_types = list(article_types)
+        out: Dict[str, Dict] = {}
+        misses: Dict[str, List[str]] = {}  # normalized → original inputs
+        with self._lock:
+            for original in article_types:
+                key = normalize_article_type(original)
+                if key in self.lookup:
+                    out[original] = {"seasons": self.lookup[key], "source": "lookup"}
+                elif key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.cache_hits += 1
+                    out[original] = {"seasons": self._cache[key], "source": "cache"}
+                else:
+                    misses.setdefault(key, []).append(original)
+
+        if misses:
+            keys = [k for k in misses if k]
+            predicted = dict(zip(keys, self._predict(keys))) if keys and self.ready else {}
+            with self._lock:
+                for key, originals in misses.items():
+                    seasons = predicted.get(key)
+                    if seasons is not None:
+                        self._remember(key, seasons)
+                    for original in originals:
+                        out[original] = {"seasons": seasons or [], "source": "model" if seasons is not None else "none"}
+        return {a: out[a] for a in article_types}
+
+    def seasons_for(self, article_type: str) -> List[str]:
+        return self.classify([article_type])[article_type]["seasons"]
+
+    def info(self) -> Dict:
+        return {"model_loaded": self.ready, "known_article_types": len(self.lookup),
+                "cache": {"size": len(self._cache), "max": self.cache_size, "hits": self.cache_hits},
+                "model_calls": self.model_calls}
+
+    # ---------- internals ----------
+    def _predict(self, keys: List[str]) -> List[List[str]]:
+        self.model_calls += 1
+        rows = self.mlb.inverse_transform(self.pipeline.predict(keys))
+        return [_ordered(r) for r in rows]
+
+    def _remember(self, key: str, seasons: List[str]) -> None:
+        self._cache[key] = seasons
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
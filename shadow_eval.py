@@ -0,0 +1,170 @@
+"""
+🌓 Shadow Evaluation
+Scores the registered ML outfit models next to the rule engine without
+touching responses: the request handler answers with the rule engine and
+queues the same input; a background thread runs the ML model, times it and
+compares each slot (top / bottom / outer).
+
+Per gender, the last ``window`` evaluations are kept in memory; ``snapshot``
+reports per-slot agreement, full-outfit agreement, model latency percentiles
+and the most common disagreements. The request path only does a non-blocking
+queue put — when the queue is full the sample is dropped and counted.
+
+Labels are compared after normalization (case, "_"/"-") plus a small alias map
+from the training-set vocabulary to the rule engine's image-folder labels.
+"""
+
+import queue
+import random
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+SLOTS = ("top", "bottom", "outer")
+DEFAULT_WINDOW = 1000
+
+# training-set label → rule-engine label (both normalized)
+LABEL_ALIASES = {
+    "men": {"formal shirt": "shirt", "cotton pants": "pants", "trousers": "pants", "light jacket": "jacket"},
+    # the rule engine folds every non-kurta top into "Tops"
+    "women": {"shirts": "tops"},
+}
+
+
+def normalize_label(gender: str, label) -> str:
+    key = " ".join(str(label).lower().replace("_", " ").replace("-", " ").split())
+    return LABEL_ALIASES.get(gender, {}).get(key, key)
+
+
+def ml_features(data: Dict) -> Dict:
+    """API request fields → the training-set vocabulary (lower-case, 'fall' not 'autumn')."""
+    out = {k: (v.strip().lower() if isinstance(v, str) else v) for k, v in data.items()}
+    if out.get("season") == "autumn":
+        out["season"] = "fall"
+    return out
+
+
+# ==========================
+# Rolling stats
+# ==========================
+class ShadowStats:
+    """Last ``window`` shadow results for one gender."""
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.records = deque(maxlen=window)  # (version, latency_ms, rule labels, ml labels)
+        self.total = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def record(self, version: str, latency_ms: float, rule: Sequence[str], ml: Sequence[str]) -> None:
+        with self._lock:
+            self.records.append((version, latency_ms, tuple(rule), tuple(ml)))
+            self.total += 1
+
+    def record_error(self, error: str) -> None:
+        with self._lock:
+            self.errors += 1
+            self.last_error = error
+
+    def snapshot(self, top_disagreements: int = 5) -> Dict:
+        with self._lock:
+            records = list(self.records)
+            total, errors, last_error = self.total, self.errors, self.last_error
+        out = {"evaluated_total": total, "errors": errors, "last_error": last_error, "window": len(records)}
+        if not records:
+            return out
+        latencies = np.array([r[1] for r in records])
+        p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+        out["latency_ms"] = {"p50": round(float(p50), 3), "p90": round(float(p90), 3),
+                             "p99": round(float(p99), 3), "max": round(float(latencies.max()), 3)}
+        out["agreement"] = {}
+        out["disagreements"] = {}
+        for i, slot in enumerate(SLOTS):
+            pairs = [(r[2][i], r[3][i]) for r in records]
+            out["agreement"][slot] = round(sum(a == b for a, b in pairs) / len(pairs), 4)
+            misses = Counter(f"{a} → {b}" for a, b in pairs if a != b)
+            out["disagreements"][slot] = dict(misses.most_common(top_disagreements))
+        out["agreement"]["outfit"] = round(sum(r[2] == r[3] for r in records) / len(records), 4)
+        out["versions"] = dict(Counter(r[0] for r in records))
+        return out
+
+
+# ==========================
+# Evaluator
+# ==========================
+class ShadowEvaluator:
+    """Background ML scoring of requests already answered by the rule engine."""
+
+    def __init__(self, models: Dict, window: int = DEFAULT_WINDOW, queue_size: int = 256,
+                 sample_rate: float = 1.0, enabled: bool = True):
+        self.models = models  # gender → model_registry.ActiveModel
+        self.sample_rate = sample_rate
+        self.enabled = enabled
+        self.stats = {g: ShadowStats(window) for g in models}
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, gender: str, features: Dict, rule_output: Tuple[str, str, str]) -> bool:
+        """Queue one request for shadow scoring; never blocks. Returns False if skipped."""
+        if not self.enabled or gender not in self.models:
+            return False
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((gender, dict(features), tuple(rule_output)))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def drain(self) -> None:
+        """Block until every queued sample has been scored (tests / shutdown)."""
+        self._queue.join()
+
+    def snapshot(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "queue": {"pending": self._queue.qsize(), "dropped": self.dropped},
+            **{g: s.snapshot() for g, s in self.stats.items()},
+        }
+
+    # ---------- worker ----------
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="shadow-eval", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            gender, features, rule_output = self._queue.get()
+            try:
+                self._evaluate(gender, features, rule_output)
+            except Exception as e:  # the shadow path must never take the worker down
+                self.stats[gender].record_error(str(e))
+            finally:
+                self._queue.task_done()
+
+    def _evaluate(self, gender: str, features: Dict, rule_output: Tuple[str, str, str]) -> None:
+        model = self.models[gender].get()
+        if model is None:
+            self.stats[gender].record_error(self.models[gender].error or "no active model")
+            return
+        t0 = time.perf_counter()
+        prediction = model.predict_one(ml_features(features))
+        latency_ms = (time.perf_counter() - t0) * 1000
+        self.stats[gender].record(
+            model.version, latency_ms,
+            [normalize_label(gender, v) for v in rule_output],
+            [normalize_label(gender, v) for v in prediction],
+        )
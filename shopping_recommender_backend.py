@@ -6,126 +6,105 @@ Works with both male and female modules
 
 import os
 import random
+import threading
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from collections import Counter
 import re
 
+from color_extraction import extract_color_from_caption
+from caption_index import CaptionIndex, as_caption_index
+from wardrobe_snapshot import WardrobeSnapshot, get_wardrobe_snapshot
+
 # ==========================
 # Configuration
 # ==========================
-COLOR_NAMES = [
-    "red", "green", "blue", "yellow", "orange", "purple", "pink",
-    "brown", "black", "white", "gray", "beige", "maroon", "navy",
-    "teal", "cyan", "gold", "silver", "cream"
-]
-
-COLOR_ALIASES = {
-    "grey": "gray", "charcoal": "gray", "slate": "gray", "ash": "gray",
-    "smoke": "gray", "graphite": "gray", "gunmetal": "gray", "pewter": "gray",
-    "sky": "blue", "navy": "blue", "teal": "blue", "turquoise": "blue",
-    "aqua": "blue", "azure": "blue", "babyblue": "blue", "cobalt": "blue",
-    "indigo": "blue", "royalblue": "blue", "denim": "blue", "sapphire": "blue",
-    "midnight": "blue", "crimson": "red", "scarlet": "red", "ruby": "red",
-    "cherry": "red", "garnet": "red", "blood": "red", "rosewood": "red",
-    "rust": "red", "wine": "red", "brick": "red", "mahogany": "red",
-    "burgundy": "maroon", "oxblood": "maroon", "berry": "maroon",
-    "plum": "maroon", "raisin": "maroon", "lime": "green", "olive": "green",
-    "forest": "green", "emerald": "green", "mint": "green", "sage": "green",
-    "moss": "green", "seafoam": "green", "jade": "green", "chartreuse": "green",
-    "avocado": "green", "basil": "green", "golden": "gold", "mustard": "yellow",
-    "lemon": "yellow", "amber": "yellow", "honey": "yellow", "canary": "yellow",
-    "sunflower": "yellow", "beige": "yellow", "sand": "yellow", "camel": "yellow",
-    "khaki": "yellow", "tan": "yellow", "apricot": "orange", "peach": "orange",
-    "tangerine": "orange", "coral": "orange", "salmon": "orange",
-    "terracotta": "orange", "rusty": "orange", "pumpkin": "orange",
-    "violet": "purple", "lavender": "purple", "lilac": "purple", "mauve": "purple",
-    "orchid": "purple", "amethyst": "purple", "magenta": "purple",
-    "eggplant": "purple", "rose": "pink", "blush": "pink", "fuchsia": "pink",
-    "hotpink": "pink", "salmonpink": "pink", "baby pink": "pink",
-    "bubblegum": "pink", "coralpink": "pink", "peony": "pink", "dustyrose": "pink",
-    "chocolate": "brown", "coffee": "brown", "mocha": "brown", "walnut": "brown",
-    "caramel": "brown", "bronze": "brown", "copper": "brown", "espresso": "brown",
-    "rustbrown": "brown", "hazel": "brown", "offwhite": "white", "off-white": "white",
-    "ivory": "white", "cream": "white", "eggshell": "white", "snow": "white",
-    "pearl": "white", "linen": "white", "porcelain": "white", "jet": "black",
-    "onyx": "black", "ebony": "black", "coal": "black", "ink": "black",
-    "char": "black", "graphiteblack": "black", "platinum": "silver",
-    "chrome": "silver", "metallic": "silver", "steel": "silver",
+VALID_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+CATEGORY_FAMILIES = ("tops", "bottoms", "outerwear")
+
+# Item categories based on folder names / item labels
+TOP_ITEMS = {
+    "shirt", "shirts", "t-shirt", "t-shirt", "kurta", "kurtas",
+    "sweater", "sweaters", "formal_shirts", "formal_shirt", "tops"
+}
+BOTTOM_ITEMS = {
+    "pants", "jeans", "shorts", "trousers", "cotton pants", "formal_pants",
+    "formal_pant", "leggings", "capris"
+}
+OUTERWEAR_ITEMS = {
+    "jacket", "jackets", "coat", "hoodie", "hoodies", "puffer_jacket",
+    "dupatta", "outerwear", "none"
 }
 
-VALID_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+# Gap analysis thresholds (shared with gap_batch.BatchGapAnalyzer)
+COMMON_COLORS = ["black", "white", "blue", "red", "green", "yellow",
+                 "orange", "pink", "purple", "brown", "gray", "beige"]
+MIN_CATEGORY_COUNTS = {"tops": 5, "bottoms": 4, "outerwear": 2}
+WARM_OUTERWEAR_LABELS = ["sweater", "hoodie", "coat", "jacket"]
+SUMMER_TOP_KEYWORDS = ["t-shirt", "shorts", "tank", "top"]
 
 
 # ==========================
 # Helper Functions
 # ==========================
-def normalize_color_word(word: str) -> str:
-    """Normalize color name to canonical form."""
-    w = (word or "").strip().lower()
-    return COLOR_ALIASES.get(w, w)
+def _normalize_caption_cache_keys(cache: Dict[str, str]) -> CaptionIndex:
+    """
+    Caption index with one canonical key per image (any path form looks it up).
 
+    A plain dict can change in place, so it is re-indexed on every call; hold
+    the CaptionIndex from load_blip_caption_cache() (memoized on the file's
+    mtime) to reuse one.
+    """
+    if not cache:
+        return CaptionIndex()
+    return as_caption_index(cache)
 
-def extract_color_from_caption(caption: str) -> Optional[str]:
-    """Extract color from BLIP caption."""
-    if not caption:
-        return None
-    text = caption.lower()
-    for c in COLOR_NAMES:
-        if re.search(rf"\b{re.escape(c)}\b", text):
-            return c
-    for alias, canonical in COLOR_ALIASES.items():
-        if re.search(rf"\b{re.escape(alias)}\b", text):
-            return canonical
-    return None
-
-
-def _normalize_path_key(p: str) -> str:
-    """Normalize file path for consistent dict keys (absolute, posix, lowercase)."""
-    try:
-        return Path(p).resolve().as_posix().lower()
-    except Exception:
-        # Fallback: best-effort normalization
-        return str(p).replace("\\", "/").lower()
 
+_caption_cache_memo: Dict[str, Tuple[int, CaptionIndex]] = {}
 
-def _normalize_caption_cache_keys(cache: Dict[str, str]) -> Dict[str, str]:
-    """Return a new dict with normalized absolute keys and anchor-tail variants."""
-    if not cache:
-        return {}
-    out: Dict[str, str] = {}
-    for k, v in cache.items():
-        norm_key = _normalize_path_key(k)
-        val = (v or "").strip()
-        out[norm_key] = val
-        for anchor in ("/clothing_images_men/", "/clothing_images/"):
-            idx = norm_key.find(anchor)
-            if idx != -1:
-                tail = norm_key[idx+1:]
-                out[tail] = val
-    return out
-
-
-def load_blip_caption_cache(cache_path: str = "blip_captions_cache.json") -> Dict[str, str]:
-    """Load BLIP caption cache from JSON file and normalize keys to absolute posix lowercase."""
+
+def load_blip_caption_cache(cache_path: str = "blip_captions_cache.json") -> CaptionIndex:
+    """Load BLIP caption cache from JSON file into a CaptionIndex (canonical image ids)."""
     import json
     from pathlib import Path
     
     cache_file = Path(cache_path)
     if not cache_file.exists():
         print(f"⚠️ Caption cache not found: {cache_path}")
-        return {}
+        return CaptionIndex()
+    
+    # Re-read (and re-normalize every key) only when the file changed
+    mtime = cache_file.stat().st_mtime_ns
+    memo = _caption_cache_memo.get(cache_path)
+    if memo and memo[0] == mtime:
+        return memo[1]
     
     try:
         with open(cache_file, 'r', encoding='utf-8') as f:
             raw = json.load(f)
-        # Normalize keys; store absolute and tail-from images root variants
-        captions = _normalize_caption_cache_keys(raw)
+        # One canonical "<root>/<label>/<file>" key per image
+        captions = CaptionIndex(raw)
         print(f"✅ Loaded {len(captions)} captions from {cache_path}")
+        _caption_cache_memo[cache_path] = (mtime, captions)
         return captions
     except Exception as e:
         print(f"❌ Error loading caption cache: {e}")
-        return {}
+        return CaptionIndex()
+
+
+def categorize_label(label: str) -> str:
+    """Categorize an item folder / label into tops/bottoms/outerwear."""
+    label_lower = label.lower()
+
+    if label_lower in TOP_ITEMS:
+        return "tops"
+    elif label_lower in BOTTOM_ITEMS:
+        return "bottoms"
+    elif label_lower in OUTERWEAR_ITEMS:
+        return "outerwear"
+    else:
+        # Default to tops if unknown
+        return "tops"
 
 
 # ==========================
@@ -134,40 +113,26 @@ def load_blip_caption_cache(cache_path: str = "blip_captions_cache.json") -> Dic
 class WardrobeAnalyzer:
     """Analyze user's current wardrobe from image folders."""
     
-    def __init__(self, images_root: Path, caption_cache: Dict[str, str] = None):
+    def __init__(self, images_root: Path, caption_cache: Dict[str, str] = None,
+                 snapshot: Optional[WardrobeSnapshot] = None):
         self.images_root = Path(images_root)
-        self.caption_cache = caption_cache or {}
+        self.caption_cache = as_caption_index(caption_cache)
+        self.snapshot = snapshot  # incremental, persisted scan (see wardrobe_snapshot.py)
         
         # Define item categories based on folder names
-        self.top_items = {
-            "shirt", "shirts", "t-shirt", "t-shirt", "kurta", "kurtas", 
-            "sweater", "sweaters", "formal_shirts", "formal_shirt", "tops"
-        }
-        self.bottom_items = {
-            "pants", "jeans", "shorts", "trousers", "cotton pants", "formal_pants",
-            "formal_pant", "leggings", "capris"
-        }
-        self.outerwear_items = {
-            "jacket", "jackets", "coat", "hoodie", "hoodies", "puffer_jacket",
-            "dupatta", "outerwear", "none"
-        }
+        self.top_items = TOP_ITEMS
+        self.bottom_items = BOTTOM_ITEMS
+        self.outerwear_items = OUTERWEAR_ITEMS
         
     def _categorize_item(self, folder_name: str) -> str:
         """Categorize item folder into tops/bottoms/outerwear."""
-        folder_lower = folder_name.lower()
-        
-        if folder_lower in self.top_items:
-            return "tops"
-        elif folder_lower in self.bottom_items:
-            return "bottoms"
-        elif folder_lower in self.outerwear_items:
-            return "outerwear"
-        else:
-            # Default to tops if unknown
-            return "tops"
+        return categorize_label(folder_name)
         
     def scan_wardrobe(self) -> Dict:
         """Scan all clothing folders and extract wardrobe data."""
+        if self.snapshot is not None:
+            return self.snapshot.scan(self._categorize_item, self.caption_cache)
+        
         wardrobe = {
             "tops": {},
             "bottoms": {},
@@ -200,22 +165,8 @@ class WardrobeAnalyzer:
                 item_count += 1
                 wardrobe["total_items"] += 1
                 
-                # Extract color from BLIP caption with robust key matching
-                raw_path = str(img_file)
-                img_key = _normalize_path_key(raw_path)
-                caption = None
-                # 1) absolute-normalized match
-                if img_key in self.caption_cache:
-                    caption = self.caption_cache[img_key]
-                else:
-                    # 2) relative tail match from known anchors
-                    rel_posix = raw_path.replace("\\", "/").lower()
-                    for anchor in ("clothing_images_men/", "clothing_images/"):
-                        if anchor in rel_posix:
-                            tail = rel_posix[rel_posix.index(anchor):]
-                            if tail in self.caption_cache:
-                                caption = self.caption_cache[tail]
-                                break
+                # Extract color from BLIP caption (canonical root/label/file id)
+                caption = self.caption_cache.get(str(img_file))
                 color = extract_color_from_caption(caption) if caption else None
                 if color:
                     colors.append(color)
@@ -270,10 +221,16 @@ class GapAnalyzer:
         
         return gaps
     
+    def _category_total(self, category: str) -> int:
+        """Items in a category; wardrobe stores pass precomputed ``category_counts``."""
+        counts = self.wardrobe.get("category_counts")
+        if counts is not None:
+            return counts.get(category, 0)
+        return sum(item_data["count"] for item_data in self.wardrobe[category].values())
+
     def _find_missing_colors(self) -> List[str]:
         """Find colors that are missing or underrepresented."""
-        common_colors = ["black", "white", "blue", "red", "green", "yellow", 
-                        "orange", "pink", "purple", "brown", "gray", "beige"]
+        common_colors = COMMON_COLORS
         
         existing_colors = set(self.wardrobe["color_distribution"].keys())
         missing = [c for c in common_colors if c not in existing_colors]
@@ -284,19 +241,16 @@ class GapAnalyzer:
             if count <= 2 and color in common_colors
         ]
         
-        return list(set(missing + underrepresented))
+        return sorted(set(missing + underrepresented))  # stable order for cached / JSON results
     
     def _find_underrepresented_categories(self) -> List[str]:
         """Find categories with very few items."""
         underrepresented = []
         
         for category in ["tops", "bottoms", "outerwear"]:
-            total_items = sum(
-                item_data["count"] 
-                for item_data in self.wardrobe[category].values()
-            )
+            total_items = self._category_total(category)
             
-            min_expected = {"tops": 5, "bottoms": 4, "outerwear": 2}[category]
+            min_expected = MIN_CATEGORY_COUNTS[category]
             
             if total_items < min_expected:
                 underrepresented.append(category)
@@ -309,15 +263,12 @@ class GapAnalyzer:
         
         # Winter needs
         if self.season in ["winter", "autumn"]:
-            outerwear_items = sum(
-                item_data["count"] 
-                for item_data in self.wardrobe["outerwear"].values()
-            )
+            outerwear_items = self._category_total("outerwear")
             if outerwear_items < 2:
                 seasonal_gaps.append("warm_outerwear")
             
             # Check for warm items
-            warm_categories = ["sweater", "hoodie", "coat", "jacket"]
+            warm_categories = WARM_OUTERWEAR_LABELS
             has_warm = any(
                 cat in self.wardrobe["outerwear"] 
                 for cat in warm_categories
@@ -327,7 +278,7 @@ class GapAnalyzer:
         
         # Summer needs
         elif self.season in ["summer", "spring"]:
-            summer_items = ["t-shirt", "shorts", "tank", "top"]
+            summer_items = SUMMER_TOP_KEYWORDS
             has_summer = any(
                 any(item in cat for item in summer_items)
                 for cat in self.wardrobe["tops"].keys()
@@ -342,17 +293,10 @@ class GapAnalyzer:
         quantity_gaps = []
         
         # Expected minimum quantities
-        expected = {
-            "tops": 5,
-            "bottoms": 4,
-            "outerwear": 2
-        }
+        expected = MIN_CATEGORY_COUNTS
         
         for category, min_count in expected.items():
-            current_count = sum(
-                item_data["count"] 
-                for item_data in self.wardrobe[category].values()
-            )
+            current_count = self._category_total(category)
             
             if current_count < min_count:
                 quantity_gaps.append({
@@ -447,12 +391,28 @@ class GapAnalyzer:
 # ==========================
 # Main Shopping Recommender
 # ==========================
+
+
+def preferred_family(preferred_category: Optional[str]) -> Optional[str]:
+    """'Jeans' → 'bottoms', 'tops' → 'tops', '' → None; ValueError if unknown."""
+    cat = (preferred_category or "").strip().lower()
+    if not cat:
+        return None
+    if cat in CATEGORY_FAMILIES:
+        return cat
+    for family, items in (("tops", TOP_ITEMS), ("bottoms", BOTTOM_ITEMS), ("outerwear", OUTERWEAR_ITEMS)):
+        if cat in items or cat.replace(" ", "_") in items:
+            return family
+    raise ValueError(f"Unknown category: {preferred_category}")
+
 class ShoppingRecommender:
     """Main class for generating shopping recommendations."""
     
-    def __init__(self, images_root: Path, caption_cache: Dict[str, str] = None):
+    def __init__(self, images_root: Path, caption_cache: Dict[str, str] = None,
+                 snapshot: Optional[WardrobeSnapshot] = None):
         self.images_root = images_root
         self.caption_cache = caption_cache or {}
+        self.snapshot = snapshot
         self.analyzer = None
         self.gap_analyzer = None
         
@@ -467,7 +427,7 @@ class ShoppingRecommender:
             Dictionary with wardrobe analysis and recommendations
         """
         # Step 1: Analyze current wardrobe
-        self.analyzer = WardrobeAnalyzer(self.images_root, self.caption_cache)
+        self.analyzer = WardrobeAnalyzer(self.images_root, self.caption_cache, self.snapshot)
         wardrobe_data = self.analyzer.scan_wardrobe()
         
         # Step 2: Analyze gaps
@@ -484,6 +444,41 @@ class ShoppingRecommender:
         
         return results
     
+    def analyze(self, season: str = "summer", preferred_category: Optional[str] = None) -> Dict:
+        """
+        Structured (JSON-ready) wardrobe summary, gaps and recommendations.
+
+        Args:
+            season: Current season (summer/winter/spring/autumn)
+            preferred_category: Optional tops/bottoms/outerwear or item label
+                (e.g. "jeans"); recommendations are limited to its family
+        """
+        self.analyzer = WardrobeAnalyzer(self.images_root, self.caption_cache, self.snapshot)
+        wardrobe_data = self.analyzer.scan_wardrobe()
+        self.gap_analyzer = GapAnalyzer(wardrobe_data, season)
+        gaps = self.gap_analyzer.analyze_gaps()
+
+        family = preferred_family(preferred_category)
+        recommendations = [r for r in gaps.pop("recommendations") if not family or r["category"] == family]
+        return {
+            "wardrobe": {
+                "total_items": wardrobe_data["total_items"],
+                "categories": {
+                    category: {
+                        "total": sum(item["count"] for item in wardrobe_data[category].values()),
+                        "items": {
+                            name: {"count": item["count"], "colors": sorted(item["unique_colors"])}
+                            for name, item in wardrobe_data[category].items()
+                        },
+                    }
+                    for category in CATEGORY_FAMILIES
+                },
+                "color_distribution": dict(wardrobe_data["color_distribution"].most_common()),
+            },
+            "gaps": gaps,
+            "recommendations": recommendations,
+        }
+
     def _format_wardrobe_summary(self, wardrobe: Dict) -> str:
         """Format wardrobe summary for display."""
         summary = "## 📊 Current Wardrobe Analysis\n\n"
@@ -564,11 +559,53 @@ class ShoppingRecommender:
         return shopping_list
 
 
+# ==========================
+# Cached structured analysis (API)
+# ==========================
+_analysis_cache: Dict[Tuple[str, str, str, Optional[str]], Dict] = {}
+_analysis_fingerprints: Dict[str, str] = {}
+_analysis_lock = threading.Lock()  # the API calls shopping_analysis from threadpool workers
+
+
+def shopping_analysis(images_root: str, season: str, caption_cache: Dict = None,
+                      preferred_category: Optional[str] = None) -> Tuple[Dict, bool]:
+    """
+    ShoppingRecommender.analyze(), cached by (wardrobe fingerprint, season,
+    preferred category family). The wardrobe snapshot is refreshed first, so a
+    changed folder (or new captions) invalidates every cached result for that
+    images root. Returns (result, cache_hit).
+    """
+    family = preferred_family(preferred_category)
+    season = season.strip().lower()
+    season = "autumn" if season == "fall" else season
+    snapshot = get_wardrobe_snapshot(images_root)
+    fingerprint = snapshot.refreshed_fingerprint(caption_cache)
+    root = snapshot.images_root.as_posix()
+    key = (root, fingerprint, season, family)
+    with _analysis_lock:
+        if _analysis_fingerprints.get(root) != fingerprint:
+            for stale in [k for k in _analysis_cache if k[0] == root]:
+                del _analysis_cache[stale]
+            _analysis_fingerprints[root] = fingerprint
+        cached = _analysis_cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    # analyze outside the lock; a result for a fingerprint replaced meanwhile is not cached
+    result = ShoppingRecommender(Path(images_root), caption_cache, snapshot).analyze(season, family)
+    result["fingerprint"] = fingerprint
+    with _analysis_lock:
+        if _analysis_fingerprints.get(root) == fingerprint:
+            result = _analysis_cache.setdefault(key, result)
+    return result, False
+
+
 # ==========================
 # Gradio Integration Function
 # ==========================
 def generate_shopping_recommendations(images_root: str, season: str, caption_cache: Dict = None, 
-                                     caption_cache_path: str = None) -> Tuple[str, str, str]:
+                                     caption_cache_path: str = None,
+                                     use_snapshot: bool = True) -> Tuple[str, str, str]:
     """
     Main function to call from Gradio.
     
@@ -577,6 +614,8 @@ def generate_shopping_recommendations(images_root: str, season: str, caption_cac
         season: Current season
         caption_cache: Optional BLIP caption cache (dict)
         caption_cache_path: Optional path to BLIP caption JSON file
+        use_snapshot: Answer from the persisted wardrobe snapshot, rescanning
+            only folders that changed (False = full scan every call)
         
     Returns:
         Tuple of (wardrobe_summary, gap_analysis, shopping_list)
@@ -610,7 +649,8 @@ def generate_shopping_recommendations(images_root: str, season: str, caption_cac
             # Normalize any provided in-memory cache keys
             caption_cache = _normalize_caption_cache_keys(caption_cache)
         
-        recommender = ShoppingRecommender(Path(images_root), caption_cache)
+        snapshot = get_wardrobe_snapshot(images_root) if use_snapshot else None
+        recommender = ShoppingRecommender(Path(images_root), caption_cache, snapshot)
         results = recommender.generate_recommendations(season)
         
         return (
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import time
+import unittest
+
+from async_scraper import AsyncFetcher, TokenBucket, page_urls
+from clothing_web_scraper import ClothingWebScraper
+from scraper_fixture_server import FixtureServer
+
+logging.disable(logging.WARNING)
+
+
+def fast_fetcher(**kwargs):
+    options = dict(rate_per_host=1000, burst=100, max_per_host=8, retries=2, backoff=0.01, seed=1)
+    options.update(kwargs)
+    return AsyncFetcher(**options)
+
+
+class TestAsyncScraper(unittest.TestCase):
+
+    def setUp(self):
+        self.outfitters = FixtureServer().start()
+        self.khaadi = FixtureServer().start()
+        # HTML collection pages: these tests cover the crawler, not the products.json feed
+        self.scraper = ClothingWebScraper(outfitters_base=self.outfitters.url, khaadi_base=self.khaadi.url,
+                                          outfitters_source="html")
+
+    def tearDown(self):
+        self.outfitters.stop()
+        self.khaadi.stop()
+
+    def test_crawl_matches_sequential_scrape(self):
+        concurrent = self.scraper.scrape_all_websites(fetcher=fast_fetcher())
+        sequential = ClothingWebScraper(outfitters_base=self.outfitters.url, khaadi_base=self.khaadi.url,
+                                        outfitters_source="html")
+        self.assertEqual(concurrent["outfitters_men"], sequential.scrape_outfitters_men_shirts())
+        self.assertEqual(concurrent["outfitters_women"], sequential.scrape_outfitters_women_shirts())
+        self.assertEqual(concurrent["khaadi_men"], sequential.scrape_khaadi_men())
+        self.assertEqual([p["name"] for p in concurrent["khaadi_men"]], ["Cotton Kurta", "Waistcoat"])
+        self.assertEqual(self.scraper.scraped_data, concurrent)
+
+    def test_collection_pages_are_merged(self):
+        data = self.scraper.scrape_all_websites(pages=2, fetcher=fast_fetcher())
+        names = [p["name"] for p in data["outfitters_men"]]
+        self.assertEqual(names, ["Oxford Shirt Navy", "Linen Shirt Beige", "Check Shirt", "Denim Shirt Blue"])
+        self.assertEqual(len(data["outfitters_women"]), 2)  # page 2 is a 404: skipped, not retried
+        self.assertEqual(page_urls("http://x/c?sort=new", 2), ["http://x/c?sort=new", "http://x/c?sort=new&page=2"])
+
+    def test_retries_transient_errors(self):
+        self.outfitters.fail("/collections/men-shirts", [503, 429])
+        fetcher = fast_fetcher()
+        data = self.scraper.scrape_all_websites(fetcher=fetcher)
+        self.assertEqual(len(data["outfitters_men"]), 3)
+        self.assertEqual(fetcher.stats["retries"], 2)
+
+        self.outfitters.fail("/collections/women-shirts", [500, 500, 500])
+        fetcher = fast_fetcher(retries=2)
+        data = self.scraper.scrape_all_websites(fetcher=fetcher)
+        self.assertEqual(data["outfitters_women"], [])
+        self.assertEqual(fetcher.stats["failures"], 1)
+        self.assertEqual(len(data["outfitters_men"]), 3)
+
+    def test_per_host_rate_limit_does_not_block_other_hosts(self):
+        fetcher = fast_fetcher(rate_per_host=10, burst=1)
+        start = time.monotonic()
+        self.scraper.scrape_all_websites(pages=3, fetcher=fetcher)  # 6 outfitters pages, 1 khaadi page
+        outfitters = sorted(t for _, t in self.outfitters.hits)
+        khaadi = [t for _, t in self.khaadi.hits]
+        self.assertEqual(len(outfitters), 6)
+        gaps = [b - a for a, b in zip(outfitters, outfitters[1:])]
+        self.assertGreaterEqual(min(gaps), 0.08)  # ~1 / rate apart
+        self.assertLess(khaadi[0] - start, 0.08)  # not queued behind the other host
+
+    def test_token_bucket(self):
+        async def take(n):
+            bucket = TokenBucket(rate=50, burst=2)
+            t0 = time.monotonic()
+            for _ in range(n):
+                await bucket.acquire()
+            return time.monotonic() - t0
+
+        self.assertLess(asyncio.run(take(2)), 0.02)  # the burst is free
+        self.assertGreaterEqual(asyncio.run(take(6)), 4 / 50 - 0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from caption_index import CaptionIndex, as_caption_index, canonical_image_id
+from shopping_recommender_backend import _normalize_caption_cache_keys, load_blip_caption_cache
+
+
+class TestCaptionIndex(unittest.TestCase):
+
+    def test_canonical_ids(self):
+        expected = "clothing_images_men/shirt/s1.jpg"
+        for path in ("/srv/app/clothing_images_men/Shirt/S1.jpg", "clothing_images_men\\shirt\\s1.jpg",
+                     "clothing_images_men/shirt/s1.jpg", "clothing_images_men/tops/../shirt/s1.jpg"):
+            self.assertEqual(canonical_image_id(path), expected, path)
+        self.assertEqual(canonical_image_id("./shirt/s1.jpg"), f"{Path.cwd().name.lower()}/shirt/s1.jpg")
+
+    def test_one_entry_per_image_any_path_form(self):
+        index = CaptionIndex({
+            "clothing_images\\tops\\t1.jpg": " a red top ",
+            "/data/clothing_images_men/coat/c1.jpg": "a black coat",
+        })
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index["clothing_images/tops/t1.jpg"], "a red top")
+        self.assertEqual(index.get(str(Path.cwd() / "clothing_images" / "tops" / "T1.jpg")), "a red top")
+        self.assertIn("clothing_images_men/coat/c1.jpg", index)
+        self.assertIsNone(index.get("clothing_images_men/coat/c2.jpg"))
+        self.assertEqual(sorted(index), ["clothing_images/tops/t1.jpg", "clothing_images_men/coat/c1.jpg"])
+
+    def test_ids_and_captions_are_interned(self):
+        index = CaptionIndex({f"clothing_images/tops/t{i}.jpg": "a plain white top" for i in range(3)})
+        captions = [index[k] for k in index]
+        self.assertTrue(all(c is captions[0] for c in captions))
+        self.assertIs(as_caption_index(index), index)
+        self.assertIs(_normalize_caption_cache_keys(index), index)
+
+    def test_in_place_edits_are_seen(self):
+        cache = {"clothing_images/tops/t1.jpg": "a red top"}
+        self.assertEqual(_normalize_caption_cache_keys(cache)["clothing_images/tops/t1.jpg"], "a red top")
+        cache["clothing_images/tops/t1.jpg"] = "a blue top"  # re-captioned, same size
+        self.assertEqual(_normalize_caption_cache_keys(cache)["clothing_images/tops/t1.jpg"], "a blue top")
+
+    def test_repo_caption_files(self):
+        index = load_blip_caption_cache("blip_captions_male.json")
+        with open("blip_captions_male.json", encoding="utf-8") as f:
+            raw = json.load(f)
+        self.assertIsInstance(index, CaptionIndex)
+        self.assertEqual(len(index), len(raw))
+        key, caption = next(iter(raw.items()))
+        self.assertEqual(index.get(os.path.abspath(key.replace("\\", "/"))), caption.strip())
+        self.assertIs(load_blip_caption_cache("blip_captions_male.json"), index)  # unchanged file: memoized
+
+    def test_missing_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(len(load_blip_caption_cache(os.path.join(tmp, "missing.json"))), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
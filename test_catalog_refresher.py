@@ -0,0 +1,102 @@
+import logging
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from catalog_refresher import CatalogRefresher, slice_name
+from clothing_web_scraper import ClothingWebScraper
+from dynamic_shopping_recommender import DynamicShoppingRecommender
+from product_catalog import ProductCatalog
+from scraper_fixture_server import FixtureServer
+
+logging.disable(logging.WARNING)
+
+OLD_SHIRT = {"name": "Old Shirt", "price": "PKR 1,990", "colors": ["Red"], "image_url": "https://cdn.example/old.jpg",
+             "product_url": "https://example.com/products/old-shirt", "website": "Outfitters",
+             "category": "shirts", "gender": "men"}
+
+
+class TestCatalogRefresher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.catalog = ProductCatalog(Path(self.tmp.name) / "catalog.db")
+        self.server = FixtureServer(latency=0.3).start()
+        self.refresher = CatalogRefresher(self.catalog, scraper_factory=self.scraper, ttl=3600, retry_after=3600)
+
+    def tearDown(self):
+        self.refresher.stop()
+        self.refresher.drain()
+        self.server.stop()
+        self.catalog.close()
+        self.tmp.cleanup()
+
+    def scraper(self):
+        return ClothingWebScraper(outfitters_base=self.server.url, khaadi_base=self.server.url, http_cache_dir=None)
+
+    def test_stale_slices(self):
+        now = time.time()
+        self.catalog.upsert_products("outfitters_men", [OLD_SHIRT], refreshed_at=now - 7200)
+        self.catalog.upsert_products("outfitters_women", [dict(OLD_SHIRT, gender="women")])
+        self.assertEqual(self.refresher.stale(["outfitters_men", "outfitters_women", "khaadi_men"], now),
+                         ["outfitters_men", "khaadi_men"])
+        self.assertEqual(slice_name("Women", " Jeans "), "outfitters_women_jeans")
+
+    def test_serves_snapshot_while_refreshing(self):
+        self.catalog.upsert_products("outfitters_men", [OLD_SHIRT], refreshed_at=time.time() - 7200)
+        t0 = time.perf_counter()
+        self.assertEqual(self.refresher.ensure_fresh(["outfitters_men"]), ["outfitters_men"])
+        self.assertLess(time.perf_counter() - t0, 0.2)  # the 0.3 s scrape happens on the worker
+        self.assertEqual([p["name"] for p in self.catalog.by_category("shirts", "men")], ["Old Shirt"])
+        self.assertEqual(self.refresher.ensure_fresh(["outfitters_men"]), [])  # already queued
+
+        self.refresher.drain()
+        names = [p["name"] for p in self.catalog.by_category("shirts", "men")]
+        self.assertEqual(names, ["Oxford Shirt Navy", "Linen Shirt Beige", "Check Shirt", "Denim Shirt Blue"])
+        self.assertEqual(self.refresher.stale(["outfitters_men"]), [])
+        self.assertEqual(self.refresher.stats["refreshed"], 1)
+        with mock.patch("product_catalog.PriceIndex", side_effect=AssertionError("rebuilt in request")):
+            self.assertEqual(len(self.catalog.price_index("men")), 4)  # built by the refresh
+
+    def test_failed_refresh_keeps_snapshot(self):
+        self.catalog.upsert_products("outfitters_men_jeans", [dict(OLD_SHIRT, category="jeans")],
+                                     refreshed_at=time.time() - 7200)
+        self.assertEqual(self.refresher.ensure_fresh(["outfitters_men_jeans"]), ["outfitters_men_jeans"])
+        self.refresher.drain()  # /collections/men-jeans is not served → no products
+        self.assertEqual([p["name"] for p in self.catalog.by_category("jeans", "men")], ["Old Shirt"])
+        self.assertIn("outfitters_men_jeans", self.refresher.errors)
+        self.assertEqual(self.refresher.ensure_fresh(["outfitters_men_jeans"]), [])  # backing off
+        self.assertTrue(self.refresher.status()["outfitters_men_jeans"]["stale"] is False)
+
+    def test_recommender_does_not_scrape_in_request(self):
+        self.server.latency = 1.0
+        self.catalog.upsert_products("outfitters_women", [dict(OLD_SHIRT, gender="women")],
+                                     refreshed_at=time.time() - 7200)
+        with tempfile.TemporaryDirectory() as images_root:
+            t0 = time.perf_counter()
+            recommender = DynamicShoppingRecommender(images_root, gender="women", catalog=self.catalog,
+                                                     refresher=self.refresher)
+            self.assertEqual([p["name"] for p in recommender._get_available_products()["women_tops"]],
+                             ["Old Shirt"])
+            self.assertLess(time.perf_counter() - t0, 0.5)
+            self.refresher.drain()
+            self.assertEqual([p["name"] for p in recommender._get_available_products()["women_tops"]],
+                             ["Poplin Shirt White", "Satin Shirt"])
+
+    def test_scheduler_refreshes_base_slices(self):
+        self.server.latency = 0.0
+        self.refresher.interval = 0.05
+        self.refresher.start()
+        deadline = time.time() + 30
+        while len(self.catalog.slices()) < 3 and time.time() < deadline:
+            time.sleep(0.05)
+        self.refresher.stop()
+        self.refresher.drain()
+        self.assertEqual({s: i["products"] for s, i in self.catalog.slices().items()},
+                         {"outfitters_men": 4, "outfitters_women": 2, "khaadi_men": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
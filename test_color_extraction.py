@@ -0,0 +1,52 @@
+import unittest
+
+from bench_color_extraction import build_corpus, legacy_extract_color_from_caption
+from color_extraction import (
+    ColorExtractor,
+    extract_color_from_caption,
+    extract_colors_bulk,
+    normalize_color_word,
+)
+
+
+class TestColorExtraction(unittest.TestCase):
+
+    def test_matches_legacy_on_corpus(self):
+        """Single-pass extractor must agree with the per-term regex loop."""
+        corpus = build_corpus(3000)
+        for cap in corpus:
+            self.assertEqual(extract_color_from_caption(cap), legacy_extract_color_from_caption(cap), cap)
+
+    def test_precedence_names_before_aliases(self):
+        # 'navy' is both a name and an alias; the name wins, as before
+        self.assertEqual(extract_color_from_caption("a navy shirt"), "navy")
+        # names beat aliases regardless of position in the caption
+        self.assertEqual(extract_color_from_caption("crimson and black stripes"), "black")
+        # among names, table order wins (red is listed before black)
+        self.assertEqual(extract_color_from_caption("black and red"), "red")
+
+    def test_phrases_and_boundaries(self):
+        self.assertEqual(extract_color_from_caption("a baby pink top"), "pink")
+        self.assertEqual(extract_color_from_caption("an off-white kurta"), "white")
+        self.assertEqual(extract_color_from_caption("a Baby  Pink top"), "pink")
+        self.assertIsNone(extract_color_from_caption("a rosewoodish tone"))
+        self.assertEqual(extract_color_from_caption("rosewood"), "red")
+        self.assertIsNone(extract_color_from_caption(""))
+        self.assertIsNone(extract_color_from_caption(None))
+
+    def test_custom_tables(self):
+        ex = ColorExtractor(["red"], {"silver": "gray", "baby blue": "blue"})
+        self.assertEqual(ex.extract("silver and red"), "red")
+        self.assertEqual(ex.extract("a baby blue cap"), "blue")
+        self.assertEqual(ex.normalize(" Silver "), "gray")
+        self.assertEqual(normalize_color_word("Grey"), "gray")
+
+    def test_bulk_preserves_order(self):
+        caps = ["a red shirt", None, "a red shirt", "plain", "ivory"]
+        self.assertEqual(extract_colors_bulk(caps), ["red", None, "red", None, "white"])
+        ex = ColorExtractor()
+        self.assertEqual(ex.extract_mapping({"a.jpg": "teal", "b.jpg": ""}), {"a.jpg": "teal", "b.jpg": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
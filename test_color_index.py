@@ -0,0 +1,174 @@
+import json
+import os
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from color_extraction import extract_color_from_caption, normalize_color_word
+from color_index import ColorImageIndex, image_id_for, index_path_for_cache, load_or_build_color_index
+
+
+def legacy_match(color: str, cap: str) -> bool:
+    """The per-image test filter_images_by_color_using_captions used to run."""
+    requested = normalize_color_word(color.lower())
+    if not cap:
+        return False
+    if re.search(rf"\b{re.escape(requested)}\b", cap):
+        return True
+    det = extract_color_from_caption(cap)
+    if det and normalize_color_word(det) == requested:
+        return True
+    return requested in cap
+
+
+def label_of(key: str) -> str:
+    return image_id_for(key).split("/")[-2]
+
+
+CAPTIONS = {
+    "clothing_images\\shirt\\s1.jpg": "a navy blue shirt with buttons",
+    "clothing_images\\shirt\\s2.jpg": "a woman wearing a crimson top",
+    "clothing_images\\shirt\\s3.jpg": "an off-white kurta",
+    "clothing_images\\shirt\\s4.jpg": "a reddish scarf",
+    "clothing_images\\jeans\\j1.jpg": "a pair of denim jeans",
+    "clothing_images\\jeans\\j2.jpg": "",
+}
+
+
+class TestColorImageIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ColorImageIndex()
+        self.index.add_caption_cache("women", CAPTIONS)
+
+    def test_matches_legacy_filter(self):
+        queries = ["red", "blue", "Navy", "white", "cream", "grey", "black", "pink"]
+        for color in queries:
+            for label in ("shirt", "jeans"):
+                expected = sorted(
+                    image_id_for(k) for k, cap in CAPTIONS.items()
+                    if label_of(k) == label and legacy_match(color, cap)
+                )
+                self.assertEqual(self.index.lookup("women", label, color), expected, (color, label))
+
+    def test_incremental_updates(self):
+        self.index.add_image("women", "shirt", "clothing_images/shirt/s5.jpg", "a red dress")
+        self.assertIn("clothing_images/shirt/s5.jpg", self.index.lookup("women", "shirt", "red"))
+        self.index.add_image("women", "shirt", "clothing_images/shirt/s5.jpg", "a black dress")
+        self.assertNotIn("clothing_images/shirt/s5.jpg", self.index.lookup("women", "shirt", "red"))
+        self.assertTrue(self.index.remove_image("clothing_images\\shirt\\s5.jpg"))
+        self.assertEqual(self.index.lookup("women", "shirt", "black"), [])
+
+    def test_paging(self):
+        for i in range(30):
+            self.index.add_image("men", "coat", f"clothing_images_men/coat/c{i:02d}.jpg", "a gray coat")
+        items, total = self.index.page("men", "coat", "grey", page=2, page_size=12)
+        self.assertEqual(total, 30)
+        self.assertEqual(items[0], "clothing_images_men/coat/c12.jpg")
+        self.assertEqual(len(self.index.page("men", "coat", "gray", page=3, page_size=12)[0]), 6)
+
+    def test_persistence_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = Path(tmp) / "blip_captions_female.json"
+            cache.write_text(json.dumps(CAPTIONS), encoding="utf-8")
+            built = load_or_build_color_index("women", str(cache))
+            self.assertTrue(index_path_for_cache(str(cache)).exists())
+            loaded = ColorImageIndex(index_path=str(index_path_for_cache(str(cache))))
+            self.assertTrue(loaded.load())
+            self.assertEqual(len(loaded), len(built))
+            self.assertEqual(loaded.lookup("women", "shirt", "red"), built.lookup("women", "shirt", "red"))
+
+    def test_sync_folder(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp) / "shirt"
+            folder.mkdir()
+            for name in ("a.jpg", "b.png", "notes.txt"):
+                (folder / name).write_bytes(b"")
+            captions = {"a.jpg": "a red shirt", "b.png": "a blue shirt"}
+            calls = []
+
+            def caption_for(p):
+                calls.append(p)
+                return captions[os.path.basename(p)]
+
+            self.assertTrue(self.index.sync_folder("women", folder, caption_for))
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(self.index.lookup("women", "shirt", "red")[-1], (folder / "a.jpg").as_posix())
+            # unchanged folder: no rescan
+            self.assertFalse(self.index.sync_folder("women", folder, caption_for))
+            (folder / "a.jpg").unlink()
+            os.utime(folder, ns=(0, 0))
+            self.assertTrue(self.index.sync_folder("women", folder, caption_for))
+            self.assertNotIn((folder / "a.jpg").as_posix(), self.index.lookup("women", "shirt", "red"))
+            self.assertEqual(len(calls), 2)
+
+    def test_sync_folder_retries_only_uncaptioned(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp) / "shirt"
+            folder.mkdir()
+            for name in ("a.jpg", "b.jpg"):
+                (folder / name).write_bytes(b"")
+            captions = {"a.jpg": "a red shirt"}
+            calls = []
+
+            def caption_for(p):
+                calls.append(os.path.basename(p))
+                return captions.get(os.path.basename(p), "")
+
+            self.assertTrue(self.index.sync_folder("women", folder, caption_for))
+            self.assertEqual(sorted(calls), ["a.jpg", "b.jpg"])
+            self.assertTrue(self.index.sync_folder("women", folder, caption_for))
+            self.assertEqual(calls[2:], ["b.jpg"])  # folder not rescanned, only b retried
+            captions["b.jpg"] = "a blue shirt"
+            self.index.sync_folder("women", folder, caption_for)
+            self.assertEqual(self.index.lookup("women", "shirt", "blue"), [(folder / "b.jpg").as_posix()])
+            self.assertFalse(self.index.sync_folder("women", folder, caption_for))
+            self.assertEqual(len(calls), 4)
+
+
+class TestImagesColorFilter(unittest.TestCase):
+
+    def setUp(self):
+        import wearsmart_api
+        self.api = wearsmart_api
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "clothing_images_men"
+        (self.root / "shirt").mkdir(parents=True)
+        self.cache = Path(self.tmp.name) / "blip_captions_male.json"
+        self.captions = {}
+        self.patches = [mock.patch.object(wearsmart_api, "MEN_IMAGES_ROOT", self.root.as_posix()),
+                        mock.patch.dict(wearsmart_api.CAPTION_CACHES, {"men": self.cache.as_posix()}),
+                        mock.patch.dict(wearsmart_api._color_indexes, clear=True)]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in reversed(self.patches):
+            p.stop()
+        self.tmp.cleanup()
+
+    def add_image(self, name, caption):
+        self.captions[f"clothing_images_men\\shirt\\{name}"] = caption
+        self.cache.write_text(json.dumps(self.captions), encoding="utf-8")
+        (self.root / "shirt" / name).write_bytes(b"")
+
+    def images(self, color):
+        return self.api.get_images(gender="men", label="shirt", limit=10, color=color, page=1)["items"]
+
+    def test_men_aliases_and_folder_changes(self):
+        self.add_image("a.jpg", "a taupe shirt")  # taupe is only in the men's alias table
+        self.assertEqual(self.images("beige"), ["/static/men/shirt/a.jpg"])
+        self.add_image("b.jpg", "a silver shirt")  # men fold silver into gray
+        os.utime(self.root / "shirt", ns=(0, 0))  # new mtime even on coarse-timestamp filesystems
+        self.assertEqual(self.images("gray"), ["/static/men/shirt/b.jpg"])
+        (self.root / "shirt" / "a.jpg").unlink()
+        self.assertEqual(self.images("beige"), [])
+        with self.assertRaises(self.api.HTTPException) as ctx:
+            self.images("reddish")
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from bench_flat_forest import notebook_pipeline
+from day_planner import forecast_slots, pick_unused, plan_day, predict_batch, slot_for_hour, slot_features
+from fast_predictor import FastOutfitPredictor
+
+T0 = 1_760_000_400  # 2025-10-09 09:00 UTC
+
+
+def fake_forecast(tz_hours=0, entries=12):
+    """OpenWeather /forecast shaped payload: 3-hour steps starting at T0."""
+    items = []
+    for i in range(entries):
+        items.append({
+            "dt": T0 + i * 3 * 3600,
+            "main": {"temp": 10 + i, "feels_like": 9 + i, "humidity": 50 + i},
+            "wind": {"speed": 2.0},
+            "weather": [{"main": "Rain" if i % 3 == 0 else "Clouds"}],
+        })
+    return {"list": items, "city": {"name": "Lahore", "timezone": tz_hours * 3600}}
+
+
+class TestDayPlanner(unittest.TestCase):
+
+    def test_slot_for_hour(self):
+        self.assertEqual([slot_for_hour(h) for h in (0, 5, 11, 12, 16, 17, 20, 21, 23)],
+                         ["night", "morning", "morning", "afternoon", "afternoon",
+                          "evening", "evening", "night", "night"])
+
+    def test_forecast_grouped_into_next_24h_slots(self):
+        slots = forecast_slots(fake_forecast())
+        # 09,12,15,18 | 21,00,03,06 (UTC) → morning, afternoon, evening, night in order
+        self.assertEqual([s["time_of_day"] for s in slots], ["morning", "afternoon", "evening", "night"])
+        morning, afternoon, evening, night = slots
+        self.assertEqual((morning["temperature"], morning["start"], morning["end"]), (10.0, "09:00", "12:00"))
+        self.assertEqual((afternoon["temperature"], afternoon["weather_condition"]), (11.5, "clouds"))
+        self.assertEqual(night["temperature"], 15.0)  # 21:00 + 00:00 + 03:00; tomorrow's 06:00 is left out
+        self.assertEqual(night["end"], "06:00")
+
+    def test_city_timezone_shifts_slots(self):
+        slots = forecast_slots(fake_forecast(tz_hours=5))  # first entry is 14:00 local
+        self.assertEqual(slots[0]["time_of_day"], "afternoon")
+        self.assertEqual(len(slots), 4)
+        self.assertEqual(forecast_slots({"list": []}), [])
+
+    def test_batch_prediction_matches_single_rows(self):
+        pipeline, _ = notebook_pipeline("enhanced_weather_clothing_dataset_no_accessories.csv", n_estimators=5)
+        slots = forecast_slots(fake_forecast())
+        for s in slots:
+            s["weather_condition"] = "cloudy"
+        rows = slot_features(slots, "winter", "casual", mood="neutral")
+        self.assertEqual(rows[0]["time_of_day"], "morning")
+        import pandas as pd
+
+        single = [tuple(pipeline.predict(pd.DataFrame([r]))[0]) for r in rows]
+        self.assertEqual(predict_batch(pipeline, rows), single)
+        self.assertEqual(predict_batch(pipeline, rows, FastOutfitPredictor.from_pipeline(pipeline)), single)
+
+    def test_images_not_repeated_across_the_day(self):
+        slots = forecast_slots(fake_forecast())
+        outfits = [("shirt", "jeans", "jacket"), ("shirt", "jeans", "none"),
+                   ("shirt", "shorts", "none"), ("shirt", "jeans", "jacket")]
+        folders = {"shirt": ["s1", "s2", "s3", "s4", "s5"], "jeans": ["j1", "j2", "j3"],
+                   "shorts": ["h1"], "jacket": ["k1"]}
+        plan = plan_day(slots, outfits, lambda label: folders.get(label, []), random.Random(0))
+        self.assertEqual([p["outfit"]["top"] for p in plan], ["shirt"] * 4)
+        tops = [p["images"]["top"] for p in plan]
+        self.assertEqual(len(set(tops)), 4)
+        self.assertEqual(len({p["images"]["bottom"] for p in plan if p["outfit"]["bottom"] == "jeans"}), 3)
+        self.assertIsNone(plan[1]["images"]["outer"])
+        self.assertEqual(plan[3]["images"]["outer"], "k1")  # only one jacket: reused rather than empty
+
+    def test_pick_unused(self):
+        used = set()
+        rng = random.Random(1)
+        self.assertEqual(sorted(pick_unused(["a", "b"], used, rng) for _ in range(2)), ["a", "b"])
+        self.assertIn(pick_unused(["a", "b"], used, rng), ("a", "b"))
+        self.assertIsNone(pick_unused([], used, rng))
+
+    def test_api_plan_uses_static_urls(self):
+        import wearsmart_api as api
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for label, n in (("hoodie", 4), ("jeans", 2), ("jacket", 4)):
+                os.makedirs(os.path.join(tmp, label))
+                for i in range(n):
+                    open(os.path.join(tmp, label, f"{label}{i}.jpg"), "wb").close()
+            req = api.PlanRequest(city="Lahore", season="winter", occasion="casual")
+            with mock.patch.object(api, "MEN_IMAGES_ROOT", tmp), mock.patch.object(api._shadow, "enabled", False):
+                plan = api.build_day_plan("men", fake_forecast(), req)
+        self.assertEqual(plan["city"], "Lahore")
+        self.assertEqual([s["weather"]["time_of_day"] for s in plan["slots"]],
+                         ["morning", "afternoon", "evening", "night"])
+        tops = [s["images"]["top"] for s in plan["slots"]]
+        self.assertEqual([s["outfit"]["top"] for s in plan["slots"]], ["Hoodie"] * 4)
+        self.assertEqual(len(set(tops)), 4)
+        self.assertTrue(all(t.startswith("/static/men/hoodie/") for t in tops))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from bench_flat_forest import notebook_pipeline
+from fast_predictor import FastOutfitPredictor, load_fast_predictor, load_flat_model
+
+DATASETS = {
+    "men": "enhanced_weather_clothing_dataset_no_accessories.csv",
+    "women": "enhanced_weather_clothing_dataset_women_balanced_cleaned.csv",
+}
+
+
+class TestFastPredictor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.models = {g: notebook_pipeline(csv, n_estimators=30) for g, csv in DATASETS.items()}
+
+    def test_matches_pipeline_on_datasets(self):
+        for gender, (pipeline, X) in self.models.items():
+            with self.subTest(gender=gender):
+                fast = FastOutfitPredictor.from_pipeline(pipeline)
+                expected = [tuple(r) for r in pipeline.predict(X)]
+                self.assertEqual(fast.predict_many(X.to_dict(orient="records")), expected)
+
+    def test_predict_one_from_dict(self):
+        pipeline, X = self.models["men"]
+        fast = FastOutfitPredictor.from_pipeline(pipeline)
+        row = X.iloc[5].to_dict()
+        self.assertEqual(fast.predict_one(row), tuple(pipeline.predict(pd.DataFrame([row]))[0]))
+        self.assertEqual(set(fast.features), set(X.columns))
+
+    def test_unknown_category_is_ignored_like_sklearn(self):
+        pipeline, X = self.models["women"]
+        fast = FastOutfitPredictor.from_pipeline(pipeline)
+        row = dict(X.iloc[0].to_dict(), weather_condition="volcanic ash", occasion="gala")
+        self.assertEqual(fast.predict_one(row), tuple(pipeline.predict(pd.DataFrame([row]))[0]))
+
+    def test_array_input(self):
+        pipeline, X = self.models["men"]
+        fast = FastOutfitPredictor.from_pipeline(pipeline)
+        encoded = pipeline.named_steps["preprocessor"].transform(X.head(50))
+        encoded = encoded.toarray() if hasattr(encoded, "toarray") else encoded
+        self.assertEqual([tuple(r) for r in fast.predict_array(encoded)],
+                         [tuple(r) for r in pipeline.predict(X.head(50))])
+
+    def test_saved_model_is_memory_mapped(self):
+        pipeline, X = self.models["women"]
+        fast = FastOutfitPredictor.from_pipeline(pipeline)
+        rows = X.to_dict(orient="records")
+        with tempfile.TemporaryDirectory() as tmp:
+            loaded = load_flat_model(fast.save(Path(tmp) / "women.flat"))
+            self.assertEqual(sorted(p.name for p in Path(tmp, "women.flat").iterdir()),
+                             ["feature.npy", "left.npy", "right.npy", "roots.npy", "schema.json",
+                              "threshold.npy", "value.npy"])
+            self.assertIsInstance(loaded.arrays["threshold"].base, np.memmap)
+            self.assertEqual(loaded.predict_many(rows), fast.predict_many(rows))
+            del loaded
+
+    def test_unsupported_layout(self):
+        pipeline, X = self.models["men"]
+        cols = X.select_dtypes(exclude="object").columns.tolist()
+        scaled = Pipeline([
+            ("preprocessor", ColumnTransformer([("num", StandardScaler(), cols)])),
+            ("classifier", pipeline.named_steps["classifier"]),
+        ])
+        self.assertIsNone(load_fast_predictor(scaled))
+
+
+if __name__ == "__main__":
+    unittest.main()
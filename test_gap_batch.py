@@ -0,0 +1,69 @@
+import random
+import unittest
+from collections import Counter
+
+import numpy as np
+
+from gap_batch import BatchGapAnalyzer
+from shopping_recommender_backend import GapAnalyzer, categorize_label
+
+LABELS = ["shirt", "t-shirt", "tops", "kurta", "jeans", "shorts", "capris", "coat", "jacket", "hoodie", "dupatta"]
+COLORS = ["black", "white", "blue", "red", "beige", "navy", "maroon", "gray"]
+
+
+def random_batch(users, seed=0):
+    rng = random.Random(seed)
+    label_counts = np.array([[rng.choice([0, 0, 1, 2, 4]) for _ in LABELS] for _ in range(users)])
+    color_counts = np.array([[rng.choice([0, 1, 2, 3, 6]) for _ in COLORS] for _ in range(users)])
+    return label_counts, color_counts
+
+
+def wardrobe_dict(labels, categories, label_row, color_row):
+    wardrobe = {"tops": {}, "bottoms": {}, "outerwear": {}, "total_items": int(label_row.sum()),
+                "color_distribution": Counter({c: int(n) for c, n in zip(COLORS, color_row) if n})}
+    for label, cat, n in zip(labels, categories, label_row):
+        if n:
+            wardrobe[cat][label] = {"count": int(n), "colors": [], "unique_colors": []}
+    return wardrobe
+
+
+class TestBatchGapAnalyzer(unittest.TestCase):
+
+    def test_matches_gap_analyzer(self):
+        label_counts, color_counts = random_batch(80)
+        categories = [categorize_label(l) for l in LABELS]
+        categories[LABELS.index("hoodie")] = "tops"  # overridden category changes the warm check
+        analyzer = BatchGapAnalyzer(LABELS, categories)
+        for season in ("winter", "autumn", "summer", "spring", "monsoon"):
+            batch = analyzer.analyze(label_counts, color_counts, COLORS, season)
+            for i in range(len(label_counts)):
+                expected = GapAnalyzer(wardrobe_dict(LABELS, categories, label_counts[i], color_counts[i]),
+                                       season).analyze_gaps()
+                self.assertEqual(batch.gaps(i), expected, (season, i))
+
+    def test_compact_records(self):
+        label_counts, color_counts = random_batch(40, seed=5)
+        batch = BatchGapAnalyzer(LABELS).analyze(label_counts, color_counts, COLORS, "winter")
+        records = batch.records()
+        self.assertEqual(len(records), 40)
+        for i, record in enumerate(records):
+            full = batch.gaps(i)
+            self.assertEqual([[r["priority"], r["category"]] for r in full["recommendations"]],
+                             [r[:2] for r in record["recommendations"]])
+            self.assertEqual(record["needed"], {g["category"]: g["needed"] for g in full["quantity_gaps"]})
+            self.assertEqual(record["missing_colors"], full["missing_colors"])
+
+    def test_empty_and_mismatched_input(self):
+        analyzer = BatchGapAnalyzer(LABELS)
+        batch = analyzer.analyze(np.zeros((0, len(LABELS)), int), np.zeros((0, 0), int), [], "summer")
+        self.assertEqual(batch.records(), [])
+        empty = analyzer.analyze(np.zeros((1, len(LABELS)), int), np.zeros((1, 0), int), [], "summer")
+        self.assertEqual(empty.gaps(0), GapAnalyzer(wardrobe_dict(LABELS, [categorize_label(l) for l in LABELS],
+                                                                  np.zeros(len(LABELS), int), np.zeros(len(COLORS), int)),
+                                                    "summer").analyze_gaps())
+        with self.assertRaises(ValueError):
+            analyzer.analyze(np.zeros((2, 3), int), np.zeros((2, 0), int), [], "summer")
+
+
+if __name__ == "__main__":
+    unittest.main()
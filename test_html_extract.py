@@ -0,0 +1,119 @@
+import logging
+import random
+import unittest
+from unittest import mock
+
+import html_extract
+from clothing_web_scraper import ClothingWebScraper
+from scraper_fixture_server import DEFAULT_DIR
+
+logging.disable(logging.WARNING)
+
+URL = "http://o/collections/x"
+PARSERS = ["parse_outfitters_men_shirts", "parse_outfitters_women_shirts", "parse_khaadi_men"]
+
+
+def random_card(rng: random.Random, i: int) -> str:
+    """One product card with the variations the parsers have rules for."""
+    wrap = rng.choice(['div class="product-card"', 'div class="Grid-Cell"', 'article', 'li class="product-item"',
+                       'div class="product-tile"', 'div class="card item"', 'section'])
+    href = rng.choice([f'/products/p{i}', f'/men/p{i}.html', f'https://x.pk/products/p{i}', f'p{i}', ''])
+    img = rng.choice(['', f'<img src="//cdn/p{i}.jpg">', f'<img data-src="/img/p{i}.jpg">',
+                      f'<img src="" data-lazy="i{i}.jpg">'])
+    parts = [f'<a href="{href}">{img}{rng.choice(["", "Shop", f"Link Name {i}"])}</a>' if rng.random() < 0.9 else img]
+    name = rng.choice([f'Oxford Shirt {i}', 'Tee', 'Polo', f'Off-White Navy Linen {i}', '', 'Kurta Black'])
+    name_tag = rng.choice(['h3', 'h2', 'h4 class="title"', 'p class="name"', 'span class="product-title"',
+                           'h5 class="product-name"', 'h3 class="x-title"'])
+    parts.append(f'<{name_tag}> {name} <!-- note --><script>var x=1</script></{name_tag.split()[0]}>')
+    price = rng.choice(['PKR 3,990', 'Sale PKR 2,795', 'Rs 1000', '', 'PKR\n 1,200'])
+    price_tag = rng.choice(['span class="price"', 'div class="cost"', 'span class="sale-price"', 'span',
+                            'div class="money"'])
+    parts.append(f'<{price_tag}>{price}</{price_tag.split()[0]}>')
+    for _ in range(rng.randint(0, 4)):
+        color = rng.choice(['Navy', 'White', 'S', 'XL', 'Slim Fit', '3 colors', 'Red', '', 'x' * 60])
+        color_tag = rng.choice(['span class="swatch"', 'div class="color"', 'span class="color-swatch"',
+                                'span class="swatch-label"'])
+        parts.append(f'<{color_tag}>{color}</{color_tag.split()[0]}>')
+    rng.shuffle(parts)
+    inner = ''.join(parts)
+    if rng.random() < 0.2:
+        inner = f'<div class="inner product-info">{inner}</div>'
+    return f'<{wrap}>{inner}</{wrap.split()[0]}>'
+
+
+def random_page(seed: int) -> bytes:
+    rng = random.Random(seed)
+    body = ''.join(random_card(rng, i) for i in range(rng.randint(0, 70)))
+    if rng.random() < 0.3:
+        body = f'<div class="collection-grid">{body}</div>'
+    return f'<!DOCTYPE html><html><head><title>T</title></head><body><main>{body}</main></body></html>'.encode()
+
+
+class TestHtmlExtract(unittest.TestCase):
+
+    def setUp(self):
+        options = dict(outfitters_base="http://o", khaadi_base="http://k", http_cache_dir=None)
+        self.bs4 = ClothingWebScraper(parser_backend="bs4", **options)
+        self.lxml = ClothingWebScraper(parser_backend="lxml", **options)
+
+    def assertSameProducts(self, content):
+        for method in PARSERS:
+            self.assertEqual(getattr(self.lxml, method)(content, URL), getattr(self.bs4, method)(content, URL))
+        self.assertEqual(self.lxml.parse_outfitters_collection(content, URL, "Shirts", "Men"),
+                         self.bs4.parse_outfitters_collection(content, URL, "Shirts", "Men"))
+
+    def test_fixture_pages_match_beautifulsoup(self):
+        for page in sorted(DEFAULT_DIR.glob("*.html")):
+            with self.subTest(page=page.name):
+                self.assertSameProducts(page.read_bytes())
+        products = self.lxml.parse_khaadi_men((DEFAULT_DIR / "khaadi_men.html").read_bytes(), "http://k/men")
+        self.assertEqual(products[0]["colors"], ["Black"])
+        self.assertEqual(products[0]["product_url"], "http://k/men/kurta-black-101.html")
+
+    def test_generated_pages_match_beautifulsoup(self):
+        for seed in range(40):
+            with self.subTest(seed=seed):
+                self.assertSameProducts(random_page(seed))
+
+    def test_fallback_containers(self):
+        no_classes = b'<html><body><ul><li><a href="/products/a">Alpha Tee</a> PKR 1,000</li>' \
+                     b'<li><a href="/products/b">Beta Tee</a></li></ul></body></html>'
+        upper_case = b'<html><body><div class="Tile PRODUCTBOX"><h3>Gamma Shirt</h3></div></body></html>'
+        text_price = b'<html><body><article><h3>Delta Shirt</h3><span>Now PKR 999</span></article></body></html>'
+        for content in (no_classes, upper_case, text_price, b'', b'<p>nothing</p>'):
+            self.assertSameProducts(content)
+        self.assertEqual(self.lxml.parse_outfitters_men_shirts(text_price, URL)[0]["price"], "PKR 999")
+        self.assertEqual([p["name"] for p in self.lxml.parse_outfitters_women_shirts(no_classes, URL)],
+                         ["Alpha Tee", "Beta Tee"])
+
+    def test_process_pool(self):
+        content = random_page(3)
+        expected = html_extract.extract_products(content, URL, "outfitters_collection", "http://o", "Shirts", "Men")
+        with mock.patch.object(html_extract, "LARGE_PAGE_BYTES", 1), mock.patch.object(html_extract, "POOL_WORKERS", 2):
+            # off by default: in-app scrapes parse in-thread
+            self.assertEqual(self.lxml.parse_outfitters_collection(content, URL, "Shirts", "Men"), expected)
+            self.assertIsNone(html_extract._pool)
+            try:
+                html_extract.use_process_pool()
+                pooled = self.lxml.parse_outfitters_collection(content, URL, "Shirts", "Men")
+                self.assertIsNotNone(html_extract._pool)
+            finally:
+                html_extract.use_process_pool(False)
+        self.assertIsNone(html_extract._pool)
+        self.assertEqual(pooled, expected)
+
+    def test_selectors(self):
+        sel = html_extract.Selector('a[href*="/products/"]')
+        self.assertEqual((sel.tag, sel.attrs), ("a", (("href", "/products/"),)))
+        self.assertEqual(html_extract.Selector('span:contains("PKR")').contains, "PKR")
+        self.assertEqual(html_extract.Selector('.product-card').xpath(),
+                         "//*[contains(concat(' ', normalize-space(@class), ' '), ' product-card ')]")
+        for bad in ('div > a', 'a:hover', ''):
+            with self.assertRaises(ValueError):
+                html_extract.Selector(bad)
+        with self.assertRaises(ValueError):
+            ClothingWebScraper(parser_backend="html5lib")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import logging
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from clothing_web_scraper import ClothingWebScraper
+from http_cache import HttpCache
+from scraper_fixture_server import FixtureServer
+from test_async_scraper import fast_fetcher
+
+logging.disable(logging.WARNING)
+
+
+class TestHttpCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.outfitters = FixtureServer().start()
+        self.khaadi = FixtureServer().start()
+
+    def tearDown(self):
+        self.outfitters.stop()
+        self.khaadi.stop()
+        self.tmp.cleanup()
+
+    def crawl(self, pages=1):
+        scraper = ClothingWebScraper(outfitters_base=self.outfitters.url, khaadi_base=self.khaadi.url,
+                                     http_cache_dir=self.tmp.name, outfitters_source="html")
+        fetcher = fast_fetcher(cache=scraper.http_cache)
+        data = scraper.scrape_all_websites(pages=pages, fetcher=fetcher)
+        return data, scraper.last_crawl_report
+
+    def test_second_crawl_reuses_parsed_products(self):
+        first, report = self.crawl(pages=2)
+        downloaded = report["bytes_downloaded"]
+        self.assertEqual(report["not_modified"], 0)
+        self.assertEqual(report["pages_parsed"], 4)  # women page 2 is a 404
+        self.assertGreater(downloaded, 0)
+
+        second, report = self.crawl(pages=2)  # fresh scraper: state comes from disk
+        self.assertEqual(second, first)
+        self.assertEqual(report["not_modified"], 4)
+        self.assertEqual(report["parses_reused"], 4)
+        self.assertEqual(report["pages_parsed"], 0)
+        self.assertEqual(report["bytes_downloaded"], 0)
+        self.assertEqual(report["bytes_saved"], downloaded)
+        self.assertGreater(report["parse_seconds_saved"], 0)
+
+    def test_changed_page_is_reparsed(self):
+        self.crawl()
+        page = self.outfitters.pages["/collections/men-shirts"]
+        self.outfitters.set_page("/collections/men-shirts", page.replace(b"Oxford Shirt Navy", b"Oxford Shirt White"))
+        data, report = self.crawl()
+        self.assertEqual(report["pages_parsed"], 1)
+        self.assertEqual(report["parses_reused"], 2)
+        self.assertEqual(data["outfitters_men"][0]["name"], "Oxford Shirt White")
+
+    def test_identical_body_without_validators(self):
+        self.outfitters.validators = self.khaadi.validators = False
+        first, _ = self.crawl()
+        second, report = self.crawl()
+        self.assertEqual(second, first)
+        self.assertEqual(report["not_modified"], 0)
+        self.assertEqual(report["parses_reused"], 3)
+        self.assertGreater(report["bytes_downloaded"], 0)
+
+    def test_not_modified_without_cached_body_refetches(self):
+        scraper = ClothingWebScraper(outfitters_base=self.outfitters.url, khaadi_base=self.khaadi.url,
+                                     http_cache_dir=self.tmp.name, outfitters_source="html")
+        first = scraper.scrape_all_websites(fetcher=fast_fetcher(cache=scraper.http_cache))
+        for body in Path(self.tmp.name).glob("*.body"):
+            body.unlink()
+        second = scraper.scrape_all_websites(fetcher=fast_fetcher(cache=scraper.http_cache))
+        self.assertEqual(second, first)
+        self.assertEqual(scraper.last_crawl_report["not_modified"], 0)
+        self.assertEqual(scraper.last_crawl_report["requests"], 6)  # each 304 followed by a plain GET
+
+        _, report = self.crawl()  # a fresh cache ignores entries without a body
+        self.assertEqual(report["requests"], 3)
+        self.assertEqual(report["parses_reused"], 3)
+
+    def test_cache_io_runs_off_the_event_loop(self):
+        threads = set()
+
+        class RecordingCache(HttpCache):
+            def _paths(self, url):
+                threads.add(threading.get_ident())
+                return super()._paths(url)
+
+        for _ in range(2):  # second crawl: 304s read cached bodies and products
+            scraper = ClothingWebScraper(outfitters_base=self.outfitters.url, khaadi_base=self.khaadi.url,
+                                         http_cache_dir=None, outfitters_source="html")
+            scraper.scrape_all_websites(fetcher=fast_fetcher(cache=RecordingCache(self.tmp.name)))
+        self.assertEqual(scraper.last_crawl_report["parses_reused"], 3)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.get_ident(), threads)  # the crawl's loop runs on this thread
+
+    def test_store(self):
+        cache = HttpCache(self.tmp.name)
+        url = "http://shop.test/a"
+        self.assertEqual(cache.conditional_headers(url), {})
+        self.assertFalse(cache.store(url, b"<html>1</html>", {"ETag": '"v1"'}))
+        cache.store_products(url, "P.parse", [{"name": "A"}], 0.5)
+        self.assertEqual(cache.conditional_headers(url), {"If-None-Match": '"v1"'})
+        self.assertTrue(cache.store(url, b"<html>1</html>", {"ETag": '"v1"'}))
+        self.assertEqual(cache.products(url, "P.parse")["products"], [{"name": "A"}])
+        self.assertFalse(cache.store(url, b"<html>2</html>", {"Last-Modified": "Mon, 19 Oct 2026 10:00:00 GMT"}))
+        self.assertIsNone(cache.products(url, "P.parse"))
+        reopened = HttpCache(self.tmp.name)
+        self.assertEqual(reopened.body(url), b"<html>2</html>")
+        self.assertEqual(reopened.conditional_headers(url), {"If-Modified-Since": "Mon, 19 Oct 2026 10:00:00 GMT"})
+
+
+    def test_unreadable_entry_is_logged(self):
+        cache = HttpCache(self.tmp.name)
+        url = "http://shop.test/broken"
+        cache.store(url, b"<html></html>", {"ETag": '"v1"'})
+        meta_path, _ = cache._paths(url)
+        meta_path.write_text("{not json", encoding="utf-8")
+        logging.disable(logging.NOTSET)
+        try:
+            with self.assertLogs("http_cache", level="WARNING"):
+                self.assertIsNone(HttpCache(self.tmp.name).entry(url))
+        finally:
+            logging.disable(logging.WARNING)
+
+if __name__ == "__main__":
+    unittest.main()
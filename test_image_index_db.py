@@ -0,0 +1,92 @@
+import sqlite3
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from bench_image_index_db import synthetic_rows
+from image_index_db import SCHEMA, ImageIndexDB
+
+
+class TestImageIndexDB(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = ImageIndexDB(Path(self.tmp.name) / "data" / "image_index.db", batch_size=50)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_wal_and_reused_connection(self):
+        con = self.db.connection()
+        self.assertIs(con, self.db.connection())
+        self.assertEqual(con.execute("PRAGMA journal_mode").fetchone()[0].lower(), "wal")
+
+    def test_upsert_and_lookup(self):
+        self.db.upsert("a.jpg", "shirt", "a red shirt", ["red"])
+        self.db.upsert("a.jpg", "shirt", "a blue shirt", ["blue"])
+        self.assertEqual(self.db.get_caption("a.jpg"), "a blue shirt")
+        self.assertIsNone(self.db.get_caption("missing.jpg"))
+        self.assertEqual(self.db.count(), 1)
+        self.assertEqual(self.db.sample(5), [("a.jpg", "shirt", "a blue shirt", "blue")])
+
+    def test_batched_writer(self):
+        rows = synthetic_rows(120)
+        with self.db.writer() as w:
+            for i, row in enumerate(rows, start=1):
+                w.add(*row)
+                if i == 100:
+                    self.assertEqual(w.written, 100)  # two full batches committed
+        self.assertEqual(w.written, 120)
+        self.assertEqual(self.db.existing_paths(), {r[0] for r in rows})
+
+    def test_connection_per_thread(self):
+        self.db.upsert("a.jpg", "shirt", "a red shirt", ["red"])
+        seen = []
+
+        def worker():
+            seen.append((self.db.connection(), self.db.get_caption("a.jpg")))
+            self.db.close()
+
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+        self.assertIsNot(seen[0][0], self.db.connection())
+        self.assertEqual(seen[0][1], "a red shirt")
+
+    def test_query_by_color_uses_tags_and_captions(self):
+        self.db.upsert("a.jpg", "shirt", "a red shirt", ["red"])
+        self.db.upsert("b.jpg", "shirt", "a navy-blue shirt", ["blue"])
+        self.db.upsert("c.jpg", "coat", "a sky-blue coat", [])
+        self.db.upsert("d.jpg", "coat", "a tailored coat", [])
+        blue = {r[0] for r in self.db.query_by_color("blue", ["blue", "sky-blue"])}
+        self.assertEqual(blue, {"b.jpg", "c.jpg"})
+        # whole words only: "tailored" is not "red"
+        self.assertEqual([r[0] for r in self.db.query_by_color("red", ["red"])], ["a.jpg"])
+        # re-tagging replaces both the color rows and the caption index entry
+        self.db.upsert("a.jpg", "shirt", "a green shirt", ["green"])
+        self.assertEqual(self.db.query_by_color("red", ["red"]), [])
+        self.assertEqual(len(self.db.query_by_color("blue", ["blue"], limit=1)), 1)
+
+    def test_backfills_existing_database(self):
+        path = Path(self.tmp.name) / "legacy.db"
+        with sqlite3.connect(path.as_posix()) as con:
+            con.execute(SCHEMA[0])
+            con.execute("INSERT INTO images (path, label, caption, colors) VALUES (?, ?, ?, ?)",
+                        ("old.jpg", "shirt", "a charcoal shirt", "gray,white"))
+        db = ImageIndexDB(path)
+        self.assertEqual([r[0] for r in db.query_by_color("white")], ["old.jpg"])
+        self.assertEqual([r[0] for r in db.query_by_color("gray", ["charcoal"])], ["old.jpg"])
+        db.close()
+
+    def test_sample_without_repeats(self):
+        self.db.upsert_many(synthetic_rows(500))
+        rows = self.db.sample(24)
+        self.assertEqual(len(rows), 24)
+        self.assertEqual(len({r[0] for r in rows}), 24)
+        self.assertEqual(len(self.db.sample(1000)), 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
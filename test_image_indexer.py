@@ -0,0 +1,106 @@
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from color_extraction import get_men_extractor
+from image_index_db import ImageIndexDB
+from image_indexer import clean_caption, extract_colors, refresh_index, scan_images
+
+
+class TestImageIndexer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "clothing_images_men"
+        for label, names in {"shirt": ["a.jpg", "b.png", "notes.txt"], "jeans": ["c.jpg"]}.items():
+            (self.root / label).mkdir(parents=True)
+            for name in names:
+                (self.root / label / name).write_bytes(b"x")
+        self.db = ImageIndexDB(Path(self.tmp.name) / "index.db", batch_size=4)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def caption(self, path: str) -> str:
+        with self.lock:
+            self.calls.append(os.path.basename(path))
+        return f"a navy blue {Path(path).parent.name}"
+
+    def refresh(self, **kw):
+        return refresh_index(self.db, self.root, self.caption, extract_colors, workers=3, **kw)
+
+    def path(self, label: str, name: str) -> str:
+        return str((self.root / label / name).resolve())
+
+    def test_scan(self):
+        items = scan_images(self.root)
+        self.assertEqual(sorted(i[1] for i in items),
+                         sorted([self.path("jeans", "c.jpg"), self.path("shirt", "a.jpg"), self.path("shirt", "b.png")]))
+        self.assertEqual(scan_images(self.root / "missing"), [])
+
+    def test_unchanged_tree_is_skipped(self):
+        report = self.refresh()
+        self.assertEqual((report["indexed"], report["skipped"]), (3, 0))
+        self.assertEqual(self.db.get_caption(self.path("jeans", "c.jpg")), "a navy blue jeans")
+        self.calls.clear()
+        report = self.refresh()
+        self.assertEqual((report["indexed"], report["skipped"]), (0, 3))
+        self.assertEqual(self.calls, [])
+
+    def test_modified_and_deleted_files(self):
+        self.refresh()
+        self.calls.clear()
+        (self.root / "shirt" / "a.jpg").write_bytes(b"bigger")
+        (self.root / "jeans" / "c.jpg").unlink()
+        report = self.refresh()
+        self.assertEqual(self.calls, ["a.jpg"])
+        self.assertEqual(report["pruned"], 1)
+        self.assertIsNone(self.db.get_caption(self.path("jeans", "c.jpg")))
+        self.assertEqual(self.db.count(), 2)
+
+    def test_legacy_rows_are_restamped_not_recaptioned(self):
+        self.db.upsert(self.path("shirt", "a.jpg"), "shirt", "old caption", [])
+        report = self.refresh()
+        self.assertEqual(report["restamped"], 1)
+        self.assertNotIn("a.jpg", self.calls)
+        self.assertEqual(self.db.get_caption(self.path("shirt", "a.jpg")), "old caption")
+
+    def test_failures_resume_on_next_run(self):
+        def flaky(path):
+            if path.endswith("b.png"):
+                raise RuntimeError("out of memory")
+            return self.caption(path)
+
+        report = refresh_index(self.db, self.root, flaky, extract_colors, workers=2)
+        self.assertEqual((report["indexed"], report["failed"]), (2, 1))
+        self.calls.clear()
+        report = self.refresh()
+        self.assertEqual(self.calls, ["b.png"])
+        self.assertEqual(report["indexed"], 1)
+
+    def test_one_caption_at_a_time_by_default(self):
+        threads = set()
+
+        def caption(path):
+            threads.add(threading.get_ident())
+            return self.caption(path)
+
+        report = refresh_index(self.db, self.root, caption, extract_colors)
+        self.assertEqual(report["indexed"], 3)
+        self.assertEqual(len(threads), 1)
+
+    def test_caption_helpers(self):
+        self.assertEqual(clean_caption("Top: a navy blue shirt."), "a navy blue shirt")
+        # color_extraction's tables, as in the color index: navy folds into blue
+        self.assertEqual(extract_colors("a dark grey and navy-blue coat"), ["gray", "blue"])
+        self.assertEqual(extract_colors("a silver and taupe coat"), ["silver"])
+        self.assertEqual(extract_colors("a silver and taupe coat", extractor=get_men_extractor()), ["gray", "beige"])
+
+
+if __name__ == "__main__":
+    unittest.main()
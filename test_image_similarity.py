@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from bench_image_similarity import synthetic_vectors
+from image_similarity import EMBED_DIM, LabelSimilarityIndex, SimilarityStore, compute_embedding
+
+
+def save_image(path: Path, rgb, stripes=None):
+    img = np.full((40, 30, 3), rgb, dtype=np.uint8)
+    if stripes is not None:
+        img[::4] = stripes
+    Image.fromarray(img).save(path)
+
+
+class TestImageSimilarity(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "clothing_images"
+        self.folder = self.root / "shirt"
+        self.folder.mkdir(parents=True)
+        save_image(self.folder / "red.png", (200, 20, 20))
+        save_image(self.folder / "dark_red.png", (170, 15, 25))
+        save_image(self.folder / "blue.png", (20, 30, 200))
+        save_image(self.folder / "blue_striped.png", (20, 30, 200), stripes=(255, 255, 255))
+        (self.folder / "notes.txt").write_text("not an image")
+        self.cache = Path(self.tmp.name) / "image_embeddings.npz"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_embedding_is_compact_and_normalized(self):
+        vec = compute_embedding(str(self.folder / "red.png"))
+        self.assertEqual(vec.dtype, np.float16)
+        self.assertEqual(vec.shape, (EMBED_DIM,))
+        self.assertAlmostEqual(float(np.linalg.norm(vec.astype(np.float32))), 1.0, places=2)
+        self.assertIsNone(compute_embedding(str(self.folder / "notes.txt")))
+
+    def test_nearest_neighbour_by_color(self):
+        store = SimilarityStore(self.root, str(self.cache))
+        index = store.for_label("shirt")
+        self.assertEqual(len(index), 4)
+        red = (self.folder / "red.png").as_posix()
+        hits = index.neighbours(red, k=3)
+        self.assertEqual(hits[0][0], (self.folder / "dark_red.png").as_posix())
+        self.assertNotIn(red, [h for h, _ in hits])
+
+    def test_next_similar_walks_neighbours_without_repeats(self):
+        store = SimilarityStore(self.root, str(self.cache))
+        history = {}
+        current = (self.folder / "blue.png").as_posix()
+        shown = []
+        for _ in range(3):
+            current = store.next_similar("shirt", current, history)
+            shown.append(current)
+        self.assertEqual(shown[0], (self.folder / "blue_striped.png").as_posix())
+        self.assertEqual(len(set(shown)), 3)
+        # all shown: cycles back to the closest one
+        self.assertEqual(store.next_similar("shirt", current, history), shown[0])
+
+    def test_cache_reuses_unchanged_embeddings(self):
+        SimilarityStore(self.root, str(self.cache)).for_label("shirt")
+        self.assertTrue(self.cache.exists())
+        (self.folder / "blue.png").unlink()
+        os.utime(self.folder, ns=(0, 0))
+        store = SimilarityStore(self.root, str(self.cache))
+        self.assertEqual(len(store._vectors), 4)
+        self.assertEqual(len(store.for_label("shirt")), 3)
+        self.assertEqual(len(store._vectors), 3)
+
+    def test_ann_matches_brute_force(self):
+        vecs = synthetic_vectors(3000)
+        ids = [str(i) for i in range(len(vecs))]
+        brute = LabelSimilarityIndex(ids, vecs, ann_threshold=10_000)
+        ann = LabelSimilarityIndex(ids, vecs, ann_threshold=100)
+        self.assertFalse(brute.uses_ann)
+        self.assertTrue(ann.uses_ann)
+        recall = []
+        for q in ids[:50]:
+            exact = {h for h, _ in brute.neighbours(q, k=10)}
+            approx = {h for h, _ in ann.neighbours(q, k=10)}
+            recall.append(len(exact & approx) / 10.0)
+        self.assertGreaterEqual(np.mean(recall), 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
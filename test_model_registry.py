@@ -0,0 +1,117 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from bench_flat_forest import notebook_pipeline
+from model_registry import ActiveModel, ModelRegistry, RegistryError
+
+MEN_CSV = "enhanced_weather_clothing_dataset_no_accessories.csv"
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pipeline_a, cls.X = notebook_pipeline(MEN_CSV, n_estimators=5)
+        cls.pipeline_b, _ = notebook_pipeline(MEN_CSV, n_estimators=7)
+        cls.row = cls.X.iloc[3].to_dict()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(Path(self.tmp.name) / "registry")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_register_records_metadata_and_checksums(self):
+        v1 = self.registry.register("outfit_men", self.pipeline_a, source="a.pkl")
+        v2 = self.registry.register("outfit_men", self.pipeline_b)
+        self.assertEqual((v1, v2), ("v1", "v2"))
+        self.assertEqual(self.registry.versions("outfit_men"), ["v1", "v2"])
+        meta = self.registry.meta("outfit_men", "v1")
+        self.assertTrue(meta["flat"])
+        self.assertEqual(set(meta["features"]), set(self.X.columns))
+        self.assertIn("model.joblib", meta["checksums"])
+        self.assertIn("flat/threshold.npy", meta["checksums"])
+        self.assertTrue(self.registry.verify("outfit_men", "v1"))
+        self.assertIsNone(self.registry.active_version("outfit_men"))
+
+    def test_load_uses_mmapped_flat_arrays(self):
+        self.registry.register("outfit_men", self.pipeline_a, activate=True)
+        loaded = self.registry.load("outfit_men")
+        self.assertEqual((loaded.version, loaded.backend), ("v1", "flat"))
+        expected = tuple(self.pipeline_a.predict(self.X.iloc[[3]])[0])
+        self.assertEqual(loaded.predict_one(self.row), expected)
+        self.assertIsInstance(loaded.predictor.arrays["left"].base, np.memmap)
+
+    def test_unsupported_pipeline_falls_back_to_joblib(self):
+        cols = self.X.select_dtypes(exclude="object").columns.tolist()
+        scaled = Pipeline([
+            ("preprocessor", ColumnTransformer([("num", StandardScaler(), cols)])),
+            ("classifier", self.pipeline_a.named_steps["classifier"]),
+        ]).fit(self.X[cols], self.pipeline_a.predict(self.X))
+        self.registry.register("outfit_men", scaled, activate=True)
+        self.assertFalse(self.registry.meta("outfit_men", "v1")["flat"])
+        loaded = self.registry.load("outfit_men")
+        self.assertEqual(loaded.backend, "joblib")
+        self.assertEqual(loaded.predict_one(self.row), tuple(scaled.predict(self.X.iloc[[3]][cols])[0]))
+
+    def test_load_does_not_rehash_unchanged_artifacts(self):
+        self.registry.register("outfit_men", self.pipeline_a, activate=True)
+        with mock.patch("model_registry.hashlib.sha256", side_effect=AssertionError("rehashed on load")):
+            self.assertEqual(self.registry.load("outfit_men").backend, "flat")
+
+    def test_tampered_artifact_is_rejected(self):
+        self.registry.register("outfit_men", self.pipeline_a)
+        target = self.registry.root / "outfit_men" / "v1" / "flat" / "threshold.npy"
+        target.write_bytes(target.read_bytes()[:-8] + b"\0" * 8)
+        self.assertFalse(self.registry.verify("outfit_men", "v1"))
+        with self.assertRaises(RegistryError):
+            self.registry.activate("outfit_men", "v1")
+        with self.assertRaises(RegistryError):
+            self.registry.load("outfit_men", "v1")
+
+    def test_lazy_load_and_hot_swap(self):
+        self.registry.register("outfit_men", self.pipeline_a, activate=True)
+        self.registry.register("outfit_men", self.pipeline_b)
+        slot = ActiveModel(self.registry, "outfit_men")
+        self.assertIsNone(slot.current)
+        before = slot.get()
+        self.assertEqual(before.version, "v1")
+        after = slot.swap("v2")
+        self.assertEqual((after.version, slot.get().version), ("v2", "v2"))
+        self.assertEqual(self.registry.active_version("outfit_men"), "v2")
+        # a request that started before the swap still holds a working model
+        self.assertEqual(before.predict_one(self.row), tuple(self.pipeline_a.predict(self.X.iloc[[3]])[0]))
+        with self.assertRaises(RegistryError):
+            slot.swap("v9")
+        self.assertEqual(slot.get().version, "v2")
+
+    def test_other_worker_follows_active_pointer(self):
+        self.registry.register("outfit_men", self.pipeline_a, activate=True)
+        self.registry.register("outfit_men", self.pipeline_b)
+        worker = ActiveModel(self.registry, "outfit_men", check_interval=0)
+        self.assertEqual(worker.get().version, "v1")
+        ActiveModel(self.registry, "outfit_men").swap("v2")  # admin call in another worker
+        self.assertEqual(worker.get().version, "v1")  # keeps serving while reloading
+        for _ in range(200):
+            if worker.current.version == "v2":
+                break
+            time.sleep(0.01)
+        self.assertEqual(worker.current.version, "v2")
+
+    def test_no_active_version(self):
+        slot = ActiveModel(self.registry, "outfit_women")
+        self.assertIsNone(slot.get())
+        self.assertIn("No active version", slot.error)
+
+
+if __name__ == "__main__":
+    unittest.main()
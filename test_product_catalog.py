@@ -0,0 +1,166 @@
+import json
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from catalog_refresher import CatalogRefresher
+from clothing_web_scraper import ClothingWebScraper
+from dynamic_shopping_recommender import DynamicShoppingRecommender
+from product_catalog import ProductCatalog, price_minor, shared_catalog, to_minor
+from scraper_fixture_server import FixtureServer
+
+logging.disable(logging.WARNING)
+
+
+def product(name, price, colors, category="shirts", gender="men", website="Outfitters"):
+    slug = name.lower().replace(" ", "-")
+    return {"name": name, "price": price, "colors": colors, "image_url": f"https://cdn.example/{slug}.jpg",
+            "product_url": f"https://example.com/products/{slug}", "website": website,
+            "category": category, "gender": gender}
+
+
+SCRAPED = {
+    "outfitters_men": [
+        product("Oxford Shirt", "PKR 3,990", ["Navy", "White"]),
+        product("Linen Shirt Beige", "PKR 2,490", []),
+        product("Slim Jeans", "PKR 4,500", ["Dark Blue"], category="jeans"),
+        product("Bomber Jacket", "Price not available", ["Olive Green"], category="jacket"),
+    ],
+    "outfitters_women": [
+        product("Poplin Shirt", "PKR 1,999.50", ["Blue"], gender="women"),
+    ],
+}
+
+
+class TestProductCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.catalog = ProductCatalog(Path(self.tmp.name) / "catalog.db")
+        self.catalog.ingest(SCRAPED)
+
+    def tearDown(self):
+        self.catalog.close()
+        self.tmp.cleanup()
+
+    def test_price_minor(self):
+        self.assertEqual(price_minor("PKR 3,990"), 399000)
+        self.assertEqual(price_minor("PKR 1,999.50"), 199950)
+        self.assertIsNone(price_minor("Price not available"))
+
+    def test_color_queries_use_canonical_colors(self):
+        self.assertEqual(self.catalog.count(), 5)
+        self.assertEqual([p["name"] for p in self.catalog.by_color("light blue", "men")], ["Slim Jeans"])
+        self.assertEqual([p["name"] for p in self.catalog.by_color("Blue")], ["Slim Jeans", "Poplin Shirt"])
+        self.assertEqual([p["name"] for p in self.catalog.by_color("white", "women")], [])
+        # color named only in the title, label kept as scraped
+        beige = self.catalog.by_color("beige", "men")
+        self.assertEqual([p["name"] for p in beige], ["Linen Shirt Beige"])
+        self.assertEqual(beige[0]["colors"], [])
+        self.assertEqual(set(beige[0]), set(SCRAPED["outfitters_men"][0]))
+
+    def test_category_and_price_search(self):
+        self.assertEqual([p["name"] for p in self.catalog.by_category("shirt", "men")],
+                         ["Oxford Shirt", "Linen Shirt Beige"])
+        self.assertEqual([p["name"] for p in self.catalog.by_category("outerwear", "men")], ["Bomber Jacket"])
+        under = self.catalog.search(gender="men", max_price_minor=400000, order_by_price=True)
+        self.assertEqual([p["name"] for p in under], ["Linen Shirt Beige", "Oxford Shirt"])
+        self.assertEqual([p["name"] for p in self.catalog.search(category="tops", color="white")],
+                         ["Oxford Shirt"])
+
+    def test_price_index_budget_queries(self):
+        index = self.catalog.price_index("men")
+        self.assertEqual(len(index), 3)  # the jacket has no price
+        self.assertEqual([p["name"] for p in index.range("men", "tops", max_price_minor=to_minor(3000))],
+                         ["Linen Shirt Beige"])
+        self.assertEqual([p["name"] for p in index.range("men", "shirts", min_price_minor=to_minor(2490))],
+                         ["Linen Shirt Beige", "Oxford Shirt"])
+        self.assertEqual([p["name"] for p in index.under("men", "tops", to_minor(5000), colors=["Navy", "Red"])],
+                         ["Oxford Shirt"])
+        self.assertEqual(index.under("men", "bottoms", to_minor(4499.99)), [])
+        self.assertIs(self.catalog.price_index("men"), index)
+
+        self.catalog.upsert_products("outfitters_men", [product("Twill Chinos", "PKR 2,990", ["Khaki"], "trousers")])
+        index = self.catalog.price_index("men")
+        self.assertEqual([p["name"] for p in index.range("men", "bottoms")], ["Twill Chinos", "Slim Jeans"])
+
+    def test_shared_catalog_per_db_path(self):
+        db = Path(self.tmp.name) / "shared.db"
+        catalog = shared_catalog(db)
+        self.assertIs(shared_catalog(db.as_posix()), catalog)
+        self.assertIsNot(shared_catalog(Path(self.tmp.name) / "other.db"), catalog)
+
+    def test_shopping_list_budget(self):
+        self.catalog.upsert_products("outfitters_women", [
+            product("Satin Shirt", "PKR 3,490", ["Green"], gender="women"),
+            product("Linen Top", "PKR 2,790", ["Beige"], category="top", gender="women"),
+        ])
+        with tempfile.TemporaryDirectory() as images_root:
+            recommender = DynamicShoppingRecommender(images_root, gender="women", catalog=self.catalog,
+                                                     refresher=CatalogRefresher(self.catalog))
+            web_products = recommender._get_available_products()
+            gaps = {"missing_colors": ["Beige"], "seasonal_needs": web_products["women_tops"]}
+            text, images, links = recommender._format_shopping_list(gaps, web_products, budget=3000)
+        self.assertIn("💰 Budget: up to PKR 3,000", text)
+        self.assertNotIn("Satin Shirt", text)
+        self.assertLess(text.index("Linen Top"), text.index("Poplin Shirt"))  # missing color first
+        self.assertEqual(links[:2], ["https://example.com/products/linen-top",
+                                     "https://example.com/products/poplin-shirt"])
+        unbounded, _, _ = recommender._format_shopping_list(gaps, web_products)
+        self.assertIn("Satin Shirt", unbounded)
+
+    def test_upsert_updates_and_replace_drops_stale(self):
+        updated = dict(SCRAPED["outfitters_men"][0], price="PKR 2,990", colors=["Red"])
+        self.catalog.upsert_products("outfitters_men", [updated])
+        self.assertEqual(self.catalog.count(), 5)
+        self.assertEqual(self.catalog.by_color("red")[0]["price"], "PKR 2,990")
+        self.assertEqual([p["name"] for p in self.catalog.by_color("white")], [])
+
+        self.catalog.upsert_products("outfitters_men", [updated], replace=True)
+        self.assertEqual(self.catalog.count(), 2)
+        self.assertEqual(self.catalog.by_category("jeans"), [])
+        self.assertEqual(self.catalog.slices()["outfitters_men"]["products"], 1)
+        self.assertEqual(self.catalog.slices()["outfitters_women"]["products"], 1)
+
+    def test_failed_upsert_does_not_cache_category(self):
+        with self.assertRaises(TypeError):  # colors can't be serialized → transaction rolls back
+            self.catalog.upsert_products("outfitters_men", [product("Cargo Shorts", "PKR 2,290", [object()],
+                                                                    category="shorts")])
+        self.catalog.upsert_products("outfitters_men", [product("Cargo Shorts", "PKR 2,290", ["Khaki"],
+                                                                category="shorts")])
+        self.assertEqual([p["name"] for p in self.catalog.search(category="shorts")], ["Cargo Shorts"])
+
+    def test_import_json_and_scraper_lookups(self):
+        catalog = ProductCatalog(Path(self.tmp.name) / "imported.db")
+        filename = Path(self.tmp.name) / "scraped.json"
+        filename.write_text(json.dumps(SCRAPED), encoding="utf-8")
+        self.assertEqual(catalog.import_json(filename), {"outfitters_men": 4, "outfitters_women": 1})
+        scraper = ClothingWebScraper(http_cache_dir=None, catalog=catalog)
+        self.assertEqual([p["name"] for p in scraper.get_products_by_color("Light Blue", "women")], ["Poplin Shirt"])
+        self.assertEqual(len(scraper.get_products_by_category("jeans")), 1)
+        catalog.close()
+
+    def test_recommender_buckets_from_catalog(self):
+        with tempfile.TemporaryDirectory() as images_root, FixtureServer() as server:
+            # khaadi_men is missing from SCRAPED; let the refresher fetch it from the fixtures
+            refresher = CatalogRefresher(self.catalog, scraper_factory=lambda: ClothingWebScraper(
+                outfitters_base=server.url, khaadi_base=server.url, http_cache_dir=None))
+            recommender = DynamicShoppingRecommender(images_root, gender="women", catalog=self.catalog,
+                                                     refresher=refresher)
+            buckets = recommender._get_available_products()
+            self.assertEqual([p["name"] for p in buckets["women_tops"]], ["Poplin Shirt"])
+            self.assertEqual(buckets["women_bottoms"], [])
+
+            recommender = DynamicShoppingRecommender(images_root, gender="men", catalog=self.catalog,
+                                                     refresher=refresher)
+            refresher.drain()
+            self.assertEqual(self.catalog.slices()["khaadi_men"]["products"], 2)
+            recommender.preferred_category = "jeans"
+            buckets = recommender._get_available_products()
+            self.assertEqual([p["name"] for p in buckets["men_bottoms"]], ["Slim Jeans"])
+            self.assertEqual(buckets["men_tops"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from season_classifier import load_grouped, train
+from season_service import SeasonClassifierService, normalize_article_type
+
+
+class TestSeasonService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pipeline, cls.mlb, _, _ = train()
+        cls.known = load_grouped()["articleType"].tolist()
+
+    def service(self, **kwargs):
+        return SeasonClassifierService(self.pipeline, self.mlb, known=self.known, **kwargs)
+
+    def test_lookup_matches_model(self):
+        service = self.service()
+        self.assertEqual(len(service.lookup), len(set(self.known)))
+        self.assertEqual(service.model_calls, 1)  # whole vocabulary in one batch
+        expected = self.mlb.inverse_transform(self.pipeline.predict(["jackets", "tshirts"]))
+        result = service.classify(["Jackets", " TSHIRTS "])
+        self.assertEqual(result["Jackets"]["source"], "lookup")
+        self.assertEqual(set(result["Jackets"]["seasons"]), set(expected[0]))
+        self.assertEqual(set(result[" TSHIRTS "]["seasons"]), set(expected[1]))
+        self.assertEqual(service.model_calls, 1)
+
+    def test_unknowns_are_batched_and_cached(self):
+        service = self.service()
+        result = service.classify(["denim jacket", "Formal_Pants", "formal pants", "linen kurta", ""])
+        self.assertEqual(service.model_calls, 2)  # one batch for all misses
+        self.assertEqual(result["Formal_Pants"], result["formal pants"])
+        self.assertEqual(result["denim jacket"]["source"], "model")
+        self.assertEqual(result[""], {"seasons": [], "source": "none"})
+        again = service.classify(["denim jacket"])
+        self.assertEqual(again["denim jacket"]["source"], "cache")
+        self.assertEqual(again["denim jacket"]["seasons"], result["denim jacket"]["seasons"])
+        self.assertEqual(service.model_calls, 2)
+        self.assertEqual(list(result), ["denim jacket", "Formal_Pants", "formal pants", "linen kurta", ""])
+
+    def test_lru_eviction(self):
+        service = self.service(cache_size=2)
+        service.classify(["a coat", "b coat"])
+        service.classify(["a coat"])          # refresh a
+        service.classify(["c coat"])          # evicts b
+        self.assertEqual(list(service._cache), ["a coat", "c coat"])
+
+    def test_without_model_uses_dataset_labels(self):
+        service = SeasonClassifierService(labels={"Puffer Jacket": ["winter", "fall", "fall"]})
+        self.assertFalse(service.ready)
+        self.assertEqual(service.seasons_for("puffer_jacket"), ["fall", "winter"])
+        self.assertEqual(service.classify(["kimono"])["kimono"], {"seasons": [], "source": "none"})
+        self.assertEqual(normalize_article_type(" Puffer_Jacket "), "puffer jacket")
+
+    def test_wardrobe_endpoint(self):
+        import wearsmart_api as api
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for label, n in (("jackets", 2), ("shorts", 3), ("none", 1), ("empty", 0)):
+                os.makedirs(os.path.join(tmp, label))
+                for i in range(n):
+                    open(os.path.join(tmp, label, f"{i}.jpg"), "wb").close()
+            with mock.patch.object(api, "MEN_IMAGES_ROOT", tmp), \
+                    mock.patch.object(api, "_season_service", self.service()):
+                result = api.wardrobe_seasons("men")
+                batch = api.classify_seasons(api.SeasonRequest(article_types=["jackets", "shorts"]))
+        self.assertEqual(set(result["items"]), {"jackets", "shorts"})
+        self.assertEqual(result["items"]["jackets"]["count"], 2)
+        for season, n in result["season_counts"].items():
+            expected = sum(i["count"] for i in result["items"].values() if season in i["seasons"])
+            self.assertEqual(n, expected)
+            self.assertEqual(season in result["missing_seasons"], n == 0)
+        self.assertEqual(batch["items"]["jackets"]["seasons"], result["items"]["jackets"]["seasons"])
+
+
+if __name__ == "__main__":
+    unittest.main()
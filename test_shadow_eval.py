@@ -0,0 +1,93 @@
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from bench_flat_forest import notebook_pipeline
+from model_registry import ActiveModel, ModelRegistry
+from shadow_eval import ShadowEvaluator, ml_features, normalize_label
+
+
+class FakeModel:
+    def __init__(self, outputs, version="v1", delay=None):
+        self.version = version
+        self.outputs = list(outputs)
+        self.delay = delay
+
+    def predict_one(self, features):
+        if self.delay:
+            self.delay.wait()
+        return self.outputs.pop(0)
+
+
+class FakeSlot:
+    def __init__(self, model):
+        self.model = model
+        self.error = "no active version"
+
+    def get(self):
+        return self.model
+
+
+class TestShadowEval(unittest.TestCase):
+
+    def test_normalization(self):
+        self.assertEqual(normalize_label("men", "T-Shirt"), normalize_label("men", "t-shirt"))
+        self.assertEqual(normalize_label("women", "Puffer_Jacket"), "puffer jacket")
+        self.assertEqual(normalize_label("men", "cotton pants"), "pants")
+        self.assertEqual(normalize_label("women", "trousers"), "trousers")
+        self.assertEqual(ml_features({"mood": "Neutral", "season": "autumn", "temperature": 12.5}),
+                         {"mood": "neutral", "season": "fall", "temperature": 12.5})
+
+    def test_agreement_and_latency(self):
+        model = FakeModel([("shirt", "jeans", "none"), ("hoodie", "jeans", "jacket"),
+                           ("formal shirt", "cotton pants", "coat")])
+        shadow = ShadowEvaluator({"men": FakeSlot(model)})
+        shadow.submit("men", {}, ("Shirt", "Jeans", "None"))
+        shadow.submit("men", {}, ("T-Shirt", "Jeans", "Jacket"))
+        shadow.submit("men", {}, ("Shirt", "Pants", "Jacket"))
+        shadow.drain()
+        stats = shadow.snapshot()["men"]
+        self.assertEqual(stats["window"], 3)
+        self.assertEqual(stats["agreement"], {"top": 0.6667, "bottom": 1.0, "outer": 0.6667, "outfit": 0.3333})
+        self.assertEqual(stats["disagreements"]["top"], {"t shirt → hoodie": 1})
+        self.assertEqual(stats["versions"], {"v1": 3})
+        self.assertLessEqual(stats["latency_ms"]["p50"], stats["latency_ms"]["max"])
+
+    def test_request_path_never_blocks(self):
+        gate = threading.Event()
+        model = FakeModel([("shirt", "jeans", "none")] * 10, delay=gate)
+        shadow = ShadowEvaluator({"men": FakeSlot(model)}, queue_size=2)
+        accepted = [shadow.submit("men", {}, ("Shirt", "Jeans", "None")) for _ in range(6)]
+        self.assertGreaterEqual(accepted.count(False), 3)  # worker holds 1, queue holds 2
+        self.assertEqual(shadow.dropped, accepted.count(False))
+        gate.set()
+        shadow.drain()
+        self.assertEqual(shadow.snapshot()["men"]["window"], accepted.count(True))
+
+    def test_errors_are_recorded(self):
+        shadow = ShadowEvaluator({"women": FakeSlot(None)})
+        shadow.submit("women", {}, ("Tops", "Jeans", "None"))
+        shadow.drain()
+        stats = shadow.snapshot()["women"]
+        self.assertEqual((stats["errors"], stats["window"]), (1, 0))
+        self.assertFalse(ShadowEvaluator({"men": FakeSlot(None)}, enabled=False).submit("men", {}, ()))
+
+    def test_registry_model_in_shadow(self):
+        pipeline, X = notebook_pipeline("enhanced_weather_clothing_dataset_no_accessories.csv", n_estimators=5)
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = ModelRegistry(Path(tmp))
+            registry.register("outfit_men", pipeline, activate=True)
+            shadow = ShadowEvaluator({"men": ActiveModel(registry, "outfit_men")})
+            row = X.iloc[0].to_dict()
+            expected = tuple(pipeline.predict(X.iloc[[0]])[0])
+            request = dict(row, mood=row["mood"].capitalize())  # API casing
+            shadow.submit("men", request, expected)
+            shadow.drain()
+            stats = shadow.snapshot()["men"]
+        self.assertEqual(stats["agreement"]["outfit"], 1.0)
+        self.assertEqual(stats["errors"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
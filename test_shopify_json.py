@@ -0,0 +1,87 @@
+import json
+import logging
+import unittest
+
+from clothing_web_scraper import ClothingWebScraper
+from scraper_fixture_server import FixtureServer
+from test_async_scraper import fast_fetcher
+
+logging.disable(logging.WARNING)
+
+MEN_FEED = "/collections/men-shirts/products.json?limit=250"
+WOMEN_FEED = "/collections/women-shirts/products.json?limit=250"
+
+
+class TestShopifyJson(unittest.TestCase):
+
+    def setUp(self):
+        self.outfitters = FixtureServer().start()
+        self.khaadi = FixtureServer().start()
+        self.scraper = ClothingWebScraper(outfitters_base=self.outfitters.url, khaadi_base=self.khaadi.url,
+                                          http_cache_dir=None)
+
+    def tearDown(self):
+        self.outfitters.stop()
+        self.khaadi.stop()
+
+    def test_crawl_reads_products_feed(self):
+        fetcher = fast_fetcher()
+        data = self.scraper.scrape_all_websites(pages=2, fetcher=fetcher)
+        men = data["outfitters_men"]
+        self.assertEqual([p["name"] for p in men],
+                         ["Oxford Shirt Navy", "Linen Shirt Beige", "Check Shirt", "Denim Shirt Blue"])
+        self.assertEqual(men[0]["colors"], ["Navy", "White"])
+        self.assertEqual(men[2]["price"], "PKR 2,795")
+        self.assertEqual(men[2]["image_url"], "https://cdn.shopify.com/s/files/check-red.jpg")
+        self.assertEqual(men[3]["product_url"], f"{self.outfitters.url}/products/denim-shirt")
+        self.assertEqual({p["gender"] for p in data["outfitters_women"]}, {"women"})
+        self.assertEqual(len(data["khaadi_men"]), 2)
+        self.assertEqual(fetcher.stats["fallbacks"], 0)
+        self.assertTrue(all("products.json" in path for path, _ in self.outfitters.hits[:4]))
+
+    def test_feed_agrees_with_html(self):
+        html = ClothingWebScraper(outfitters_base=self.outfitters.url, outfitters_source="html",
+                                  http_cache_dir=None).scrape_outfitters_women_shirts()
+        feed = self.scraper.scrape_outfitters_women_shirts()
+        fields = ("name", "price", "colors", "image_url", "product_url", "category", "gender")
+        self.assertEqual([{k: p[k] for k in fields} for p in feed], [{k: p[k] for k in fields} for p in html])
+
+    def test_falls_back_to_html(self):
+        self.outfitters.fail(MEN_FEED, [404])
+        self.outfitters.set_page(WOMEN_FEED, b"<html>password page</html>")
+        fetcher = fast_fetcher()
+        data = self.scraper.scrape_all_websites(fetcher=fetcher)
+        self.assertEqual([p["name"] for p in data["outfitters_men"]],
+                         ["Oxford Shirt Navy", "Linen Shirt Beige", "Check Shirt"])  # HTML page 1
+        self.assertEqual(len(data["outfitters_women"]), 2)
+        self.assertEqual(fetcher.stats["fallbacks"], 2)
+
+        self.outfitters.fail(MEN_FEED, [404])
+        self.assertEqual(len(self.scraper.scrape_outfitters_men_shirts()), 3)
+        self.assertEqual(len(self.scraper.ensure_outfitters_category("men", "shirts")), 4)
+
+    def test_parse_products_json(self):
+        feed = {"products": [
+            {"title": "Polo", "handle": "polo", "options": [{"name": "Colour", "values": ["Black", "Olive"]}],
+             "variants": [{"price": "2490.00"}, {"price": "1999.50"}, {"price": None}],
+             "images": [{"src": "//cdn.shopify.com/polo.jpg"}]},
+            {"title": "  ", "handle": "blank"},
+            {"title": "Tee", "handle": "tee"},
+        ]}
+        products = self.scraper.parse_outfitters_products_json(json.dumps(feed).encode(), "http://x/p.json",
+                                                               "T-Shirts", "Men")
+        self.assertEqual([p["name"] for p in products], ["Polo", "Tee"])
+        self.assertEqual(products[0]["price"], "PKR 1,999.50")
+        self.assertEqual(products[0]["colors"], ["Black", "Olive"])
+        self.assertEqual(products[0]["image_url"], "https://cdn.shopify.com/polo.jpg")
+        self.assertEqual((products[1]["price"], products[1]["colors"], products[1]["image_url"]),
+                         ("Price not available", [], ""))
+        self.assertEqual(products[1]["category"], "t-shirts")
+        with self.assertRaises(ValueError):
+            self.scraper.parse_outfitters_products_json(b"<html></html>", "http://x/p.json", "shirts", "men")
+        with self.assertRaises(ValueError):
+            ClothingWebScraper(outfitters_source="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
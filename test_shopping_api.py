@@ -0,0 +1,114 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi import HTTPException
+
+import shopping_recommender_backend as backend
+import wearsmart_api
+from wardrobe_snapshot import WardrobeSnapshot
+
+IMAGES = {"shirt": 3, "jeans": 1, "coat": 1}
+
+
+class TestShoppingAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "clothing_images_men"
+        for label, n in IMAGES.items():
+            (self.root / label).mkdir(parents=True)
+            for i in range(n):
+                (self.root / label / f"{label}{i}.jpg").write_bytes(b"")
+        self.captions = {f"clothing_images_men/shirt/shirt{i}.jpg": f"a {c} shirt"
+                         for i, c in enumerate(["blue", "white", "blue"])}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def analysis(self, season="winter", category=None):
+        return backend.shopping_analysis(str(self.root), season, self.captions, category)
+
+    def test_structured_result_and_cache_hit(self):
+        result, cached = self.analysis()
+        self.assertFalse(cached)
+        wardrobe = result["wardrobe"]
+        self.assertEqual(wardrobe["total_items"], 5)
+        self.assertEqual(wardrobe["categories"]["tops"]["items"]["shirt"], {"count": 3, "colors": ["blue", "white"]})
+        self.assertEqual(wardrobe["color_distribution"], {"blue": 2, "white": 1})
+        self.assertIn("bottoms", result["gaps"]["underrepresented_categories"])
+        self.assertNotIn("recommendations", result["gaps"])
+        self.assertTrue(result["recommendations"])
+
+        again, cached = self.analysis("Winter")
+        self.assertTrue(cached)
+        self.assertIs(again, result)
+        self.assertFalse(self.analysis("summer")[1])
+        self.assertTrue(self.analysis("fall")[1] is False and self.analysis("autumn")[1])
+
+    def test_changed_wardrobe_invalidates(self):
+        result, _ = self.analysis()
+        time.sleep(0.01)
+        (self.root / "jeans" / "jeans9.jpg").write_bytes(b"")
+        changed, cached = self.analysis()
+        self.assertFalse(cached)
+        self.assertNotEqual(changed["fingerprint"], result["fingerprint"])
+        self.assertEqual(changed["wardrobe"]["categories"]["bottoms"]["total"], 2)
+
+    def test_concurrent_requests(self):
+        errors = []
+
+        def worker(seasons):
+            try:
+                for season in seasons:
+                    self.analysis(season)
+            except Exception as e:
+                errors.append(e)
+
+        self.analysis()
+        (self.root / "jeans" / "jeans9.jpg").write_bytes(b"")  # every thread sees the invalidation
+        threads = [threading.Thread(target=worker, args=(["winter", "summer", "spring", "autumn"] * 5,))
+                   for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(errors, [])
+        self.assertTrue(self.analysis("summer")[1])
+
+    def test_fingerprint_is_stable_across_loads(self):
+        result, _ = self.analysis()
+        reloaded = WardrobeSnapshot(self.root)
+        self.assertTrue(reloaded.load())
+        self.assertEqual(reloaded.fingerprint, result["fingerprint"])
+
+    def test_preferred_category(self):
+        self.assertEqual(backend.preferred_family("Jeans"), "bottoms")
+        self.assertEqual(backend.preferred_family("puffer jacket"), "outerwear")
+        self.assertIsNone(backend.preferred_family(" "))
+        result, _ = self.analysis(category="tops")
+        self.assertTrue(result["recommendations"])
+        self.assertEqual({r["category"] for r in result["recommendations"]}, {"tops"})
+        with self.assertRaises(ValueError):
+            self.analysis(category="spaceship")
+
+    def test_api_endpoint(self):
+        with mock.patch.object(wearsmart_api, "MEN_IMAGES_ROOT", str(self.root)):
+            body = wearsmart_api.shopping("men", "winter", "jeans")
+            self.assertEqual(body["gender"], "men")
+            self.assertEqual({r["category"] for r in body["recommendations"]}, {"bottoms"})
+            self.assertTrue(wearsmart_api.shopping("men", "winter", "bottoms")["cached"])
+            with self.assertRaises(HTTPException) as ctx:
+                wearsmart_api.shopping("men", "winter", "spaceship")
+            self.assertEqual(ctx.exception.status_code, 422)
+        with self.assertRaises(HTTPException) as ctx:
+            wearsmart_api.shopping("kids", "winter", None)
+        self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
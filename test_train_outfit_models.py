@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import joblib
+
+from train_outfit_models import (DATASETS, BudgetExceeded, check_budget, fit, forest_shape,
+                                 load_dataset)
+
+
+class TestTrainOutfitModels(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.X, cls.y = load_dataset(DATASETS["women"])
+
+    def test_parallel_fit_is_reproducible(self):
+        serial, (X_test, _) = fit(self.X, self.y, n_estimators=8, max_depth=10, n_jobs=None)
+        parallel, _ = fit(self.X, self.y, n_estimators=8, max_depth=10, n_jobs=-1)
+        self.assertEqual(serial.predict(X_test).tolist(), parallel.predict(X_test).tolist())
+        self.assertIsNone(parallel.named_steps["classifier"].estimators_[0].n_jobs)
+
+    def test_budgets(self):
+        pipeline, _ = fit(self.X, self.y, n_estimators=6, max_depth=5)
+        trees, depth, _ = forest_shape(pipeline)
+        self.assertEqual(trees, 6)
+        self.assertLessEqual(depth, 5)
+        check_budget(pipeline, tree_budget=6, depth_budget=5)
+        check_budget(pipeline, tree_budget=0, depth_budget=0)  # 0 disables a budget
+        with self.assertRaises(BudgetExceeded):
+            check_budget(pipeline, tree_budget=5, depth_budget=0)
+        with self.assertRaises(BudgetExceeded):
+            check_budget(pipeline, tree_budget=0, depth_budget=depth - 1)
+
+    def test_cli_writes_model_and_report(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            run = subprocess.run(
+                [sys.executable, "train_outfit_models.py", "--gender", "women", "--out-dir", tmp,
+                 "--n-estimators", "5", "--max-depth", "8", "--tree-budget", "5", "--depth-budget", "8"],
+                capture_output=True, text=True, cwd=Path(__file__).parent,
+            )
+            self.assertEqual(run.returncode, 0, run.stdout + run.stderr)
+            model = joblib.load(Path(tmp) / "weather_clothing_recommender_women.pkl")
+            report = json.loads((Path(tmp) / "weather_clothing_recommender_women_report.json").read_text())
+            self.assertEqual(report["size"]["trees_per_output"], 5)
+            self.assertIn("exact_match", report["accuracy"])
+            self.assertIn("flat_single_p50", report["latency_ms"])
+            self.assertEqual(len(model.predict(self.X.head(3))), 3)
+
+            rejected = subprocess.run(
+                [sys.executable, "train_outfit_models.py", "--gender", "men", "--out-dir", tmp,
+                 "--n-estimators", "5", "--max-depth", "0", "--depth-budget", "8"],
+                capture_output=True, text=True, cwd=Path(__file__).parent,
+            )
+            self.assertEqual(rejected.returncode, 1)
+            self.assertFalse((Path(tmp) / "weather_clothing_recommender.pkl").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from shopping_recommender_backend import WardrobeAnalyzer, generate_shopping_recommendations
+from wardrobe_snapshot import WardrobeSnapshot, snapshot_path_for
+
+CAPTIONS = {
+    "shirt": ["a blue shirt", "a white shirt with red stripes", "a shirt"],
+    "jeans": ["dark blue jeans", "black jeans"],
+    "coat": ["a long beige coat"],
+}
+
+
+def comparable(wardrobe):
+    out = {k: wardrobe[k] for k in ("total_items", "color_distribution")}
+    for category in ("tops", "bottoms", "outerwear"):
+        out[category] = {name: (d["count"], d["colors"], sorted(d["unique_colors"]))
+                         for name, d in wardrobe[category].items()}
+    return out
+
+
+class TestWardrobeSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name) / "clothing_images_men"
+        self.captions = {}
+        for label, caps in CAPTIONS.items():
+            (self.root / label).mkdir(parents=True)
+            for i, cap in enumerate(caps):
+                self.add_image(label, f"{label}{i}.jpg", cap)
+        self.add_image("shirt", "uncaptioned.jpg")
+        (self.root / "none").mkdir()
+        (self.root / "shirt" / "notes.txt").write_text("x")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add_image(self, label, name, caption=None):
+        path = self.root / label / name
+        path.write_bytes(b"")
+        if caption:
+            self.captions[path.resolve().as_posix().lower()] = caption
+
+    def full_scan(self):
+        return WardrobeAnalyzer(self.root, self.captions).scan_wardrobe()
+
+    def snapshot_scan(self, snapshot):
+        return WardrobeAnalyzer(self.root, self.captions, snapshot).scan_wardrobe()
+
+    def test_matches_full_scan(self):
+        snapshot = WardrobeSnapshot(self.root)
+        self.assertEqual(comparable(self.snapshot_scan(snapshot)), comparable(self.full_scan()))
+        self.assertEqual(sorted(snapshot.rescanned), ["coat", "jeans", "shirt"])
+        self.assertTrue(snapshot_path_for(self.root).exists())
+
+    def test_only_changed_folders_are_rescanned(self):
+        snapshot = WardrobeSnapshot(self.root)
+        self.snapshot_scan(snapshot)
+        self.snapshot_scan(snapshot)
+        self.assertEqual(snapshot.rescanned, [])
+
+        time.sleep(0.01)
+        self.add_image("jeans", "jeans9.jpg", "grey jeans")
+        os.remove(self.root / "coat" / "coat0.jpg")
+        result = self.snapshot_scan(snapshot)
+        self.assertEqual(sorted(snapshot.rescanned), ["coat", "jeans"])
+        self.assertEqual(comparable(result), comparable(self.full_scan()))
+        self.assertNotIn("coat", result["outerwear"])  # empty folders are left out, as before
+
+    def test_persisted_snapshot_is_reused(self):
+        self.snapshot_scan(WardrobeSnapshot(self.root))
+        reloaded = WardrobeSnapshot(self.root)
+        self.assertTrue(reloaded.load())
+        result = self.snapshot_scan(reloaded)
+        self.assertEqual(reloaded.rescanned, [])
+        self.assertEqual(comparable(result), comparable(self.full_scan()))
+
+    def test_new_captions_fill_missing_colors(self):
+        snapshot = WardrobeSnapshot(self.root)
+        self.snapshot_scan(snapshot)
+        path = (self.root / "shirt" / "uncaptioned.jpg").resolve().as_posix().lower()
+        self.captions[path] = "a green shirt"
+        result = self.snapshot_scan(snapshot)
+        self.assertEqual(snapshot.rescanned, [])
+        self.assertIn("green", result["tops"]["shirt"]["colors"])
+        self.assertEqual(comparable(result), comparable(self.full_scan()))
+
+    def test_edited_caption_updates_color_and_fingerprint(self):
+        snapshot = WardrobeSnapshot(self.root)
+        self.snapshot_scan(snapshot)
+        fingerprint = snapshot.fingerprint
+        path = (self.root / "shirt" / "shirt0.jpg").resolve().as_posix().lower()
+        self.captions[path] = "a green shirt"  # re-captioned: same number of captions
+        result = self.snapshot_scan(snapshot)
+        self.assertEqual(snapshot.rescanned, [])
+        self.assertNotEqual(snapshot.fingerprint, fingerprint)
+        self.assertEqual(comparable(result), comparable(self.full_scan()))
+
+    def test_generate_shopping_recommendations_uses_snapshot(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            fresh = generate_shopping_recommendations("clothing_images_men", "winter", self.captions,
+                                                      use_snapshot=False)
+            cached = generate_shopping_recommendations("clothing_images_men", "winter", self.captions)
+            self.assertTrue(Path("clothing_images_men_wardrobe_snapshot.json").exists())
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(fresh[1:], cached[1:])
+        self.assertIn("Tops", cached[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import random
+import tempfile
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+from fastapi import HTTPException
+
+import wearsmart_api
+from shopping_recommender_backend import GapAnalyzer, categorize_label
+from wardrobe_store import WardrobeStore, empty_wardrobe
+
+LABELS = ["shirt", "t-shirt", "jeans", "shorts", "coat", "hoodie", "kurta"]
+COLORS = ["black", "white", "blue", "red", "beige"]
+
+
+def wardrobe_from_items(items):
+    """What scan_wardrobe would build from the item records (no category_counts)."""
+    wardrobe = empty_wardrobe()
+    del wardrobe["category_counts"]
+    for item in items:
+        entry = wardrobe[item["category"]].setdefault(item["label"], {"count": 0, "colors": [], "unique_colors": []})
+        entry["count"] += 1
+        entry["colors"] += item["colors"]
+        wardrobe["total_items"] += 1
+        wardrobe["color_distribution"].update(item["colors"])
+    return wardrobe
+
+
+def comparable(wardrobe):
+    out = {"total": wardrobe["total_items"], "colors": dict(wardrobe["color_distribution"])}
+    for category in ("tops", "bottoms", "outerwear"):
+        out[category] = {name: (d["count"], sorted(d["colors"])) for name, d in wardrobe[category].items()}
+    return out
+
+
+class TestWardrobeStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = WardrobeStore(Path(self.tmp.name) / "wardrobes.db")
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_aggregates_follow_inserts_and_deletes(self):
+        rng = random.Random(3)
+        ids = self.store.add_items("u1", [(rng.choice(LABELS), rng.sample(COLORS, rng.randint(0, 2)))
+                                          for _ in range(60)])
+        self.store.add_items("u2", [("jeans", ["Black"])])
+        for item_id in rng.sample(ids, 25):
+            self.assertTrue(self.store.remove_item("u1", item_id))
+        self.assertFalse(self.store.remove_item("u2", ids[0]))  # other user's / deleted ids
+
+        items = self.store.items("u1")
+        self.assertEqual(len(items), 35)
+        wardrobe = self.store.wardrobe("u1")
+        self.assertEqual(comparable(wardrobe), comparable(wardrobe_from_items(items)))
+        expected = dict.fromkeys(("tops", "bottoms", "outerwear"), 0)
+        expected.update(Counter(categorize_label(i["label"]) for i in items))
+        self.assertEqual(wardrobe["category_counts"], expected)
+        self.assertEqual(self.store.wardrobe("u2")["color_distribution"], Counter({"black": 1}))
+
+    def test_emptied_labels_disappear(self):
+        item_id = self.store.add_item("u1", "coat", ["beige"])
+        self.store.remove_item("u1", item_id)
+        wardrobe = self.store.wardrobe("u1")
+        self.assertEqual(wardrobe["outerwear"], {})
+        self.assertEqual(wardrobe["total_items"], 0)
+        self.assertEqual(self.store.connection().execute("SELECT COUNT(*) FROM wardrobe_label_colors").fetchone()[0], 0)
+
+    def test_gaps_match_item_scan(self):
+        self.store.add_items("u1", [("shirt", ["blue"]), ("shirt", ["white"]), ("jeans", ["blue"]),
+                                    ("scarf", ["red"], "outerwear")])
+        wardrobe = self.store.wardrobe("u1")
+        self.assertIn("scarf", wardrobe["outerwear"])
+        for season in ("winter", "summer"):
+            self.assertEqual(self.store.gaps("u1", season),
+                             GapAnalyzer(wardrobe_from_items(self.store.items("u1")), season).analyze_gaps())
+
+    def test_bulk_gaps(self):
+        for u in range(30):
+            self.store.add_items(f"user{u}", [("coat", ["black"])] * (u % 4))
+        users = [f"user{u}" for u in range(30)] + ["nobody"]
+        with mock.patch("wardrobe_store.MAX_IDS_PER_QUERY", 7):
+            bulk = self.store.gaps_many(users, "winter")
+        self.assertEqual(list(bulk), users)
+        for u in users:
+            self.assertEqual(bulk[u], self.store.gaps(u, "winter"), u)
+        self.assertIn("warm_outerwear", bulk["user1"]["seasonal_gaps"])
+        self.assertNotIn("warm_outerwear", bulk["user3"]["seasonal_gaps"])
+
+    def test_api(self):
+        with mock.patch.object(wearsmart_api, "_wardrobe_store", self.store):
+            req = wearsmart_api.WardrobeItemsRequest(items=[{"label": "Shirt", "colors": ["blue"]},
+                                                           {"label": "coat", "category": "outerwear"}])
+            ids = wearsmart_api.add_wardrobe_items("u9", req)["item_ids"]
+            body = wearsmart_api.user_wardrobe("u9", "fall")
+            self.assertEqual(body["category_counts"], {"tops": 1, "bottoms": 0, "outerwear": 1})
+            self.assertEqual(body["gaps"], self.store.gaps("u9", "autumn"))
+
+            bulk = wearsmart_api.bulk_wardrobe_gaps(wearsmart_api.BulkGapsRequest(user_ids=["u9", "x"], season="winter"))
+            self.assertEqual(set(bulk["results"]), {"u9", "x"})
+            compact = wearsmart_api.bulk_wardrobe_gaps(
+                wearsmart_api.BulkGapsRequest(user_ids=["u9", "x"], season="winter", compact=True))
+            self.assertEqual(compact["results"]["x"]["needed"], {"tops": 5, "bottoms": 4, "outerwear": 2})
+
+            self.assertEqual(wearsmart_api.remove_wardrobe_item("u9", ids[0])["removed"], ids[0])
+            with self.assertRaises(HTTPException) as ctx:
+                wearsmart_api.remove_wardrobe_item("u9", ids[0])
+            self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+"""
+🏋️ Outfit Model Training
+Rebuilds the weather → outfit models from the CSVs, reproducibly, with the
+same preprocessing / forest / split as dataset.ipynb (men) and DATA.ipynb
+(women), and writes a latency / size / accuracy report next to each model.
+
+Budgets keep the served model fast: a model whose forests have more trees or
+deeper trees than allowed is rejected (nothing is written).
+
+Run:
+    python train_outfit_models.py                          # both genders → models/trained/
+    python train_outfit_models.py --gender men --max-depth 0 --depth-budget 0   # notebook settings
+    python train_outfit_models.py --register --activate    # also publish to the model registry
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+TARGETS = ["recommended_top", "recommended_bottom", "recommended_outer"]
+DATASETS = {
+    "men": "enhanced_weather_clothing_dataset_no_accessories.csv",
+    "women": "enhanced_weather_clothing_dataset_women_balanced_cleaned.csv",
+}
+MODEL_FILES = {"men": "weather_clothing_recommender.pkl", "women": "weather_clothing_recommender_women.pkl"}
+REGISTRY_NAMES = {"men": "outfit_men", "women": "outfit_women"}
+
+DEFAULT_TREES = 100   # per output, as in the notebooks
+DEFAULT_DEPTH = 16    # notebooks grow to ~24; 16 keeps test accuracy within noise
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+
+
+class BudgetExceeded(Exception):
+    """The trained model is larger than the configured tree / depth budget."""
+
+
+# ==========================
+# Data + pipeline
+# ==========================
+def load_dataset(csv_path: str):
+    import pandas as pd
+
+    df = pd.read_csv(csv_path).dropna()
+    return df.drop(columns=TARGETS), df[TARGETS]
+
+
+def build_pipeline(X, n_estimators: int = DEFAULT_TREES, max_depth: Optional[int] = None,
+                   n_jobs: Optional[int] = None):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.multioutput import MultiOutputClassifier
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    cat_cols = X.select_dtypes(include="object").columns.tolist()
+    num_cols = X.select_dtypes(exclude="object").columns.tolist()
+    forest = RandomForestClassifier(n_estimators=n_estimators, max_depth=max_depth,
+                                    random_state=RANDOM_STATE, n_jobs=n_jobs)
+    return Pipeline([
+        ("preprocessor", ColumnTransformer([
+            ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols),
+            ("num", "passthrough", num_cols),
+        ])),
+        ("classifier", MultiOutputClassifier(forest)),
+    ])
+
+
+def split(X, y):
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+
+
+def fit(X, y, n_estimators: int = DEFAULT_TREES, max_depth: Optional[int] = None, n_jobs: Optional[int] = -1):
+    """
+    Fit on the notebook train split. Trees are grown in parallel; the fitted
+    forests are reset to n_jobs=None so serving predicts on one thread (no
+    per-call pool start-up, deterministic probability sums).
+    """
+    X_train, X_test, y_train, y_test = split(X, y)
+    pipeline = build_pipeline(X, n_estimators, max_depth, n_jobs)
+    pipeline.fit(X_train, y_train)
+    for forest in pipeline.named_steps["classifier"].estimators_:
+        forest.n_jobs = None
+    pipeline.named_steps["classifier"].estimator.n_jobs = None
+    return pipeline, (X_test, y_test)
+
+
+# ==========================
+# Budgets + report
+# ==========================
+def forest_shape(pipeline) -> Tuple[int, int, int]:
+    """(max trees per output, max tree depth, total nodes)."""
+    forests = pipeline.named_steps["classifier"].estimators_
+    trees = max(len(f.estimators_) for f in forests)
+    depth = max(t.tree_.max_depth for f in forests for t in f.estimators_)
+    nodes = sum(t.tree_.node_count for f in forests for t in f.estimators_)
+    return trees, depth, nodes
+
+
+def check_budget(pipeline, tree_budget: int, depth_budget: int) -> None:
+    trees, depth, _ = forest_shape(pipeline)
+    if tree_budget and trees > tree_budget:
+        raise BudgetExceeded(f"{trees} trees per output > budget {tree_budget}")
+    if depth_budget and depth > depth_budget:
+        raise BudgetExceeded(f"tree depth {depth} > budget {depth_budget}")
+
+
+def _p50_ms(fn, items) -> float:
+    times = []
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        times.append((time.perf_counter() - t0) * 1000)
+    return float(np.median(times))
+
+
+def build_report(pipeline, test, model_path: Path, csv_path: str, params: Dict,
+                 latency_rows: int = 100) -> Dict:
+    import pandas as pd
+    import sklearn
+
+    from fast_predictor import FastOutfitPredictor
+
+    X_test, y_test = test
+    pred = pipeline.predict(X_test)
+    truth = y_test.to_numpy()
+    trees, depth, nodes = forest_shape(pipeline)
+    fast = FastOutfitPredictor.from_pipeline(pipeline)
+    rows = X_test.head(latency_rows).to_dict(orient="records")
+    batch = X_test.to_dict(orient="records")
+
+    t0 = time.perf_counter()
+    fast.predict_many(batch)
+    batch_ms = (time.perf_counter() - t0) * 1000
+
+    with open(csv_path, "rb") as f:
+        data_sha = hashlib.sha256(f.read()).hexdigest()
+    return {
+        "model": model_path.name,
+        "dataset": {"csv": os.path.basename(csv_path), "sha256": data_sha, "rows_test": len(truth)},
+        "params": params,
+        "accuracy": {
+            **{t: round(float((pred[:, i] == truth[:, i]).mean()), 4) for i, t in enumerate(TARGETS)},
+            "exact_match": round(float((pred == truth).all(axis=1).mean()), 4),
+        },
+        "size": {"trees_per_output": trees, "max_depth": depth, "nodes": nodes,
+                 "pkl_bytes": model_path.stat().st_size, "flat_bytes": fast.nbytes},
+        "latency_ms": {
+            "sklearn_single_p50": round(_p50_ms(lambda r: pipeline.predict(pd.DataFrame([r])), rows), 3),
+            "flat_single_p50": round(_p50_ms(fast.predict_one, rows), 3),
+            f"flat_batch_{len(batch)}": round(batch_ms, 3),
+        },
+        "versions": {"sklearn": sklearn.__version__, "numpy": np.__version__,
+                     "python": platform.python_version()},
+    }
+
+
+# ==========================
+# CLI
+# ==========================
+def train_one(gender: str, csv_path: str, out_dir: Path, args) -> Dict:
+    import joblib
+
+    max_depth = args.max_depth or None
+    params = {"n_estimators": args.n_estimators, "max_depth": max_depth, "random_state": RANDOM_STATE,
+              "test_size": TEST_SIZE, "tree_budget": args.tree_budget, "depth_budget": args.depth_budget}
+    print(f"🏋️ Training {gender} model from {csv_path} ({args.n_estimators} trees, max_depth={max_depth})")
+    X, y = load_dataset(csv_path)
+    params["rows"] = len(X)
+    t0 = time.perf_counter()
+    pipeline, test = fit(X, y, args.n_estimators, max_depth, args.n_jobs)
+    params["fit_seconds"] = round(time.perf_counter() - t0, 2)
+    check_budget(pipeline, args.tree_budget, args.depth_budget)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    model_path = out_dir / MODEL_FILES[gender]
+    joblib.dump(pipeline, model_path)
+    report = build_report(pipeline, test, model_path, csv_path, params)
+    report_path = model_path.with_name(model_path.stem + "_report.json")
+    report_path.write_text(json.dumps(report, indent=1), encoding="utf-8")
+
+    acc, size, lat = report["accuracy"], report["size"], report["latency_ms"]
+    print(f"  ✅ {model_path} ({size['pkl_bytes'] / 1e6:.1f} MB, {size['nodes']} nodes, depth {size['max_depth']})")
+    print(f"  accuracy top {acc['recommended_top']:.3f} bottom {acc['recommended_bottom']:.3f} "
+          f"outer {acc['recommended_outer']:.3f} exact {acc['exact_match']:.3f}")
+    print(f"  latency single-row sklearn {lat['sklearn_single_p50']:.2f} ms, flat {lat['flat_single_p50']:.2f} ms")
+
+    if args.register:
+        from model_registry import ModelRegistry
+
+        ModelRegistry(args.registry).register(REGISTRY_NAMES[gender], pipeline, source=model_path.name,
+                                              extra={"training_report": report}, activate=args.activate)
+    return report
+
+
+def main():
+    from model_registry import DEFAULT_ROOT
+
+    parser = argparse.ArgumentParser(description="Train the weather → outfit models from the CSVs")
+    parser.add_argument("--gender", choices=["men", "women", "all"], default="all")
+    parser.add_argument("--csv-men", default=DATASETS["men"])
+    parser.add_argument("--csv-women", default=DATASETS["women"])
+    parser.add_argument("--out-dir", default="models/trained")
+    parser.add_argument("--n-estimators", type=int, default=DEFAULT_TREES)
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_DEPTH, help="0 = unlimited (notebooks)")
+    parser.add_argument("--tree-budget", type=int, default=DEFAULT_TREES, help="max trees per output, 0 = off")
+    parser.add_argument("--depth-budget", type=int, default=DEFAULT_DEPTH, help="max tree depth, 0 = off")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--register", action="store_true", help="add the models to the model registry")
+    parser.add_argument("--activate", action="store_true", help="with --register: make them active")
+    parser.add_argument("--registry", default=DEFAULT_ROOT)
+    args = parser.parse_args()
+
+    genders: List[str] = ["men", "women"] if args.gender == "all" else [args.gender]
+    csvs = {"men": args.csv_men, "women": args.csv_women}
+    failed = False
+    for gender in genders:
+        try:
+            train_one(gender, csvs[gender], Path(args.out_dir), args)
+        except BudgetExceeded as e:
+            print(f"❌ {gender} model rejected: {e}")
+            failed = True
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
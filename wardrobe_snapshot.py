@@ -0,0 +1,210 @@
+"""
+📸 Wardrobe Snapshot
+Persisted, incrementally refreshed result of ``WardrobeAnalyzer.scan_wardrobe``.
+
+For each clothing folder the snapshot keeps its signature (mtime_ns, number of
+image entries) and the detected color of every image in it. On refresh a
+folder whose mtime is unchanged is not even listed; the others are listed
+with ``os.scandir`` (no per-file ``stat``), and only their new images get a
+caption lookup (CaptionIndex, no path resolution) + color extraction.
+
+Colors depend on the caption cache too: when its content version
+(``CaptionIndex.version``) changes — captions added, edited or re-generated —
+every image's color is looked up again, which changes the fingerprint only if
+a color actually changed. Colors are memoized per caption text (LRU-bounded).
+
+Persisted as JSON next to the images root
+(``clothing_images_men`` → ``clothing_images_men_wardrobe_snapshot.json``).
+"""
+
+import functools
+import hashlib
+import json
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from caption_index import CaptionIndex, as_caption_index
+from color_extraction import extract_color_from_caption
+
+SNAPSHOT_VERSION = 2
+VALID_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+SKIP_FOLDERS = {"data", "none"}
+COLOR_MEMO_SIZE = 4096
+
+
+def snapshot_path_for(images_root) -> Path:
+    root = Path(images_root)
+    return root.with_name(f"{root.name}_wardrobe_snapshot.json")
+
+
+@functools.lru_cache(maxsize=COLOR_MEMO_SIZE)
+def color_for_caption(caption: str) -> Optional[str]:
+    """extract_color_from_caption, memoized on the caption text."""
+    return extract_color_from_caption(caption)
+
+
+class WardrobeSnapshot:
+    """Folder → (signature, per-image colors), refreshed only where folders changed."""
+
+    def __init__(self, images_root, path: Optional[str] = None):
+        self.images_root = Path(images_root)
+        self.path = Path(path) if path else snapshot_path_for(images_root)
+        self.folders: Dict[str, Dict] = {}  # name -> {"mtime_ns", "entries", "images": {file: color|None}}
+        self.caption_version: Optional[str] = None
+        self.rescanned: List[str] = []  # folders rescanned by the last refresh
+        self._dirty = False
+        self._fingerprint: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _color_for(self, captions: CaptionIndex, folder: str, name: str) -> Optional[str]:
+        caption = captions.get(f"{self.images_root.as_posix()}/{folder}/{name}")
+        return color_for_caption(caption) if caption else None
+
+    # ---------- refresh ----------
+    def refresh(self, caption_cache: Optional[Dict[str, str]] = None) -> bool:
+        """Bring the snapshot up to date with the folders. Returns True if anything changed."""
+        caption_cache = as_caption_index(caption_cache)
+        captions_changed = self.caption_version != caption_cache.version
+        self.caption_version = caption_cache.version
+        self.rescanned = []
+        seen = set()
+        order = []
+        if self.images_root.is_dir():
+            with os.scandir(self.images_root) as it:
+                for entry in it:
+                    if not entry.is_dir() or entry.name.lower() in SKIP_FOLDERS:
+                        continue
+                    seen.add(entry.name)
+                    order.append(entry.name)
+                    self._refresh_folder(entry, caption_cache, captions_changed)
+        removed = [name for name in self.folders if name not in seen]
+        for name in removed:
+            del self.folders[name]
+        # keep scandir order so scan results list folders like iterdir() did
+        self.folders = {name: self.folders[name] for name in order}
+        changed = bool(self.rescanned or removed or captions_changed)
+        self._dirty = self._dirty or changed
+        if changed:
+            self._fingerprint = None
+        return changed
+
+    def _refresh_folder(self, entry: os.DirEntry, caption_cache: CaptionIndex, captions_changed: bool) -> None:
+        mtime_ns = entry.stat().st_mtime_ns
+        state = self.folders.get(entry.name)
+        # adding / removing / renaming a file bumps the folder mtime: unchanged → no listing at all
+        names = None
+        if not state or state["mtime_ns"] != mtime_ns:
+            names = [
+                e.name for e in os.scandir(entry.path)
+                if e.is_file() and os.path.splitext(e.name)[1].lower() in VALID_EXTS
+            ]
+        signature = (mtime_ns, len(names) if names is not None else state["entries"])
+        if state and (state["mtime_ns"], state["entries"]) == signature and (
+                names is None or set(names) == set(state["images"])):
+            if captions_changed:
+                for name in state["images"]:
+                    state["images"][name] = self._color_for(caption_cache, entry.name, name)
+            return
+        old = state["images"] if state else {}
+        images = {}
+        for name in names:
+            if name in old and not captions_changed:
+                images[name] = old[name]
+            else:
+                images[name] = self._color_for(caption_cache, entry.name, name)
+        self.folders[entry.name] = {"mtime_ns": signature[0], "entries": signature[1], "images": images}
+        self.rescanned.append(entry.name)
+
+    def scan(self, categorize, caption_cache: Optional[Dict[str, str]] = None) -> Dict:
+        """Refresh, persist if changed, and return the scan_wardrobe() dict (thread-safe)."""
+        with self._lock:
+            self.refresh(caption_cache)
+            self.flush()
+            return self.wardrobe(categorize)
+
+    def refreshed_fingerprint(self, caption_cache=None) -> str:
+        """Refresh (thread-safe) and return the fingerprint of the current contents."""
+        with self._lock:
+            self.refresh(caption_cache)
+            self.flush()
+            return self.fingerprint
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of folders, entries and colors; recomputed only after a change."""
+        if self._fingerprint is None:
+            payload = json.dumps(self.folders, sort_keys=True, ensure_ascii=False)
+            self._fingerprint = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+        return self._fingerprint
+
+    # ---------- result ----------
+    def wardrobe(self, categorize) -> Dict:
+        """scan_wardrobe()-shaped dict; ``categorize(folder_name)`` → tops/bottoms/outerwear."""
+        wardrobe = {
+            "tops": {},
+            "bottoms": {},
+            "outerwear": {},
+            "total_items": 0,
+            "color_distribution": Counter()
+        }
+        for name, state in self.folders.items():
+            if not state["entries"]:
+                continue
+            colors = [c for c in state["images"].values() if c]
+            wardrobe["total_items"] += state["entries"]
+            wardrobe["color_distribution"].update(colors)
+            wardrobe[categorize(name)][name] = {
+                "count": state["entries"],
+                "colors": colors,
+                "unique_colors": list(set(colors))
+            }
+        return wardrobe
+
+    # ---------- persistence ----------
+    def save(self) -> None:
+        payload = {"version": SNAPSHOT_VERSION, "root": self.images_root.as_posix(),
+                   "caption_version": self.caption_version, "folders": self.folders}
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"⚠️ Could not save wardrobe snapshot {self.path}: {e}")
+
+    def flush(self) -> None:
+        if self._dirty:
+            self.save()
+
+    def load(self) -> bool:
+        if not self.path.exists():
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read wardrobe snapshot {self.path}: {e}")
+            return False
+        if payload.get("version") != SNAPSHOT_VERSION or payload.get("root") != self.images_root.as_posix():
+            return False
+        self.folders = payload.get("folders", {})
+        self.caption_version = payload.get("caption_version")
+        self._fingerprint = None
+        return True
+
+
+_snapshots: Dict[Tuple[str, str], WardrobeSnapshot] = {}
+
+
+def get_wardrobe_snapshot(images_root, path: Optional[str] = None) -> WardrobeSnapshot:
+    """Process-wide snapshot per images root (loaded from disk on first use)."""
+    key = (Path(images_root).resolve().as_posix(), str(path or ""))
+    if key not in _snapshots:
+        snapshot = WardrobeSnapshot(images_root, path)
+        snapshot.load()
+        _snapshots[key] = snapshot
+    return _snapshots[key]
@@ -0,0 +1,258 @@
+"""
+👥 Wardrobe Store
+Per-user wardrobes for gap analysis, in SQLite (data/wardrobes.db).
+
+The image-folder wardrobe (WardrobeAnalyzer) is one global wardrobe rebuilt by
+scanning files. Here every user has item records (category, label, colors)
+plus aggregates that are kept up to date on each insert and delete, in the
+same transaction:
+
+- ``wardrobe_labels(user_id, category, label) -> count``
+- ``wardrobe_label_colors(user_id, category, label, color) -> count``
+
+``wardrobe(user_id)`` therefore reads a few aggregate rows (no item scan) and
+returns the ``scan_wardrobe`` dict with ``category_counts``, so GapAnalyzer
+works in O(categories). ``count_matrices`` loads the aggregates of many users
+as users × labels / users × colors arrays (one query each per chunk of ids)
+and ``gaps_many`` runs them through gap_batch.BatchGapAnalyzer.
+
+Connections follow image_index_db.py: one per thread, WAL mode, fixed SQL
+strings for the statement cache.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gap_batch import BatchGapAnalyzer, GapBatch
+from shopping_recommender_backend import CATEGORY_FAMILIES, GapAnalyzer, categorize_label
+
+DEFAULT_DB = os.getenv("WEARSMART_WARDROBE_DB", "data/wardrobes.db")
+STATEMENT_CACHE_SIZE = 128
+MAX_IDS_PER_QUERY = 500  # stays under SQLite's bound-parameter limit
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS wardrobe_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id TEXT NOT NULL,
+        category TEXT NOT NULL,
+        label TEXT NOT NULL,
+        colors TEXT NOT NULL DEFAULT ''
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_wardrobe_items_user ON wardrobe_items(user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS wardrobe_labels (
+        user_id TEXT NOT NULL,
+        category TEXT NOT NULL,
+        label TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, category, label)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS wardrobe_label_colors (
+        user_id TEXT NOT NULL,
+        category TEXT NOT NULL,
+        label TEXT NOT NULL,
+        color TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, category, label, color)
+    ) WITHOUT ROWID
+    """,
+]
+
+INSERT_ITEM_SQL = "INSERT INTO wardrobe_items (user_id, category, label, colors) VALUES (?, ?, ?, ?)"
+SELECT_ITEM_SQL = "SELECT category, label, colors FROM wardrobe_items WHERE id = ? AND user_id = ?"
+DELETE_ITEM_SQL = "DELETE FROM wardrobe_items WHERE id = ?"
+ITEMS_SQL = "SELECT id, category, label, colors FROM wardrobe_items WHERE user_id = ? ORDER BY id"
+ADD_LABEL_SQL = """
+    INSERT INTO wardrobe_labels (user_id, category, label, count) VALUES (?, ?, ?, 1)
+    ON CONFLICT(user_id, category, label) DO UPDATE SET count = count + 1
+"""
+ADD_COLOR_SQL = """
+    INSERT INTO wardrobe_label_colors (user_id, category, label, color, count) VALUES (?, ?, ?, ?, 1)
+    ON CONFLICT(user_id, category, label, color) DO UPDATE SET count = count + 1
+"""
+SUB_LABEL_SQL = "UPDATE wardrobe_labels SET count = count - 1 WHERE user_id = ? AND category = ? AND label = ?"
+SUB_COLOR_SQL = """
+    UPDATE wardrobe_label_colors SET count = count - 1
+    WHERE user_id = ? AND category = ? AND label = ? AND color = ?
+"""
+PRUNE_LABEL_SQL = "DELETE FROM wardrobe_labels WHERE user_id = ? AND category = ? AND label = ? AND count <= 0"
+PRUNE_COLORS_SQL = "DELETE FROM wardrobe_label_colors WHERE user_id = ? AND category = ? AND label = ? AND count <= 0"
+LABELS_SQL = "SELECT user_id, category, label, count FROM wardrobe_labels WHERE user_id IN ({})"
+COLORS_SQL = "SELECT user_id, category, label, color, count FROM wardrobe_label_colors WHERE user_id IN ({})"
+COLOR_TOTALS_SQL = """
+    SELECT user_id, color, SUM(count) FROM wardrobe_label_colors
+    WHERE user_id IN ({}) GROUP BY user_id, color
+"""
+
+Item = Tuple  # (label, colors[, category])
+
+
+def empty_wardrobe() -> Dict:
+    """``scan_wardrobe``-shaped dict plus precomputed ``category_counts``."""
+    wardrobe = {category: {} for category in CATEGORY_FAMILIES}
+    wardrobe.update(total_items=0, color_distribution=Counter(),
+                    category_counts=dict.fromkeys(CATEGORY_FAMILIES, 0))
+    return wardrobe
+
+
+def _clean_colors(colors: Iterable[str]) -> List[str]:
+    return sorted({c.strip().lower() for c in colors or () if c and c.strip()})
+
+
+class WardrobeStore:
+    """Item records + incrementally maintained per-user aggregates."""
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    # ---------- connections ----------
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection (opened, tuned and schema-checked once)."""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.db_path.as_posix(), cached_statements=STATEMENT_CACHE_SIZE)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.execute("PRAGMA busy_timeout=5000")
+            self._local.con = con
+            with self._schema_lock:
+                if not self._schema_ready:
+                    with con:
+                        for stmt in SCHEMA:
+                            con.execute(stmt)
+                    self._schema_ready = True
+        return con
+
+    def close(self) -> None:
+        """Close the calling thread's connection (others stay open)."""
+        con = getattr(self._local, "con", None)
+        if con is not None:
+            con.close()
+            self._local.con = None
+
+    # ---------- writes ----------
+    def add_item(self, user_id: str, label: str, colors: Sequence[str] = (),
+                 category: Optional[str] = None) -> int:
+        """Add one item; returns its id."""
+        return self.add_items(user_id, [(label, colors)], category)[0]
+
+    def add_items(self, user_id: str, items: Iterable[Item], category: Optional[str] = None) -> List[int]:
+        """Add (label, colors[, category]) items in one transaction; category defaults to the label's."""
+        ids = []
+        with self.connection() as con:
+            for label, colors, *item_category in items:
+                label = label.strip().lower()
+                if not label:
+                    raise ValueError("Item label must not be empty")
+                cat = (item_category and item_category[0]) or category or categorize_label(label)
+                if cat not in CATEGORY_FAMILIES:
+                    raise ValueError(f"Unknown category: {cat}")
+                colors = _clean_colors(colors)
+                ids.append(con.execute(INSERT_ITEM_SQL, (user_id, cat, label, ",".join(colors))).lastrowid)
+                con.execute(ADD_LABEL_SQL, (user_id, cat, label))
+                con.executemany(ADD_COLOR_SQL, [(user_id, cat, label, c) for c in colors])
+        return ids
+
+    def remove_item(self, user_id: str, item_id: int) -> bool:
+        """Delete one of the user's items; False if it does not exist."""
+        with self.connection() as con:
+            row = con.execute(SELECT_ITEM_SQL, (item_id, user_id)).fetchone()
+            if row is None:
+                return False
+            key = (user_id, row[0], row[1])
+            con.execute(DELETE_ITEM_SQL, (item_id,))
+            con.execute(SUB_LABEL_SQL, key)
+            con.executemany(SUB_COLOR_SQL, [key + (c,) for c in row[2].split(",") if c])
+            con.execute(PRUNE_LABEL_SQL, key)
+            con.execute(PRUNE_COLORS_SQL, key)
+        return True
+
+    # ---------- reads ----------
+    def items(self, user_id: str) -> List[Dict]:
+        return [
+            {"id": item_id, "category": cat, "label": label, "colors": colors.split(",") if colors else []}
+            for item_id, cat, label, colors in self.connection().execute(ITEMS_SQL, (user_id,))
+        ]
+
+    def wardrobe(self, user_id: str) -> Dict:
+        """The user's wardrobe from the aggregate tables (same shape as scan_wardrobe)."""
+        return self.wardrobes([user_id])[user_id]
+
+    def _query_chunks(self, sql: str, user_ids: Sequence[str]):
+        """Rows of ``sql`` (one ``IN ({})`` placeholder) for all ids, MAX_IDS_PER_QUERY at a time."""
+        con = self.connection()
+        for start in range(0, len(user_ids), MAX_IDS_PER_QUERY):
+            chunk = list(user_ids[start:start + MAX_IDS_PER_QUERY])
+            yield from con.execute(sql.format(",".join("?" * len(chunk))), chunk)
+
+    def wardrobes(self, user_ids: Sequence[str]) -> Dict[str, Dict]:
+        """Wardrobes of many users; two aggregate queries per chunk of ids."""
+        out = {uid: empty_wardrobe() for uid in user_ids}
+        ids = list(out)
+        for uid, cat, label, count in self._query_chunks(LABELS_SQL, ids):
+            wardrobe = out[uid]
+            wardrobe[cat][label] = {"count": count, "colors": [], "unique_colors": []}
+            wardrobe["category_counts"][cat] += count
+            wardrobe["total_items"] += count
+        for uid, cat, label, color, count in self._query_chunks(COLORS_SQL, ids):
+            wardrobe = out[uid]
+            item = wardrobe[cat][label]
+            item["colors"].extend([color] * count)
+            item["unique_colors"].append(color)
+            wardrobe["color_distribution"][color] += count
+        return out
+
+    def count_matrices(self, user_ids: Sequence[str]):
+        """
+        Aggregates of many users as arrays.
+
+        Returns (labels, label_counts, colors, color_counts) where labels are
+        (category, label) pairs, label_counts is users × labels and
+        color_counts is users × colors (rows in ``user_ids`` order).
+        """
+        row = {uid: i for i, uid in enumerate(user_ids)}
+        labels: Dict[Tuple[str, str], int] = {}
+        colors: Dict[str, int] = {}
+        label_cells, color_cells = [], []
+        for uid, cat, label, count in self._query_chunks(LABELS_SQL, list(row)):
+            label_cells.append((row[uid], labels.setdefault((cat, label), len(labels)), count))
+        for uid, color, count in self._query_chunks(COLOR_TOTALS_SQL, list(row)):
+            color_cells.append((row[uid], colors.setdefault(color, len(colors)), count))
+
+        label_counts = np.zeros((len(row), len(labels)), dtype=np.int64)
+        color_counts = np.zeros((len(row), len(colors)), dtype=np.int64)
+        for matrix, cells in ((label_counts, label_cells), (color_counts, color_cells)):
+            if cells:
+                r, c, n = np.array(cells, dtype=np.int64).T
+                matrix[r, c] = n
+        return list(labels), label_counts, list(colors), color_counts
+
+    def gap_batch(self, user_ids: Sequence[str], season: str = "summer") -> GapBatch:
+        """Vectorized gap analysis for many users (rows in ``user_ids`` order)."""
+        labels, label_counts, colors, color_counts = self.count_matrices(user_ids)
+        analyzer = BatchGapAnalyzer([label for _, label in labels], [cat for cat, _ in labels])
+        return analyzer.analyze(label_counts, color_counts, colors, season)
+
+    # ---------- gap analysis ----------
+    def gaps(self, user_id: str, season: str = "summer") -> Dict:
+        return GapAnalyzer(self.wardrobe(user_id), season).analyze_gaps()
+
+    def gaps_many(self, user_ids: Sequence[str], season: str = "summer") -> Dict[str, Dict]:
+        """Gap analysis for many users at once (GapAnalyzer dicts, via the batch engine)."""
+        user_ids = list(dict.fromkeys(user_ids))
+        batch = self.gap_batch(user_ids, season)
+        return {uid: batch.gaps(i) for i, uid in enumerate(user_ids)}
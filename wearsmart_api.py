@@ -10,16 +10,26 @@ Run: uvicorn wearsmart_api:app --reload --port 8000
 
 import os
 import random
+import threading
 from glob import glob
 from typing import List, Optional
 
 # import joblib  # COMMENTED OUT - not needed for rule-based system
 import pandas as pd
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 
+from color_extraction import get_default_extractor, get_men_extractor
+from color_index import load_or_build_color_index
+from day_planner import fetch_forecast, forecast_slots, plan_day, slot_features
+from model_registry import DEFAULT_ROOT as MODEL_REGISTRY_DIR, ActiveModel, ModelRegistry, RegistryError
+from season_service import SEASON_ORDER, SeasonClassifierService
+from shadow_eval import ShadowEvaluator
+from shopping_recommender_backend import load_blip_caption_cache, shopping_analysis
+from wardrobe_store import WardrobeStore
+
 # MongoDB imports
 try:
     from pymongo import MongoClient
@@ -37,6 +47,18 @@ except ImportError:
 MEN_IMAGES_ROOT = "clothing_images_men"
 WOMEN_IMAGES_ROOT = "clothing_images"
 VALID_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+CAPTION_CACHES = {"men": "blip_captions_male.json", "women": "blip_captions_female.json"}
+
+# Versioned ML models (see model_registry.py); admin calls need this token
+MODEL_NAMES = {"men": "outfit_men", "women": "outfit_women"}
+ADMIN_TOKEN = os.getenv("WEARSMART_ADMIN_TOKEN")
+
+# Shadow mode: the rule engine answers, the ML model is scored off the request path
+SHADOW_ENABLED = os.getenv("WEARSMART_SHADOW", "1") != "0"
+SHADOW_SAMPLE_RATE = float(os.getenv("WEARSMART_SHADOW_SAMPLE_RATE", "1.0"))
+
+# Day planner: forecast fetched server-side (one OpenWeather call per plan)
+OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 
 # MongoDB Configuration
 # Try environment variable first (Railway), then fallback to default
@@ -150,6 +172,14 @@ app.add_middleware(
 
 print("✅ Using RULE-BASED recommendation system (ML models disabled)")
 
+# -------------------------------------------
+# Model registry (versioned, lazily loaded, hot-swappable)
+# -------------------------------------------
+
+_model_registry = ModelRegistry(MODEL_REGISTRY_DIR)
+_active_models = {g: ActiveModel(_model_registry, name) for g, name in MODEL_NAMES.items()}
+_shadow = ShadowEvaluator(_active_models, sample_rate=SHADOW_SAMPLE_RATE, enabled=SHADOW_ENABLED)
+
 # -------------------------------------------
 # Mount image folders
 # -------------------------------------------
@@ -190,6 +220,28 @@ class OutfitResponse(BaseModel):
     bottom: str
     outer: str
 
+class SeasonRequest(BaseModel):
+    article_types: List[str] = Field(min_length=1, max_length=500)
+
+class WardrobeItem(BaseModel):
+    label: str = Field(min_length=1)
+    colors: List[str] = []
+    category: Optional[str] = Field(None, pattern=r"^(tops|bottoms|outerwear)$")
+
+class WardrobeItemsRequest(BaseModel):
+    items: List[WardrobeItem] = Field(min_length=1, max_length=500)
+
+class BulkGapsRequest(BaseModel):
+    user_ids: List[str] = Field(min_length=1, max_length=5000)
+    season: str = Field("summer", pattern=r"^(summer|winter|spring|autumn|fall)$")
+    compact: bool = False  # compact per-user records instead of full GapAnalyzer dicts
+
+class PlanRequest(BaseModel):
+    city: str
+    season: str = Field(pattern=r"^(summer|winter|spring|autumn|fall)$")
+    occasion: str
+    mood: str = "Neutral"  # men only
+
 # ===========================================
 # RULE-BASED RECOMMENDATION ENGINE
 # ===========================================
@@ -533,16 +585,19 @@ def pick_images(root: str, label: str, limit=10) -> List[str]:
     Returns:
         List of image file paths
     """
+    files = list_images(root, label)
+    random.shuffle(files)
+    return files[:limit]
+
+def list_images(root: str, label: str) -> List[str]:
+    """All image files in a category folder ([] if the folder is missing)."""
     folder = os.path.join(root, label.lower())
     if not os.path.isdir(folder):
         return []
-    
-    files = [
+    return [
         f for f in glob(folder + "/*")
         if os.path.splitext(f)[1].lower() in VALID_EXTS
     ]
-    random.shuffle(files)
-    return files[:limit]
 
 # ===========================================
 # ENDPOINTS
@@ -558,6 +613,12 @@ def root():
             "health": "/health",
             "men_recommend": "/recommend/men",
             "women_recommend": "/recommend/women",
+            "day_plan": "/plan/{gender}",
+            "seasons": "/seasons",
+            "wardrobe_seasons": "/wardrobe/{gender}/seasons",
+            "shopping": "/shopping/{gender}?season=summer",
+            "user_wardrobe": "/users/{user_id}/wardrobe",
+            "bulk_gaps": "/wardrobes/gaps",
             "images": "/images?gender=men&label=shirt&limit=10",
             "cloud_images": "/cloud-images?gender=men&label=shirt&limit=10"
         },
@@ -570,6 +631,7 @@ def health():
     return {
         "status": "ok",
         "recommendation_system": "rule-based",
+        "shadow_mode": SHADOW_ENABLED,
         # "men_model_loaded": _men_model is not None,  # COMMENTED OUT
         # "women_model_loaded": _women_model is not None,  # COMMENTED OUT
         # "men_model_error": _men_model_error,  # COMMENTED OUT
@@ -577,6 +639,10 @@ def health():
         "men_images_available": os.path.isdir(MEN_IMAGES_ROOT),
         "women_images_available": os.path.isdir(WOMEN_IMAGES_ROOT),
         "mongodb_configured": MONGODB_URI is not None and MONGODB_URI != "",
+        "models": {
+            g: (m.current.info() if m.current else {"loaded": False, "error": m.error})
+            for g, m in _active_models.items()
+        },
     }
 
 # -------------------------------------------
@@ -605,8 +671,9 @@ def recommend_men(req: MenRequest):
     # df = pd.DataFrame([req.dict()])
     # top, bottom, outer = _men_model.predict(df)[0]
     
-    # NEW - RULE-BASED PREDICTION
+    # NEW - RULE-BASED PREDICTION (ML model scored in shadow mode)
     top, bottom, outer = rule_based_recommender("men", req.dict())
+    _shadow.submit("men", req.dict(), (top, bottom, outer))
     
     return OutfitResponse(
         top=str(top),
@@ -640,8 +707,9 @@ def recommend_women(req: WomenRequest):
     # df = pd.DataFrame([req.dict()])
     # top, bottom, outer = _women_model.predict(df)[0]
     
-    # NEW - RULE-BASED PREDICTION
+    # NEW - RULE-BASED PREDICTION (ML model scored in shadow mode)
     top, bottom, outer = rule_based_recommender("women", req.dict())
+    _shadow.submit("women", req.dict(), (top, bottom, outer))
     
     return OutfitResponse(
         top=str(top),
@@ -649,15 +717,278 @@ def recommend_women(req: WomenRequest):
         outer=str(outer)
     )
 
+# -------------------------------------------
+# DAY PLAN (MEN + WOMEN)
+# -------------------------------------------
+
+def build_day_plan(gender: str, forecast: dict, req: PlanRequest) -> dict:
+    """Forecast → one outfit + images per time slot (rule engine, one pass over all slots)."""
+    slots = forecast_slots(forecast)
+    if not slots:
+        raise HTTPException(status_code=502, detail="Forecast has no entries")
+    rows = slot_features(slots, req.season, req.occasion, req.mood if gender == "men" else None)
+    outfits = [rule_based_recommender(gender, row) for row in rows]
+    for row, outfit in zip(rows, outfits):
+        _shadow.submit(gender, row, outfit)
+
+    root = MEN_IMAGES_ROOT if gender == "men" else WOMEN_IMAGES_ROOT
+    plan = plan_day(slots, outfits, lambda label: list_images(root, label))
+    for slot in plan:
+        slot["images"] = {
+            item: f"/static/{gender}/{slot['outfit'][item].lower()}/{os.path.basename(p)}" if p else None
+            for item, p in slot["images"].items()
+        }
+    return {"city": (forecast.get("city") or {}).get("name", req.city), "slots": plan}
+
+@app.post("/plan/{gender}")
+def plan_day_endpoint(gender: str, req: PlanRequest):
+    """
+    Outfits for the rest of the day (morning, afternoon, evening, night).
+
+    The 3-hour forecast for the next 24 hours is fetched once and grouped by
+    time of day; every slot is recommended in one pass and images are picked
+    so that no image repeats across the day.
+    """
+    if gender not in ("men", "women"):
+        raise HTTPException(status_code=404, detail=f"Unknown gender: {gender}")
+    if not OPENWEATHER_API_KEY:
+        raise HTTPException(status_code=503, detail="Forecast unavailable (set OPENWEATHER_API_KEY)")
+    forecast = fetch_forecast(req.city, OPENWEATHER_API_KEY)
+    if forecast is None:
+        raise HTTPException(status_code=502, detail=f"Failed to fetch forecast for {req.city}")
+    return build_day_plan(gender, forecast, req)
+
+# -------------------------------------------
+# SEASONS (articleType → seasons, for wardrobe analysis)
+# -------------------------------------------
+
+_season_service = None
+
+def get_season_service() -> SeasonClassifierService:
+    """Season classifier, loaded on first use (lookup table precomputed then)."""
+    global _season_service
+    if _season_service is None:
+        _season_service = SeasonClassifierService.load()
+    return _season_service
+
+@app.post("/seasons")
+def classify_seasons(req: SeasonRequest):
+    """
+    Seasons each articleType / clothing folder name is worn in.
+
+    Known articleTypes come from a precomputed lookup table; other strings
+    are predicted by the season model in one batch and cached.
+    """
+    service = get_season_service()
+    return {"items": service.classify(req.article_types), "model": service.info()}
+
+@app.get("/wardrobe/{gender}/seasons")
+def wardrobe_seasons(gender: str):
+    """
+    Season coverage of a wardrobe: every clothing folder with its image count
+    and seasons, images per season, and seasons with no clothes at all.
+    """
+    if gender not in ("men", "women"):
+        raise HTTPException(status_code=404, detail=f"Unknown gender: {gender}")
+    root = MEN_IMAGES_ROOT if gender == "men" else WOMEN_IMAGES_ROOT
+    labels = sorted(d for d in os.listdir(root) if d.lower() not in ("data", "none")
+                    and os.path.isdir(os.path.join(root, d))) if os.path.isdir(root) else []
+    counts = {label: len(list_images(root, label)) for label in labels}
+    seasons = get_season_service().classify([label for label in labels if counts[label]])
+
+    items = {label: {"count": counts[label], "seasons": seasons[label]["seasons"]} for label in seasons}
+    season_counts = {s: sum(i["count"] for i in items.values() if s in i["seasons"]) for s in SEASON_ORDER}
+    return {
+        "items": items,
+        "season_counts": season_counts,
+        "missing_seasons": [s for s, n in season_counts.items() if n == 0],
+    }
+
+# -------------------------------------------
+# SHOPPING ANALYSIS (wardrobe gaps → what to buy)
+# -------------------------------------------
+
+@app.get("/shopping/{gender}")
+def shopping(
+    gender: str,
+    season: str = Query("summer", pattern=r"(?i)^(summer|winter|spring|autumn|fall)$"),
+    preferred_category: Optional[str] = Query(None, description="tops/bottoms/outerwear or a label, e.g. jeans"),
+):
+    """
+    Wardrobe summary, gaps and shopping recommendations as JSON.
+
+    Results are cached by (wardrobe fingerprint, season, category); the
+    wardrobe snapshot is checked on every call, so adding or removing images
+    invalidates the cache and a repeat call is otherwise a dictionary lookup.
+    """
+    if gender not in ("men", "women"):
+        raise HTTPException(status_code=404, detail=f"Unknown gender: {gender}")
+    root = MEN_IMAGES_ROOT if gender == "men" else WOMEN_IMAGES_ROOT
+    try:
+        result, cached = shopping_analysis(root, season, load_blip_caption_cache(CAPTION_CACHES[gender]),
+                                           preferred_category)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {
+        "gender": gender,
+        "season": season.lower(),
+        "preferred_category": preferred_category,
+        "cached": cached,
+        **result,
+    }
+
+# -------------------------------------------
+# PER-USER WARDROBES (multi-tenant gap analysis)
+# -------------------------------------------
+
+_wardrobe_store = None
+
+def get_wardrobe_store() -> WardrobeStore:
+    """Per-user wardrobe store (WEARSMART_WARDROBE_DB, default data/wardrobes.db)."""
+    global _wardrobe_store
+    if _wardrobe_store is None:
+        _wardrobe_store = WardrobeStore()
+    return _wardrobe_store
+
+def gap_season(season: str) -> str:
+    return "autumn" if season == "fall" else season
+
+@app.post("/users/{user_id}/items")
+def add_wardrobe_items(user_id: str, req: WardrobeItemsRequest):
+    """Add items to a user's wardrobe (one transaction); returns the new item ids."""
+    try:
+        ids = get_wardrobe_store().add_items(user_id, [(i.label, i.colors, i.category) for i in req.items])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"user_id": user_id, "item_ids": ids}
+
+@app.delete("/users/{user_id}/items/{item_id}")
+def remove_wardrobe_item(user_id: str, item_id: int):
+    if not get_wardrobe_store().remove_item(user_id, item_id):
+        raise HTTPException(status_code=404, detail=f"Item {item_id} not found for user {user_id}")
+    return {"user_id": user_id, "removed": item_id}
+
+@app.get("/users/{user_id}/wardrobe")
+def user_wardrobe(user_id: str, season: str = Query("summer", pattern=r"^(summer|winter|spring|autumn|fall)$")):
+    """A user's wardrobe aggregates and gap analysis (no item scan)."""
+    store = get_wardrobe_store()
+    wardrobe = store.wardrobe(user_id)
+    return {
+        "user_id": user_id,
+        "total_items": wardrobe["total_items"],
+        "category_counts": wardrobe["category_counts"],
+        "color_distribution": dict(wardrobe["color_distribution"].most_common()),
+        "gaps": store.gaps(user_id, gap_season(season)),
+    }
+
+@app.post("/wardrobes/gaps")
+def bulk_wardrobe_gaps(req: BulkGapsRequest):
+    """
+    Gap analysis for many users at once. Aggregates are loaded as count
+    matrices (one query per 500 user ids) and analyzed with array operations;
+    users without items get the empty-wardrobe gaps.
+    """
+    store = get_wardrobe_store()
+    if req.compact:
+        user_ids = list(dict.fromkeys(req.user_ids))
+        records = store.gap_batch(user_ids, gap_season(req.season)).records()
+        return {"season": req.season, "results": dict(zip(user_ids, records))}
+    return {"season": req.season, "results": store.gaps_many(req.user_ids, gap_season(req.season))}
+
+# -------------------------------------------
+# ADMIN: MODEL REGISTRY
+# -------------------------------------------
+
+class ActivateRequest(BaseModel):
+    version: str = Field(pattern=r"^v\d+$")
+
+def require_admin(token: Optional[str]):
+    """Admin endpoints are disabled unless WEARSMART_ADMIN_TOKEN is set."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled (set WEARSMART_ADMIN_TOKEN)")
+    if token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.get("/admin/models")
+def list_models(x_admin_token: Optional[str] = Header(None)):
+    """Registered versions per gender, the active one, and what this worker serves."""
+    require_admin(x_admin_token)
+    return {
+        g: {**_model_registry.describe(MODEL_NAMES[g]),
+            "serving": m.current.version if m.current else None}
+        for g, m in _active_models.items()
+    }
+
+@app.post("/admin/models/{gender}/activate")
+def activate_model(gender: str, req: ActivateRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Atomically switch the active model version.
+
+    The new version is loaded and verified before the swap; requests keep being
+    served by the previous version until then. Other workers pick the change up
+    from the registry's ACTIVE pointer within a few seconds.
+    """
+    require_admin(x_admin_token)
+    if gender not in _active_models:
+        raise HTTPException(status_code=404, detail=f"Unknown gender: {gender}")
+    try:
+        loaded = _active_models[gender].swap(req.version)
+    except RegistryError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"status": "ok", "model": loaded.info()}
+
+@app.get("/admin/shadow")
+def shadow_stats(x_admin_token: Optional[str] = Header(None)):
+    """
+    Shadow-mode results for the ML models vs the rule engine (this worker).
+
+    Per gender: per-slot and full-outfit agreement, model latency percentiles
+    and the most common rule → ML disagreements over the rolling window.
+    """
+    require_admin(x_admin_token)
+    return _shadow.snapshot()
+
 # -------------------------------------------
 # IMAGES (MEN + WOMEN)
 # -------------------------------------------
 
+_color_indexes = {}
+_color_index_lock = threading.Lock()  # sync endpoints run on a thread pool
+# Same color tables as the mood modules that write the index sidecars
+COLOR_EXTRACTORS = {"men": get_men_extractor(), "women": get_default_extractor()}
+
+def get_color_index(gender: str, label: Optional[str] = None):
+    """
+    Color → image index for a gender, loaded once from the caption cache sidecar.
+
+    With ``label``, that folder is synced first (rescanned only when its mtime
+    changed), so added / deleted images show up; new images are captioned from
+    the BLIP caption cache. Call with ``_color_index_lock`` held.
+    """
+    if gender not in _color_indexes:
+        _color_indexes[gender] = load_or_build_color_index(gender, CAPTION_CACHES[gender],
+                                                           COLOR_EXTRACTORS[gender])
+    index = _color_indexes[gender]
+    if label:
+        root = MEN_IMAGES_ROOT if gender == "men" else WOMEN_IMAGES_ROOT
+        loaded = []
+
+        def caption_for(path: str) -> str:
+            if not loaded:  # read the caption cache only when the folder has new images
+                loaded.append(load_blip_caption_cache(CAPTION_CACHES[gender]))
+            return loaded[0].get(path) or ""
+
+        index.sync_folder(gender, os.path.join(root, label.lower()), caption_for)
+        index.flush()
+    return index
+
 @app.get("/images")
 def get_images(
     gender: str = Query(..., pattern="^(men|women)$"),
     label: str = Query(...),
     limit: int = Query(10, ge=1, le=50),
+    color: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
 ):
     """
     Get local image URLs for a clothing category.
@@ -666,14 +997,27 @@ def get_images(
         gender: "men" or "women"
         label: Clothing category (e.g., "shirt", "jeans", "jacket")
         limit: Maximum number of images to return (1-50)
+        color: Optional color filter, answered from the caption color index
+            (400 for a color outside its vocabulary)
+        page: 1-based page of color matches (page size = limit)
     
     Returns:
         JSON with count and list of image URLs
+        (plus total and page when filtering by color)
     """
+    base_url = f"/static/{gender}"
+
+    if color:
+        with _color_index_lock:
+            if not get_color_index(gender).covers(color):
+                raise HTTPException(status_code=400, detail=f"Unknown color: {color}")
+            ids, total = get_color_index(gender, label).page(gender, label, color, page, limit)
+        urls = [f"{base_url}/{label.lower()}/{os.path.basename(i)}" for i in ids]
+        return {"count": len(urls), "items": urls, "total": total, "page": page}
+
     root = MEN_IMAGES_ROOT if gender == "men" else WOMEN_IMAGES_ROOT
     paths = pick_images(root, label, limit)
     
-    base_url = f"/static/{gender}"
     urls = [
         f"{base_url}/{label.lower()}/{os.path.basename(p)}"
         for p in paths
@@ -11,8 +11,6 @@ os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 # ---- Standard libs
 import importlib
 import random
-import re
-import sqlite3
 from collections import defaultdict
 from pathlib import Path
 from typing import List, Tuple, Optional
@@ -26,6 +24,10 @@ from PIL import Image
 import torch
 from transformers import BlipProcessor, BlipForConditionalGeneration
 
+from caption_colors import PROMPT, clean_caption, color_terms_for_query, extract_colors, normalize_color
+from image_index_db import ImageIndexDB
+from image_indexer import refresh_index
+
 # =========================
 # Streamlit UI config
 # =========================
@@ -106,75 +108,9 @@ except Exception as e:
     )
     processor, blip_model = None, None
 
-# =========================
-# Color vocabulary & helpers
-# =========================
-COLOR_VOCAB = [
-    "black","white","gray","grey","silver","gold","golden",
-    "red","maroon","crimson",
-    "orange","amber","rust",
-    "yellow","mustard",
-    "green","olive","mint","teal",
-    "blue","navy","cyan","turquoise","royal","sky-blue","baby-blue","navy-blue",
-    "purple","violet","lavender","magenta","pink","hot-pink",
-    "beige","brown","tan","camel","camel-colored","cream","off-white","charcoal",
-]
-COLOR_ALIAS = {
-    "grey": "gray",
-    "golden": "gold",
-    "off-white": "white",
-    "charcoal": "gray",
-    "royal": "blue",
-    "sky-blue": "blue",
-    "baby-blue": "blue",
-    "navy-blue": "blue",
-    "camel-colored": "camel",
-    "hot-pink": "pink",
-}
-
-def normalize_color(word: str) -> str:
-    w = word.lower()
-    return COLOR_ALIAS.get(w, w)
-
-# allow shades like "dark blue", "bright red"
-SHADE_PREFIX = r"(?:light|dark|deep|bright|pale)\s+"
-BASE = r"|".join(map(re.escape, COLOR_VOCAB))
-COLOR_PATTERN = re.compile(rf"\b(?:{SHADE_PREFIX})?({BASE})\b", re.IGNORECASE)
-
-def extract_colors(text: str) -> List[str]:
-    if not text:
-        return []
-    found = [normalize_color(m.group(1)) for m in COLOR_PATTERN.finditer(text)]
-    # de-dup preserving order
-    seen = set()
-    out = []
-    for c in found:
-        if c not in seen:
-            seen.add(c)
-            out.append(c)
-    return out
-
 # =========================
 # Captioning (clean, no prompt echo)
 # =========================
-PROMPT = "Describe this clothing item and include its main color in one word."
-PROMPT_ECHO_RE = re.compile(
-    r"^\s*(top|bottom|outerwear)\s*:\s*|^\s*describe.*?one word\.?\s*",
-    re.IGNORECASE,
-)
-
-def _clean_caption(text: str) -> str:
-    text = PROMPT_ECHO_RE.sub("", text or "").strip()
-    text = text.strip(" ,.-")
-    text = (
-        text.replace("off white", "off-white")
-            .replace("navy blue", "navy-blue")
-            .replace("sky blue", "sky-blue")
-            .replace("baby blue", "baby-blue")
-            .replace("camel colored", "camel-colored")
-    )
-    return text or "clothing item"
-
 def blip_caption(image: Image.Image, prompt: Optional[str] = None) -> str:
     if processor is None or blip_model is None:
         return "caption unavailable"
@@ -195,11 +131,11 @@ def generate_caption(image_path: str) -> str:
     except Exception:
         return "clothing item"
     # 1) Unprompted
-    cap = _clean_caption(blip_caption(image))
+    cap = clean_caption(blip_caption(image))
     if extract_colors(cap):
         return cap
     # 2) Prompted fallback
-    cap2 = _clean_caption(blip_caption(image, PROMPT))
+    cap2 = clean_caption(blip_caption(image, PROMPT))
     return cap2
 
 # =========================
@@ -233,98 +169,41 @@ def fetch_weather(city: str):
 DB_PATH = Path("data") / "image_index.db"
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+_db = ImageIndexDB(DB_PATH)
+
 def open_conn():
-    return sqlite3.connect(DB_PATH.as_posix())
+    """This thread's long-lived connection (WAL mode, schema ensured)."""
+    return _db.connection()
 
 def init_db():
-    with open_conn() as con:
-        con.execute("""
-            CREATE TABLE IF NOT EXISTS images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                path TEXT UNIQUE,
-                label TEXT,
-                caption TEXT,
-                colors TEXT
-            )
-        """)
-        con.execute("CREATE INDEX IF NOT EXISTS idx_label ON images(label)")
-        con.execute("CREATE INDEX IF NOT EXISTS idx_colors ON images(colors)")
-        con.execute("CREATE INDEX IF NOT EXISTS idx_caption ON images(caption)")
+    _db.connection()
 
 def upsert_image_record(path: str, label: str, caption: str, colors: List[str]):
-    colors_csv = ",".join(colors)
-    with open_conn() as con:
-        con.execute("""
-            INSERT INTO images (path, label, caption, colors)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(path) DO UPDATE SET
-              label=excluded.label,
-              caption=excluded.caption,
-              colors=excluded.colors
-        """, (path, label, caption, colors_csv))
+    _db.upsert(path, label, caption, colors)
 
 def get_db_caption(path: str) -> Optional[str]:
-    with open_conn() as con:
-        row = con.execute("SELECT caption FROM images WHERE path = ?", (path,)).fetchone()
-        return row[0] if row else None
-
-def iter_image_files(root: Path):
-    if not root.exists():
-        return
-    for label_dir in sorted([p for p in root.iterdir() if p.is_dir()]):
-        label = label_dir.name
-        for img_path in label_dir.iterdir():
-            if img_path.suffix.lower() in {".jpg",".jpeg",".png",".webp"}:
-                yield label, img_path
+    return _db.get_caption(path)
 
 @st.cache_data(show_spinner=False)
 def db_count_images() -> int:
-    init_db()
-    with open_conn() as con:
-        row = con.execute("SELECT COUNT(*) FROM images").fetchone()
-    return int(row[0]) if row else 0
+    return _db.count()
 
 def build_or_refresh_index(clothing_root: Path, recaption: bool = False) -> Tuple[int,int]:
     """
-    Walks clothing_root, inserts/updates records.
+    Walks clothing_root, inserts/updates records for new or modified images
+    (change detection by size + mtime) and prunes rows for deleted files.
     If recaption=True, regenerates captions even if path already exists.
     Returns: (indexed_count, skipped_count)
     """
-    init_db()
-    indexed, skipped = 0, 0
-    with open_conn() as con:
-        existing = {row[0] for row in con.execute("SELECT path FROM images")}
-    # simple progress bar
-    all_items = list(iter_image_files(clothing_root))
-    if not all_items:
-        return 0, 0
     progress = st.progress(0.0)
-    total = len(all_items)
-
-    for i, (label, img_path) in enumerate(all_items, start=1):
-        p = str(img_path.resolve())
-        need = recaption or (p not in existing)
-        if not need:
-            skipped += 1
-        else:
-            caption = generate_caption(p)
-            colors = extract_colors(caption)
-            upsert_image_record(p, label, caption, colors)
-            indexed += 1
-        progress.progress(i/total)
-
-    db_count_images.clear()  # refresh cache
-    return indexed, skipped
-
-def color_terms_for_query(color: str) -> List[str]:
-    """Return canonical + all alias forms that map to it (for caption fallback search)."""
-    canonical = normalize_color(color)
-    terms = {canonical}
-    # include alias keys that map to this canonical
-    for k, v in COLOR_ALIAS.items():
-        if v == canonical:
-            terms.add(k)
-    return sorted(terms)
+    report = refresh_index(
+        _db, clothing_root, generate_caption, extract_colors,
+        recaption=recaption,
+        progress=lambda done, total: progress.progress(done / total),
+    )
+    progress.progress(1.0)
+    db_count_images.clear()
+    return report["indexed"], report["skipped"]
 
 def query_images_by_color(color: str, limit: int = 24) -> List[Tuple[str,str,str,str]]:
     """
@@ -333,38 +212,11 @@ def query_images_by_color(color: str, limit: int = 24) -> List[Tuple[str,str,str
     Fallback: OR match in raw `caption` for any alias terms.
     """
     init_db()
-    terms = color_terms_for_query(color)
-    params = []
-    where_clauses = []
-
-    # colors column (canonical tags)
-    canon = normalize_color(color)
-    where_clauses.append("colors LIKE ?")
-    params.append(f"%{canon}%")
-
-    # caption fallback for alias tokens
-    for t in terms:
-        where_clauses.append("LOWER(caption) LIKE ?")
-        params.append(f"%{t.lower()}%")
-
-    sql = f"""
-        SELECT path,label,caption,colors
-        FROM images
-        WHERE {" OR ".join(where_clauses)}
-        ORDER BY RANDOM() LIMIT ?
-    """
-    params.append(limit)
-    with open_conn() as con:
-        rows = con.execute(sql, params).fetchall()
-    return rows
+    # canonical tag via image_colors, alias words via the caption FTS index
+    return _db.query_by_color(normalize_color(color), color_terms_for_query(color), limit)
 
 def sample_any_images(limit: int = 24) -> List[Tuple[str,str,str,str]]:
-    with open_conn() as con:
-        rows = con.execute(
-            "SELECT path,label,caption,colors FROM images ORDER BY RANDOM() LIMIT ?",
-            (limit,),
-        ).fetchall()
-    return rows
+    return _db.sample(limit)
 
 def caption_from_db_or_generate(path: str, label: str) -> str:
     """Use DB caption if present, else caption & upsert (so display always clean)."""
@@ -11,9 +11,8 @@ os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
 # ---- Standard libs
 import importlib
 import random
-import re
-import sqlite3
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
 from typing import List, Tuple, Optional
 from datetime import datetime
@@ -28,6 +27,11 @@ from transformers import BlipProcessor, BlipForConditionalGeneration
 
 # ---- Your weather util
 from weather_api import fetch_weather  # must return dict like: {city, temperature, humidity, wind, condition, description}
+import caption_colors
+from caption_colors import PROMPT, clean_caption
+from color_extraction import get_men_extractor
+from image_index_db import ImageIndexDB
+from image_indexer import refresh_index
 
 # =========================
 # Constants / Config
@@ -35,6 +39,11 @@ from weather_api import fetch_weather  # must return dict like: {city, temperatu
 DEFAULT_IMAGES_ROOT = "clothing_images_men"   # change if needed
 DB_PATH = Path("data") / "image_index_men.db"
 
+# Men's color table, the same one mood_check_male and the API's men index use
+extract_colors = partial(caption_colors.extract_colors, extractor=get_men_extractor())
+normalize_color = partial(caption_colors.normalize_color, extractor=get_men_extractor())
+color_terms_for_query = partial(caption_colors.color_terms_for_query, extractor=get_men_extractor())
+
 # =========================
 # Streamlit UI config
 # =========================
@@ -92,23 +101,6 @@ except Exception as e:
     st.warning(f"BLIP failed to load; captions disabled. Details: {e}")
     processor, blip_model = None, None
 
-PROMPT = "Describe this clothing item and include its main color in one word."
-PROMPT_ECHO_RE = re.compile(
-    r"^\s*(top|bottom|outerwear)\s*:\s*|^\s*describe.*?one word\.?\s*",
-    re.IGNORECASE,
-)
-
-def _clean_caption(text: str) -> str:
-    text = PROMPT_ECHO_RE.sub("", text or "").strip()
-    text = text.strip(" ,.-")
-    return (
-        text.replace("off white", "off-white")
-            .replace("navy blue", "navy-blue")
-            .replace("sky blue", "sky-blue")
-            .replace("baby blue", "baby-blue")
-            .replace("camel colored", "camel-colored")
-    ) or "clothing item"
-
 def blip_caption(image: Image.Image, prompt: Optional[str] = None) -> str:
     if processor is None or blip_model is None:
         return "caption unavailable"
@@ -128,172 +120,56 @@ def generate_caption(image_path: str) -> str:
         image = Image.open(image_path).convert("RGB")
     except Exception:
         return "clothing item"
-    cap = _clean_caption(blip_caption(image))
+    cap = clean_caption(blip_caption(image))
     if extract_colors(cap):
         return cap
-    cap2 = _clean_caption(blip_caption(image, PROMPT))
+    cap2 = clean_caption(blip_caption(image, PROMPT))
     return cap2
 
-# =========================
-# Color vocab & helpers
-# =========================
-COLOR_VOCAB = [
-    "black","white","gray","grey","silver","gold","golden",
-    "red","maroon","crimson",
-    "orange","amber","rust",
-    "yellow","mustard",
-    "green","olive","mint","teal",
-    "blue","navy","cyan","turquoise","royal","sky-blue","baby-blue","navy-blue",
-    "purple","violet","lavender","magenta","pink","hot-pink",
-    "beige","brown","tan","camel","camel-colored","cream","off-white","charcoal",
-]
-COLOR_ALIAS = {
-    "grey": "gray",
-    "golden": "gold",
-    "off-white": "white",
-    "charcoal": "gray",
-    "royal": "blue",
-    "sky-blue": "blue",
-    "baby-blue": "blue",
-    "navy-blue": "blue",
-    "camel-colored": "camel",
-    "hot-pink": "pink",
-}
-
-def normalize_color(word: str) -> str:
-    return COLOR_ALIAS.get(word.lower(), word.lower())
-
-SHADE_PREFIX = r"(?:light|dark|deep|bright|pale)\s+"
-BASE = r"|".join(map(re.escape, COLOR_VOCAB))
-COLOR_PATTERN = re.compile(rf"\b(?:{SHADE_PREFIX})?({BASE})\b", re.IGNORECASE)
-
-def extract_colors(text: str) -> List[str]:
-    if not text:
-        return []
-    found = [normalize_color(m.group(1)) for m in COLOR_PATTERN.finditer(text)]
-    seen, out = set(), []
-    for c in found:
-        if c not in seen:
-            seen.add(c)
-            out.append(c)
-    return out
-
-def color_terms_for_query(color: str) -> List[str]:
-    canonical = normalize_color(color)
-    terms = {canonical}
-    for k, v in COLOR_ALIAS.items():
-        if v == canonical:
-            terms.add(k)
-    return sorted(terms)
-
 # =========================
 # Image DB (SQLite)
 # =========================
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+_db = ImageIndexDB(DB_PATH)
+
 def open_conn():
-    return sqlite3.connect(DB_PATH.as_posix())
+    """This thread's long-lived connection (WAL mode, schema ensured)."""
+    return _db.connection()
 
 def init_db():
-    with open_conn() as con:
-        con.execute("""
-            CREATE TABLE IF NOT EXISTS images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                path TEXT UNIQUE,
-                label TEXT,
-                caption TEXT,
-                colors TEXT
-            )
-        """)
-        con.execute("CREATE INDEX IF NOT EXISTS idx_label ON images(label)")
-        con.execute("CREATE INDEX IF NOT EXISTS idx_colors ON images(colors)")
-        con.execute("CREATE INDEX IF NOT EXISTS idx_caption ON images(caption)")
+    _db.connection()
 
 def upsert_image_record(path: str, label: str, caption: str, colors: List[str]):
-    colors_csv = ",".join(colors)
-    with open_conn() as con:
-        con.execute("""
-            INSERT INTO images (path, label, caption, colors)
-            VALUES (?, ?, ?, ?)
-            ON CONFLICT(path) DO UPDATE SET
-              label=excluded.label,
-              caption=excluded.caption,
-              colors=excluded.colors
-        """, (path, label, caption, colors_csv))
+    _db.upsert(path, label, caption, colors)
 
 def get_db_caption(path: str) -> Optional[str]:
-    with open_conn() as con:
-        row = con.execute("SELECT caption FROM images WHERE path = ?", (path,)).fetchone()
-        return row[0] if row else None
-
-def iter_image_files(root: Path):
-    if not root.exists():
-        return
-    for label_dir in sorted([p for p in root.iterdir() if p.is_dir()]):
-        label = label_dir.name
-        for img_path in label_dir.iterdir():
-            if img_path.suffix.lower() in {".jpg",".jpeg",".png",".webp"}:
-                yield label, img_path
+    return _db.get_caption(path)
 
 @st.cache_data(show_spinner=False)
 def db_count_images() -> int:
-    init_db()
-    with open_conn() as con:
-        (count,) = con.execute("SELECT COUNT(*) FROM images").fetchone()
-    return int(count)
+    return _db.count()
 
 def build_or_refresh_index(images_root: Path, recaption: bool = False) -> Tuple[int,int]:
-    """Index all images under images_root (folder per label)."""
-    init_db()
-    indexed, skipped = 0, 0
-    with open_conn() as con:
-        existing = {row[0] for row in con.execute("SELECT path FROM images")}
-    all_items = list(iter_image_files(images_root))
-    if not all_items:
-        return 0, 0
-
+    """Index all images under images_root (folder per label); unchanged files are skipped."""
     progress = st.progress(0.0)
-    total = len(all_items)
-
-    for i, (label, img_path) in enumerate(all_items, start=1):
-        p = str(img_path.resolve())
-        need = recaption or (p not in existing)
-        if not need:
-            skipped += 1
-        else:
-            cap = generate_caption(p)
-            colors = extract_colors(cap)
-            upsert_image_record(p, label, cap, colors)
-            indexed += 1
-        progress.progress(i/total)
-
+    report = refresh_index(
+        _db, images_root, generate_caption, extract_colors,
+        recaption=recaption,
+        progress=lambda done, total: progress.progress(done / total),
+    )
+    progress.progress(1.0)
     db_count_images.clear()
-    return indexed, skipped
+    return report["indexed"], report["skipped"]
 
 def query_images_by_color(color: str, limit: int = 24) -> List[Tuple[str,str,str,str]]:
     """Return rows (path,label,caption,colors) for a given color (canonical + aliases)."""
     init_db()
-    terms = color_terms_for_query(color)
-    canon = normalize_color(color)
-    params = [f"%{canon}%"] + [f"%{t.lower()}%" for t in terms]
-    where = ["colors LIKE ?"] + ["LOWER(caption) LIKE ?"] * len(terms)
-
-    sql = f"""
-        SELECT path,label,caption,colors
-        FROM images
-        WHERE {" OR ".join(where)}
-        ORDER BY RANDOM() LIMIT ?
-    """
-    params.append(limit)
-    with open_conn() as con:
-        return con.execute(sql, params).fetchall()
+    # canonical tag via image_colors, alias words via the caption FTS index
+    return _db.query_by_color(normalize_color(color), color_terms_for_query(color), limit)
 
 def sample_any_images(limit: int = 24) -> List[Tuple[str,str,str,str]]:
-    with open_conn() as con:
-        return con.execute(
-            "SELECT path,label,caption,colors FROM images ORDER BY RANDOM() LIMIT ?",
-            (limit,),
-        ).fetchall()
+    return _db.sample(limit)
 
 def caption_from_db_or_generate(path: str, label: str) -> str:
     cap = get_db_caption(path)